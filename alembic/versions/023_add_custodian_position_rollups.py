@@ -0,0 +1,69 @@
+"""Add custodian_position_rollups for precomputed unified positions
+
+Revision ID: 023
+Revises: 022
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "023"
+down_revision = "022"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    custodianassetclass_enum = postgresql.ENUM(
+        "equity", "fixed_income", "cash", "alternatives", "real_estate",
+        "commodities", "crypto", "options", "futures", "mutual_fund", "etf", "other",
+        name="custodianassetclass", create_type=False,
+    )
+
+    op.create_table(
+        "custodian_position_rollups",
+        sa.Column(
+            "id",
+            postgresql.UUID(as_uuid=True),
+            primary_key=True,
+            server_default=sa.text("gen_random_uuid()"),
+        ),
+        sa.Column(
+            "advisor_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("advisors.id"),
+            nullable=False,
+        ),
+        sa.Column(
+            "household_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("households.id"),
+            nullable=True,
+        ),
+        sa.Column("symbol", sa.String(20), nullable=False),
+        sa.Column("cusip", sa.String(9), nullable=True),
+        sa.Column("security_name", sa.String(255), nullable=False),
+        sa.Column("asset_class", custodianassetclass_enum, server_default="other"),
+        sa.Column("total_quantity", sa.Numeric(18, 6), nullable=False, server_default="0"),
+        sa.Column("total_market_value", sa.Numeric(18, 2), nullable=False, server_default="0"),
+        sa.Column("total_cost_basis", sa.Numeric(18, 2), nullable=False, server_default="0"),
+        sa.Column("account_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("accounts", postgresql.JSONB, nullable=True),
+        sa.Column(
+            "refreshed_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_custodian_position_rollups_scope",
+        "custodian_position_rollups",
+        ["advisor_id", "household_id", "symbol"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_custodian_position_rollups_scope")
+    op.drop_table("custodian_position_rollups")
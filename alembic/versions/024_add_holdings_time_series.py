@@ -0,0 +1,71 @@
+"""Add delta-encoded holdings time-series and value rollups
+
+Revision ID: 024
+Revises: 023
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "024"
+down_revision = "023"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Parent table only; monthly partitions are created on demand by
+    # HoldingsTimeSeriesStore.ensure_partition().
+    op.execute("""
+        CREATE TABLE holdings_snapshots (
+            account_key VARCHAR(64) NOT NULL,
+            snapshot_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            advisor_id UUID,
+            household_id UUID,
+            is_keyframe BOOLEAN NOT NULL DEFAULT false,
+            total_value NUMERIC(18, 2) NOT NULL,
+            payload JSONB NOT NULL,
+            source VARCHAR(32) NOT NULL DEFAULT 'altruist',
+            PRIMARY KEY (account_key, snapshot_at)
+        ) PARTITION BY RANGE (snapshot_at)
+    """)
+    op.create_index(
+        "ix_holdings_snapshots_advisor_time",
+        "holdings_snapshots",
+        ["advisor_id", "snapshot_at"],
+    )
+    op.create_index(
+        "ix_holdings_snapshots_household_time",
+        "holdings_snapshots",
+        ["household_id", "snapshot_at"],
+    )
+
+    op.create_table(
+        "holdings_value_rollups",
+        sa.Column("account_key", sa.String(64), nullable=False),
+        sa.Column("granularity", sa.String(8), nullable=False),
+        sa.Column("bucket_start", sa.Date(), nullable=False),
+        sa.Column("advisor_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("household_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("open_value", sa.Numeric(18, 2), nullable=False),
+        sa.Column("high_value", sa.Numeric(18, 2), nullable=False),
+        sa.Column("low_value", sa.Numeric(18, 2), nullable=False),
+        sa.Column("close_value", sa.Numeric(18, 2), nullable=False),
+        sa.Column("samples", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("last_snapshot_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("account_key", "granularity", "bucket_start"),
+    )
+    op.create_index(
+        "ix_holdings_value_rollups_household",
+        "holdings_value_rollups",
+        ["household_id", "granularity", "bucket_start"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_holdings_value_rollups_household")
+    op.drop_table("holdings_value_rollups")
+    op.drop_index("ix_holdings_snapshots_household_time")
+    op.drop_index("ix_holdings_snapshots_advisor_time")
+    op.execute("DROP TABLE holdings_snapshots CASCADE")
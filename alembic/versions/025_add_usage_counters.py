@@ -0,0 +1,44 @@
+"""Add usage_counters for O(1) monthly quota checks
+
+Revision ID: 025
+Revises: 024
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "025"
+down_revision = "024"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "usage_counters",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("feature", sa.String(50), nullable=False),
+        sa.Column("period", sa.String(6), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id", "feature", "period"),
+    )
+
+    # Seed the current totals from the audit log
+    op.execute("""
+        INSERT INTO usage_counters (user_id, feature, period, count)
+        SELECT user_id, feature, to_char(timestamp AT TIME ZONE 'UTC', 'YYYYMM'), count(*)
+        FROM usage_logs
+        GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("usage_counters")
@@ -0,0 +1,54 @@
+"""Add month-partitioned search_entries full-text index
+
+Revision ID: 026
+Revises: 025
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "026"
+down_revision = "025"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Declarative partitioning is not expressible through op.create_table
+    op.execute("""
+        CREATE TABLE search_entries (
+            collection VARCHAR(40) NOT NULL,
+            doc_id VARCHAR(64) NOT NULL,
+            occurred_at TIMESTAMPTZ NOT NULL,
+            owner_id VARCHAR(64),
+            title TEXT NOT NULL DEFAULT '',
+            participants TEXT NOT NULL DEFAULT '',
+            body TEXT NOT NULL DEFAULT '',
+            facets JSONB NOT NULL DEFAULT '{}'::jsonb,
+            payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+            search_vector TSVECTOR GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('simple', coalesce(participants, '')), 'B') ||
+                setweight(to_tsvector('simple', coalesce(body, '')), 'C')
+            ) STORED,
+            indexed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (collection, doc_id, occurred_at)
+        ) PARTITION BY RANGE (occurred_at)
+    """)
+    op.execute("CREATE TABLE search_entries_default PARTITION OF search_entries DEFAULT")
+
+    # Indexes on the parent cascade to every partition
+    op.execute(
+        "CREATE INDEX ix_search_entries_vector ON search_entries USING gin (search_vector)"
+    )
+    op.execute(
+        "CREATE INDEX ix_search_entries_facets ON search_entries USING gin (facets)"
+    )
+    op.create_index(
+        "ix_search_entries_scope",
+        "search_entries",
+        ["collection", "owner_id", "occurred_at"],
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE search_entries CASCADE")
@@ -0,0 +1,37 @@
+"""Add job_watermarks for incremental compliance jobs
+
+Revision ID: 028
+Revises: 027
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "028"
+down_revision = "027"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_watermarks",
+        sa.Column("job_key", sa.String(100), nullable=False),
+        sa.Column("watermark", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("job_key"),
+    )
+    # Range scans of the follow-up job: threshold crossings and changed rows
+    op.create_index("ix_prospects_status_activity", "prospects", ["status", "last_activity_at"])
+    op.create_index("ix_prospects_updated", "prospects", ["updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_prospects_updated", table_name="prospects")
+    op.drop_index("ix_prospects_status_activity", table_name="prospects")
+    op.drop_table("job_watermarks")
@@ -12,7 +12,14 @@ from fastapi import APIRouter, HTTPException, Depends, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr
 from jose import jwt, JWTError
-import bcrypt
+
+from backend.services.auth_crypto import (
+    TokenClaimsCache,
+    hash_password as hash_password_async,
+    hash_password_sync,
+    verify_password as verify_password_async,
+    verify_password_sync,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -37,23 +44,13 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 
 
-# --- Password Utilities (direct bcrypt, no passlib) ---
-
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt."""
-    # bcrypt has a 72-byte limit, truncate if necessary
-    pw_bytes = password.encode("utf-8")[:72]
-    return bcrypt.hashpw(pw_bytes, bcrypt.gensalt()).decode("utf-8")
+# --- Password Utilities (bcrypt; handlers use the off-loop async variants) ---
 
+# Sync variants are kept for the lazily seeded demo user store
+hash_password = hash_password_sync
+verify_password = verify_password_sync
 
-def verify_password(password: str, hashed: str) -> bool:
-    """Verify a password against a bcrypt hash."""
-    try:
-        pw_bytes = password.encode("utf-8")[:72]
-        return bcrypt.checkpw(pw_bytes, hashed.encode("utf-8"))
-    except Exception as e:
-        logger.warning("Password verification error: %s", e)
-        return False
+_claims_cache = TokenClaimsCache("auth:ria_claims")
 
 
 # --- Pydantic Models ---
@@ -132,12 +129,15 @@ def create_access_token(data: dict) -> str:
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+def _decode_token(token: str) -> dict:
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     if not credentials:
         raise HTTPException(status_code=401, detail="Not authenticated")
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        return _claims_cache.decode(credentials.credentials, _decode_token)
     except JWTError as e:
         logger.warning("JWT verification failed: %s", e)
         raise HTTPException(status_code=401, detail="Invalid or expired token")
@@ -181,7 +181,7 @@ async def login(request: LoginRequest, req: Request = None):
     if not user:
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
-    if not verify_password(request.password, user["password_hash"]):
+    if not await verify_password_async(request.password, user["password_hash"]):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
     token = create_access_token({"sub": user["email"], "role": user["role"]})
@@ -221,7 +221,7 @@ async def signup(request: SignupRequest):
         raise HTTPException(status_code=400, detail="Password must be at least 8 characters")
     
     user_id = f"{request.role}-{int(datetime.utcnow().timestamp())}"
-    password_hashed = hash_password(request.password)
+    password_hashed = await hash_password_async(request.password)
     
     # Parse licenses from comma-separated string
     licenses = []
@@ -71,7 +71,7 @@ async def get_ai_analysis(
     Return AI-generated portfolio narrative + ranked insights.
 
     Uses OpenAI gpt-4o-mini with the user's real (or demo) portfolio data.
-    Results are cached in Redis for 30 minutes.
+    Results are cached per portfolio fingerprint (30 min fresh, then stale-while-revalidate).
     """
     user_type = str(getattr(current_user, "user_type", "") or "")
     if not user_type.startswith("b2c_"):
@@ -35,6 +35,14 @@ class ChatResponse(BaseModel):
     usage_remaining: int = 0
 
 
+async def _release_quota(tracker: UsageTracker, user_id) -> None:
+    """Give back the unit require_usage_quota reserved: a failed reply is free."""
+    try:
+        await tracker.release(user_id, "ai_chat_messages")
+    except Exception as e:  # e.g. the DB transaction is already aborted
+        logger.warning("Chat quota release failed for user %s: %s", user_id, e)
+
+
 @router.post("/chat", response_model=ChatResponse)
 async def b2c_chat(
     req: ChatRequest,
@@ -43,6 +51,7 @@ async def b2c_chat(
 ):
     """B2C conversational AI — full IIM→CIM→BIM pipeline with B2C persona."""
     orchestrator = AIOrchestrator(db)
+    tracker = UsageTracker(db)
 
     household_id = str(current_user.household_id) if current_user.household_id else None
     client_id = str(current_user.client_id) if current_user.client_id else str(current_user.id)
@@ -59,10 +68,13 @@ async def b2c_chat(
         )
     except asyncio.TimeoutError:
         logger.warning("AI pipeline timed out after %ds for user %s", _AI_TIMEOUT_SECONDS, current_user.id)
+        await _release_quota(tracker, current_user.id)
         raise HTTPException(status_code=504, detail="AI response timed out. Please try again.")
+    except Exception:
+        await _release_quota(tracker, current_user.id)
+        raise
 
-    tracker = UsageTracker(db)
-    await tracker.record_usage(current_user.id, "ai_chat_messages")
+    await tracker.log_event(current_user.id, "ai_chat_messages")
 
     used = await tracker.get_monthly_count(current_user.id, "ai_chat_messages")
     tier = current_user.subscription_tier or "free"
@@ -10,7 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.api.dependencies import get_db, get_current_user
 from backend.models.user import User
-from backend.services.entitlements import TIER_FEATURES, EntitlementService
+from backend.services.entitlements import EntitlementService
 from backend.services.usage_tracker import UsageTracker
 
 logger = logging.getLogger(__name__)
@@ -45,7 +45,7 @@ def require_feature(feature_name: str) -> Callable:
 
 
 def require_usage_quota(feature_name: str) -> Callable:
-    """FastAPI dependency that checks monthly usage limits."""
+    """FastAPI dependency that reserves one unit of a monthly usage quota."""
 
     async def _check(
         current_user: User = Depends(get_current_user),
@@ -53,12 +53,14 @@ def require_usage_quota(feature_name: str) -> Callable:
     ) -> User:
         tracker = UsageTracker(db)
         limit_key = f"{feature_name}_per_month"
-        current_count = await tracker.get_monthly_count(current_user.id, feature_name)
+        limit = EntitlementService().get_usage_limit(current_user, limit_key)
 
-        svc = EntitlementService()
-        if not svc.check_usage_limit(current_user, limit_key, current_count):
-            tier = current_user.subscription_tier or "free"
-            limit = TIER_FEATURES.get(tier, {}).get(limit_key, 0)
+        # Atomic increment-and-check: concurrent requests cannot both slip
+        # past the last unit. Handlers call tracker.release() on failure.
+        allowed, current_count = await tracker.try_consume(
+            current_user.id, feature_name, limit
+        )
+        if not allowed:
             raise HTTPException(
                 status_code=429,
                 detail={
@@ -7,9 +7,9 @@ from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.api.dependencies import get_current_user, get_db
-from backend.api.financial_planning import _monte_carlo
 from backend.models.user import User
 from backend.services.entitlements import EntitlementService
+from backend.services.monte_carlo import run_monte_carlo
 
 logger = logging.getLogger(__name__)
 
@@ -45,7 +45,7 @@ async def run_retirement_plan(
 
     simulations = 1000 if full else 250
 
-    result = _monte_carlo(
+    result = await run_monte_carlo(
         current_assets=req.current_assets,
         annual_contribution=req.annual_contribution,
         years_to_retire=req.years_to_retire,
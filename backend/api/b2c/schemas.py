@@ -1,5 +1,6 @@
 """B2C response schemas — frontend contract."""
 
+from datetime import datetime
 from decimal import Decimal
 from typing import Optional
 
@@ -69,3 +70,6 @@ class DashboardResponse(BaseModel):
     alerts: list[Alert]
     ai_chat_remaining: int
     subscription_tier: str
+    snapshot_version: Optional[int] = None
+    generated_at: Optional[datetime] = None
+    degraded_sections: list[str] = []
@@ -1,5 +1,6 @@
 """B2C statement list, upload, and confirmation endpoints."""
 
+import asyncio
 import logging
 import uuid
 from datetime import datetime
@@ -17,6 +18,8 @@ from backend.models.client import Client
 from backend.models.statement import Statement
 from backend.models.user import User
 from backend.services.b2c_demo import is_demo_user
+from backend.services.blob_store import BlobTooLarge, EmptyBlob, get_blob_store
+from backend.services.dashboard_snapshots import schedule_household_refresh
 from backend.services.b2c_demo_persona import DEMO_STATEMENTS, get_demo_holdings
 from backend.services.portfolio_csv_parser import parse_portfolio_file
 from backend.services.statement_persistence import StatementPersistenceService
@@ -107,17 +110,20 @@ async def upload_statement(
             detail="Supported formats: PDF, CSV, or Excel (.xlsx/.xls)",
         )
 
-    file_bytes = await file.read()
-    if len(file_bytes) > 20 * 1024 * 1024:
+    store = get_blob_store()
+    try:
+        blob, _ = await store.save_upload(file, max_bytes=20 * 1024 * 1024)
+    except BlobTooLarge:
         raise HTTPException(status_code=413, detail="File too large (20 MB max)")
-    if not file_bytes:
+    except EmptyBlob:
         raise HTTPException(status_code=400, detail="File is empty")
 
     stmt_id = f"stmt-{str(uuid.uuid4())[:8]}"
 
     if filename_lower.endswith((".csv", ".xlsx", ".xls")):
         try:
-            parsed = parse_portfolio_file(file_bytes, file.filename)
+            async with store.local_path(blob) as path:
+                parsed = await asyncio.to_thread(parse_portfolio_file, path, file.filename)
         except ValueError as exc:
             raise HTTPException(status_code=400, detail=str(exc)) from exc
 
@@ -168,7 +174,7 @@ async def upload_statement(
         "positions": [],
     }
 
-    background_tasks.add_task(parse_statement_background, stmt_id, file_bytes, file.filename)
+    background_tasks.add_task(parse_statement_background, stmt_id, blob, file.filename)
 
     logger.info("B2C statement upload: %s by user %s", stmt_id, current_user.id)
     return {
@@ -260,6 +266,9 @@ async def confirm_statement(
         management_mode="self_directed",
         source="statement_upload",
     )
+    # Commit before the dashboard rebuild so it reads the new positions
+    await db.commit()
+    schedule_household_refresh(current_user.household_id)
     stmt["status"] = "confirmed"
     stmt["persistedStatementId"] = persisted["statement_db_id"]
     stmt["persistedAccountId"] = persisted["account_id"]
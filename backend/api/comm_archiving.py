@@ -9,9 +9,11 @@ import logging
 from datetime import datetime, timezone, timedelta
 from typing import List, Optional, Dict, Any
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 
+from backend.services.search import LocalSearchIndex, SearchQuery, message_document
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/archive", tags=["Communication Archiving"])
@@ -81,6 +83,76 @@ def _mock_messages(count: int = 50) -> List[Dict[str, Any]]:
 
 MOCK_MESSAGES = _mock_messages(60)
 
+# ---------------------------------------------------------------------------
+# Search index — messages are indexed once on ingest, queries never rescan
+# ---------------------------------------------------------------------------
+
+ARCHIVE_COLLECTION = "comm_archive"
+
+_archive_index = LocalSearchIndex()
+_archive_index.add_many(message_document(m) for m in MOCK_MESSAGES)
+
+
+def archive_message(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Store one message and index it immediately."""
+    MOCK_MESSAGES.insert(0, message)
+    _archive_index.add(message_document(message))
+    return message
+
+
+def _search(
+    text: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    sort: str = "recent",
+    offset: int = 0,
+    limit: int = 25,
+    **filters: Optional[str],
+):
+    return _archive_index.search(SearchQuery(
+        collection=ARCHIVE_COLLECTION,
+        text=text,
+        filters=filters,
+        start=start,
+        end=end,
+        facets=["channel", "status", "flagged"],
+        sort=sort,
+        offset=offset,
+        limit=limit,
+    ))
+
+
+def _channels_summary(facets: Dict[str, Dict[str, int]]) -> Dict[str, int]:
+    counts = facets.get("channel", {})
+    return {ch: counts.get(ch, 0) for ch in CHANNELS}
+
+
+def _parse_date(value: Optional[str], end_of_day: bool = False) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Invalid date: {value}")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    if end_of_day and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+
+class ArchiveMessageRequest(BaseModel):
+    channel: str
+    subject: str = ""
+    body: str
+    from_name: str
+    from_email: Optional[str] = None
+    to_name: str
+    to_email: Optional[str] = None
+    timestamp: Optional[datetime] = None
+    has_attachments: bool = False
+    attachment_count: int = 0
+
 RETENTION_POLICIES = [
     {"id": "pol-001", "name": "SEC Rule 17a-4 — Email", "channel": "email",
      "retention_years": 6, "status": "active",
@@ -114,36 +186,63 @@ async def list_archived_messages(
     page_size: int = 25,
     current_user: dict = Depends(get_current_user),
 ):
-    msgs = MOCK_MESSAGES
-    cutoff = _now - timedelta(days=days)
-    msgs = [m for m in msgs if m["timestamp"] >= cutoff.isoformat()]
-    if channel:
-        msgs = [m for m in msgs if m["channel"] == channel]
-    if status:
-        msgs = [m for m in msgs if m["status"] == status]
-    if search:
-        q = search.lower()
-        msgs = [m for m in msgs if q in m["subject"].lower() or q in m.get("from_name", "").lower() or q in m.get("to_name", "").lower()]
-
-    total = len(msgs)
-    start = (page - 1) * page_size
-    paged = msgs[start:start + page_size]
-
+    page = max(page, 1)
+    result = _search(
+        text=search,
+        start=_now - timedelta(days=days),
+        offset=(page - 1) * page_size,
+        limit=page_size,
+        channel=channel,
+        status=status,
+    )
     return {
-        "messages": paged,
-        "total": total,
+        "messages": result.payloads(),
+        "total": result.total,
         "page": page,
         "page_size": page_size,
-        "channels_summary": {ch: sum(1 for m in msgs if m["channel"] == ch) for ch in CHANNELS},
+        "channels_summary": _channels_summary(result.facets),
     }
 
 
+@router.post("/messages")
+async def ingest_message(
+    request: ArchiveMessageRequest,
+    current_user: dict = Depends(get_current_user),
+):
+    if request.channel not in CHANNELS:
+        raise HTTPException(status_code=422, detail=f"Unknown channel: {request.channel}")
+    timestamp = request.timestamp or datetime.now(timezone.utc)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return archive_message({
+        "id": f"msg-{uuid.uuid4().hex[:12]}",
+        "channel": request.channel,
+        "subject": request.subject,
+        "from_name": request.from_name,
+        "from_email": request.from_email,
+        "to_name": request.to_name,
+        "to_email": request.to_email,
+        "body_preview": request.body[:100],
+        "body_full": request.body,
+        "timestamp": timestamp.isoformat(),
+        "status": "archived",
+        "has_attachments": request.has_attachments,
+        "attachment_count": request.attachment_count,
+        "integrity_hash": hashlib.sha256(request.body.encode()).hexdigest()[:16],
+        "retention_expiry": (timestamp + timedelta(days=6 * 365)).strftime("%Y-%m-%d"),
+        "flagged_keywords": [],
+        "reviewed_by": None,
+        "reviewed_at": None,
+    })
+
+
 @router.get("/messages/{message_id}")
 async def get_message(message_id: str, current_user: dict = Depends(get_current_user)):
-    for m in MOCK_MESSAGES:
-        if m["id"] == message_id:
-            return {**m, "body_full": f"Full archived content for {m['subject']}.\n\nThis message has been securely archived with tamper-proof integrity verification."}
-    return {"error": "Message not found"}
+    doc = _archive_index.get(ARCHIVE_COLLECTION, message_id)
+    if doc is None:
+        return {"error": "Message not found"}
+    m = doc.payload
+    return {"body_full": f"Full archived content for {m['subject']}.\n\nThis message has been securely archived with tamper-proof integrity verification.", **m}
 
 
 @router.post("/messages/{message_id}/review")
@@ -169,12 +268,14 @@ async def list_policies(current_user: dict = Depends(get_current_user)):
 
 @router.get("/dashboard")
 async def archive_dashboard(current_user: dict = Depends(get_current_user)):
+    everything = _search(limit=0)
+    today = _search(start=_now - timedelta(days=1), limit=0)
     return {
-        "total_archived": len(MOCK_MESSAGES),
-        "archived_today": sum(1 for m in MOCK_MESSAGES if m["timestamp"] >= (_now - timedelta(days=1)).isoformat()),
-        "pending_review": sum(1 for m in MOCK_MESSAGES if m["status"] == "flagged_for_review"),
-        "flagged_keywords_count": sum(1 for m in MOCK_MESSAGES if m["flagged_keywords"]),
-        "channels": {ch: sum(1 for m in MOCK_MESSAGES if m["channel"] == ch) for ch in CHANNELS},
+        "total_archived": everything.total,
+        "archived_today": today.total,
+        "pending_review": everything.facets["status"].get("flagged_for_review", 0),
+        "flagged_keywords_count": everything.facets["flagged"].get("yes", 0),
+        "channels": _channels_summary(everything.facets),
         "storage_used_gb": 2.4,
         "retention_compliance": "compliant",
         "last_audit": (_now - timedelta(days=12)).strftime("%Y-%m-%d"),
@@ -188,12 +289,22 @@ async def search_archive(
     channel: Optional[str] = None,
     date_from: Optional[str] = None,
     date_to: Optional[str] = None,
+    offset: int = 0,
+    limit: int = Query(50, le=500),
     current_user: dict = Depends(get_current_user),
 ):
-    results = [m for m in MOCK_MESSAGES
-               if q.lower() in m["subject"].lower()
-               or q.lower() in m.get("from_name", "").lower()
-               or q.lower() in m.get("to_name", "").lower()]
-    if channel:
-        results = [m for m in results if m["channel"] == channel]
-    return {"results": results, "total": len(results), "query": q}
+    result = _search(
+        text=q,
+        start=_parse_date(date_from),
+        end=_parse_date(date_to, end_of_day=True),
+        sort="relevance",
+        offset=offset,
+        limit=limit,
+        channel=channel,
+    )
+    return {
+        "results": [{**h.payload, "score": h.score} for h in result.hits],
+        "total": result.total,
+        "query": q,
+        "facets": result.facets,
+    }
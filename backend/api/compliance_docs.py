@@ -8,7 +8,7 @@ from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from fastapi.responses import HTMLResponse
 from pydantic import BaseModel
 from sqlalchemy import desc, select
@@ -500,6 +500,39 @@ def _compliance_docs_fallback():
     return compliance_documents_response()
 
 
+@router.get("/search")
+async def search_documents(
+    q: str = Query(...),
+    document_type: Optional[str] = None,
+    status: Optional[str] = None,
+    offset: int = 0,
+    limit: int = Query(25, le=200),
+    db: AsyncSession = Depends(get_db_session),
+    current_user: dict = Depends(get_current_user),
+):
+    """Full-text search across the firm's compliance document versions."""
+    firm_id = current_user.get("firm_id")
+    if not firm_id:
+        raise HTTPException(status_code=400, detail="User has no associated firm")
+    try:
+        firm_uuid = UUID(firm_id) if isinstance(firm_id, str) else firm_id
+        doc_type = DocumentType(document_type) if document_type else None
+        doc_status = DocumentStatus(status) if status else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    service = ComplianceDocService(db)
+    result = await service.search_documents(
+        firm_uuid, q, doc_type, doc_status, offset=offset, limit=limit
+    )
+    return {
+        "results": [{**h.payload, "score": h.score} for h in result.hits],
+        "total": result.total,
+        "facets": result.facets,
+        "query": q,
+    }
+
+
 @router.get("/{document_id}", response_model=DocumentResponse)
 async def get_document(
     document_id: str,
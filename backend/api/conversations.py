@@ -9,6 +9,7 @@ Endpoints:
   GET    /api/v1/conversations/analyses                     – List analyses
   GET    /api/v1/conversations/analyses/{id}                – Get analysis detail
   GET    /api/v1/conversations/meetings/{id}/analysis       – Get analysis by meeting
+  GET    /api/v1/conversations/search                       – Search transcripts
   GET    /api/v1/conversations/compliance/flags             – List compliance flags
   GET    /api/v1/conversations/compliance/flags/pending     – Pending flags
   PATCH  /api/v1/conversations/compliance/flags/{id}        – Review flag
@@ -360,6 +361,30 @@ async def get_analysis_by_meeting(
 # ============================================================================
 
 
+@router.get("/search")
+async def search_transcripts(
+    q: str = Query(...),
+    client_id: Optional[UUID] = None,
+    days: Optional[int] = Query(None, ge=1),
+    offset: int = 0,
+    limit: int = Query(25, le=200),
+    db: AsyncSession = Depends(get_db_session),
+    current_user: dict = Depends(get_current_user),
+):
+    """Full-text search over the current advisor's meeting transcripts."""
+    advisor_id = UUID(current_user["id"])
+    service = ConversationService(db)
+    result = await service.search_transcripts(
+        advisor_id, q, client_id, days, offset=offset, limit=limit
+    )
+    return {
+        "results": [{**h.payload, "score": h.score} for h in result.hits],
+        "total": result.total,
+        "facets": result.facets,
+        "query": q,
+    }
+
+
 @router.get("/compliance/flags")
 async def list_compliance_flags(
     status: Optional[str] = None,
@@ -1,11 +1,15 @@
 """
 Direct Indexing Module — Personalized index construction with continuous
 tax-loss harvesting at the individual security level.
+
+Holdings, tracking error, sector weights and harvest trades come from
+backend.services.direct_indexing (tracking-error optimizer + lot scanner);
+sleeves are cached per index and rebuilt by the nightly batch.
 """
+import asyncio
 import uuid
-import random
 import logging
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
 from typing import List, Optional, Dict, Any
 
 from fastapi import APIRouter, Depends
@@ -20,6 +24,18 @@ try:
 except ImportError:
     from api.auth import get_current_user
 
+from backend.services.direct_indexing import (
+    EXCLUSION_CATEGORIES,
+    DirectIndexAccount,
+    IndexSpec,
+    SleeveState,
+    estimated_tax_savings,
+    excluded_symbols,
+    get_universe,
+    run_batch,
+    summarize,
+)
+
 _now = datetime.now(timezone.utc)
 
 
@@ -27,18 +43,6 @@ _now = datetime.now(timezone.utc)
 # Mock Data
 # ---------------------------------------------------------------------------
 
-SP500_SECTORS = {
-    "Technology": ["AAPL", "MSFT", "NVDA", "GOOGL", "META", "AVGO", "CRM", "ADBE", "AMD", "INTC"],
-    "Healthcare": ["UNH", "JNJ", "LLY", "ABBV", "MRK", "PFE", "TMO", "ABT", "DHR", "AMGN"],
-    "Financials": ["BRK.B", "JPM", "V", "MA", "BAC", "WFC", "GS", "MS", "SCHW", "AXP"],
-    "Consumer Disc.": ["AMZN", "TSLA", "HD", "MCD", "NKE", "LOW", "SBUX", "TJX", "BKNG", "CMG"],
-    "Consumer Staples": ["PG", "KO", "PEP", "COST", "WMT", "PM", "CL", "MDLZ", "MO", "KHC"],
-    "Energy": ["XOM", "CVX", "COP", "SLB", "EOG", "MPC", "PSX", "VLO", "OXY", "HAL"],
-    "Industrials": ["GE", "CAT", "UNP", "HON", "RTX", "DE", "BA", "LMT", "MMM", "UPS"],
-    "Real Estate": ["PLD", "AMT", "CCI", "EQIX", "SPG", "PSA", "O", "WELL", "DLR", "AVB"],
-    "Utilities": ["NEE", "DUK", "SO", "D", "AEP", "SRE", "EXC", "XEL", "WEC", "ED"],
-}
-
 MOCK_INDICES = [
     {
         "id": "dix-001", "name": "S&P 500 ESG Custom",
@@ -91,12 +95,69 @@ MOCK_INDICES = [
 ]
 
 
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+
+# index id -> (spec key, total value, as-of date, sleeve)
+_sleeves: Dict[str, tuple] = {}
+
+
+def _account(ix: Dict[str, Any]) -> DirectIndexAccount:
+    return DirectIndexAccount(
+        account_id=ix["id"],
+        spec=IndexSpec(
+            benchmark=ix.get("benchmark") or "S&P 500",
+            exclusions=tuple(ix.get("exclusions") or ()),
+            tilts=dict(ix.get("tilts") or {}),
+        ),
+        total_value=float(ix.get("total_value") or 0),
+    )
+
+
+def _apply(ix: Dict[str, Any], sleeve: SleeveState) -> None:
+    ix["holdings_count"] = sleeve.construction.holdings_count
+    ix["tracking_error_bps"] = sleeve.construction.tracking_error_bps
+    ix["harvest_opportunities"] = len(sleeve.trades)
+
+
+def _refresh(indices: List[Dict[str, Any]], force: bool = False) -> List[SleeveState]:
+    """Rebuild stale sleeves in one batch (blocking — call via asyncio.to_thread)."""
+    today = date.today()
+    accounts = [_account(ix) for ix in indices]
+    stamps = [(a.spec.key(), a.total_value, today) for a in accounts]
+    stale = [
+        i for i, (ix, stamp) in enumerate(zip(indices, stamps))
+        if force or _sleeves.get(ix["id"], (None,))[:3] != stamp
+    ]
+    if stale:
+        for i, sleeve in zip(stale, run_batch([accounts[i] for i in stale], today)):
+            _sleeves[indices[i]["id"]] = (*stamps[i], sleeve)
+    sleeves = [_sleeves[ix["id"]][3] for ix in indices]
+    for ix, sleeve in zip(indices, sleeves):
+        _apply(ix, sleeve)
+    return sleeves
+
+
+async def nightly_direct_index_batch() -> Dict[str, Any]:
+    """Scheduler entry point: rebuild every sleeve and rescan every lot."""
+    sleeves = await asyncio.to_thread(_refresh, MOCK_INDICES, True)
+    summary = summarize(sleeves, date.today())
+    logger.info("Direct indexing nightly batch: %s", summary)
+    return summary
+
+
+def _find(index_id: str) -> Optional[Dict[str, Any]]:
+    return next((ix for ix in MOCK_INDICES if ix["id"] == index_id), None)
+
+
 # ---------------------------------------------------------------------------
 # Endpoints
 # ---------------------------------------------------------------------------
 
 @router.get("/indices")
 async def list_indices(current_user: dict = Depends(get_current_user)):
+    await asyncio.to_thread(_refresh, MOCK_INDICES)
     total_value = sum(ix["total_value"] for ix in MOCK_INDICES)
     total_harvested = sum(ix["harvested_losses_ytd"] for ix in MOCK_INDICES)
     return {
@@ -110,33 +171,15 @@ async def list_indices(current_user: dict = Depends(get_current_user)):
 
 @router.get("/indices/{index_id}")
 async def get_index(index_id: str, current_user: dict = Depends(get_current_user)):
-    for ix in MOCK_INDICES:
-        if ix["id"] == index_id:
-            holdings = []
-            for sector, symbols in SP500_SECTORS.items():
-                if any(excl.lower() in sector.lower() for excl in ix.get("exclusions", [])):
-                    continue
-                for sym in symbols:
-                    weight = round(random.uniform(0.05, 3.5), 2)
-                    cost = round(random.uniform(50, 500), 2)
-                    current = round(cost * random.uniform(0.8, 1.4), 2)
-                    qty = round(ix["total_value"] * weight / 100 / max(current, 1), 2)
-                    gl = round((current - cost) * qty, 2)
-                    holdings.append({
-                        "symbol": sym, "sector": sector,
-                        "weight_pct": weight, "quantity": qty,
-                        "cost_basis": cost, "current_price": current,
-                        "gain_loss": gl,
-                        "harvestable": gl < -500,
-                    })
-            holdings.sort(key=lambda h: h["weight_pct"], reverse=True)
-            return {
-                **ix,
-                "holdings": holdings[:50],
-                "sector_weights": {s: round(sum(h["weight_pct"] for h in holdings if h["sector"] == s), 1)
-                                   for s in SP500_SECTORS},
-            }
-    return {"error": "Index not found"}
+    ix = _find(index_id)
+    if ix is None:
+        return {"error": "Index not found"}
+    sleeve = (await asyncio.to_thread(_refresh, [ix]))[0]
+    return {
+        **ix,
+        "holdings": sleeve.holdings()[:50],
+        "sector_weights": sleeve.construction.sector_weights_pct(),
+    }
 
 
 @router.post("/indices")
@@ -158,48 +201,42 @@ async def create_index(request: dict, current_user: dict = Depends(get_current_u
         "last_rebalanced": None,
         "created_at": _now.isoformat(),
     }
+    try:
+        await asyncio.to_thread(_refresh, [ix])
+    except ValueError as e:
+        return {"error": str(e)}
+    MOCK_INDICES.append(ix)
     return ix
 
 
 @router.post("/harvest/{index_id}")
 async def run_harvest(index_id: str, current_user: dict = Depends(get_current_user)):
-    trades = []
-    for _ in range(random.randint(3, 10)):
-        sell_sym = random.choice(["INTC", "BA", "MMM", "VLO", "KHC", "MO", "HAL"])
-        buy_sym = random.choice(["AMD", "LMT", "UPS", "PSX", "MDLZ", "PM", "SLB"])
-        loss = round(random.uniform(500, 5000), 2)
-        trades.append({
-            "sell_symbol": sell_sym, "buy_symbol": buy_sym,
-            "loss_harvested": loss,
-            "shares_sold": round(random.uniform(5, 50), 2),
-            "shares_bought": round(random.uniform(5, 50), 2),
-            "wash_sale_check": "clear",
-        })
+    ix = _find(index_id)
+    if ix is None:
+        return {"error": "Index not found"}
+    sleeve = (await asyncio.to_thread(_refresh, [ix]))[0]
+    trades = [t.to_dict() for t in sleeve.trades]
     total = round(sum(t["loss_harvested"] for t in trades), 2)
     return {
         "index_id": index_id,
         "trades": trades,
         "total_losses_harvested": total,
-        "estimated_tax_savings": round(total * 0.35, 2),
+        "estimated_tax_savings": estimated_tax_savings(sleeve.trades),
+        "lots_scanned": len(sleeve.lots),
         "status": "pending_review",
     }
 
 
 @router.get("/exclusions")
 async def list_exclusion_categories(current_user: dict = Depends(get_current_user)):
+    universe = get_universe("S&P 500")
     return {
         "categories": [
-            {"id": "tobacco", "name": "Tobacco", "companies_excluded": 5},
-            {"id": "firearms", "name": "Firearms & Weapons", "companies_excluded": 8},
-            {"id": "fossil_fuel", "name": "Fossil Fuel Extraction", "companies_excluded": 22},
-            {"id": "coal", "name": "Coal Mining", "companies_excluded": 4},
-            {"id": "oil_sands", "name": "Oil Sands", "companies_excluded": 6},
-            {"id": "arctic", "name": "Arctic Drilling", "companies_excluded": 3},
-            {"id": "alcohol", "name": "Alcohol", "companies_excluded": 7},
-            {"id": "gaming", "name": "Gaming & Casinos", "companies_excluded": 9},
-            {"id": "adult", "name": "Adult Entertainment", "companies_excluded": 2},
-            {"id": "nuclear", "name": "Nuclear Power", "companies_excluded": 4},
-            {"id": "private_prisons", "name": "Private Prisons", "companies_excluded": 3},
-            {"id": "animal_testing", "name": "Animal Testing", "companies_excluded": 12},
+            {
+                "id": cid,
+                "name": cat["name"],
+                "companies_excluded": len(excluded_symbols([cid]) & set(universe.index_of)),
+            }
+            for cid, cat in EXCLUSION_CATEGORIES.items()
         ]
     }
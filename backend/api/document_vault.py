@@ -8,9 +8,19 @@ import logging
 from datetime import datetime, timezone, timedelta
 from typing import List, Optional, Dict, Any
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from backend.services.blob_store import (
+    BlobRef,
+    BlobTooLarge,
+    EmptyBlob,
+    RangeNotSatisfiable,
+    get_blob_store,
+    parse_range,
+)
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/documents", tags=["Document Vault"])
@@ -81,6 +91,8 @@ MOCK_DOCUMENTS: List[Dict[str, Any]] = [
      "updated_at": (_now - timedelta(days=25)).isoformat()},
 ]
 
+MAX_UPLOAD_BYTES = 100 * 1024 * 1024
+
 _uploaded_docs: List[Dict[str, Any]] = []
 _signature_requests: List[Dict[str, Any]] = []
 
@@ -161,6 +173,44 @@ async def get_document(document_id: str, current_user: dict = Depends(get_curren
     raise HTTPException(status_code=404, detail="Document not found")
 
 
+@router.get("/{document_id}/download")
+async def download_document(
+    document_id: str,
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+):
+    doc = next((d for d in _uploaded_docs if d["id"] == document_id), None)
+    if not doc or not doc.get("blob"):
+        raise HTTPException(status_code=404, detail="Document content not available")
+
+    store = get_blob_store()
+    ref = BlobRef.from_dict(doc["blob"])
+    filename = (doc.get("filename") or doc["id"]).replace('"', "")
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{ref.digest}"',
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    }
+    try:
+        byte_range = parse_range(request.headers.get("range"), ref.size)
+    except RangeNotSatisfiable:
+        raise HTTPException(
+            status_code=416, detail="Range not satisfiable",
+            headers={"Content-Range": f"bytes */{ref.size}"},
+        )
+    if byte_range is None:
+        headers["Content-Length"] = str(ref.size)
+        return StreamingResponse(store.iter_range(ref), media_type=ref.content_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{ref.size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        store.iter_range(ref, start, end), status_code=206,
+        media_type=ref.content_type, headers=headers,
+    )
+
+
 @router.post("/upload")
 async def upload_document(
     name: str = Form(...),
@@ -173,7 +223,12 @@ async def upload_document(
     current_user: dict = Depends(get_current_user),
 ):
     now = datetime.now(timezone.utc).isoformat()
-    content = await file.read()
+    try:
+        blob, created = await get_blob_store().save_upload(file, max_bytes=MAX_UPLOAD_BYTES)
+    except BlobTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except EmptyBlob as e:
+        raise HTTPException(status_code=400, detail=str(e))
     doc = {
         "id": f"doc-{uuid.uuid4().hex[:8]}",
         "name": name,
@@ -181,8 +236,12 @@ async def upload_document(
         "category": category,
         "household_id": household_id,
         "client_name": client_name or "—",
-        "size_bytes": len(content),
+        "size_bytes": blob.size,
         "mime_type": file.content_type or "application/pdf",
+        "filename": file.filename,
+        "sha256": blob.digest,
+        "deduplicated": not created,
+        "blob": blob.to_dict(),
         "version": 1,
         "status": "pending_signature" if require_signature else "uploaded",
         "signature_status": "sent" if require_signature else None,
@@ -3,16 +3,16 @@ Financial Planning API — Monte Carlo simulation, multi-goal planning,
 Social Security optimization, Roth conversion analysis, and
 integration layer for RightCapital/eMoney.
 """
-import math
-import random
 import uuid
 import logging
 from datetime import datetime, timezone, timedelta
 from typing import List, Optional, Dict, Any
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 
+from backend.services.monte_carlo import MAX_SIMULATIONS, run_monte_carlo as _run_monte_carlo
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/planning", tags=["Financial Planning"])
@@ -25,68 +25,6 @@ except ImportError:
 _now = datetime.now(timezone.utc)
 
 
-# ---------------------------------------------------------------------------
-# Monte Carlo Engine
-# ---------------------------------------------------------------------------
-
-def _monte_carlo(
-    current_assets: float,
-    annual_contribution: float,
-    years_to_retire: int,
-    years_in_retirement: int,
-    annual_spending: float,
-    expected_return: float = 0.07,
-    volatility: float = 0.15,
-    inflation: float = 0.025,
-    simulations: int = 1000,
-) -> Dict[str, Any]:
-    success_count = 0
-    ending_balances = []
-    percentile_paths: Dict[str, List[float]] = {"p10": [], "p25": [], "p50": [], "p75": [], "p90": []}
-    total_years = years_to_retire + years_in_retirement
-    all_paths = []
-
-    for _ in range(simulations):
-        balance = current_assets
-        path = [balance]
-        failed = False
-        for y in range(total_years):
-            annual_r = random.gauss(expected_return, volatility)
-            if y < years_to_retire:
-                balance = balance * (1 + annual_r) + annual_contribution
-            else:
-                real_spending = annual_spending * ((1 + inflation) ** (y - years_to_retire))
-                balance = balance * (1 + annual_r) - real_spending
-            if balance < 0:
-                balance = 0
-                failed = True
-            path.append(round(balance, 2))
-        all_paths.append(path)
-        ending_balances.append(balance)
-        if not failed and balance > 0:
-            success_count += 1
-
-    ending_balances.sort()
-    for y in range(total_years + 1):
-        year_vals = sorted([p[y] if y < len(p) else 0 for p in all_paths])
-        n = len(year_vals)
-        percentile_paths["p10"].append(round(year_vals[int(n * 0.1)], 0))
-        percentile_paths["p25"].append(round(year_vals[int(n * 0.25)], 0))
-        percentile_paths["p50"].append(round(year_vals[int(n * 0.5)], 0))
-        percentile_paths["p75"].append(round(year_vals[int(n * 0.75)], 0))
-        percentile_paths["p90"].append(round(year_vals[int(n * 0.9)], 0))
-
-    return {
-        "success_rate": round(success_count / simulations * 100, 1),
-        "simulations": simulations,
-        "median_ending_balance": round(ending_balances[simulations // 2], 0),
-        "p10_ending": round(ending_balances[int(simulations * 0.1)], 0),
-        "p90_ending": round(ending_balances[int(simulations * 0.9)], 0),
-        "percentile_paths": percentile_paths,
-        "total_years": total_years,
-    }
-
-
 # ---------------------------------------------------------------------------
 # Endpoints
 # ---------------------------------------------------------------------------
@@ -96,17 +34,24 @@ async def run_monte_carlo(
     request: dict,
     current_user: dict = Depends(get_current_user),
 ):
-    result = _monte_carlo(
-        current_assets=request.get("current_assets", 500000),
-        annual_contribution=request.get("annual_contribution", 24000),
-        years_to_retire=request.get("years_to_retire", 20),
-        years_in_retirement=request.get("years_in_retirement", 30),
-        annual_spending=request.get("annual_spending", 80000),
-        expected_return=request.get("expected_return", 0.07),
-        volatility=request.get("volatility", 0.15),
-        inflation=request.get("inflation", 0.025),
-        simulations=min(request.get("simulations", 1000), 5000),
-    )
+    try:
+        result = await _run_monte_carlo(
+            current_assets=request.get("current_assets", 500000),
+            annual_contribution=request.get("annual_contribution", 24000),
+            years_to_retire=request.get("years_to_retire", 20),
+            years_in_retirement=request.get("years_in_retirement", 30),
+            annual_spending=request.get("annual_spending", 80000),
+            expected_return=request.get("expected_return", 0.07),
+            volatility=request.get("volatility", 0.15),
+            inflation=request.get("inflation", 0.025),
+            simulations=min(request.get("simulations", 1000), MAX_SIMULATIONS),
+            seed=request.get("seed"),
+            assets=request.get("assets"),
+            correlations=request.get("correlations"),
+            glide_path=request.get("glide_path"),
+        )
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
     return result
 
 
@@ -1,5 +1,6 @@
 """API endpoints for IPS Generator."""
 
+import asyncio
 from datetime import date
 from decimal import Decimal
 from typing import Optional
@@ -101,8 +102,9 @@ async def generate_ips(request: IPSGenerationRequest):
     questionnaire.recommended_equity_pct = scores["recommended_equity_pct"]
 
     customize = {"esg_only": True} if request.esg_only else None
-    portfolio = portfolio_service.build_portfolio_from_questionnaire(
-        questionnaire, customize=customize
+    # The optimizer is CPU-bound; keep it off the event loop
+    portfolio = await asyncio.to_thread(
+        portfolio_service.build_portfolio_from_questionnaire, questionnaire, customize=customize
     )
 
     ips = ips_service.generate_ips(
@@ -1,6 +1,5 @@
 """Meeting Intelligence API Endpoints"""
 import os
-import tempfile
 import logging
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks
 from typing import List, Optional
@@ -9,11 +8,14 @@ from pydantic import BaseModel, Field
 from uuid import UUID
 
 from backend.api.rate_limit import limit_requests
+from backend.services.blob_store import BlobRef, BlobTooLarge, EmptyBlob, get_blob_store
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/meetings", tags=["Meeting Intelligence"])
 
+MAX_RECORDING_BYTES = 500 * 1024 * 1024
+
 
 # ============================================================================
 # PYDANTIC SCHEMAS
@@ -467,20 +469,24 @@ async def upload_recording(
             detail=f"Invalid file type. Allowed: {', '.join(allowed_extensions)}"
         )
     
-    # Save file temporarily
-    with tempfile.NamedTemporaryFile(suffix=f".{file_ext}", delete=False) as f:
-        content = await file.read()
-        f.write(content)
-        temp_path = f.name
+    # Stream to the blob store; the worker gets a reference, not a copy
+    try:
+        blob, _ = await get_blob_store().save_upload(file, max_bytes=MAX_RECORDING_BYTES)
+    except BlobTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except EmptyBlob as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     # Update meeting status
     meeting["status"] = "processing"
+    meeting["recording_sha256"] = blob.digest
     
     # Process in background
     background_tasks.add_task(
         process_meeting_recording,
         meeting_id=meeting_id,
-        audio_path=temp_path,
+        recording=blob,
+        file_ext=file_ext,
         participant_names=[p.get("name") for p in meeting.get("participants", [])]
     )
     
@@ -589,7 +595,8 @@ async def regenerate_analysis(
 
 async def process_meeting_recording(
     meeting_id: str,
-    audio_path: str,
+    recording: BlobRef,
+    file_ext: str,
     participant_names: List[str]
 ):
     """Background task to process meeting recording"""
@@ -611,14 +618,15 @@ async def process_meeting_recording(
         if not meeting:
             return
         
-        # Step 1: Transcribe
-        transcription = await transcription_service.transcribe_audio(audio_path)
-        
-        # Step 2: Diarize
-        diarization = await diarization_service.identify_speakers(
-            audio_path,
-            participant_names=participant_names
-        )
+        async with get_blob_store().local_path(recording, suffix=f".{file_ext}") as audio_path:
+            # Step 1: Transcribe
+            transcription = await transcription_service.transcribe_audio(audio_path)
+            
+            # Step 2: Diarize
+            diarization = await diarization_service.identify_speakers(
+                audio_path,
+                participant_names=participant_names
+            )
         
         # Step 3: Merge
         merged_segments = merge_transcription_with_diarization(transcription, diarization)
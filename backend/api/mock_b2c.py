@@ -1,5 +1,7 @@
 """Mock B2C endpoints when DATABASE_URL is not configured."""
 
+import asyncio
+import io
 import os
 import time
 import uuid
@@ -652,13 +654,17 @@ async def mock_upload_statement(
     if not filename_lower.endswith((".pdf", ".csv", ".xlsx", ".xls")):
         raise HTTPException(status_code=400, detail="Supported formats: PDF, CSV, or Excel")
 
-    file_bytes = await file.read()
-    if len(file_bytes) > 20 * 1024 * 1024:
+    size = file.size
+    if size is None:
+        file.file.seek(0, io.SEEK_END)
+        size = file.file.tell()
+    file.file.seek(0)
+    if size > 20 * 1024 * 1024:
         raise HTTPException(status_code=413, detail="File too large (20 MB max)")
 
     stmt_id = f"stmt-{str(uuid.uuid4())[:8]}"
     if filename_lower.endswith((".csv", ".xlsx", ".xls")):
-        parsed = parse_portfolio_file(file_bytes, file.filename)
+        parsed = await asyncio.to_thread(parse_portfolio_file, file.file, file.filename)
         positions = [
             {
                 "ticker": h.get("symbol", "UNKNOWN"),
@@ -17,7 +17,8 @@ from __future__ import annotations
 from fastapi import APIRouter, Header
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 import hashlib
 import uuid as _uuid
 import copy
@@ -657,9 +658,11 @@ _MEETING_TYPES = [
 ]
 
 
-def _generate_slots() -> list:
+@lru_cache(maxsize=1)
+def _generate_slots(day: date) -> list:
+    """Demo availability for the two weeks after `day` (built once per day)."""
     slots = []
-    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    today = datetime(day.year, day.month, day.day)
     for day_offset in range(1, 15):
         d = today + timedelta(days=day_offset)
         if d.weekday() >= 5:
@@ -678,8 +681,6 @@ def _generate_slots() -> list:
     return slots
 
 
-_AVAILABLE_SLOTS = _generate_slots()
-
 _SCHEDULED_MEETINGS: Dict[str, list] = {
     "nicole": [{"id": "mtg-001", "title": "Quarterly Portfolio Review", "datetime": (datetime.utcnow() + timedelta(days=7, hours=10)).isoformat(), "duration_minutes": 30, "meeting_type": "portfolio_review", "status": "confirmed", "advisor_name": _ADVISOR, "notes": "Discuss Q1 performance and 529 reallocation", "meeting_link": "https://zoom.us/j/123456789"}],
     "mark": [],
@@ -699,7 +700,7 @@ async def get_meetings(authorization: str | None = Header(None)):
 
 @router.get("/meetings/availability")
 async def get_meeting_availability(authorization: str | None = Header(None)):
-    return {"slots": _AVAILABLE_SLOTS, "meeting_types": _MEETING_TYPES}
+    return {"slots": _generate_slots(datetime.utcnow().date()), "meeting_types": _MEETING_TYPES}
 
 
 @router.post("/meetings")
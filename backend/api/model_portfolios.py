@@ -12,6 +12,7 @@ Endpoints:
   POST   /api/v1/model-portfolios/rebalance/signals/{id}/approve   – Approve signal
   POST   /api/v1/model-portfolios/rebalance/signals/{id}/reject    – Reject signal
   POST   /api/v1/model-portfolios/rebalance/signals/{id}/execute   – Mark executed
+  POST   /api/v1/model-portfolios/rebalance/signals/{id}/submit    – Send orders (NDJSON)
   DELETE /api/v1/model-portfolios/subscriptions/{id}               – Unsubscribe
   POST   /api/v1/model-portfolios/subscriptions/{id}/assign        – Assign to account
   POST   /api/v1/model-portfolios                                  – Create model
@@ -27,6 +28,7 @@ Endpoints:
   POST   /api/v1/model-portfolios/{id}/subscribe                  – Subscribe
 """
 
+import json
 import logging
 from datetime import datetime
 from decimal import Decimal
@@ -34,6 +36,7 @@ from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, ConfigDict, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -524,12 +527,16 @@ async def list_assignments(
 
 @router.post("/rebalance/check")
 async def check_drift(
+    tax_budget: Optional[float] = Query(None, ge=0, description="Max estimated tax per account"),
+    tolerance_pct: float = Query(0, ge=0, le=50, description="Drift band left untraded, percent"),
     db: AsyncSession = Depends(get_db_session),
     current_user: dict = Depends(get_current_user),
 ):
-    """Check all assignments for drift and generate signals."""
+    """Check all assignments for drift and generate tax-aware signals."""
     advisor_id = UUID(current_user["id"])
     service = ModelPortfolioService(db)
+    service.rebalance.tax_budget = Decimal(str(tax_budget)) if tax_budget is not None else None
+    service.rebalance.tolerance_pct = Decimal(str(tolerance_pct))
     signals = await service.rebalance.check_all_assignments(advisor_id)
     return {
         "signals_generated": len(signals),
@@ -612,6 +619,39 @@ async def mark_signal_executed(
         raise HTTPException(status_code=400, detail=str(exc))
 
 
+@router.post("/rebalance/signals/{signal_id}/submit")
+async def submit_signal_orders(
+    signal_id: UUID,
+    db: AsyncSession = Depends(get_db_session),
+    current_user: dict = Depends(get_current_user),
+):
+    """Send an approved signal's trades to the broker; streams order status as NDJSON."""
+    from backend.models import get_shared_session_factory
+    from backend.services.iim.order_pipeline import default_pipeline
+
+    try:
+        pipeline = default_pipeline()
+    except ValueError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    service = ModelPortfolioService(db)
+    try:
+        legs, updates = await service.rebalance.prepare_submission(signal_id, pipeline.quotes)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    async def lines():
+        for update in updates:
+            yield json.dumps(update.to_dict()) + "\n"
+        async for update in pipeline.stream(legs):
+            updates.append(update)
+            yield json.dumps(update.to_dict()) + "\n"
+        # The request session may already be closed while the body streams
+        async with get_shared_session_factory()() as session:
+            await ModelPortfolioService(session).rebalance.record_submission(signal_id, updates)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 # ============================================================================
 # SUBSCRIPTIONS (static prefix — before /{model_id})
 # ============================================================================
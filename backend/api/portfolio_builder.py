@@ -1,5 +1,6 @@
 """API endpoints for ETF Portfolio Builder."""
 
+import asyncio
 from decimal import Decimal
 from typing import List, Optional
 from uuid import UUID
@@ -184,7 +185,9 @@ async def build_portfolio(
     if exclude_sectors:
         customize["exclude_sectors"] = exclude_sectors.split(",")
 
-    portfolio = service.build_portfolio_from_questionnaire(
+    # The optimizer is CPU-bound; keep it off the event loop
+    portfolio = await asyncio.to_thread(
+        service.build_portfolio_from_questionnaire,
         questionnaire,
         customize=customize if customize else None,
     )
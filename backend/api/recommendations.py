@@ -4,16 +4,19 @@ AI Recommendations API — actionable IIM output (IMM-06).
 Endpoints:
   GET  /api/v1/clients/{client_id}/recommendations
   POST /api/v1/recommendations/{rec_id}/submit-order
+  POST /api/v1/recommendations/submit-orders       (NDJSON status stream)
   POST /api/v1/recommendations/{rec_id}/snooze
   POST /api/v1/recommendations/{rec_id}/dismiss
 """
 
+import json
 import logging
 from datetime import datetime, timezone
 from typing import Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -62,6 +65,12 @@ class RecommendationResponse(BaseModel):
 class OrderSubmitRequest(BaseModel):
     quantity: Optional[int] = None
     order_type: str = "market"
+    symbol: str = ""
+    side: str = "buy"
+
+
+class OrderBatchRequest(BaseModel):
+    orders: list[dict]  # build_order_preview payloads
 
 
 class DismissRequest(BaseModel):
@@ -116,7 +125,10 @@ async def submit_order(
     """Submit a recommendation as a Tradier order."""
     try:
         from backend.services.iim.order_builder import submit_tradier_order
-        result = await submit_tradier_order(rec_id, body.quantity, body.order_type, db)
+        result = await submit_tradier_order(
+            rec_id, body.quantity, body.order_type, db,
+            symbol=body.symbol, side=body.side,
+        )
         await _log_rec_audit(
             db, current_user["id"], "ORDER_SUBMITTED",
             "recommendation", rec_id, {"result": result},
@@ -127,6 +139,33 @@ async def submit_order(
         raise HTTPException(status_code=500, detail="Order submission failed")
 
 
+@router.post("/recommendations/submit-orders")
+async def submit_orders(
+    body: OrderBatchRequest,
+    db: AsyncSession = Depends(get_db_session),
+    current_user: dict = Depends(get_current_user),
+):
+    """Submit many order previews at once; streams status as NDJSON."""
+    from backend.services.iim.order_builder import submit_order_batch
+    from backend.services.iim.order_pipeline import default_pipeline
+
+    try:
+        pipeline = default_pipeline()
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    await _log_rec_audit(
+        db, current_user["id"], "ORDER_BATCH_SUBMITTED", "recommendation", "batch",
+        {"tags": [o.get("tag") for o in body.orders]},
+    )
+    await db.commit()
+
+    async def lines():
+        async for update in submit_order_batch(body.orders, pipeline):
+            yield json.dumps(update) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.post("/recommendations/{rec_id}/snooze")
 async def snooze_recommendation(
     rec_id: str,
@@ -7,6 +7,7 @@ from pydantic import BaseModel
 from typing import List, Optional
 
 from backend.api.auth import get_current_user
+from backend.services.dashboard_snapshots import ria_dashboard
 
 router = APIRouter(prefix="/api/v1/ria/dashboard", tags=["RIA Dashboard"])
 
@@ -47,6 +48,8 @@ class DashboardResponse(BaseModel):
     households: List[HouseholdSummary]
     alerts: List[Alert]
     recentActivity: List[Activity]
+    snapshotVersion: Optional[int] = None
+    generatedAt: Optional[str] = None
 
 # --- Pre-seeded Leslie Wilson Data ---
 
@@ -75,14 +78,8 @@ ACTIVITY = [
 
 # --- Endpoints ---
 
-@router.get("/summary", response_model=DashboardResponse)
-async def get_dashboard_summary(current_user: dict = Depends(get_current_user)):
-    """
-    Get complete dashboard summary for authenticated RIA.
-    Returns KPIs, households, alerts, and recent activity.
-    """
+async def _build_summary() -> dict:
     total_aum = sum(h["totalValue"] for h in HOUSEHOLDS)
-    
     return DashboardResponse(
         kpis=KPISummary(
             totalAUM=total_aum,
@@ -93,4 +90,15 @@ async def get_dashboard_summary(current_user: dict = Depends(get_current_user)):
         households=[HouseholdSummary(**h) for h in HOUSEHOLDS],
         alerts=[Alert(**a) for a in ALERTS],
         recentActivity=[Activity(**a) for a in ACTIVITY],
-    )
+    ).model_dump()
+
+
+@router.get("/summary", response_model=DashboardResponse)
+async def get_dashboard_summary(current_user: dict = Depends(get_current_user)):
+    """
+    Get complete dashboard summary for authenticated RIA.
+    Returns KPIs, households, alerts, and recent activity, served from the
+    advisor's snapshot (rebuilt after custodian syncs).
+    """
+    advisor_id = current_user.get("advisor_id") or current_user.get("id")
+    return DashboardResponse(**await ria_dashboard(advisor_id, _build_summary))
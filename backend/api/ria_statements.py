@@ -13,6 +13,8 @@ from pydantic import BaseModel
 
 from backend.api.auth import get_current_user
 from backend.models import get_session_factory
+from backend.services.blob_store import BlobRef, BlobTooLarge, EmptyBlob, get_blob_store
+from backend.services.dashboard_snapshots import schedule_household_refresh
 from backend.services.statement_persistence import StatementPersistenceService
 from backend.services.pdf_service import pdf_service
 from backend.parsers.registry import get_default_registry
@@ -20,6 +22,8 @@ from backend.parsers.registry import get_default_registry
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/ria/statements", tags=["RIA Statements"])
 
+MAX_STATEMENT_BYTES = 50 * 1024 * 1024
+
 
 # --- Response Models ---
 
@@ -147,7 +151,8 @@ async def _persist_confirmed_statement(
                 source=source,
             )
             await db.commit()
-            return result
+        schedule_household_refresh(household_id)
+        return result
     except Exception as exc:
         logger.warning("Statement persistence skipped for %s: %s", statement_id, exc)
         return None
@@ -173,14 +178,15 @@ def _can_access_statement(stmt: Dict[str, Any], current_user: dict) -> bool:
 
 # --- Background task for parsing ---
 
-async def parse_statement_background(stmt_id: str, file_bytes: bytes, filename: str):
-    """Background task to parse a statement."""
+async def parse_statement_background(stmt_id: str, blob: BlobRef, filename: str):
+    """Background task to parse a statement stored in the blob store."""
     try:
-        # Extract text from PDF
-        text = await pdf_service.extract_text_from_bytes(file_bytes, filename)
+        # Extract the page layout (rows and columns) from the PDF
+        async with get_blob_store().local_path(blob) as path:
+            layout = await pdf_service.extract_layout_from_path(path, filename, blob.digest)
         
         # Parse using registry
-        parsed = parser_registry.detect_and_parse(text)
+        parsed = parser_registry.detect_and_parse_layout(layout)
         
         # Convert parsed positions to response format
         positions = []
@@ -257,8 +263,13 @@ async def upload_statement(
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
     
-    # Read file content
-    file_bytes = await file.read()
+    # Stream to the blob store; the parser gets a reference, not a copy
+    try:
+        blob, _ = await get_blob_store().save_upload(file, max_bytes=MAX_STATEMENT_BYTES)
+    except BlobTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except EmptyBlob as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     # Generate statement ID
     stmt_id = f"stmt-{str(uuid.uuid4())[:8]}"
@@ -279,10 +290,11 @@ async def upload_statement(
         "uploadedByUserId": current_user.get("id"),
         "uploadedByRole": current_user.get("role", "ria"),
         "positions": [],
+        "sha256": blob.digest,
     }
     
     # Start background parsing
-    background_tasks.add_task(parse_statement_background, stmt_id, file_bytes, file.filename)
+    background_tasks.add_task(parse_statement_background, stmt_id, blob, file.filename)
     
     return {
         "id": stmt_id,
@@ -0,0 +1,339 @@
+"""
+Router manifest and lazy router loading.
+
+Every API router is listed once in ROUTERS, in mount order, with the path
+prefixes it serves. At startup each entry becomes a LazyRouter placeholder
+in the route table; nothing under backend/api is imported yet. The first
+request under one of its prefixes imports the module(s), swaps the real
+routes in at the placeholder's position and re-dispatches, so precedence is
+exactly what eager mounting in manifest order would give. Once the app is up,
+a background task loads the remaining entries one by one, so steady-state
+requests never pay the import.
+
+An entry whose module fails to import (or that needs a database when none is
+configured) is served by its `fallback` router instead, typically a mock
+from mock_endpoints, mock_portal or mock_b2c.
+
+ROUTER_LOADING selects the mode:
+  lazy       placeholders, warmed in the background after startup (default)
+  on_demand  placeholders, loaded only by requests (tests, benchmarks)
+  eager      everything imported while the app module loads
+"""
+
+import asyncio
+import importlib
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.routing import BaseRoute, Match, NoMatchFound
+
+logger = logging.getLogger(__name__)
+
+MODES = ("lazy", "on_demand", "eager")
+
+
+@dataclass(frozen=True)
+class RouterSpec:
+    name: str
+    targets: Tuple[str, ...]  # "module:attribute" of each APIRouter
+    prefixes: Tuple[str, ...]  # every route path starts with one of these
+    needs_db: bool = False
+    fallback: Tuple[str, ...] = ()  # served when targets can't be used
+
+
+def _spec(
+    name: str,
+    targets: Any,
+    prefixes: Any,
+    needs_db: bool = False,
+    fallback: Any = (),
+) -> RouterSpec:
+    as_tuple = lambda v: (v,) if isinstance(v, str) else tuple(v)  # noqa: E731
+    return RouterSpec(name, as_tuple(targets), as_tuple(prefixes), needs_db, as_tuple(fallback))
+
+
+_MOCK = "backend.api.mock_endpoints"
+
+# ── Manifest (mount order matters: earlier routers win on shared prefixes) ──
+ROUTERS: Tuple[RouterSpec, ...] = (
+    # Standalone RIA routes (no DB required)
+    _spec("auth", "backend.api.auth:router", "/api/v1/auth"),
+    _spec("dashboard", "backend.api.ria_dashboard:router", "/api/v1/ria/dashboard"),
+    _spec("households", "backend.api.ria_households:router", "/api/v1/ria/households"),
+    _spec("accounts", "backend.api.ria_accounts:router", "/api/v1/ria/accounts"),
+    _spec("compliance", "backend.api.ria_compliance:router", "/api/v1/ria/compliance"),
+    _spec("compliance_dashboard", "backend.api.compliance_dashboard:router", "/api/v1/compliance"),
+    _spec("chat", "backend.api.ria_chat:router", "/api/v1/ria/chat"),
+    _spec("statements", "backend.api.ria_statements:router", "/api/v1/ria/statements"),
+    _spec("connections", "backend.api.ria_connections:router", "/api/v1/ria/connections"),
+    _spec("analysis", "backend.api.ria_analysis:router", "/api/v1/analysis",
+          fallback=f"{_MOCK}:analysis_mock_router"),
+    _spec("meetings", "backend.api.meetings:router", "/api/v1/meetings"),
+    # DB-dependent, mock data without a database
+    _spec("liquidity", "backend.api.liquidity:router", "/api/v1/liquidity",
+          needs_db=True, fallback=f"{_MOCK}:liquidity_router"),
+    _spec("custodians", "backend.api.custodians:router", "/api/v1/custodians",
+          needs_db=True, fallback=f"{_MOCK}:custodians_router"),
+    _spec("tax_harvest", "backend.api.tax_harvest:router", "/api/v1/tax-harvest",
+          needs_db=True, fallback=f"{_MOCK}:tax_router"),
+    _spec("prospects", "backend.api.prospects:router", "/api/v1/prospects",
+          needs_db=True, fallback=f"{_MOCK}:prospects_router"),
+    _spec("conversations", "backend.api.conversations:router", "/api/v1/conversations",
+          needs_db=True, fallback=f"{_MOCK}:conv_router"),
+    _spec("model_portfolios", "backend.api.model_portfolios:router", "/api/v1/model-portfolios",
+          needs_db=True, fallback=f"{_MOCK}:model_router"),
+    _spec("alternative_assets", "backend.api.alternative_assets:router", "/api/v1/alternative-assets",
+          needs_db=True, fallback=f"{_MOCK}:alt_router"),
+    _spec("market_data", "backend.api.market_data:router", "/api/v1/market-data",
+          needs_db=True, fallback=f"{_MOCK}:market_data_router"),
+    _spec("compliance_exceptions", "backend.api.compliance_exceptions:router", "/api/v1/compliance",
+          needs_db=True, fallback=f"{_MOCK}:compliance_exceptions_router"),
+    _spec("tax", "backend.api.tax:router", "/api/v1/tax",
+          needs_db=True, fallback=f"{_MOCK}:tax_analysis_router"),
+    _spec("recommendations", "backend.api.recommendations:router",
+          ("/api/v1/clients", "/api/v1/recommendations"),
+          needs_db=True, fallback=f"{_MOCK}:recommendations_router"),
+    # Feature routers (no DB required)
+    _spec("ria_onboarding", "backend.api.ria_onboarding:router", "/api/v1/ria-onboarding"),
+    _spec("help", "backend.api.help:router", "/api/v1/help"),
+    _spec("stock_screener", "backend.api.stock_screener:router", "/api/v1/screener"),
+    _spec("onboarding_flow", "backend.api.onboarding_flow:router", "/api/v1/onboarding"),
+    _spec("messaging", "backend.api.messaging:router", "/api/v1/messaging"),
+    _spec("report_scheduler", "backend.api.report_scheduler:router", "/api/v1/report-scheduler"),
+    _spec("workflows", "backend.api.workflows:router", "/api/v1/workflows"),
+    _spec("best_execution", "backend.api.best_execution:router", "/api/v1/best-execution"),
+    _spec("portfolio_review", "backend.api.portfolio_review:router", "/api/v1/portfolio-review"),
+    _spec("custodian_integration", "backend.api.custodian_integration:router", "/api/v1/custodian-feeds"),
+    _spec("portfolio_accounting", "backend.api.portfolio_accounting:router", "/api/v1/performance"),
+    _spec("document_vault", "backend.api.document_vault:router", "/api/v1/documents"),
+    _spec("firm_management", "backend.api.firm_management:router", "/api/v1/firm"),
+    _spec("rebalancing_engine", "backend.api.rebalancing_engine:router", "/api/v1/rebalancing"),
+    _spec("financial_planning", "backend.api.financial_planning:router", "/api/v1/planning"),
+    _spec("comm_archiving", "backend.api.comm_archiving:router", "/api/v1/archive"),
+    _spec("engagement_analytics", "backend.api.engagement_analytics:router", "/api/v1/engagement"),
+    _spec("crm_integrations", "backend.api.crm_integrations:router", "/api/v1/crm-integrations"),
+    _spec("direct_indexing", "backend.api.direct_indexing:router", "/api/v1/direct-indexing"),
+    # RIA Platform API v1 (DB required)
+    _spec(
+        "platform",
+        ("backend.api.dashboard:router", "backend.api.households:router",
+         "backend.api.accounts:router", "backend.api.analysis_extended:router"),
+        ("/api/v1/dashboard", "/api/v1/households", "/api/v1/accounts", "/api/v1/analysis"),
+        needs_db=True,
+    ),
+    _spec(
+        "portal",
+        ("backend.api.reports:router", "backend.api.client_portal:router",
+         "backend.api.onboarding:router", "backend.api.billing:router"),
+        ("/api/v1/reports", "/api/v1/portal", "/api/v1/onboarding", "/api/v1/billing"),
+        needs_db=True, fallback="backend.api.mock_portal:router",
+    ),
+    _spec(
+        "ria_api",
+        ("backend.api.statements:router", "backend.api.analysis:router",
+         "backend.api.chat:router", "backend.api.compliance:router",
+         "backend.api.portfolio_builder:router", "backend.api.ips_generator:router"),
+        ("/api/v1/statements", "/api/v1/analysis", "/api/v1/chat", "/api/v1/compliance",
+         "/api/v1/portfolio-builder", "/api/v1/ips"),
+        needs_db=True,
+    ),
+    # After the compliance router so its /compliance/documents reviews win
+    _spec("compliance_docs", "backend.api.compliance_docs:router", "/api/v1/compliance/documents",
+          needs_db=True, fallback=f"{_MOCK}:compliance_docs_router"),
+    # B2C self-service (DB required; demo routes without one)
+    _spec(
+        "b2c",
+        tuple(f"backend.api.b2c.{m}:router" for m in (
+            "auth", "onboarding", "dashboard", "chat", "statements", "subscription",
+            "advisor_connect", "planning", "plaid", "budgets", "household", "insights",
+            "ai_analysis",
+        )),
+        "/api/v1/b2c",
+        needs_db=True, fallback="backend.api.mock_b2c:router",
+    ),
+    _spec("b2c_supplement", "backend.api.mock_b2c:supplement_router", "/api/v1/b2c", needs_db=True),
+)
+
+
+def _resolve(targets: Tuple[str, ...]) -> list:
+    """Import each "module:attribute" target. Blocking; may run in a thread."""
+    routers = []
+    for target in targets:
+        module, _, attr = target.partition(":")
+        routers.append(getattr(importlib.import_module(module), attr or "router"))
+    return routers
+
+
+# ─── Lazy placeholder ───────────────────────────────────────────
+
+
+class LazyRouter(BaseRoute):
+    """Route-table placeholder that swaps itself for the real routes on first match."""
+
+    def __init__(self, table: "RouterTable", spec: RouterSpec, targets: Tuple[str, ...]) -> None:
+        self.table = table
+        self.spec = spec
+        self.targets = targets
+        self._lock = asyncio.Lock()
+
+    @property
+    def pending(self) -> bool:
+        return self in self.table.app.router.routes
+
+    def matches(self, scope: Dict[str, Any]) -> Tuple[Match, Dict[str, Any]]:
+        if scope["type"] in ("http", "websocket"):
+            path = scope["path"]
+            if any(path == p or path.startswith(p + "/") for p in self.spec.prefixes):
+                return Match.FULL, {}
+        return Match.NONE, {}
+
+    def url_path_for(self, name: str, /, **path_params: Any):
+        raise NoMatchFound(name, path_params)
+
+    async def handle(self, scope, receive, send) -> None:
+        await self.load()
+        # The real routes now sit where this placeholder was; route again
+        await self.table.app.router(scope, receive, send)
+
+    async def load(self) -> None:
+        async with self._lock:
+            if not self.pending:
+                return
+            t0 = time.perf_counter()
+            try:
+                routers = await asyncio.to_thread(_resolve, self.targets)
+            except Exception as e:
+                routers = await asyncio.to_thread(self._fallback, e)
+            self.table.install(self, routers, time.perf_counter() - t0)
+
+    def load_now(self) -> None:
+        if not self.pending:
+            return
+        t0 = time.perf_counter()
+        try:
+            routers = _resolve(self.targets)
+        except Exception as e:
+            routers = self._fallback(e)
+        self.table.install(self, routers, time.perf_counter() - t0)
+
+    def _fallback(self, error: Exception) -> list:
+        self.table.errors[self.spec.name] = f"{type(error).__name__}: {error}"
+        logger.error("Failed to mount %s router: %s", self.spec.name, error, exc_info=True)
+        if not self.spec.fallback or self.targets == self.spec.fallback:
+            return []
+        try:
+            routers = _resolve(self.spec.fallback)
+        except Exception as e:
+            logger.warning("Could not mount mock %s router: %s", self.spec.name, e)
+            return []
+        self.table.mocked.append(self.spec.name)
+        return routers
+
+
+# ─── Route table ────────────────────────────────────────────────
+
+
+class RouterTable:
+    """The app's manifest routers and their load state (see /api/health)."""
+
+    def __init__(self, app, mode: str) -> None:
+        self.app = app
+        self.mode = mode
+        self.lazy: List[LazyRouter] = []
+        self.loaded: Dict[str, float] = {}  # name -> import ms
+        self.mocked: List[str] = []
+        self.errors: Dict[str, str] = {}
+        self._warm_task: Optional[asyncio.Task] = None
+
+    def install(self, placeholder: LazyRouter, routers: list, seconds: float) -> None:
+        routes = self.app.router.routes
+        start = len(routes)
+        for router in routers:
+            self.app.include_router(router)
+        added = routes[start:]
+        del routes[start:]
+        index = routes.index(placeholder)
+        routes[index:index + 1] = added
+        self.app.openapi_schema = None
+        if routers:
+            self.loaded[placeholder.spec.name] = round(seconds * 1000, 1)
+            logger.debug("Router %s loaded in %.0fms", placeholder.spec.name, seconds * 1000)
+
+    def pending(self) -> List[LazyRouter]:
+        return [p for p in self.lazy if p.pending]
+
+    def load_all(self) -> None:
+        for placeholder in self.pending():
+            placeholder.load_now()
+
+    async def warm(self) -> None:
+        """Load every pending router in manifest order, yielding between them."""
+        t0 = time.perf_counter()
+        for placeholder in self.pending():
+            await placeholder.load()
+            await asyncio.sleep(0)
+        logger.info("Routers warmed in %.0fms", (time.perf_counter() - t0) * 1000)
+
+    def start_warmup(self) -> None:
+        if self.mode == "lazy" and self.pending():
+            self._warm_task = asyncio.create_task(self.warm())
+
+    async def stop_warmup(self) -> None:
+        if self._warm_task is not None:
+            self._warm_task.cancel()
+            await asyncio.gather(self._warm_task, return_exceptions=True)
+            self._warm_task = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "loaded": len(self.loaded),
+            "pending": [p.spec.name for p in self.pending()],
+            "mocked": self.mocked,
+            "errors": self.errors,
+        }
+
+
+def mount_routers(
+    app,
+    db_available: bool,
+    specs: Tuple[RouterSpec, ...] = ROUTERS,
+    mode: Optional[str] = None,
+) -> RouterTable:
+    """Add every manifest router to `app` (as placeholders unless eager)."""
+    mode = mode or os.getenv("ROUTER_LOADING", "lazy").lower()
+    if mode not in MODES:
+        logger.warning("Unknown ROUTER_LOADING=%s, using lazy", mode)
+        mode = "lazy"
+    table = RouterTable(app, mode)
+    skipped = []
+    for spec in specs:
+        targets = spec.targets
+        if spec.needs_db and not db_available:
+            if not spec.fallback:
+                table.errors[spec.name] = "no database configured"
+                skipped.append(spec.name)
+                continue
+            targets = spec.fallback
+            table.mocked.append(spec.name)
+        placeholder = LazyRouter(table, spec, targets)
+        app.router.routes.append(placeholder)
+        table.lazy.append(placeholder)
+    if skipped:
+        logger.info("Skipping DB-dependent routers (no DATABASE_URL): %s", ", ".join(skipped))
+    if mode == "eager":
+        table.load_all()
+
+    # The schema must describe every route, so build it from a fully loaded table
+    build_openapi = app.openapi
+
+    def openapi() -> Dict[str, Any]:
+        table.load_all()
+        return build_openapi()
+
+    app.openapi = openapi
+    logger.info("%d routers registered (%s)", len(table.lazy), mode)
+    return table
@@ -19,9 +19,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.api.auth import get_current_user
 from backend.models import get_db_session
+from backend.services.blob_store import BlobTooLarge, EmptyBlob, get_blob_store
 
 logger = logging.getLogger(__name__)
 
+MAX_TAX_UPLOAD_BYTES = 25 * 1024 * 1024
+
 _security = HTTPBearer(auto_error=False)
 
 
@@ -121,11 +124,15 @@ async def ingest_1040(
 
     try:
         from backend.services.tax.document_ingestor import ingest_tax_document
-        file_bytes = await file.read()
-        job_id = await ingest_tax_document(file_bytes, resolved_client_id, db)
+        blob, _ = await get_blob_store().save_upload(file, max_bytes=MAX_TAX_UPLOAD_BYTES)
+        job_id = await ingest_tax_document(blob, resolved_client_id, db)
         return IngestJobResponse(job_id=job_id, status="processing")
     except HTTPException:
         raise
+    except BlobTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except EmptyBlob as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("Tax ingest failed: %s", e)
         raise HTTPException(status_code=500, detail="Tax document processing failed")
@@ -109,9 +109,7 @@ from pydantic import BaseModel, Field, validator
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
-from anthropic import Anthropic
 import logging
-import pandas as pd
 import io
 from typing import List, Dict, Any, Optional
 
@@ -132,6 +130,22 @@ app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 
+# bcrypt pool saturated during a login burst → shed load instead of queueing
+async def _password_hasher_busy_handler(request: Request, exc: Exception):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many sign-in attempts in progress. Please retry."},
+        headers={"Retry-After": "1"},
+    )
+
+
+try:
+    from backend.services.auth_crypto import PasswordHasherBusy
+    app.add_exception_handler(PasswordHasherBusy, _password_hasher_busy_handler)
+except Exception as e:
+    logger.warning("Password hasher busy handler not registered: %s", e)
+
+
 # ── Global DB error handler ──────────────────────────────────────────────────
 # Catch database connection/operational errors and return a clean 503 instead
 # of a raw 500 traceback.  The frontend already renders error states, so this
@@ -222,16 +236,19 @@ async def add_security_headers(request: Request, call_next):
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY") or os.getenv("OPENAI_API_KEY")  # Fallback for compatibility
 ANTHROPIC_MODEL = os.getenv("ANTHROPIC_MODEL", "claude-3-5-haiku-20241022")
 
-if ANTHROPIC_API_KEY:
-    anthropic_client = Anthropic(api_key=ANTHROPIC_API_KEY)
-    logger.info("Anthropic client initialized successfully")
-else:
-    anthropic_client = None
+anthropic_client = None
+if not ANTHROPIC_API_KEY:
     logger.warning("ANTHROPIC_API_KEY not set - portfolio analysis will use mock responses")
 
-# Track router mount status for debugging
-_ria_routers_mounted = []
-_ria_router_errors = []
+
+def _get_anthropic_client():
+    """Create the Anthropic client on first use (the SDK is slow to import)."""
+    global anthropic_client
+    if anthropic_client is None and ANTHROPIC_API_KEY:
+        from anthropic import Anthropic
+        anthropic_client = Anthropic(api_key=ANTHROPIC_API_KEY)
+        logger.info("Anthropic client initialized successfully")
+    return anthropic_client
 
 # Check if a real database is available — if not, DB-dependent routers will fail
 # at runtime even though they import successfully. We pre-detect this and force
@@ -244,6 +261,22 @@ _db_available = bool(_db_url) and "user:pass@" not in _db_url
 if not _db_available:
     logger.info("No usable DATABASE_URL configured — DB-dependent routers will use mock fallbacks")
 
+def _cache_stats() -> dict:
+    try:
+        from backend.services.async_cache import cache_stats
+        return cache_stats()
+    except Exception:
+        return {}
+
+
+def _latency_stats() -> dict:
+    try:
+        from backend.services.latency import latency_stats
+        return latency_stats()
+    except Exception:
+        return {}
+
+
 # Health check for frontend connectivity and Railway
 @app.get("/api/health")
 async def api_health_check():
@@ -252,504 +285,19 @@ async def api_health_check():
         "status": "healthy",
         "version": "1.3.0",  # Meeting Intelligence feature
         "environment": env,
-        "ai_enabled": anthropic_client is not None,
+        "ai_enabled": bool(ANTHROPIC_API_KEY),
+        "caches": _cache_stats(),
+        "latency": _latency_stats(),
+        "scheduler": _scheduler.status() if _scheduler else None,
+        "routers": _router_table.status(),
     }
 
-# Mount standalone RIA auth & demo routes (no DB required)
-# Each router imported separately to identify which one fails
-
-# Mount auth router
-try:
-    from backend.api.auth import router as auth_router
-    app.include_router(auth_router)
-    _ria_routers_mounted.append("auth")
-except Exception as e:
-    _ria_router_errors.append(f"auth: {type(e).__name__}: {e}")
-    logger.error("Failed to mount auth router: %s", e, exc_info=True)
-
-# Mount RIA dashboard router
-try:
-    from backend.api.ria_dashboard import router as ria_dashboard_router
-    app.include_router(ria_dashboard_router)
-    _ria_routers_mounted.append("dashboard")
-except Exception as e:
-    _ria_router_errors.append(f"dashboard: {type(e).__name__}: {e}")
-    logger.error("Failed to mount ria_dashboard router: %s", e, exc_info=True)
-
-# Mount RIA households router
-try:
-    from backend.api.ria_households import router as ria_households_router
-    app.include_router(ria_households_router)
-    _ria_routers_mounted.append("households")
-except Exception as e:
-    _ria_router_errors.append(f"households: {type(e).__name__}: {e}")
-    logger.error("Failed to mount ria_households router: %s", e, exc_info=True)
-
-# Mount RIA accounts router
-try:
-    from backend.api.ria_accounts import router as ria_accounts_router
-    app.include_router(ria_accounts_router)
-    _ria_routers_mounted.append("accounts")
-except Exception as e:
-    _ria_router_errors.append(f"accounts: {type(e).__name__}: {e}")
-    logger.error("Failed to mount ria_accounts router: %s", e, exc_info=True)
-
-# Mount RIA compliance router
-try:
-    from backend.api.ria_compliance import router as ria_compliance_router
-    app.include_router(ria_compliance_router)
-    _ria_routers_mounted.append("compliance")
-except Exception as e:
-    _ria_router_errors.append(f"compliance: {type(e).__name__}: {e}")
-    logger.error("Failed to mount ria_compliance router: %s", e, exc_info=True)
-
-# Mount compliance dashboard (mock data — no DB required)
-try:
-    from backend.api.compliance_dashboard import router as compliance_dashboard_router
-    app.include_router(compliance_dashboard_router)
-    _ria_routers_mounted.append("compliance_dashboard")
-except Exception as e:
-    _ria_router_errors.append(f"compliance_dashboard: {type(e).__name__}: {e}")
-    logger.error("Failed to mount compliance_dashboard router: %s", e, exc_info=True)
-
-# Mount RIA chat router
-try:
-    from backend.api.ria_chat import router as ria_chat_router
-    app.include_router(ria_chat_router)
-    _ria_routers_mounted.append("chat")
-except Exception as e:
-    _ria_router_errors.append(f"chat: {type(e).__name__}: {e}")
-    logger.error("Failed to mount ria_chat router: %s", e, exc_info=True)
-
-# Mount RIA statements router
-try:
-    from backend.api.ria_statements import router as ria_statements_router
-    app.include_router(ria_statements_router)
-    _ria_routers_mounted.append("statements")
-except Exception as e:
-    _ria_router_errors.append(f"statements: {type(e).__name__}: {e}")
-    logger.error("Failed to mount ria_statements router: %s", e, exc_info=True)
-
-# Mount RIA connections router (B2C advisor connect requests)
-try:
-    from backend.api.ria_connections import router as ria_connections_router
-    app.include_router(ria_connections_router)
-    _ria_routers_mounted.append("connections")
-except Exception as e:
-    _ria_router_errors.append(f"connections: {type(e).__name__}: {e}")
-    logger.error("Failed to mount ria_connections router: %s", e, exc_info=True)
-
-# Mount RIA analysis router
-try:
-    from backend.api.ria_analysis import router as ria_analysis_router
-    app.include_router(ria_analysis_router)
-    _ria_routers_mounted.append("analysis")
-except Exception as e:
-    _ria_router_errors.append(f"analysis: {type(e).__name__}: {e}")
-    logger.error("Failed to mount ria_analysis router: %s", e, exc_info=True)
-
-# Mount Meeting Intelligence router
-try:
-    from backend.api.meetings import router as meetings_router
-    app.include_router(meetings_router)
-    _ria_routers_mounted.append("meetings")
-except Exception as e:
-    _ria_router_errors.append(f"meetings: {type(e).__name__}: {e}")
-    logger.error("Failed to mount meetings router: %s", e, exc_info=True)
-
-# NOTE: Compliance Documents router (ADV Part 2B, Form CRS) is mounted AFTER
-# the compliance router so that /api/v1/compliance/documents endpoints in
-# compliance.py (document reviews) take priority over compliance_docs.py's
-# generic list handler.  See registration below the RIA Platform API block.
-
-# DB-dependent routers — only mount if a real database is configured.
-# Without a database, these import fine but fail at runtime (500 errors).
-# Mock fallbacks are mounted later for any skipped routers.
-_db_routers = [
-    ("liquidity", "backend.api.liquidity"),
-    ("custodians", "backend.api.custodians"),
-    ("tax_harvest", "backend.api.tax_harvest"),
-    ("prospects", "backend.api.prospects"),
-    ("conversations", "backend.api.conversations"),
-    ("model_portfolios", "backend.api.model_portfolios"),
-    ("alternative_assets", "backend.api.alternative_assets"),
-    ("market_data", "backend.api.market_data"),
-    ("compliance_exceptions", "backend.api.compliance_exceptions"),
-    ("tax", "backend.api.tax"),
-    ("recommendations", "backend.api.recommendations"),
-]
+# Mount every API router from the manifest. Modules are imported on first
+# request (and warmed in the background after startup), so a cold worker
+# serves /api/health without loading ~70 routers. See router_manifest.py.
+from backend.api.router_manifest import mount_routers
 
-if _db_available:
-    for _name, _module in _db_routers:
-        try:
-            import importlib
-            _mod = importlib.import_module(_module)
-            app.include_router(_mod.router)
-            _ria_routers_mounted.append(_name)
-        except Exception as e:
-            _ria_router_errors.append(f"{_name}: {type(e).__name__}: {e}")
-            logger.error("Failed to mount %s router: %s", _name, e, exc_info=True)
-else:
-    for _name, _ in _db_routers:
-        _ria_router_errors.append(f"{_name}: no database configured")
-    logger.info("Skipping DB-dependent routers (no DATABASE_URL): %s", ", ".join(n for n, _ in _db_routers))
-
-# Mount RIA Onboarding Wizard router
-try:
-    from backend.api.ria_onboarding import router as ria_onboarding_router
-    app.include_router(ria_onboarding_router)
-    _ria_routers_mounted.append("ria_onboarding")
-except Exception as e:
-    _ria_router_errors.append(f"ria_onboarding: {type(e).__name__}: {e}")
-    logger.error("Failed to mount ria_onboarding router: %s", e, exc_info=True)
-
-# Mount Help Center router
-try:
-    from backend.api.help import router as help_router
-    app.include_router(help_router)
-    _ria_routers_mounted.append("help")
-except Exception as e:
-    _ria_router_errors.append(f"help: {type(e).__name__}: {e}")
-    logger.error("Failed to mount help router: %s", e, exc_info=True)
-
-# Mount Stock Screener router
-try:
-    from backend.api.stock_screener import router as stock_screener_router
-    app.include_router(stock_screener_router)
-    _ria_routers_mounted.append("stock_screener")
-except Exception as e:
-    _ria_router_errors.append(f"stock_screener: {type(e).__name__}: {e}")
-    logger.error("Failed to mount stock_screener router: %s", e, exc_info=True)
-
-# Mount Enhanced Onboarding Flow router
-try:
-    from backend.api.onboarding_flow import router as onboarding_flow_router
-    app.include_router(onboarding_flow_router)
-    _ria_routers_mounted.append("onboarding_flow")
-except Exception as e:
-    _ria_router_errors.append(f"onboarding_flow: {type(e).__name__}: {e}")
-    logger.error("Failed to mount onboarding_flow router: %s", e, exc_info=True)
-
-# Mount Messaging router
-try:
-    from backend.api.messaging import router as messaging_router
-    app.include_router(messaging_router)
-    _ria_routers_mounted.append("messaging")
-except Exception as e:
-    _ria_router_errors.append(f"messaging: {type(e).__name__}: {e}")
-    logger.error("Failed to mount messaging router: %s", e, exc_info=True)
-
-# Mount Report Scheduler router
-try:
-    from backend.api.report_scheduler import router as report_scheduler_router
-    app.include_router(report_scheduler_router)
-    _ria_routers_mounted.append("report_scheduler")
-except Exception as e:
-    _ria_router_errors.append(f"report_scheduler: {type(e).__name__}: {e}")
-    logger.error("Failed to mount report_scheduler router: %s", e, exc_info=True)
-
-# Mount Workflows router
-try:
-    from backend.api.workflows import router as workflows_router
-    app.include_router(workflows_router)
-    _ria_routers_mounted.append("workflows")
-except Exception as e:
-    _ria_router_errors.append(f"workflows: {type(e).__name__}: {e}")
-    logger.error("Failed to mount workflows router: %s", e, exc_info=True)
-
-# Mount Best Execution Monitoring router
-try:
-    from backend.api.best_execution import router as best_execution_router
-    app.include_router(best_execution_router)
-    _ria_routers_mounted.append("best_execution")
-except Exception as e:
-    _ria_router_errors.append(f"best_execution: {type(e).__name__}: {e}")
-    logger.error("Failed to mount best_execution router: %s", e, exc_info=True)
-
-# Mount Portfolio Review router
-try:
-    from backend.api.portfolio_review import router as portfolio_review_router
-    app.include_router(portfolio_review_router)
-    _ria_routers_mounted.append("portfolio_review")
-except Exception as e:
-    _ria_router_errors.append(f"portfolio_review: {type(e).__name__}: {e}")
-    logger.error("Failed to mount portfolio_review router: %s", e, exc_info=True)
-
-# Mount Custodian Data Integration router
-try:
-    from backend.api.custodian_integration import router as custodian_integration_router
-    app.include_router(custodian_integration_router)
-    _ria_routers_mounted.append("custodian_integration")
-except Exception as e:
-    _ria_router_errors.append(f"custodian_integration: {type(e).__name__}: {e}")
-    logger.error("Failed to mount custodian_integration router: %s", e, exc_info=True)
-
-# Mount Portfolio Accounting / Performance router
-try:
-    from backend.api.portfolio_accounting import router as portfolio_accounting_router
-    app.include_router(portfolio_accounting_router)
-    _ria_routers_mounted.append("portfolio_accounting")
-except Exception as e:
-    _ria_router_errors.append(f"portfolio_accounting: {type(e).__name__}: {e}")
-    logger.error("Failed to mount portfolio_accounting router: %s", e, exc_info=True)
-
-# Mount Document Vault router
-try:
-    from backend.api.document_vault import router as document_vault_router
-    app.include_router(document_vault_router)
-    _ria_routers_mounted.append("document_vault")
-except Exception as e:
-    _ria_router_errors.append(f"document_vault: {type(e).__name__}: {e}")
-    logger.error("Failed to mount document_vault router: %s", e, exc_info=True)
-
-# Mount Firm Management (Multi-Advisor RBAC) router
-try:
-    from backend.api.firm_management import router as firm_management_router
-    app.include_router(firm_management_router)
-    _ria_routers_mounted.append("firm_management")
-except Exception as e:
-    _ria_router_errors.append(f"firm_management: {type(e).__name__}: {e}")
-    logger.error("Failed to mount firm_management router: %s", e, exc_info=True)
-
-# Mount Rebalancing Engine router
-try:
-    from backend.api.rebalancing_engine import router as rebalancing_engine_router
-    app.include_router(rebalancing_engine_router)
-    _ria_routers_mounted.append("rebalancing_engine")
-except Exception as e:
-    _ria_router_errors.append(f"rebalancing_engine: {type(e).__name__}: {e}")
-    logger.error("Failed to mount rebalancing_engine router: %s", e, exc_info=True)
-
-# Mount Financial Planning router
-try:
-    from backend.api.financial_planning import router as fin_planning_router
-    app.include_router(fin_planning_router)
-    _ria_routers_mounted.append("financial_planning")
-except Exception as e:
-    _ria_router_errors.append(f"financial_planning: {type(e).__name__}: {e}")
-    logger.error("Failed to mount financial_planning router: %s", e, exc_info=True)
-
-# Mount Communication Archiving router
-try:
-    from backend.api.comm_archiving import router as comm_archiving_router
-    app.include_router(comm_archiving_router)
-    _ria_routers_mounted.append("comm_archiving")
-except Exception as e:
-    _ria_router_errors.append(f"comm_archiving: {type(e).__name__}: {e}")
-    logger.error("Failed to mount comm_archiving router: %s", e, exc_info=True)
-
-# Mount Engagement Analytics router
-try:
-    from backend.api.engagement_analytics import router as engagement_analytics_router
-    app.include_router(engagement_analytics_router)
-    _ria_routers_mounted.append("engagement_analytics")
-except Exception as e:
-    _ria_router_errors.append(f"engagement_analytics: {type(e).__name__}: {e}")
-    logger.error("Failed to mount engagement_analytics router: %s", e, exc_info=True)
-
-# Mount CRM Integrations router
-try:
-    from backend.api.crm_integrations import router as crm_integrations_router
-    app.include_router(crm_integrations_router)
-    _ria_routers_mounted.append("crm_integrations")
-except Exception as e:
-    _ria_router_errors.append(f"crm_integrations: {type(e).__name__}: {e}")
-    logger.error("Failed to mount crm_integrations router: %s", e, exc_info=True)
-
-# Mount Direct Indexing router
-try:
-    from backend.api.direct_indexing import router as direct_indexing_router
-    app.include_router(direct_indexing_router)
-    _ria_routers_mounted.append("direct_indexing")
-except Exception as e:
-    _ria_router_errors.append(f"direct_indexing: {type(e).__name__}: {e}")
-    logger.error("Failed to mount direct_indexing router: %s", e, exc_info=True)
-
-if _ria_routers_mounted:
-    logger.info("RIA demo routes mounted: %s", ", ".join(_ria_routers_mounted))
-
-# ── Mount mock-data routers as fallback for any real router that failed ──
-_mock_mounted: list[str] = []
-_failed_features = {name.split(":")[0].strip() for name in _ria_router_errors}
-if _failed_features:
-    try:
-        from backend.api.mock_endpoints import ALL_MOCK_ROUTERS
-    except ImportError:
-        try:
-            from api.mock_endpoints import ALL_MOCK_ROUTERS
-        except ImportError:
-            ALL_MOCK_ROUTERS = []
-
-    for feature_name, mock_router in ALL_MOCK_ROUTERS:
-        if feature_name in _failed_features:
-            try:
-                app.include_router(mock_router)
-                _mock_mounted.append(feature_name)
-            except Exception as e:
-                logger.warning("Could not mount mock %s router: %s", feature_name, e)
-
-    if _mock_mounted:
-        logger.info("Mock-data routers mounted for: %s", ", ".join(_mock_mounted))
-
-if not _ria_routers_mounted and not _mock_mounted:
-    logger.warning("No RIA demo routes could be mounted!")
-
-# Mount RIA Platform API v1 routers (DB required for analysis/chat/compliance)
-if _db_available:
-    try:
-        from backend.api.dashboard import router as dashboard_router
-        from backend.api.households import router as households_router
-        from backend.api.accounts import router as accounts_router
-        from backend.api.analysis_extended import router as analysis_extended_router
-        app.include_router(dashboard_router)
-        app.include_router(households_router)
-        app.include_router(accounts_router)
-        app.include_router(analysis_extended_router)
-    except Exception as e:
-        logger.warning("Could not mount dashboard/households/accounts: %s", e)
-else:
-    logger.info("Skipping dashboard/households/accounts routers (no DATABASE_URL)")
-_portal_mounted = False
-if _db_available:
-    try:
-        from backend.api.reports import router as reports_router
-        from backend.api.client_portal import router as client_portal_router
-        from backend.api.onboarding import router as onboarding_router
-        from backend.api.billing import router as billing_router
-        app.include_router(reports_router)
-        app.include_router(client_portal_router)
-        app.include_router(onboarding_router)
-        app.include_router(billing_router)
-        _portal_mounted = True
-    except Exception as e:
-        logger.warning("Could not mount reports/portal/planning/onboarding/billing: %s", e)
-
-# Mount mock portal API if the real DB-backed portal could not be loaded
-if not _portal_mounted:
-    try:
-        from backend.api.mock_portal import router as mock_portal_router
-        app.include_router(mock_portal_router)
-        logger.info("Mock portal API mounted (no DB available)")
-    except Exception as e2:
-        logger.warning("Could not mount mock portal API: %s", e2)
-if _db_available:
-    try:
-        from backend.api.statements import router as statements_router
-        from backend.api.analysis import router as analysis_router
-        from backend.api.chat import router as chat_router
-        from backend.api.compliance import router as compliance_router
-        from backend.api.portfolio_builder import router as portfolio_builder_router
-        from backend.api.ips_generator import router as ips_router
-        app.include_router(statements_router)
-        app.include_router(analysis_router)
-        app.include_router(chat_router)
-        app.include_router(compliance_router)
-        app.include_router(portfolio_builder_router)
-        app.include_router(ips_router)
-        logger.info("RIA Platform API v1 routes mounted")
-    except Exception as e:
-        logger.warning("Could not mount RIA API routes (DB/config): %s", e)
-        _ria_router_errors.append(f"analysis: {type(e).__name__}: {e}")
-else:
-    logger.info("Skipping statements/analysis/chat/compliance routers (no DATABASE_URL)")
-    _ria_router_errors.append("analysis: no database configured")
-
-# Mount Compliance Documents router (ADV Part 2B, Form CRS)
-if _db_available:
-    try:
-        from backend.api.compliance_docs import router as compliance_docs_router
-        app.include_router(compliance_docs_router)
-        _ria_routers_mounted.append("compliance_docs")
-    except Exception as e:
-        _ria_router_errors.append(f"compliance_docs: {type(e).__name__}: {e}")
-        logger.error("Failed to mount compliance_docs router: %s", e, exc_info=True)
-else:
-    _ria_router_errors.append("compliance_docs: no database configured")
-
-# Mount mock compliance docs if the real one wasn't loaded
-if "compliance_docs" not in [n for n in _ria_routers_mounted] and "compliance_docs" not in _mock_mounted:
-    try:
-        from backend.api.mock_endpoints import compliance_docs_router as mock_cdocs
-    except ImportError:
-        try:
-            from api.mock_endpoints import compliance_docs_router as mock_cdocs
-        except ImportError:
-            mock_cdocs = None
-    if mock_cdocs:
-        try:
-            app.include_router(mock_cdocs)
-            _mock_mounted.append("compliance_docs")
-            logger.info("Mock compliance_docs router mounted")
-        except Exception:
-            pass
-
-# Mount B2C self-service routes (DB required)
-if _db_available:
-    try:
-        try:
-            from backend.api.b2c.auth import router as b2c_auth_router
-            from backend.api.b2c.onboarding import router as b2c_onboarding_router
-            from backend.api.b2c.dashboard import router as b2c_dashboard_router
-            from backend.api.b2c.chat import router as b2c_chat_router
-            from backend.api.b2c.statements import router as b2c_statements_router
-            from backend.api.b2c.subscription import router as b2c_subscription_router
-            from backend.api.b2c.advisor_connect import router as b2c_advisor_connect_router
-            from backend.api.b2c.planning import router as b2c_planning_router
-            from backend.api.b2c.plaid import router as b2c_plaid_router
-            from backend.api.b2c.budgets import router as b2c_budgets_router
-            from backend.api.b2c.household import router as b2c_household_router
-            from backend.api.b2c.insights import router as b2c_insights_router
-            from backend.api.b2c.ai_analysis import router as b2c_ai_router
-        except ImportError:
-            from api.b2c.auth import router as b2c_auth_router
-            from api.b2c.onboarding import router as b2c_onboarding_router
-            from api.b2c.dashboard import router as b2c_dashboard_router
-            from api.b2c.chat import router as b2c_chat_router
-            from api.b2c.statements import router as b2c_statements_router
-            from api.b2c.subscription import router as b2c_subscription_router
-            from api.b2c.advisor_connect import router as b2c_advisor_connect_router
-            from api.b2c.planning import router as b2c_planning_router
-            from api.b2c.plaid import router as b2c_plaid_router
-            from api.b2c.budgets import router as b2c_budgets_router
-            from api.b2c.household import router as b2c_household_router
-            from api.b2c.insights import router as b2c_insights_router
-            from api.b2c.ai_analysis import router as b2c_ai_router
-        app.include_router(b2c_auth_router)
-        app.include_router(b2c_onboarding_router)
-        app.include_router(b2c_dashboard_router)
-        app.include_router(b2c_chat_router)
-        app.include_router(b2c_statements_router)
-        app.include_router(b2c_subscription_router)
-        app.include_router(b2c_advisor_connect_router)
-        app.include_router(b2c_planning_router)
-        app.include_router(b2c_plaid_router)
-        app.include_router(b2c_budgets_router)
-        app.include_router(b2c_household_router)
-        app.include_router(b2c_insights_router)
-        app.include_router(b2c_ai_router)
-        logger.info("B2C API routes mounted")
-        try:
-            try:
-                from backend.api.mock_b2c import supplement_router as b2c_supplement_router
-            except ImportError:
-                from api.mock_b2c import supplement_router as b2c_supplement_router
-            app.include_router(b2c_supplement_router)
-            logger.info("B2C demo supplement routes mounted")
-        except Exception as sup_exc:
-            logger.warning("Could not mount B2C supplement routes: %s", sup_exc)
-    except Exception as e:
-        logger.warning("Could not mount B2C routes: %s", e)
-else:
-    logger.info("Skipping B2C routes (no DATABASE_URL)")
-    try:
-        try:
-            from backend.api.mock_b2c import router as mock_b2c_router
-        except ImportError:
-            from api.mock_b2c import router as mock_b2c_router
-        app.include_router(mock_b2c_router)
-        logger.info("Mock B2C router mounted (GET /api/v1/b2c/me)")
-    except Exception as e:
-        logger.warning("Could not mount mock B2C router: %s", e)
+_router_table = mount_routers(app, _db_available)
 
 
 # Pydantic models for request/response validation
@@ -983,6 +531,8 @@ _scheduler = None
 @app.on_event("startup")
 async def _on_startup():
     global _scheduler
+    _router_table.start_warmup()
+
     # Initialize Redis (non-blocking — degrades gracefully)
     try:
         from backend.services.redis_client import get_redis
@@ -990,72 +540,54 @@ async def _on_startup():
     except Exception as exc:
         logger.warning("Redis init skipped: %s", exc)
 
-    # Start APScheduler for periodic tasks
+    # Trace the portfolio builder's efficient frontiers off the event loop
     try:
-        from apscheduler.schedulers.asyncio import AsyncIOScheduler
-        _scheduler = AsyncIOScheduler(timezone="UTC")
-        _scheduler.start()
+        from backend.services.portfolio_builder_service import precompute_frontiers
+        asyncio.create_task(asyncio.to_thread(precompute_frontiers))
+    except Exception as exc:
+        logger.warning("Efficient frontier precompute skipped: %s", exc)
 
-        if _db_available:
-            from apscheduler.triggers.interval import IntervalTrigger
-            from apscheduler.triggers.cron import CronTrigger
+    # Recurring jobs: one leader fires them, every worker runs shards
+    if _db_available:
+        try:
             from backend.models import get_session_factory
-
-            async def _run_adv_currency_check():
-                factory = get_session_factory()
-                async with factory() as db:
-                    from backend.services.cim.adv_monitor import check_all_adv_currency
-                    count = await check_all_adv_currency(db)
-                    await db.commit()
-                    logger.info("ADV currency check completed: %d warnings", count)
-
-            async def _run_follow_up_check():
-                factory = get_session_factory()
-                async with factory() as db:
-                    from backend.services.prospect.follow_up_service import check_follow_ups
-                    count = await check_follow_ups(db)
-                    await db.commit()
-                    logger.info("Follow-up check completed: %d actions", count)
-
-            _scheduler.add_job(
-                _run_adv_currency_check,
-                trigger=CronTrigger(hour=6, minute=0),
-                id="adv_currency_check",
-                replace_existing=True,
-                misfire_grace_time=300,
-            )
-            _scheduler.add_job(
-                _run_follow_up_check,
-                trigger=IntervalTrigger(hours=4),
-                id="prospect_follow_ups",
-                replace_existing=True,
-                misfire_grace_time=120,
+            from backend.services.scheduler import JobScheduler, get_coordinator
+            from backend.services.scheduler.jobs import default_jobs, default_services
+
+            _scheduler = JobScheduler(
+                await get_coordinator(),
+                default_jobs(get_session_factory()),
+                # Quote stream and harvest detector: leader only, so opportunities are created once
+                services=default_services(get_session_factory()),
             )
+            await _scheduler.start()
+        except Exception as exc:
+            logger.warning("Job scheduler init failed: %s", exc)
 
-            jobs = _scheduler.get_jobs()
-            logger.info("APScheduler started — %d jobs registered: %s",
-                        len(jobs), [j.id for j in jobs])
-
-            # IMM-01: Altruist poll is a long-running loop — start as asyncio task
-            try:
-                from backend.services.market_data import periodic_altruist_poll
-                asyncio.create_task(periodic_altruist_poll(
-                    get_session_factory(), interval_seconds=60))
-                logger.info("Altruist poll task started")
-            except Exception as exc:
-                logger.warning("Altruist poll init skipped: %s", exc)
-        else:
-            logger.info("APScheduler started — 0 jobs (no DB available)")
+        from backend.models import get_session_factory
 
-    except Exception as exc:
-        logger.warning("APScheduler init failed: %s", exc)
+        # Usage metering: batched audit events + Redis counter write-back
+        try:
+            from backend.services.usage_tracker import usage_metering_worker
+            asyncio.create_task(usage_metering_worker(get_session_factory()))
+        except Exception as exc:
+            logger.warning("Usage metering worker init skipped: %s", exc)
+    else:
+        logger.info("Job scheduler not started (no DB available)")
 
 
 @app.on_event("shutdown")
 async def _on_shutdown():
     global _scheduler
+    await _router_table.stop_warmup()
     if _scheduler:
-        _scheduler.shutdown(wait=False)
+        await _scheduler.shutdown()
+    try:
+        from backend.models import get_session_factory
+        from backend.services.usage_tracker import flush_usage
+        await flush_usage(get_session_factory())
+    except Exception:
+        pass
     try:
         from backend.services.redis_client import close_redis
         await close_redis()
@@ -1149,246 +681,18 @@ async def health_check():
     return {"status": "healthy"}
 
 
-def parse_portfolio_file(file_content: bytes, filename: str) -> List[Dict[str, Any]]:
+def parse_portfolio_file(source: Any, filename: str) -> List[Dict[str, Any]]:
     """
     Parse CSV or XLSX portfolio file from various brokerages (Robinhood, Fidelity, Schwab, etc.)
-    and return holdings in standardized format
+    and return holdings in standardized format. `source` is bytes or a binary
+    file; rows are streamed in chunks rather than loaded whole.
     """
-    
-    holdings = []
-    
+    from backend.services.portfolio_csv_parser import parse_ticker_amounts
+
     try:
-        # Determine file type
-        file_ext = filename.lower().split('.')[-1]
-        
-        if file_ext == 'csv':
-            # Try different encodings and delimiters for CSV
-            try:
-                df = pd.read_csv(io.BytesIO(file_content), encoding='utf-8')
-            except UnicodeDecodeError:
-                try:
-                    df = pd.read_csv(io.BytesIO(file_content), encoding='latin-1')
-                except:
-                    df = pd.read_csv(io.BytesIO(file_content), encoding='cp1252')
-            
-        elif file_ext in ['xlsx', 'xls']:
-            # Parse XLSX - read first sheet, skip header rows if needed
-            df = pd.read_excel(io.BytesIO(file_content), engine='openpyxl', sheet_name=0)
-            
-        else:
-            raise ValueError(f"Unsupported file type: {file_ext}")
-        
-        # Remove completely empty rows
-        df = df.dropna(how='all')
-        
-        if len(df) == 0:
-            raise ValueError("File appears to be empty")
-        
-        # Normalize column names (case-insensitive, strip whitespace, handle special chars)
-        df.columns = df.columns.str.strip().str.lower().str.replace('_', ' ').str.replace('-', ' ')
-        
-        # Comprehensive ticker/symbol column detection
-        # Supports major brokerages: Robinhood, Fidelity, Schwab, TD Ameritrade, Vanguard,
-        # E*TRADE, Interactive Brokers, Merrill Edge, Ally Invest, Webull, M1 Finance, SoFi,
-        # Betterment, Wealthfront, T. Rowe Price, and generic formats
-        ticker_candidates = [
-            # Standard names
-            'symbol', 'ticker', 'sym', 'stock', 'security', 'instrument', 'name',
-            'asset', 'holding', 'equity', 'investment', 'position',
-            # Brokerage-specific variations
-            'description', 'asset name', 'security name', 'instrument name',
-            'equity name', 'holding name', 'position name', 'investment name',
-            # Vanguard, Fidelity specific
-            'fund symbol', 'fund name', 'security description', 'investment description',
-            # Interactive Brokers
-            'underlying symbol', 'base symbol', 'conid',
-            # E*TRADE, Merrill Edge
-            'symbol description', 'instrument description',
-            # TD Ameritrade
-            'cusip', 'symbol description',
-            # Generic fallbacks
-            'company', 'issuer', 'product'
-        ]
-        
-        ticker_col = None
-        for col in df.columns:
-            col_clean = col.lower().strip()
-            if any(candidate in col_clean for candidate in ticker_candidates):
-                # Additional check: column should contain mostly text/alphanumeric
-                sample_values = df[col].dropna().head(10).astype(str)
-                if len(sample_values) > 0:
-                    text_ratio = sum(1 for v in sample_values if any(c.isalpha() for c in str(v))) / len(sample_values)
-                    if text_ratio > 0.5:  # At least 50% text
-                        ticker_col = col
-                        break
-        
-        # Comprehensive value/amount column detection
-        # Supports various brokerage column naming conventions
-        amount_candidates = [
-            # Standard value columns
-            'value', 'amount', 'balance', 'total value', 'market value', 'current value',
-            'equity value', 'position value', 'account value',
-            # Brokerage-specific value names
-            'market price', 'last price', 'closing price', 'current price',
-            'cost basis', 'cost', 'principal', 'book value', 'total cost',
-            # Dollar amount indicators
-            'usd', '$', 'dollar', 'dollars', 'us dollars', 'value in usd',
-            # Fidelity/Vanguard specific
-            'price per share', 'share price', 'current market value',
-            # Share-based (we'll multiply by price if available)
-            'quantity', 'qty', 'shares', 'share', 'units', 'unit', 'position size',
-            'number of shares', 'share quantity',
-            # Interactive Brokers
-            'mtm p&l', 'unrealized p&l', 'realized p&l',
-            # E*TRADE, Merrill Edge
-            'market price', 'last price', 'settled cash'
-        ]
-        
-        amount_col = None
-        price_col = None
-        shares_col = None
-        
-        for col in df.columns:
-            col_clean = col.lower().strip()
-            if any(candidate in col_clean for candidate in amount_candidates):
-                # Check if it's a dollar amount column
-                sample_values = df[col].dropna().head(10).astype(str)
-                if len(sample_values) > 0:
-                    # Check if values look like dollar amounts
-                    dollar_indicators = sum(1 for v in sample_values if '$' in str(v) or 
-                                          (v.replace(',', '').replace('.', '').replace('-', '').replace('$', '').isdigit()))
-                    
-                    if 'price' in col_clean or 'cost' in col_clean:
-                        price_col = col
-                    elif 'quantity' in col_clean or 'qty' in col_clean or 'shares' in col_clean or 'share' in col_clean:
-                        shares_col = col
-                    elif dollar_indicators / len(sample_values) > 0.5:
-                        if amount_col is None:
-                            amount_col = col
-        
-        # If we have shares and price, calculate value
-        if shares_col and price_col and amount_col is None:
-            # Will calculate below
-            pass
-        
-        # Fallback: try to find numeric columns that might be values
-        if amount_col is None:
-            for col in df.columns:
-                if df[col].dtype in ['float64', 'int64']:
-                    sample_values = df[col].dropna().head(10)
-                    if len(sample_values) > 0:
-                        avg_value = abs(sample_values.mean())
-                        # Reasonable portfolio values are typically in thousands
-                        if 100 < avg_value < 10000000:  # Between $100 and $10M per holding
-                            if amount_col is None:
-                                amount_col = col
-                                break
-        
-        # If still no ticker column, try first text column
-        if ticker_col is None:
-            for col in df.columns:
-                if df[col].dtype == 'object':  # String type
-                    sample = str(df[col].iloc[0]) if len(df) > 0 else ""
-                    if any(c.isalpha() for c in sample) and len(sample) < 50:
-                        ticker_col = col
-                        break
-        
-        # If no amount column found, try first numeric column after ticker
-        if amount_col is None:
-            for col in df.columns:
-                if col != ticker_col and df[col].dtype in ['float64', 'int64']:
-                    amount_col = col
-                    break
-        
-        if ticker_col is None:
-            raise ValueError("Could not identify ticker/symbol column. Please check file format.")
-        
-        # Extract holdings
-        for idx, row in df.iterrows():
-            try:
-                # Get ticker - handle various formats
-                ticker_raw = str(row[ticker_col]).strip() if not pd.isna(row[ticker_col]) else ""
-                
-                if not ticker_raw or ticker_raw.lower() in ['nan', 'none', '']:
-                    continue
-                
-                # Extract ticker symbol (may be in format like "AAPL - Apple Inc" or just "AAPL")
-                ticker_parts = ticker_raw.split()
-                ticker = ticker_parts[0].upper().strip('()[]{}')
-                
-                # Clean ticker (remove common suffixes like .US, .TO, etc.)
-                ticker = ticker.split('.')[0].split('-')[0].split('(')[0]
-                
-                # Skip if ticker looks invalid
-                if len(ticker) < 1 or len(ticker) > 10 or not ticker.replace('$', '').isalnum():
-                    continue
-                
-                # Get amount/value
-                amount_value = None
-                
-                # Case 1: Direct dollar amount column
-                if amount_col:
-                    try:
-                        amount_str = str(row[amount_col]).replace(',', '').replace('$', '').strip()
-                        # Remove common suffixes like " USD"
-                        amount_str = amount_str.split()[0] if amount_str.split() else amount_str
-                        amount_value = float(amount_str)
-                    except (ValueError, TypeError):
-                        pass
-                
-                # Case 2: Calculate from shares * price
-                if amount_value is None and shares_col and price_col:
-                    try:
-                        shares = float(str(row[shares_col]).replace(',', '').strip())
-                        price = float(str(row[price_col]).replace(',', '').replace('$', '').strip())
-                        amount_value = shares * price
-                    except (ValueError, TypeError):
-                        pass
-                
-                # Case 3: Use shares if no price available (assume $1 per share as fallback)
-                if amount_value is None and shares_col:
-                    try:
-                        shares = float(str(row[shares_col]).replace(',', '').strip())
-                        if shares > 0:
-                            # Use shares as dollar amount (user will need to verify)
-                            amount_value = shares
-                    except (ValueError, TypeError):
-                        pass
-                
-                # Skip if no valid amount found
-                if amount_value is None or amount_value <= 0:
-                    continue
-                
-                # Skip very small amounts (likely errors)
-                if amount_value < 0.01:
-                    continue
-                
-                holdings.append({
-                    "ticker": ticker,
-                    "amount": round(amount_value, 2)
-                })
-                
-            except Exception as e:
-                logger.debug(f"Error parsing row {idx}: {str(e)}")
-                continue
-        
-        # Remove duplicates (sum amounts if same ticker)
-        holdings_dict = {}
-        for h in holdings:
-            ticker = h["ticker"]
-            if ticker in holdings_dict:
-                holdings_dict[ticker]["amount"] += h["amount"]
-            else:
-                holdings_dict[ticker] = h.copy()
-        
-        holdings = list(holdings_dict.values())
-        
-        if len(holdings) == 0:
-            raise ValueError("No valid holdings found in file. Please check that the file contains ticker symbols and dollar amounts.")
-        
+        holdings = parse_ticker_amounts(source, filename)
         logger.info(f"Parsed {len(holdings)} holdings from {filename}")
         return holdings
-        
     except Exception as e:
         logger.error(f"Error parsing file {filename}: {str(e)}", exc_info=True)
         if "Could not identify" in str(e) or "No valid holdings" in str(e):
@@ -1441,24 +745,28 @@ async def parse_file(request: Request, file: UploadFile = File(...)):
                 detail="Unsupported file type. Please upload CSV or XLSX file."
             )
         
-        # Read file content
-        content = await file.read()
+        # Size comes from the spooled upload; the body is never read into memory
+        size = file.size
+        if size is None:
+            file.file.seek(0, io.SEEK_END)
+            size = file.file.tell()
+        file.file.seek(0)
         
-        if len(content) == 0:
+        if size == 0:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="File is empty"
             )
         
         # Check file size (max 10MB)
-        if len(content) > 10 * 1024 * 1024:
+        if size > 10 * 1024 * 1024:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="File too large. Maximum size is 10MB."
             )
         
-        # Parse file
-        holdings = parse_portfolio_file(content, filename)
+        # Parse file (streamed in chunks, off the event loop)
+        holdings = await asyncio.to_thread(parse_portfolio_file, file.file, filename)
         
         logger.info(f"Successfully parsed file {filename}: {len(holdings)} holdings")
         
@@ -1561,7 +869,8 @@ def analyze_portfolio(request: Request, payload: AnalyzePortfolioRequest):
         logger.info(f"Received portfolio analysis request for client: {payload.client.name}")
         
         # If Anthropic client is not available, return mock response
-        if anthropic_client is None:
+        client = _get_anthropic_client()
+        if client is None:
             logger.info("Using mock analysis (AI service not configured)")
             analysis_data = generate_mock_analysis(payload.client, payload.holdings)
             return AnalyzePortfolioResponse(**analysis_data)
@@ -1571,7 +880,7 @@ def analyze_portfolio(request: Request, payload: AnalyzePortfolioRequest):
         
         # Call Anthropic API
         try:
-            response = anthropic_client.messages.create(
+            response = client.messages.create(
                 model=ANTHROPIC_MODEL,
                 max_tokens=4000,
                 # temperature omitted — causes 400 errors on extended-thinking models
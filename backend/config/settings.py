@@ -79,6 +79,12 @@ class Settings:
     # Redis
     redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379")
 
+    # Document blob storage ("filesystem" or "s3")
+    blob_store_backend: str = os.getenv("BLOB_STORE_BACKEND", "filesystem")
+    blob_store_dir: str = os.getenv("BLOB_STORE_DIR", "/tmp/firmum-blobs")
+    blob_store_bucket: str = os.getenv("BLOB_STORE_BUCKET", "")
+    blob_store_prefix: str = os.getenv("BLOB_STORE_PREFIX", "blobs")
+
     # Anthropic
     anthropic_api_key: str = os.getenv("ANTHROPIC_API_KEY", "")
 
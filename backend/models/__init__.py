@@ -2,6 +2,7 @@
 
 import logging
 import os
+from functools import lru_cache
 from typing import AsyncGenerator
 
 from sqlalchemy import create_engine
@@ -34,6 +35,12 @@ def get_session_factory(database_url: str | None = None):
     )
 
 
+@lru_cache(maxsize=1)
+def get_shared_session_factory():
+    """Process-wide session factory: one engine, one connection pool."""
+    return get_session_factory()
+
+
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
     """Dependency for FastAPI to inject async DB session."""
     session_factory = get_session_factory()
@@ -67,9 +74,10 @@ from .portfolio_models import (  # noqa: E402
     TimeHorizon,
 )
 from .position import Position  # noqa: E402
+from .search_index import SearchEntry  # noqa: E402
 from .statement import Statement  # noqa: E402
 from .transaction import Transaction  # noqa: E402
-from .usage_log import UsageLog  # noqa: E402
+from .usage_log import UsageCounter, UsageLog  # noqa: E402
 from .user import User  # noqa: E402
 from .portal import (  # noqa: E402
     ClientPortalUser,
@@ -112,6 +120,7 @@ from .custodian import (  # noqa: E402
     CustodianAccount,
     AggregatedPosition,
     AggregatedTransaction,
+    CustodianPositionRollup,
     CustodianSyncLog,
     CustodianType,
     ConnectionStatus,
@@ -189,6 +198,9 @@ from .compliance_rules import (  # noqa: E402
 )
 from .tax_profile import TaxProfile  # noqa: E402
 from .bim_score import BIMScore  # noqa: E402
+from .holdings_series import HoldingsSnapshot, HoldingsValueRollup  # noqa: E402
+from .outbox import OutboundEmail  # noqa: E402
+from .job_watermark import JobWatermark  # noqa: E402
 
 __all__ = [
     "Account",
@@ -215,19 +227,23 @@ __all__ = [
     "Household",
     "InvestmentObjective",
     "InvestmentPolicyStatement",
+    "JobWatermark",
     "ModelPortfolio",
     "ModelPortfolioHolding",
     "NudgeInteraction",
     "NudgeStatus",
     "NudgeType",
+    "OutboundEmail",
     "PortalDocument",
     "PortalNarrative",
     "Position",
     "RiskQuestionnaire",
     "RiskToleranceLevel",
+    "SearchEntry",
     "Statement",
     "TimeHorizon",
     "Transaction",
+    "UsageCounter",
     "UsageLog",
     "User",
     "get_db_session",
@@ -250,6 +266,7 @@ __all__ = [
     "CustodianAccount",
     "AggregatedPosition",
     "AggregatedTransaction",
+    "CustodianPositionRollup",
     "CustodianSyncLog",
     "CustodianType",
     "ConnectionStatus",
@@ -322,4 +339,7 @@ __all__ = [
     "TaxProfile",
     # BIM Scoring models
     "BIMScore",
+    # Holdings time-series models
+    "HoldingsSnapshot",
+    "HoldingsValueRollup",
 ]
@@ -12,7 +12,7 @@ from uuid import UUID, uuid4
 
 from sqlalchemy import (
     Boolean, DateTime, ForeignKey, Index, Integer, Numeric,
-    String, Text, UniqueConstraint,
+    String, Text, UniqueConstraint, text,
 )
 from sqlalchemy import Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID, JSONB
@@ -525,6 +525,63 @@ class AggregatedTransaction(Base, TimestampMixin):
     )
 
 
+class CustodianPositionRollup(Base):
+    """
+    Precomputed cross-custodian position totals by symbol.
+    Refreshed after each sync so unified views read a handful of rows
+    instead of re-aggregating every AggregatedPosition per request.
+    household_id is NULL for the advisor-wide rollup.
+    """
+    __tablename__ = "custodian_position_rollups"
+    __table_args__ = (
+        Index(
+            "ix_custodian_position_rollups_scope",
+            "advisor_id", "household_id", "symbol",
+        ),
+    )
+
+    # Server-side default: rows are bulk-inserted with INSERT ... SELECT
+    id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True), primary_key=True,
+        server_default=text("gen_random_uuid()"),
+    )
+    advisor_id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True), ForeignKey("advisors.id"), nullable=False
+    )
+    household_id: Mapped[Optional[UUID]] = mapped_column(
+        PG_UUID(as_uuid=True), ForeignKey("households.id"), nullable=True
+    )
+
+    # Security
+    symbol: Mapped[str] = mapped_column(String(20), nullable=False)
+    cusip: Mapped[Optional[str]] = mapped_column(String(9), nullable=True)
+    security_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    asset_class: Mapped[CustodianAssetClass] = mapped_column(
+        SQLEnum(CustodianAssetClass), default=CustodianAssetClass.OTHER
+    )
+
+    # Totals across accounts
+    total_quantity: Mapped[Decimal] = mapped_column(
+        Numeric(18, 6), default=Decimal("0")
+    )
+    total_market_value: Mapped[Decimal] = mapped_column(
+        Numeric(18, 2), default=Decimal("0")
+    )
+    total_cost_basis: Mapped[Decimal] = mapped_column(
+        Numeric(18, 2), default=Decimal("0")
+    )
+    account_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Per-account detail: [{account_id, quantity, market_value}]
+    accounts: Mapped[Optional[list]] = mapped_column(
+        JSONB, default=list, nullable=True
+    )
+
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default="now()"
+    )
+
+
 class CustodianSyncLog(Base):
     """
     Audit trail for sync operations.
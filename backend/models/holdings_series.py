@@ -0,0 +1,77 @@
+"""
+Holdings time-series models.
+
+holdings_snapshots is range-partitioned by month on snapshot_at. Each row
+stores the account's total value plus a compact quantity delta against the
+previous row; a keyframe (full quantities + market values) is written at
+least once per day and at the start of every month, so any partition can be
+decoded on its own. holdings_value_rollups keeps downsampled daily and
+weekly OHLC-style value buckets for cheap long-range charts.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import Boolean, Date, DateTime, Index, Integer, Numeric, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class HoldingsSnapshot(Base):
+    """One point in an account's holdings history (keyframe or delta)."""
+
+    __tablename__ = "holdings_snapshots"
+    __table_args__ = (
+        Index("ix_holdings_snapshots_advisor_time", "advisor_id", "snapshot_at"),
+        Index("ix_holdings_snapshots_household_time", "household_id", "snapshot_at"),
+        {"postgresql_partition_by": "RANGE (snapshot_at)"},
+    )
+
+    # Partition key must be part of the primary key
+    account_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    snapshot_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True
+    )
+    advisor_id: Mapped[Optional[UUID]] = mapped_column(
+        PG_UUID(as_uuid=True), nullable=True
+    )
+    household_id: Mapped[Optional[UUID]] = mapped_column(
+        PG_UUID(as_uuid=True), nullable=True
+    )
+    is_keyframe: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    total_value: Mapped[Decimal] = mapped_column(Numeric(18, 2), nullable=False)
+    # Keyframe: {"q": {sym: qty}, "mv": {sym: value}}
+    # Delta:    {"q": {changed sym: qty}, "r": [removed syms]}
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    source: Mapped[str] = mapped_column(String(32), default="altruist", nullable=False)
+
+
+class HoldingsValueRollup(Base):
+    """Downsampled account value per day or ISO week."""
+
+    __tablename__ = "holdings_value_rollups"
+    __table_args__ = (
+        Index("ix_holdings_value_rollups_household", "household_id", "granularity", "bucket_start"),
+    )
+
+    account_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    granularity: Mapped[str] = mapped_column(String(8), primary_key=True)  # day | week
+    bucket_start: Mapped[date] = mapped_column(Date, primary_key=True)
+    advisor_id: Mapped[Optional[UUID]] = mapped_column(
+        PG_UUID(as_uuid=True), nullable=True
+    )
+    household_id: Mapped[Optional[UUID]] = mapped_column(
+        PG_UUID(as_uuid=True), nullable=True
+    )
+    open_value: Mapped[Decimal] = mapped_column(Numeric(18, 2), nullable=False)
+    high_value: Mapped[Decimal] = mapped_column(Numeric(18, 2), nullable=False)
+    low_value: Mapped[Decimal] = mapped_column(Numeric(18, 2), nullable=False)
+    close_value: Mapped[Decimal] = mapped_column(Numeric(18, 2), nullable=False)
+    samples: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    last_snapshot_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
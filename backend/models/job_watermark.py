@@ -0,0 +1,26 @@
+"""Per-job watermarks for incremental scheduled jobs.
+
+An incremental job reads its watermark (the `now` of its last successful
+run), evaluates only rows that changed or crossed a time threshold since
+then, and moves the watermark forward in the same transaction as its
+results (see services.scheduler.watermarks).
+"""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class JobWatermark(Base):
+    """Last evaluated instant per job (and shard, e.g. "adv_currency_check:3/8")."""
+
+    __tablename__ = "job_watermarks"
+
+    job_key: Mapped[str] = mapped_column(String(100), primary_key=True)
+    watermark: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
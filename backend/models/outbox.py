@@ -0,0 +1,50 @@
+"""Transactional email outbox.
+
+Rows are written in the same transaction as the business change that
+triggers the email and delivered afterwards, in batches, by the outbox
+worker (see services.email_outbox).
+"""
+
+from datetime import datetime
+from typing import Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import DateTime, Index, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class OutboundEmail(Base):
+    """One queued email. status: pending -> sending -> sent | failed | suppressed."""
+
+    __tablename__ = "email_outbox"
+
+    id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True), primary_key=True, default=uuid4
+    )
+    to_email: Mapped[str] = mapped_column(String(320), nullable=False)
+    from_email: Mapped[Optional[str]] = mapped_column(String(320), nullable=True)
+    from_name: Mapped[Optional[str]] = mapped_column(String(120), nullable=True)
+    subject: Mapped[str] = mapped_column(String(255), nullable=False)
+    html_content: Mapped[str] = mapped_column(Text, nullable=False)
+    # Per-recipient tokens (e.g. {"-first_name-": "Ana"}) so one body can
+    # go out to many recipients in a single provider request
+    substitutions: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+    category: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    sent_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    __table_args__ = (Index("ix_email_outbox_due", "status", "next_attempt_at"),)
@@ -122,6 +122,8 @@ class Prospect(Base, TimestampMixin):
         Index("ix_prospects_email", "email"),
         Index("ix_prospects_created", "created_at"),
         Index("ix_prospects_next_action", "next_action_date"),
+        Index("ix_prospects_status_activity", "status", "last_activity_at"),
+        Index("ix_prospects_updated", "updated_at"),
         Index(
             "ix_prospects_search",
             "search_vector",
@@ -0,0 +1,52 @@
+"""Full-text search index shared by the archive, transcripts and compliance docs.
+
+search_entries is range-partitioned by month on occurred_at (see migration
+026); search_vector is a generated, weighted tsvector (title A,
+participants B, body C) under the 'simple' configuration so Postgres and
+the embedded LocalSearchIndex tokenize identically.
+"""
+
+import logging
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Computed, DateTime, Index, String, Text, func
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+logger = logging.getLogger(__name__)
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(participants, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(body, '')), 'C')"
+)
+
+
+class SearchEntry(Base):
+    """One indexed message, transcript or compliance document version."""
+
+    __tablename__ = "search_entries"
+    __table_args__ = (
+        Index("ix_search_entries_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_search_entries_facets", "facets", postgresql_using="gin"),
+        Index("ix_search_entries_scope", "collection", "owner_id", "occurred_at"),
+    )
+
+    collection: Mapped[str] = mapped_column(String(40), primary_key=True)
+    doc_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    owner_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    title: Mapped[str] = mapped_column(Text, default="", nullable=False)
+    participants: Mapped[str] = mapped_column(Text, default="", nullable=False)
+    body: Mapped[str] = mapped_column(Text, default="", nullable=False)
+    facets: Mapped[dict] = mapped_column(JSONB, default=dict, nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, default=dict, nullable=False)
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)
+    )
+    indexed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -1,11 +1,15 @@
-"""Monthly usage tracking for rate-limited features."""
+"""Monthly usage tracking for rate-limited features.
+
+usage_logs is the append-only audit trail; usage_counters holds the
+per-user, per-feature, per-month totals that entitlement checks read.
+"""
 
 import logging
 from datetime import datetime
 from typing import Optional
 from uuid import UUID, uuid4
 
-from sqlalchemy import DateTime, ForeignKey, Index, String, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -31,3 +35,19 @@ class UsageLog(Base):
     )
 
     __table_args__ = (Index("idx_usage_user_feature_month", "user_id", "feature", "timestamp"),)
+
+
+class UsageCounter(Base):
+    """Running monthly total per user and feature (period = YYYYMM)."""
+
+    __tablename__ = "usage_counters"
+
+    user_id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True
+    )
+    feature: Mapped[str] = mapped_column(String(50), primary_key=True)
+    period: Mapped[str] = mapped_column(String(6), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -7,14 +7,19 @@ from .base_parser import (
     ParsedPosition,
     ParsedStatement,
 )
+from .layout import Column, DocumentLayout, TableSchema, extract_layout
 from .registry import ParserRegistry, get_default_registry
 
 __all__ = [
     "BaseStatementParser",
+    "Column",
+    "DocumentLayout",
     "ParsedAllocation",
     "ParsedFee",
     "ParsedPosition",
     "ParsedStatement",
     "ParserRegistry",
+    "TableSchema",
+    "extract_layout",
     "get_default_registry",
 ]
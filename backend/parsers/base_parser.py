@@ -8,6 +8,8 @@ from typing import Any, Optional
 
 from pydantic import BaseModel, Field
 
+from .layout import DocumentLayout, TableSchema
+
 logger = logging.getLogger(__name__)
 
 
@@ -64,6 +66,9 @@ class ParsedStatement(BaseModel):
 class BaseStatementParser(ABC):
     """Abstract base for statement parsers."""
 
+    # Declared shape of the positions table; see layout.TableSchema
+    position_table: Optional[TableSchema] = None
+
     @abstractmethod
     def can_handle(self, raw_text: str) -> bool:
         """Return True if this parser recognizes the statement format."""
@@ -75,3 +80,31 @@ class BaseStatementParser(ABC):
     @abstractmethod
     def get_custodian_name(self) -> str:
         """Return canonical custodian name."""
+
+    def parse_layout(self, layout: DocumentLayout) -> ParsedStatement:
+        """
+        Parse from a page layout. Header fields still come from parse() over
+        the layout text; positions come from the declared table when it
+        matches, instead of the line heuristics.
+        """
+        result = self.parse(layout.text)
+        if self.position_table is None:
+            return result
+        rows = self.position_table.extract(layout)
+        if not rows:
+            return result
+        summed = result.total_value == sum(p.market_value for p in result.positions)
+        result.positions = [position_from_row(row) for row in rows]
+        result.metadata["table_rows"] = len(rows)
+        if summed or result.total_value == 0:
+            result.total_value = sum(p.market_value for p in result.positions)
+        return result
+
+
+def position_from_row(row: dict[str, Any]) -> ParsedPosition:
+    """ParsedPosition from a table row keyed by ParsedPosition field names."""
+    fields = {k: v for k, v in row.items() if k in ParsedPosition.model_fields}
+    fields.setdefault("security_name", row.get("ticker") or row.get("fund_name") or "")
+    if "quantity" not in fields and row.get("price") and row.get("market_value"):
+        fields["quantity"] = (row["market_value"] / row["price"]).quantize(Decimal("0.0001"))
+    return ParsedPosition(**fields)
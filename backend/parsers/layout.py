@@ -0,0 +1,334 @@
+"""
+Layout extraction: statement pages as rows of positioned cells.
+
+PDFs are read once with PyMuPDF word boxes. Words are grouped into rows by
+baseline and merged into cells wherever the horizontal gap is narrower than
+a column gutter, so "Index 500 (BlackRock)" stays one cell while amounts in
+separate columns do not. Plain-text statements get the same structure, with
+character offsets used as coordinates. Layouts are cached by content hash,
+so re-parsing an upload costs no second extraction. A PDF on disk is opened
+by path, and hashed by streaming unless the caller already knows its digest
+(a BlobRef), so it is never copied into memory whole.
+
+Parsers declare what their position tables look like with a TableSchema
+instead of guessing from number magnitudes line by line. A schema matches
+in three ways:
+  - header mode: a row naming at least `min_header_matches` of its columns
+    sets column x-ranges, and each body cell goes to the column it sits under;
+  - headerless mode: runs of rows whose cells type-check, in order, against
+    the required columns (e.g. ticker | quantity | money);
+  - labelled fields: "Target 9%   Actual 11%   Value $4,627.18" pulls values
+    out by their inline label, wherever they sit in the row.
+"""
+
+import hashlib
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+_CACHE_SIZE = 32
+_layout_cache: "OrderedDict[str, DocumentLayout]" = OrderedDict()
+
+_TICKER = re.compile(r"^[A-Z][A-Z0-9.\-]{0,5}$")
+_NUMBER = re.compile(r"^\(?-?\$?-?[\d,]*\.?\d+\)?$")
+_SEPARATOR = re.compile(r"^[-=_.\s]{3,}$")
+
+
+# ─── Rows and cells ─────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class Word:
+    x0: float
+    x1: float
+    text: str
+
+
+@dataclass(frozen=True)
+class Cell:
+    x0: float
+    x1: float
+    text: str
+
+    @property
+    def center(self) -> float:
+        return (self.x0 + self.x1) / 2
+
+
+@dataclass
+class Row:
+    y: float
+    words: List[Word]
+    gutter: float  # gaps at least this wide separate cells
+    _cells: Optional[List[Cell]] = field(default=None, repr=False)
+
+    @property
+    def cells(self) -> List[Cell]:
+        if self._cells is None:
+            self._cells = _merge(self.words, self.gutter)
+        return self._cells
+
+    @property
+    def text(self) -> str:
+        return "  ".join(c.text for c in self.cells)
+
+
+def _merge(words: List[Word], gutter: float) -> List[Cell]:
+    cells: List[Cell] = []
+    for w in words:
+        if cells and w.x0 - cells[-1].x1 < gutter:
+            last = cells[-1]
+            cells[-1] = Cell(last.x0, w.x1, f"{last.text} {w.text}")
+        else:
+            cells.append(Cell(w.x0, w.x1, w.text))
+    return cells
+
+
+@dataclass
+class PageLayout:
+    number: int
+    rows: List[Row]
+
+
+@dataclass
+class DocumentLayout:
+    pages: List[PageLayout]
+    source: str = "pdf"  # pdf | text
+    _text: Optional[str] = field(default=None, repr=False)
+
+    @property
+    def text(self) -> str:
+        """Plain text rebuilt from the rows, for detection and header fields."""
+        if self._text is None:
+            self._text = "\n".join(
+                "\n".join(r.text for r in page.rows) for page in self.pages
+            )
+        return self._text
+
+    @classmethod
+    def from_text(cls, raw_text: str) -> "DocumentLayout":
+        """Layout of a text statement; a single space joins, two or more split."""
+        pages = []
+        for number, chunk in enumerate(raw_text.split("\f")):
+            rows = []
+            for y, line in enumerate(chunk.expandtabs(8).split("\n")):
+                words = [Word(m.start(), m.end(), m.group()) for m in re.finditer(r"\S+", line)]
+                if words:
+                    rows.append(Row(float(y), words, gutter=2))
+            pages.append(PageLayout(number, rows))
+        return cls(pages, source="text", _text=raw_text)
+
+
+def _page_rows(words: List[Tuple]) -> List[Row]:
+    """Group PyMuPDF word tuples (x0, y0, x1, y1, text, ...) into rows."""
+    rows: List[Row] = []
+    current: List[Tuple] = []
+    center = height = 0.0
+
+    def flush() -> None:
+        if current:
+            h = sorted(w[3] - w[1] for w in current)[len(current) // 2]
+            line = sorted(current, key=lambda w: w[0])
+            rows.append(Row(center, [Word(w[0], w[2], w[4]) for w in line], gutter=0.8 * h))
+
+    for w in sorted(words, key=lambda w: ((w[1] + w[3]) / 2, w[0])):
+        mid, h = (w[1] + w[3]) / 2, w[3] - w[1]
+        if current and abs(mid - center) <= 0.5 * max(height, h):
+            current.append(w)
+            continue
+        flush()
+        current, center, height = [w], mid, h
+    flush()
+    return rows
+
+
+def extract_layout(pdf: Union[bytes, str], digest: Optional[str] = None) -> DocumentLayout:
+    """
+    Layout of a PDF given as bytes or a file path, cached by content hash
+    (`digest`, the file's sha256 when known). Blocking; run in a thread.
+    """
+    import fitz  # PyMuPDF
+
+    if digest:
+        key = digest
+    elif isinstance(pdf, str):
+        with open(pdf, "rb") as f:
+            key = hashlib.file_digest(f, "sha256").hexdigest()
+    else:
+        key = hashlib.sha256(pdf).hexdigest()
+    cached = _layout_cache.get(key)
+    if cached is not None:
+        _layout_cache.move_to_end(key)
+        return cached
+    opened = fitz.open(pdf) if isinstance(pdf, str) else fitz.open(stream=pdf, filetype="pdf")
+    with opened as doc:
+        layout = DocumentLayout(
+            [PageLayout(i, _page_rows(page.get_text("words"))) for i, page in enumerate(doc)]
+        )
+    _layout_cache[key] = layout
+    if len(_layout_cache) > _CACHE_SIZE:
+        _layout_cache.popitem(last=False)
+    return layout
+
+
+# ─── Column schemas ─────────────────────────────────────────────
+
+
+def parse_decimal(text: str) -> Optional[Decimal]:
+    s = text.strip().rstrip("%").strip()
+    if not _NUMBER.match(s):
+        return None
+    negative = s.startswith("(") or "-" in s
+    try:
+        value = Decimal(s.strip("()").replace("$", "").replace(",", "").replace("-", ""))
+    except InvalidOperation:
+        return None
+    return -value if negative else value
+
+
+def _convert(kind: str, text: str) -> Any:
+    text = text.strip()
+    if kind == "ticker":
+        return text if _TICKER.match(text) else None
+    if kind == "percent":
+        return parse_decimal(text) if text.endswith("%") else None
+    if kind in ("number", "money"):
+        if kind == "number" and "$" in text:
+            return None
+        return parse_decimal(text)
+    # text: anything that is not a bare number
+    return text if text and parse_decimal(text) is None else None
+
+
+@dataclass(frozen=True)
+class Column:
+    name: str  # ParsedPosition field name where one exists
+    kind: str = "text"  # text | ticker | number | money | percent
+    headers: Tuple[str, ...] = ()  # header captions, lowercase
+    label: Optional[str] = None  # inline label preceding the value
+    required: bool = True
+
+
+@dataclass(frozen=True)
+class TableSchema:
+    columns: Tuple[Column, ...]
+    min_header_matches: int = 2
+    end_markers: Tuple[str, ...] = ("total",)
+
+    # ── matching ──
+
+    def extract(self, layout: DocumentLayout) -> List[Dict[str, Any]]:
+        """Every table row in the document, as {column name: value}."""
+        out: List[Dict[str, Any]] = []
+        for page in layout.pages:
+            rows = page.rows
+            i = 0
+            while i < len(rows):
+                header = self._header(rows[i])
+                if header:
+                    body, i = self._body(rows, i + 1, header)
+                    out.extend(body)
+                    continue
+                fitted = None if self._is_end(rows[i]) else self._fit(rows[i])
+                if fitted is not None:
+                    out.append(fitted)
+                i += 1
+        return out
+
+    def _is_end(self, row: Row) -> bool:
+        return row.cells[0].text.lower().startswith(self.end_markers)
+
+    def _header(self, row: Row) -> Optional[Dict[str, Cell]]:
+        found: Dict[str, Cell] = {}
+        for cell in row.cells:
+            caption = cell.text.lower().rstrip(":")
+            for col in self.columns:
+                if col.name not in found and caption in col.headers:
+                    found[col.name] = cell
+                    break
+        return found if len(found) >= self.min_header_matches else None
+
+    def _body(
+        self, rows: List[Row], start: int, header: Dict[str, Cell]
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        cols = {c.name: c for c in self.columns}
+        out: List[Dict[str, Any]] = []
+        i = start
+        while i < len(rows):
+            row = rows[i]
+            if _SEPARATOR.match(row.text):
+                i += 1
+                continue
+            if self._is_end(row):
+                break
+            values: Dict[str, Any] = {}
+            for cell in row.cells:
+                name = _nearest(cell, header)
+                value = _convert(cols[name].kind, cell.text)
+                if value is not None and name not in values:
+                    values[name] = value
+            if not all(c.name in values for c in self.columns if c.required and c.name in header):
+                break
+            out.append(values)
+            i += 1
+        return out, i
+
+    def _fit(self, row: Row) -> Optional[Dict[str, Any]]:
+        """Headerless match: labelled fields by label, the rest by order and type."""
+        words = list(row.words)
+        values: Dict[str, Any] = {}
+        for col in self.columns:
+            if col.label is None:
+                continue
+            idx = next(
+                (k for k, w in enumerate(words[:-1]) if w.text.lower().rstrip(":") == col.label),
+                None,
+            )
+            value = _convert(col.kind, words[idx + 1].text) if idx is not None else None
+            if value is None:
+                if col.required:
+                    return None
+                continue
+            values[col.name] = value
+            del words[idx:idx + 2]
+        positional = [c for c in self.columns if c.label is None and c.required]
+        cells = _merge(words, row.gutter)
+        if len(cells) != len(positional):
+            return None
+        for col, cell in zip(positional, cells):
+            value = _convert(col.kind, cell.text)
+            if value is None:
+                return None
+            values[col.name] = value
+        return values
+
+
+def _nearest(cell: Cell, header: Dict[str, Cell]) -> str:
+    """Column whose header overlaps the cell most, else the closest one."""
+    best, best_overlap = None, 0.0
+    for name, h in header.items():
+        overlap = min(cell.x1, h.x1) - max(cell.x0, h.x0)
+        if overlap > best_overlap:
+            best, best_overlap = name, overlap
+    if best is not None:
+        return best
+    return min(header, key=lambda n: abs(header[n].center - cell.center))
+
+
+# Holdings tables shared by the brokerage parsers and the generic fallback
+BROKERAGE_POSITIONS = TableSchema(
+    columns=(
+        Column("ticker", "ticker", headers=("symbol", "ticker", "symbol/cusip")),
+        Column(
+            "security_name", "text",
+            headers=("security name", "description", "name", "security", "fund name", "fund"),
+            required=False,
+        ),
+        Column("quantity", "number", headers=("shares", "quantity", "qty", "units")),
+        Column("price", "money", headers=("price", "last price", "share price"), required=False),
+        Column("market_value", "money", headers=("value", "market value", "current value", "balance")),
+        Column("actual_allocation_pct", "percent", headers=("allocation", "% of account"), required=False),
+    ),
+)
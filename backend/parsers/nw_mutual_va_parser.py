@@ -13,6 +13,7 @@ from .base_parser import (
     ParsedPosition,
     ParsedStatement,
 )
+from .layout import Column, DocumentLayout, TableSchema
 
 logger = logging.getLogger(__name__)
 
@@ -25,10 +26,23 @@ DETECTION_KEYWORDS = [
     "contract number",
 ]
 
+# "Index 500 (BlackRock)    Target 9%   Actual 11%   Value $4,627.18"
+SUBACCOUNT_TABLE = TableSchema(
+    columns=(
+        Column("fund_name", "text", headers=("sub-account", "subaccount", "investment option", "fund name", "fund")),
+        Column("quantity", "number", headers=("units",), required=False),
+        Column("target_allocation_pct", "percent", headers=("target",), label="target", required=False),
+        Column("actual_allocation_pct", "percent", headers=("actual",), label="actual", required=False),
+        Column("market_value", "money", headers=("value",), label="value"),
+    ),
+)
+
 
 class NWMutualVAParser(BaseStatementParser):
     """Parse Northwestern Mutual Variable Annuity statements."""
 
+    position_table = SUBACCOUNT_TABLE
+
     def can_handle(self, raw_text: str) -> bool:
         text = raw_text.upper()
         return all(kw.upper() in text for kw in ["VARIABLE ANNUITY", "NORTHWESTERN"])
@@ -89,6 +103,24 @@ class NWMutualVAParser(BaseStatementParser):
             result.total_value = sum(p.market_value for p in result.positions)
         return result
 
+    def parse_layout(self, layout: DocumentLayout) -> ParsedStatement:
+        result = super().parse_layout(layout)
+        result.allocations = [
+            ParsedAllocation(
+                category=p.fund_name or p.security_name,
+                target_pct=p.target_allocation_pct,
+                actual_pct=p.actual_allocation_pct,
+                drift=(
+                    p.actual_allocation_pct - p.target_allocation_pct
+                    if p.actual_allocation_pct is not None and p.target_allocation_pct is not None
+                    else None
+                ),
+            )
+            for p in result.positions
+            if p.target_allocation_pct is not None
+        ] or result.allocations
+        return result
+
     def _parse_date(self, m: str, d: str, y: str) -> Optional[date]:
         try:
             yr = int(y)
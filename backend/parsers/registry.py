@@ -3,9 +3,10 @@
 import logging
 from typing import List
 
-from .base_parser import BaseStatementParser, ParsedStatement
+from .base_parser import BaseStatementParser, ParsedStatement, position_from_row
 from .etrade_parser import ETradeParser
 from .fidelity_parser import FidelityParser
+from .layout import BROKERAGE_POSITIONS, DocumentLayout
 from .nw_mutual_cash_parser import NWMutualCashParser
 from .nw_mutual_va_parser import NWMutualVAParser
 from .robinhood_parser import RobinhoodParser
@@ -29,10 +30,29 @@ class ParserRegistry:
 
     def detect_and_parse(self, raw_text: str) -> ParsedStatement:
         """Detect custodian from raw text and parse. Falls back to LLM if unknown."""
+        return self.detect_and_parse_layout(DocumentLayout.from_text(raw_text))
+
+    def detect_and_parse_layout(self, layout: DocumentLayout) -> ParsedStatement:
+        """
+        Parse a page layout. Unknown formats try the generic holdings table
+        before the LLM fallback, which only sees documents with no table.
+        """
+        raw_text = layout.text
         for parser in self._parsers:
             if parser.can_handle(raw_text):
                 logger.info("Using parser: %s", parser.get_custodian_name())
-                return parser.parse(raw_text)
+                return parser.parse_layout(layout)
+        rows = BROKERAGE_POSITIONS.extract(layout)
+        if rows:
+            logger.info("No parser matched, using generic holdings table (%d rows)", len(rows))
+            positions = [position_from_row(row) for row in rows]
+            return ParsedStatement(
+                custodian="Unknown",
+                account_type="BROKERAGE",
+                total_value=sum(p.market_value for p in positions),
+                positions=positions,
+                metadata={"confidence": 0.8, "parser": "layout_table"},
+            )
         logger.info("No parser matched, using universal fallback")
         return self._fallback_parser.parse(raw_text)
 
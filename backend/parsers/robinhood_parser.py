@@ -7,6 +7,7 @@ from decimal import Decimal
 from typing import Optional
 
 from .base_parser import BaseStatementParser, ParsedPosition, ParsedStatement
+from .layout import BROKERAGE_POSITIONS
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +15,8 @@ logger = logging.getLogger(__name__)
 class RobinhoodParser(BaseStatementParser):
     """Parse Robinhood brokerage statements."""
 
+    position_table = BROKERAGE_POSITIONS
+
     def can_handle(self, raw_text: str) -> bool:
         return "Robinhood" in raw_text and "Menlo Park" in raw_text
 
@@ -1,27 +1,33 @@
-"""Firmum services."""
+"""Firmum services.
 
-from .compliance_doc_service import ComplianceDocService
-from .custodian import CustodianService
-from .iim_service import IIMService
-from .liquidity_optimizer import LiquidityOptimizer
-from .nudge_engine import NudgeEngine
-from .portal_auth_service import PortalAuthService
-from .tax_harvest import TaxHarvestService
-from .prospect import ProspectService
-from .conversation import ConversationService
-from .model_portfolio import ModelPortfolioService
-from .alternative import AlternativeAssetService
+Service classes are imported on first attribute access, so importing one
+lightweight submodule (e.g. backend.services.auth_crypto) does not pull in
+the ORM models, the custodian adapters and the LLM SDKs.
+"""
 
-__all__ = [
-    "ComplianceDocService",
-    "CustodianService",
-    "IIMService",
-    "LiquidityOptimizer",
-    "NudgeEngine",
-    "PortalAuthService",
-    "TaxHarvestService",
-    "ProspectService",
-    "ConversationService",
-    "ModelPortfolioService",
-    "AlternativeAssetService",
-]
+import importlib
+
+_EXPORTS = {
+    "ComplianceDocService": ".compliance_doc_service",
+    "CustodianService": ".custodian",
+    "IIMService": ".iim_service",
+    "LiquidityOptimizer": ".liquidity_optimizer",
+    "NudgeEngine": ".nudge_engine",
+    "PortalAuthService": ".portal_auth_service",
+    "TaxHarvestService": ".tax_harvest",
+    "ProspectService": ".prospect",
+    "ConversationService": ".conversation",
+    "ModelPortfolioService": ".model_portfolio",
+    "AlternativeAssetService": ".alternative",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
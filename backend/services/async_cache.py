@@ -0,0 +1,193 @@
+"""
+Async cache-aside layer on the shared Redis client.
+
+  - Entries are JSON envelopes {"v": value, "at": unix_ts} stored with
+    TTL = fresh_ttl + stale_ttl
+  - Fresh hits return immediately; stale hits return the old value and
+    schedule one background refresh (stale-while-revalidate)
+  - Concurrent misses for the same key share a single computation
+    (single-flight, per process)
+  - Falls back to a bounded in-process dict when Redis is unavailable
+  - Per-namespace hit/miss counters are exposed via cache_stats()
+
+Key schema:
+  {namespace}:{key}   -> JSON envelope
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from backend.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+_LOCAL_MAX_ENTRIES = 1024
+
+
+def fingerprint(obj: Any, length: int = 16) -> str:
+    """Stable short hash of a JSON-serializable object (key order independent)."""
+    canonical = json.dumps(obj, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:length]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    refreshes: int = 0
+    errors: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        served = self.hits + self.stale_hits + self.misses + self.coalesced
+        return (self.hits + self.stale_hits) / served if served else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["hit_rate"] = round(self.hit_rate, 4)
+        return data
+
+
+_registry: Dict[str, Any] = {}
+
+
+def register_cache(namespace: str, cache: Any) -> None:
+    """Expose any cache with a `.stats: CacheStats` through cache_stats()."""
+    _registry[namespace] = cache
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Counters for every registered cache in this process."""
+    return {ns: cache.stats.as_dict() for ns, cache in _registry.items()}
+
+
+class AsyncCache:
+    """Cache-aside with single-flight misses and stale-while-revalidate."""
+
+    def __init__(self, namespace: str, fresh_ttl: int, stale_ttl: int = 0) -> None:
+        self.namespace = namespace
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.stats = CacheStats()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._background: set = set()
+        self._local: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        register_cache(namespace, self)
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    # ── Storage ────────────────────────────────────────────────
+
+    async def _read(self, key: str) -> Optional[Tuple[Any, float]]:
+        raw: Optional[str] = None
+        redis = await get_redis()
+        if redis:
+            try:
+                raw = await redis.get(self._key(key))
+            except Exception as e:
+                self.stats.errors += 1
+                logger.debug("Cache read failed for %s: %s", self._key(key), e)
+        else:
+            entry = self._local.get(key)
+            if entry and entry[0] > time.time():
+                raw = entry[1]
+        if not raw:
+            return None
+        try:
+            envelope = json.loads(raw)
+            return envelope["v"], float(envelope["at"])
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    async def _write(self, key: str, value: Any) -> None:
+        raw = json.dumps({"v": value, "at": time.time()}, default=str)
+        ttl = self.fresh_ttl + self.stale_ttl
+        redis = await get_redis()
+        if redis:
+            try:
+                await redis.setex(self._key(key), ttl, raw)
+            except Exception as e:
+                self.stats.errors += 1
+                logger.debug("Cache write failed for %s: %s", self._key(key), e)
+            return
+        self._local[key] = (time.time() + ttl, raw)
+        self._local.move_to_end(key)
+        while len(self._local) > _LOCAL_MAX_ENTRIES:
+            self._local.popitem(last=False)
+
+    async def invalidate(self, key: str) -> None:
+        self._local.pop(key, None)
+        redis = await get_redis()
+        if redis:
+            try:
+                await redis.delete(self._key(key))
+            except Exception as e:
+                logger.debug("Cache delete failed for %s: %s", self._key(key), e)
+
+    # ── Single-flight compute ──────────────────────────────────
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        existing = self._inflight.get(key)
+        if existing is not None:
+            self.stats.coalesced += 1
+            return await asyncio.shield(existing)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+            await self._write(key, value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark retrieved so an unobserved failure does not log a warning
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _refresh(self, key: str, compute: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            await self._compute(key, compute)
+            self.stats.refreshes += 1
+        except Exception as e:
+            self.stats.errors += 1
+            logger.warning("Background refresh failed for %s: %s", self._key(key), e)
+
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """
+        Return (value, from_cache). Exceptions from compute propagate to the
+        caller on a miss and are never cached.
+        """
+        entry = await self._read(key)
+        if entry is not None:
+            value, written_at = entry
+            if time.time() - written_at < self.fresh_ttl:
+                self.stats.hits += 1
+                return value, True
+            self.stats.stale_hits += 1
+            if key not in self._inflight:
+                task = asyncio.create_task(self._refresh(key, compute))
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+            return value, True
+
+        if key in self._inflight:
+            return await self._compute(key, compute), False
+        self.stats.misses += 1
+        return await self._compute(key, compute), False
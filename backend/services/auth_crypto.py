@@ -0,0 +1,150 @@
+"""
+Off-loop password hashing and verified-token cache for the auth paths.
+
+  - bcrypt runs in a dedicated, bounded thread pool (bcrypt releases the
+    GIL), so a login burst no longer blocks the event loop for every other
+    request; once BCRYPT_MAX_PENDING calls are queued new ones fail fast
+    with PasswordHasherBusy (served as 503 + Retry-After)
+  - TokenClaimsCache keeps decoded, signature-checked JWT claims keyed by
+    the SHA-256 of the token until the token's own exp, so auth
+    dependencies decode each token once instead of on every request
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import bcrypt
+
+from backend.services.async_cache import CacheStats, register_cache
+
+logger = logging.getLogger(__name__)
+
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", min(4, os.cpu_count() or 1)))
+BCRYPT_MAX_PENDING = int(os.getenv("BCRYPT_MAX_PENDING", "64"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_pending = 0
+
+
+class PasswordHasherBusy(Exception):
+    """Too many password hash/verify calls queued; retry shortly."""
+
+
+# ─────────────────────────────────────────────────────────────
+# Password hashing
+# ─────────────────────────────────────────────────────────────
+
+
+def hash_password_sync(password: str) -> str:
+    """Hash a password using bcrypt (72-byte limit)."""
+    pw_bytes = password.encode("utf-8")[:72]
+    return bcrypt.hashpw(pw_bytes, bcrypt.gensalt()).decode("utf-8")
+
+
+def verify_password_sync(password: str, hashed: str) -> bool:
+    """Verify a password against a bcrypt hash."""
+    try:
+        pw_bytes = password.encode("utf-8")[:72]
+        return bcrypt.checkpw(pw_bytes, hashed.encode("utf-8"))
+    except Exception as e:
+        logger.warning("Password verification error: %s", e)
+        return False
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=max(1, BCRYPT_WORKERS), thread_name_prefix="bcrypt"
+        )
+    return _executor
+
+
+async def _run_bounded(fn: Callable[..., Any], *args: Any) -> Any:
+    global _pending
+    if _pending >= BCRYPT_MAX_PENDING:
+        raise PasswordHasherBusy("Password hashing queue is full")
+    _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            _get_executor(), fn, *args
+        )
+    finally:
+        _pending -= 1
+
+
+async def hash_password(password: str) -> str:
+    """bcrypt hash on the bounded pool."""
+    return await _run_bounded(hash_password_sync, password)
+
+
+async def verify_password(password: str, hashed: str) -> bool:
+    """bcrypt verify on the bounded pool."""
+    return await _run_bounded(verify_password_sync, password, hashed)
+
+
+def pending_hashes() -> int:
+    return _pending
+
+
+# ─────────────────────────────────────────────────────────────
+# Verified-token cache
+# ─────────────────────────────────────────────────────────────
+
+
+class TokenClaimsCache:
+    """LRU of validated JWT claims, each entry living until the token's exp."""
+
+    def __init__(self, namespace: str, max_entries: int = 10_000) -> None:
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        register_cache(namespace, self)
+
+    @staticmethod
+    def _key(token: str) -> str:
+        # Never keep raw bearer tokens in memory longer than needed
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, claims = entry
+        if expires_at <= time.time():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return dict(claims)
+
+    def put(self, token: str, claims: Dict[str, Any]) -> None:
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)):
+            return  # no expiry → never cache
+        key = self._key(token)
+        self._entries[key] = (float(exp), dict(claims))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def decode(self, token: str, decoder: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+        """Cached claims, else decoder(token); decoder errors propagate uncached."""
+        claims = self.get(token)
+        if claims is not None:
+            self.stats.hits += 1
+            return claims
+        self.stats.misses += 1
+        claims = decoder(token)
+        self.put(token, claims)
+        return dict(claims)
+
+    def clear(self) -> None:
+        self._entries.clear()
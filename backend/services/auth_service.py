@@ -8,7 +8,6 @@ import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 
-import bcrypt
 from jose import JWTError, jwt
 from pydantic import BaseModel, EmailStr
 from sqlalchemy import select
@@ -18,9 +17,17 @@ from backend.config.settings import settings
 from backend.models.client import Client
 from backend.models.household import Household
 from backend.models.user import User, UserType
+from backend.services import auth_crypto
+from backend.services.auth_crypto import TokenClaimsCache
 
 logger = logging.getLogger(__name__)
 
+_claims_cache = TokenClaimsCache("auth:b2c_claims")
+
+
+def _decode(token: str) -> dict:
+    return jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=["HS256"])
+
 
 class RegisterRequest(BaseModel):
     email: EmailStr
@@ -54,21 +61,10 @@ class AuthService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    @staticmethod
-    def hash_password(password: str) -> str:
-        """Hash a password using bcrypt (72-byte limit)."""
-        pw_bytes = password.encode("utf-8")[:72]
-        return bcrypt.hashpw(pw_bytes, bcrypt.gensalt()).decode("utf-8")
-
-    @staticmethod
-    def verify_password(plain: str, hashed: str) -> bool:
-        """Verify a password against a bcrypt hash."""
-        try:
-            pw_bytes = plain.encode("utf-8")[:72]
-            return bcrypt.checkpw(pw_bytes, hashed.encode("utf-8"))
-        except Exception as e:
-            logger.warning("Password verification error: %s", e)
-            return False
+    # Sync hashing stays available for scripts; request paths use the
+    # off-loop variants from auth_crypto.
+    hash_password = staticmethod(auth_crypto.hash_password_sync)
+    verify_password = staticmethod(auth_crypto.verify_password_sync)
 
     @staticmethod
     def create_token(user_id: str, user_type: str, token_type: str = "access") -> str:
@@ -83,7 +79,7 @@ class AuthService:
     @staticmethod
     def decode_token(token: str) -> TokenPayload:
         try:
-            payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=["HS256"])
+            payload = _claims_cache.decode(token, _decode)
             return TokenPayload(**payload)
         except JWTError as e:
             logger.warning("JWT decode failed: %s", e)
@@ -115,7 +111,7 @@ class AuthService:
         user = User(
             id=uuid.uuid4(),
             email=req.email,
-            hashed_password=self.hash_password(req.password),
+            hashed_password=await auth_crypto.hash_password(req.password),
             user_type=UserType.B2C_RETAIL.value,
             subscription_tier="free",
             subscription_active=False,
@@ -135,7 +131,7 @@ class AuthService:
         result = await self.db.execute(select(User).where(User.email == req.email))
         user = result.scalar_one_or_none()
 
-        if not user or not self.verify_password(req.password, user.hashed_password):
+        if not user or not await auth_crypto.verify_password(req.password, user.hashed_password):
             raise ValueError("Invalid email or password")
 
         access_token = self.create_token(str(user.id), user.user_type or "b2c_retail", "access")
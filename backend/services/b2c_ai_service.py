@@ -5,7 +5,9 @@ Replaces string-template narratives with actual AI-generated insights
 personalized to the user's portfolio, spending, goals, and tax situation.
 
 Falls back gracefully to deterministic templates when OpenAI is unavailable.
-Redis cache (30-min TTL) prevents per-request API calls.
+Results are cached per portfolio fingerprint through the async cache layer
+(30-min fresh TTL, then served stale while a background refresh runs), so
+uploads that change the portfolio get a new analysis immediately.
 """
 
 from __future__ import annotations
@@ -16,10 +18,15 @@ import os
 from datetime import datetime, timezone
 from typing import Any
 
+from backend.services.async_cache import AsyncCache, fingerprint
+
 logger = logging.getLogger(__name__)
 
 _MODEL = "gpt-4o-mini"
 _CACHE_TTL = 1800  # 30 minutes
+_STALE_TTL = 6 * 3600  # serve stale up to 6h while refreshing
+
+_analysis_cache = AsyncCache("b2c:ai_analysis", fresh_ttl=_CACHE_TTL, stale_ttl=_STALE_TTL)
 
 
 def _get_openai_client():
@@ -27,24 +34,13 @@ def _get_openai_client():
     if not api_key:
         return None
     try:
-        from openai import OpenAI
-        return OpenAI(api_key=api_key, timeout=15.0)
+        from openai import AsyncOpenAI
+        return AsyncOpenAI(api_key=api_key, timeout=15.0)
     except Exception as e:
         logger.warning("OpenAI init failed: %s", e)
         return None
 
 
-def _get_redis():
-    redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
-    try:
-        import redis as redislib
-        r = redislib.Redis.from_url(redis_url, decode_responses=True, socket_connect_timeout=2)
-        r.ping()
-        return r
-    except Exception:
-        return None
-
-
 # ---------------------------------------------------------------------------
 # Prompt builder
 # ---------------------------------------------------------------------------
@@ -197,6 +193,41 @@ def _fallback_analysis(ctx: dict[str, Any]) -> dict[str, Any]:
 # Main entry point
 # ---------------------------------------------------------------------------
 
+async def _request_analysis(client, portfolio_ctx: dict[str, Any]) -> dict[str, Any]:
+    """Call OpenAI and validate the structured response. Raises on failure."""
+    response = await client.chat.completions.create(
+        model=_MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": (
+                    "You are a financial wellness assistant. "
+                    "You produce only valid JSON. "
+                    "Never give specific investment advice. "
+                    "Always include a disclaimer-level framing in narrative."
+                ),
+            },
+            {"role": "user", "content": _build_prompt(portfolio_ctx)},
+        ],
+        max_tokens=600,
+        temperature=0.4,
+        response_format={"type": "json_object"},
+    )
+    raw = response.choices[0].message.content or "{}"
+    data = json.loads(raw)
+
+    # Validate basic structure
+    if "narrative" not in data or "insights" not in data:
+        raise ValueError("Missing required keys in OpenAI response")
+
+    return {
+        "narrative": data["narrative"],
+        "insights": data["insights"][:4],
+        "model": _MODEL,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
 async def generate_portfolio_analysis(
     user_id: str,
     portfolio_ctx: dict[str, Any],
@@ -204,26 +235,12 @@ async def generate_portfolio_analysis(
     """
     Generate AI-powered portfolio analysis for a B2C user.
 
-    Checks Redis cache first. On cache miss, calls OpenAI gpt-4o-mini
-    with structured portfolio context. Falls back to deterministic templates
-    if OpenAI is unavailable or times out.
+    Cache key is user id + portfolio fingerprint. On a miss, concurrent
+    requests for the same key share one OpenAI call. Falls back to
+    deterministic templates (never cached) if OpenAI is unavailable or fails.
 
     Returns a dict with: narrative (str), insights (list), model (str), generated_at (str).
     """
-    cache_key = f"b2c:ai_analysis:{user_id}"
-    redis = _get_redis()
-
-    # Cache hit
-    if redis:
-        try:
-            cached = redis.get(cache_key)
-            if cached:
-                data = json.loads(cached)
-                data["cached"] = True
-                return data
-        except Exception as e:
-            logger.debug("Redis cache read failed: %s", e)
-
     client = _get_openai_client()
     if not client:
         logger.info("OpenAI not configured — using fallback analysis for user %s", user_id)
@@ -231,51 +248,12 @@ async def generate_portfolio_analysis(
         result["cached"] = False
         return result
 
-    prompt = _build_prompt(portfolio_ctx)
-
+    cache_key = f"{user_id}:{fingerprint(portfolio_ctx)}"
     try:
-        response = client.chat.completions.create(
-            model=_MODEL,
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a financial wellness assistant. "
-                        "You produce only valid JSON. "
-                        "Never give specific investment advice. "
-                        "Always include a disclaimer-level framing in narrative."
-                    ),
-                },
-                {"role": "user", "content": prompt},
-            ],
-            max_tokens=600,
-            temperature=0.4,
-            response_format={"type": "json_object"},
+        data, from_cache = await _analysis_cache.get_or_compute(
+            cache_key, lambda: _request_analysis(client, portfolio_ctx)
         )
-        raw = response.choices[0].message.content or "{}"
-        data = json.loads(raw)
-
-        # Validate basic structure
-        if "narrative" not in data or "insights" not in data:
-            raise ValueError("Missing required keys in OpenAI response")
-
-        result = {
-            "narrative": data["narrative"],
-            "insights": data["insights"][:4],
-            "model": _MODEL,
-            "generated_at": datetime.now(timezone.utc).isoformat(),
-            "cached": False,
-        }
-
-        # Write to cache
-        if redis:
-            try:
-                redis.setex(cache_key, _CACHE_TTL, json.dumps(result))
-            except Exception as e:
-                logger.debug("Redis cache write failed: %s", e)
-
-        return result
-
+        return {**data, "cached": from_cache}
     except Exception as e:
         logger.error("OpenAI analysis failed for user %s: %s", user_id, e)
         result = _fallback_analysis(portfolio_ctx)
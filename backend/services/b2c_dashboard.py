@@ -3,6 +3,7 @@ B2C dashboard service. Calls real IIM methods and formats for retail UI.
 """
 
 import logging
+from datetime import date, datetime, time, timedelta, timezone
 from decimal import Decimal
 from typing import Optional
 
@@ -25,21 +26,99 @@ from backend.models.position import Position
 from backend.models.statement import Statement
 from backend.services.entitlements import TIER_FEATURES, EntitlementService
 from backend.services.iim_service import IIMService
+from backend.services.task_graph import Section, run_sections
 from backend.services.tier_catalog import FEE_BENCHMARKS
 from backend.services.usage_tracker import UsageTracker
 
 logger = logging.getLogger(__name__)
 
+# Per-section deadlines (seconds); a section past its deadline renders empty
+SECTION_TIMEOUTS = {
+    "accounts": 5.0,
+    "allocation": 3.0,
+    "fee_impact": 2.0,
+    "net_worth_history": 2.0,
+    "risk_profile": 1.0,
+    "chat_remaining": 1.0,
+}
+
+
+def _last4(account_number: Optional[str]) -> str:
+    """Last four digits of an account number ("***1234" -> "1234"), "" if fewer."""
+    digits = "".join(c for c in account_number or "" if c.isdigit())
+    return digits[-4:] if len(digits) >= 4 else ""
+
+
+def _total_aum(accounts: list) -> Decimal:
+    return sum((a.last_statement_value or Decimal("0") for a in accounts), Decimal("0"))
+
 
 class B2CDashboardService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, session_factory=None):
         self.db = db
+        self.session_factory = session_factory
         self.iim = IIMService(db)
         self.entitlements = EntitlementService()
 
+    async def _in_session(self, method: str, *args):
+        """
+        Call a read-only section method. With a session factory it gets its own
+        pooled session, so sections can overlap; otherwise it shares self.db.
+        """
+        if self.session_factory is None:
+            return await getattr(self, method)(*args)
+        async with self.session_factory() as session:
+            return await getattr(B2CDashboardService(session), method)(*args)
+
+    def _plan(self, user) -> dict[str, Section]:
+        """
+        Dashboard sections and what each needs. Accounts gate the page, so they
+        are required; everything else degrades to an empty placeholder.
+        """
+        run = self._in_session
+        return {
+            "accounts": Section(
+                lambda: run("_get_user_accounts", user),
+                timeout=SECTION_TIMEOUTS["accounts"],
+                required=True,
+            ),
+            # Keyed on the household alone, so the slowest section starts first
+            "allocation": Section(
+                lambda: run("_calculate_allocation", user),
+                placeholder=[],
+                timeout=SECTION_TIMEOUTS["allocation"],
+            ),
+            "fee_impact": Section(
+                lambda accounts: run("_calculate_fee_summary", accounts, _total_aum(accounts)),
+                needs=("accounts",),
+                timeout=SECTION_TIMEOUTS["fee_impact"],
+            ),
+            "net_worth_history": Section(
+                lambda accounts: run("_get_net_worth_history", accounts),
+                needs=("accounts",),
+                placeholder=[],
+                timeout=SECTION_TIMEOUTS["net_worth_history"],
+            ),
+            "risk_profile": Section(
+                lambda: run("_get_risk_profile", user),
+                timeout=SECTION_TIMEOUTS["risk_profile"],
+            ),
+            "chat_remaining": Section(
+                lambda: run("_get_chat_remaining", user),
+                placeholder=0,
+                timeout=SECTION_TIMEOUTS["chat_remaining"],
+            ),
+        }
+
     async def get_dashboard(self, user) -> DashboardResponse:
         """Full dashboard payload for B2C retail investor."""
-        accounts = await self._get_user_accounts(user)
+        sections = await run_sections(
+            self._plan(user),
+            metric="dashboard.b2c",
+            concurrency=None if self.session_factory else 1,
+        )
+        accounts = sections["accounts"]
+        tier = user.subscription_tier or "free"
 
         if not accounts:
             return DashboardResponse(
@@ -49,7 +128,7 @@ class B2CDashboardService:
                 fee_impact_summary=None,
                 fee_benchmarks=[],
                 net_worth_history=[],
-                risk_profile=await self._get_risk_profile(user),
+                risk_profile=sections["risk_profile"],
                 alerts=[
                     Alert(
                         type="onboarding",
@@ -59,18 +138,14 @@ class B2CDashboardService:
                         gated=False,
                     )
                 ],
-                ai_chat_remaining=await self._get_chat_remaining(user),
-                subscription_tier=user.subscription_tier or "free",
+                ai_chat_remaining=sections["chat_remaining"],
+                subscription_tier=tier,
+                degraded_sections=sections.degraded,
             )
 
-        total_aum = sum(
-            (a.last_statement_value or Decimal("0")) for a in accounts
-        )
-        allocation = await self._calculate_allocation(user)
-        fee_impact = await self._calculate_fee_summary(accounts, total_aum)
+        total_aum = _total_aum(accounts)
+        fee_impact = sections["fee_impact"]
         fee_benchmarks = self._build_fee_benchmarks(total_aum, fee_impact)
-        net_worth_history = await self._get_net_worth_history(accounts)
-        risk_profile = await self._get_risk_profile(user)
         alerts = await self._build_alerts(user, fee_impact)
 
         account_summaries = [
@@ -86,14 +161,15 @@ class B2CDashboardService:
         return DashboardResponse(
             total_aum=total_aum,
             accounts=account_summaries,
-            allocation=allocation,
+            allocation=sections["allocation"],
             fee_impact_summary=fee_impact,
             fee_benchmarks=fee_benchmarks,
-            net_worth_history=net_worth_history,
-            risk_profile=risk_profile,
+            net_worth_history=sections["net_worth_history"],
+            risk_profile=sections["risk_profile"],
             alerts=alerts,
-            ai_chat_remaining=await self._get_chat_remaining(user),
-            subscription_tier=user.subscription_tier or "free",
+            ai_chat_remaining=sections["chat_remaining"],
+            subscription_tier=tier,
+            degraded_sections=sections.degraded,
         )
 
     async def _get_user_accounts(self, user) -> list:
@@ -203,7 +279,75 @@ class B2CDashboardService:
     async def _get_net_worth_history(self, accounts: list) -> list[NetWorthPoint]:
         if not accounts:
             return []
-        account_ids = [a.id for a in accounts]
+        # Custodian-fed accounts come from the holdings time-series (weekly
+        # rollups over two years); every other account contributes its
+        # statement ending values, carried forward between statements.
+        start = datetime.now(timezone.utc) - timedelta(days=730)
+        fed, feed_rows = set(), []
+        try:
+            fed, feed_rows = await self._feed_history(accounts, start)
+        except Exception as e:
+            logger.debug("Holdings series unavailable, using statements: %s", e)
+        statement_ids = [a.id for a in accounts if a.id not in fed]
+        if not feed_rows:
+            return await self._statement_history(statement_ids)
+
+        from backend.services.market_data.holdings_store import bucket_start, merge_series
+
+        carry, rows = {}, []
+        if statement_ids:
+            result = await self.db.execute(
+                select(Statement.account_id, Statement.statement_date, Statement.ending_value)
+                .where(
+                    Statement.account_id.in_(statement_ids),
+                    Statement.statement_date.isnot(None),
+                    Statement.ending_value.isnot(None),
+                )
+                .order_by(Statement.statement_date.asc())
+            )
+            for account_id, stmt_date, value in result.all():
+                if stmt_date < start.date():
+                    carry[str(account_id)] = Decimal(str(value))
+                else:
+                    week = bucket_start(datetime.combine(stmt_date, time.min), "week")
+                    rows.append((str(account_id), week, Decimal(str(value))))
+        return [
+            NetWorthPoint(date=p["date"], value=p["value"])
+            for p in merge_series(feed_rows + rows, carry)
+        ]
+
+    async def _feed_history(self, accounts: list, start: datetime) -> tuple[set, list]:
+        """
+        (ids of accounts covered by the custodian feed, weekly feed totals as
+        merge_series rows). The series is keyed by the custodian's account
+        id; an account is covered when a household custodian account with
+        history ends in the same last four digits.
+        """
+        from backend.models.custodian import CustodianAccount
+        from backend.services.market_data.holdings_store import HoldingsTimeSeriesStore
+
+        store = HoldingsTimeSeriesStore(self.db)
+        async with self.db.begin_nested():
+            custodian = (
+                await self.db.execute(
+                    select(CustodianAccount.external_account_id, CustodianAccount.external_account_number)
+                    .where(CustodianAccount.household_id.in_({a.household_id for a in accounts}))
+                )
+            ).all()
+            keys = await store.accounts_with_history([key for key, _ in custodian], start)
+            series = await store.value_series(sorted(keys), start=start, granularity="week")
+        fed = set()
+        for key, number in custodian:
+            digits = _last4(number or key)
+            if key in keys and digits:
+                fed.update(a.id for a in accounts if _last4(a.account_number_masked) == digits)
+        rows = [("feed", date.fromisoformat(p["date"]), p["value"]) for p in series]
+        return fed, rows
+
+    async def _statement_history(self, account_ids: list) -> list[NetWorthPoint]:
+        """Household totals per statement date, for accounts with no feed history."""
+        if not account_ids:
+            return []
         result = await self.db.execute(
             select(Statement.statement_date, func.sum(Statement.ending_value))
             .where(
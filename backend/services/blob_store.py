@@ -0,0 +1,318 @@
+"""
+Content-addressed blob storage for uploaded documents.
+
+  - uploads are streamed in CHUNK_SIZE pieces to a temp file and hashed
+    (SHA-256) as they are written, so memory per upload stays constant
+    regardless of file size
+  - the digest is the storage key: identical files are stored once
+  - reads are chunked and range-aware (HTTP Range downloads)
+  - background jobs receive a BlobRef and open the blob themselves
+    (local_path) instead of being handed a bytes copy
+  - backends: local filesystem (default) or S3-compatible object storage
+
+Key layout: sha256/{d[:2]}/{d[2:4]}/{digest}
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, BinaryIO, Dict, Optional, Tuple
+
+from backend.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import boto3
+    from botocore.exceptions import ClientError
+    HAS_BOTO3 = True
+except ImportError:
+    HAS_BOTO3 = False
+
+CHUNK_SIZE = 1024 * 1024
+DEFAULT_CONTENT_TYPE = "application/octet-stream"
+
+
+class BlobTooLarge(ValueError):
+    """Upload exceeded the caller's size limit (nothing was stored)."""
+
+
+class EmptyBlob(ValueError):
+    """Upload contained no data."""
+
+
+class RangeNotSatisfiable(ValueError):
+    """Requested byte range lies outside the blob."""
+
+
+@dataclass(frozen=True)
+class BlobRef:
+    """Handle to a stored blob; cheap to copy into job arguments and records."""
+
+    digest: str
+    size: int
+    content_type: str = DEFAULT_CONTENT_TYPE
+
+    @property
+    def key(self) -> str:
+        return f"sha256/{self.digest[:2]}/{self.digest[2:4]}/{self.digest}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BlobRef":
+        return cls(data["digest"], int(data["size"]), data.get("content_type") or DEFAULT_CONTENT_TYPE)
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) for a single `bytes=` Range header.
+    None means serve the whole blob (no header, multi-range, or malformed).
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first == "":
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable(header)
+            start, end = max(0, size - suffix), size - 1
+        else:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise RangeNotSatisfiable(header)
+    return start, end
+
+
+# ─────────────────────────────────────────────────────────────
+# Backends (blocking; BlobStore runs them in threads)
+# ─────────────────────────────────────────────────────────────
+
+
+class FilesystemBackend:
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def put_file(self, key: str, src_path: str) -> None:
+        dst = self._path(key)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        # Atomic: readers never see a partial blob; a concurrent identical
+        # upload just replaces the file with the same bytes
+        os.replace(src_path, dst)
+
+    def open(self, key: str, start: int = 0) -> BinaryIO:
+        fh = open(self._path(key), "rb")
+        fh.seek(start)
+        return fh
+
+    def local_path(self, key: str) -> Optional[str]:
+        return self._path(key)
+
+    def download(self, key: str, dst_path: str) -> None:
+        shutil.copyfile(self._path(key), dst_path)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class S3Backend:
+    def __init__(self, bucket: str, prefix: str = "blobs"):
+        if not HAS_BOTO3:
+            raise RuntimeError("boto3 is required for the s3 blob backend")
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.client = boto3.client("s3")
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def put_file(self, key: str, src_path: str) -> None:
+        # upload_file streams from disk and switches to multipart for large files
+        self.client.upload_file(src_path, self.bucket, self._key(key))
+        os.unlink(src_path)
+
+    def open(self, key: str, start: int = 0) -> BinaryIO:
+        kwargs = {"Range": f"bytes={start}-"} if start else {}
+        return self.client.get_object(Bucket=self.bucket, Key=self._key(key), **kwargs)["Body"]
+
+    def local_path(self, key: str) -> Optional[str]:
+        return None
+
+    def download(self, key: str, dst_path: str) -> None:
+        self.client.download_file(self.bucket, self._key(key), dst_path)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+
+# ─────────────────────────────────────────────────────────────
+# Store
+# ─────────────────────────────────────────────────────────────
+
+
+class BlobStore:
+    def __init__(self, backend: Any, tmp_dir: Optional[str] = None):
+        self.backend = backend
+        # Temp files live next to filesystem blobs so put_file is a rename
+        self.tmp_dir = tmp_dir or os.path.join(
+            getattr(backend, "root", None) or tempfile.gettempdir(), ".incoming"
+        )
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    # ── writes ───────────────────────────────────────────────
+
+    async def save_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        content_type: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+    ) -> Tuple[BlobRef, bool]:
+        """Store a chunk stream. Returns (ref, created); created=False on dedupe."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as out:
+
+                def _write(chunk: bytes) -> None:
+                    digest.update(chunk)
+                    out.write(chunk)
+
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if max_bytes is not None and size > max_bytes:
+                        raise BlobTooLarge(f"Upload exceeds {max_bytes} bytes")
+                    await asyncio.to_thread(_write, chunk)
+            if size == 0:
+                raise EmptyBlob("Upload is empty")
+
+            ref = BlobRef(digest.hexdigest(), size, content_type or DEFAULT_CONTENT_TYPE)
+            if await asyncio.to_thread(self.backend.exists, ref.key):
+                return ref, False
+            await asyncio.to_thread(self.backend.put_file, ref.key, tmp_path)
+            return ref, True
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    async def save_upload(
+        self, upload: Any, max_bytes: Optional[int] = None
+    ) -> Tuple[BlobRef, bool]:
+        """Stream a FastAPI UploadFile (or any async .read(n)) into the store."""
+
+        async def _chunks() -> AsyncIterator[bytes]:
+            while True:
+                chunk = await upload.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+        return await self.save_stream(
+            _chunks(), getattr(upload, "content_type", None), max_bytes
+        )
+
+    async def save_bytes(
+        self, data: bytes, content_type: Optional[str] = None
+    ) -> Tuple[BlobRef, bool]:
+        async def _one() -> AsyncIterator[bytes]:
+            for i in range(0, len(data), CHUNK_SIZE):
+                yield data[i:i + CHUNK_SIZE]
+
+        return await self.save_stream(_one(), content_type)
+
+    # ── reads ────────────────────────────────────────────────
+
+    async def exists(self, ref: BlobRef) -> bool:
+        return await asyncio.to_thread(self.backend.exists, ref.key)
+
+    async def iter_range(
+        self, ref: BlobRef, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Yield bytes start..end (inclusive) in CHUNK_SIZE pieces."""
+        end = ref.size - 1 if end is None else end
+        remaining = end - start + 1
+        fh = await asyncio.to_thread(self.backend.open, ref.key, start)
+        try:
+            while remaining > 0:
+                chunk = await asyncio.to_thread(fh.read, min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            await asyncio.to_thread(fh.close)
+
+    async def read_bytes(self, ref: BlobRef) -> bytes:
+        """Whole blob in memory — only for inputs a parser needs as bytes."""
+        return b"".join([chunk async for chunk in self.iter_range(ref)])
+
+    @asynccontextmanager
+    async def local_path(self, ref: BlobRef, suffix: str = "") -> AsyncIterator[str]:
+        """
+        A filesystem path for the blob for the duration of the block: the
+        blob itself on the filesystem backend, a streamed temp copy otherwise.
+        `suffix` gives tools that sniff by extension (Whisper, pdf2image) one.
+        """
+        path = self.backend.local_path(ref.key)
+        if path and not suffix:
+            yield path
+            return
+        work_dir = tempfile.mkdtemp(dir=self.tmp_dir)
+        target = os.path.join(work_dir, f"{ref.digest}{suffix}")
+        try:
+            if path:
+                os.symlink(path, target)
+            else:
+                await asyncio.to_thread(self.backend.download, ref.key, target)
+            yield target
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """Process-wide store configured from settings (BLOB_STORE_*)."""
+    global _store
+    if _store is None:
+        backend: Any = None
+        if settings.blob_store_backend == "s3":
+            if HAS_BOTO3 and settings.blob_store_bucket:
+                backend = S3Backend(settings.blob_store_bucket, settings.blob_store_prefix)
+            else:
+                logger.warning("S3 blob backend unavailable (boto3/bucket), using filesystem")
+        _store = BlobStore(backend or FilesystemBackend(settings.blob_store_dir))
+    return _store
@@ -0,0 +1 @@
+"""CIM helpers: ADV Part 2B currency monitoring (IMM-03) and batch pre-trade checks."""
@@ -1,13 +1,40 @@
-"""ADV Part 2B currency monitoring (IMM-03)."""
+"""
+ADV Part 2B currency monitoring (IMM-03).
+
+The daily job is incremental. An advisor's ADV severity (check_adv_currency)
+depends only on days since the latest ADV update, so between two runs it
+can change only for advisors who filed a new ADV, or whose latest one
+crossed the 300- or 365-day step. One grouped query returns just those
+advisors (see services.scheduler.watermarks); the job writes an audit
+entry per advisor whose severity moved into WARNING or BLOCKING and
+advances its watermark in the same commit.
+"""
 
 import logging
 from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from uuid import UUID
 
 from backend.services.cim_service import ComplianceRulesEngine
+from backend.services.scheduler.watermarks import crossed, job_key, load_watermark, save_watermark
 
 logger = logging.getLogger(__name__)
 
+ADV_JOB = "adv_currency_check"
+ADV_STEPS = (300, 365)  # days at which check_adv_currency's severity steps up
+ALERT_SEVERITIES = ("WARNING", "BLOCKING")
+
+_engine = ComplianceRulesEngine()
+
+
+def _as_utc(ts: datetime) -> datetime:
+    # compliance_documents.updated_at is stored as naive UTC
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts.astimezone(timezone.utc)
+
+
+def _severity(days: int) -> str:
+    return _engine.check_adv_currency({"days_since_update": days}).severity
+
 
 async def check_adv_on_login(advisor_id: UUID, db) -> dict:
     """Called on advisor login — checks if ADV Part 2B needs updating."""
@@ -26,9 +53,8 @@ async def check_adv_on_login(advisor_id: UUID, db) -> dict:
         if not row:
             return {"status": "no_adv_found", "severity": "WARNING"}
 
-        days_since = (datetime.now(timezone.utc) - row[0].replace(tzinfo=timezone.utc)).days
-        engine = ComplianceRulesEngine()
-        rule_result = engine.check_adv_currency({"days_since_update": days_since})
+        days_since = (datetime.now(timezone.utc) - _as_utc(row[0])).days
+        rule_result = _engine.check_adv_currency({"days_since_update": days_since})
 
         if not rule_result.passed:
             logger.warning("ADV currency check failed for advisor %s: %s", advisor_id, rule_result.details)
@@ -44,19 +70,93 @@ async def check_adv_on_login(advisor_id: UUID, db) -> dict:
         return {"status": "skipped"}
 
 
-async def check_all_adv_currency(db) -> int:
-    """Scheduled daily job — checks all advisors. Returns count of warnings."""
-    warnings = 0
+def adv_changes(
+    rows: Iterable[Tuple[Any, datetime]],
+    since: Optional[datetime],
+    now: datetime,
+) -> List[Dict[str, Any]]:
+    """
+    Severity changes among (advisor_id, latest ADV update) rows: current
+    severity vs. the one at `since` (None when the document is newer than
+    `since`, or on a first run).
+    """
+    changes = []
+    for advisor_id, updated_at in rows:
+        updated_at = _as_utc(updated_at)
+        days = (now - updated_at).days
+        severity = _severity(days)
+        before = _severity((since - updated_at).days) if since is not None and updated_at <= since else None
+        if severity != before:
+            changes.append({
+                "advisor_id": advisor_id,
+                "days_since_update": days,
+                "severity": severity,
+                "previous": before,
+            })
+    return changes
+
+
+def adv_windows(since: datetime, now: datetime) -> List[Tuple[datetime, datetime]]:
+    """[lo, hi) ranges of ADV update times whose severity may have stepped up since the watermark."""
+    # days > step  <=>  updated_at <= now - (step + 1) days; a day of slack, adv_changes is exact
+    return [(crossed(since, now, step + 1)[0], crossed(since, now, step)[1]) for step in ADV_STEPS]
+
+
+async def _latest_adv(db, since: Optional[datetime], now: datetime) -> List[Tuple[Any, datetime]]:
+    """Latest ADV update per advisor, only for advisors whose severity may have moved."""
+    from sqlalchemy import text
+
+    having, params = "", {}
+    if since is not None:
+        clauses = ["max(updated_at) > :since"]
+        params["since"] = since
+        for i, (lo, hi) in enumerate(adv_windows(since, now)):
+            params[f"lo{i}"], params[f"hi{i}"] = lo, hi
+            clauses.append(f"(max(updated_at) >= :lo{i} AND max(updated_at) < :hi{i})")
+        having = "HAVING " + " OR ".join(clauses)
+    result = await db.execute(
+        text(f"""
+            SELECT advisor_id, max(updated_at) FROM compliance_documents
+            WHERE doc_type = 'adv_part_2b'
+            GROUP BY advisor_id {having}
+        """),
+        params,
+    )
+    return [(row[0], row[1]) for row in result.fetchall()]
+
+
+async def check_all_adv_currency(db, shard=None, now: Optional[datetime] = None) -> int:
+    """
+    Scheduled daily job — evaluates advisors whose ADV severity may have
+    changed since the last run, or only those in `shard` (a scheduler
+    Shard) when the run is split across workers.
+    Returns count of advisors newly at WARNING or BLOCKING.
+    """
+    now = now or datetime.now(timezone.utc)
+    key = job_key(ADV_JOB, shard)
     try:
-        from sqlalchemy import text
+        from backend.models.compliance_rules import ComplianceAuditLog
 
-        result = await db.execute(
-            text("SELECT DISTINCT advisor_id FROM compliance_documents WHERE doc_type = 'adv_part_2b'")
-        )
-        for row in result.fetchall():
-            status = await check_adv_on_login(row[0], db)
-            if status.get("severity") in ("WARNING", "BLOCKING"):
-                warnings += 1
+        since = await load_watermark(db, key)
+        rows = await _latest_adv(db, since, now)
+        if shard is not None:
+            rows = [row for row in rows if shard.owns(row[0])]
+        alerts = [c for c in adv_changes(rows, since, now) if c["severity"] in ALERT_SEVERITIES]
+        db.add_all([
+            ComplianceAuditLog(
+                advisor_id=UUID(str(c["advisor_id"])),
+                action=f"ADV_CURRENCY_{c['severity']}",
+                entity_type="adv_part_2b",
+                entity_id=str(c["advisor_id"]),
+                metadata_json={"days_since_update": c["days_since_update"], "previous": c["previous"]},
+            )
+            for c in alerts
+        ])
+        await save_watermark(db, key, now)
+        if alerts:
+            logger.warning("ADV currency: %d advisors newly at WARNING/BLOCKING (%d evaluated)",
+                           len(alerts), len(rows))
+        return len(alerts)
     except Exception as e:
         logger.debug("ADV batch check skipped: %s", e)
-    return warnings
+        return 0
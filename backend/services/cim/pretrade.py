@@ -0,0 +1,381 @@
+"""
+Batch pre-trade compliance: CIM layer 1 over many trades at once.
+
+CIMService.validate_recommendation checks one recommendation: a client
+lookup, every ComplianceRulesEngine check and a ComplianceLog write.
+Bulk actions (rebalancing a book, approving a harvest batch) go through
+PreTradeCompliance.check_trades instead:
+
+  - context is loaded in bulk: one query each for the clients, their
+    latest IPS and their households' positions, however many trades;
+  - concentration is checked on each household's post-batch look-through
+    exposure (current positions plus all of its trades in the batch),
+    with every household in one batched exposure-engine call;
+  - the rule set is compiled once per rule selection (cached) into
+    checks that read pre-built context, so the per-trade loop does no
+    lookups or parsing;
+  - ComplianceLog rows for the whole batch go out in one multi-row INSERT.
+
+Evaluation has a latency budget. Trades still unevaluated when it runs
+out fail closed with a PRETRADE_BUDGET result, so every trade gets an
+answer in bounded time. The audit insert always runs.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models import Account, Client, ComplianceLog, InvestmentPolicyStatement, Position
+from backend.services.cim_service import (
+    ComplianceRulesEngine,
+    RuleResult,
+    compliance_log_row,
+    decision,
+    suitability_profile,
+)
+from backend.services.concentration import Exposure, Holding, get_engine, holdings_from_positions
+from backend.services.latency import histogram
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGET_MS = 2000.0
+PROMPT_VERSION = "cim-pretrade-v1"
+BUDGET_RULE = "PRETRADE_BUDGET"
+_DEADLINE_EVERY = 32  # trades evaluated between deadline checks
+
+
+# ─── Inputs and results ─────────────────────────────────────────
+
+
+@dataclass
+class ProposedTrade:
+    """
+    One order to check. `details` carries the recommendation fields rules
+    read (risk_level, strategy_type, liquidity_rating, current_allocation,
+    adv_data, involves_advisor_account). As with validate_recommendation,
+    Reg BI fails without documented `alternatives`.
+    """
+
+    id: str
+    client_id: Optional[str]
+    symbol: str
+    side: str  # BUY | SELL
+    amount: float  # dollars
+    alternatives: List[Any] = field(default_factory=list)
+    details: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def signed_amount(self) -> float:
+        return -abs(self.amount) if self.side.upper() == "SELL" else abs(self.amount)
+
+
+@dataclass
+class ClientContext:
+    """Everything the rules read about one client, loaded once per batch."""
+
+    kyc: Dict[str, Any] = field(default_factory=dict)  # as stored on Client
+    profile: Dict[str, Any] = field(default_factory=dict)  # numeric Series 65 profile
+    ips: Dict[str, Any] = field(default_factory=dict)  # {"target_allocation": {...}}
+    household: Optional[str] = None  # concentration is checked per household
+    holdings: List[Holding] = field(default_factory=list)
+
+
+@dataclass
+class TradeCheck:
+    trade_id: str
+    status: str  # APPROVED | CONDITIONAL | REJECTED
+    results: List[RuleResult]
+
+    @property
+    def passed(self) -> bool:
+        """CONDITIONAL trades may proceed; they are flagged for supervisory review."""
+        return self.status != "REJECTED"
+
+    @property
+    def violations(self) -> List[str]:
+        return [r.rule for r in self.results if not r.passed]
+
+    def to_dict(self) -> dict:
+        return {
+            "trade_id": self.trade_id,
+            "status": self.status,
+            "passed": self.passed,
+            "violations": self.violations,
+        }
+
+
+@dataclass
+class PreTradeBatch:
+    checks: List[TradeCheck]
+    elapsed_ms: float
+    budget_ms: float
+    unevaluated: int = 0  # trades failed closed on the budget
+
+    @property
+    def rejected(self) -> List[TradeCheck]:
+        return [c for c in self.checks if not c.passed]
+
+    def by_trade(self) -> Dict[str, TradeCheck]:
+        return {c.trade_id: c for c in self.checks}
+
+
+# ─── Rule compilation ───────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class _Subject:
+    recommendation: dict
+    alternatives: list
+    client: ClientContext
+    portfolio: dict
+
+
+def _ia206(engine: ComplianceRulesEngine, s: _Subject) -> RuleResult:
+    # Drift is only measurable when the trade carries the resulting allocation
+    ips = s.client.ips if "current_allocation" in s.recommendation else {}
+    return engine.check_ia_act_fiduciary(s.recommendation, ips)
+
+
+# Rule -> check over a subject, in the order validate_recommendation runs them
+_RULES: Dict[str, Callable[[ComplianceRulesEngine, _Subject], RuleResult]] = {
+    "FINRA_2111": lambda e, s: e.check_finra_2111(s.recommendation, s.client.kyc),
+    "FINRA_2330": lambda e, s: e.check_finra_2330(s.recommendation, s.client.kyc),
+    "REG_BI": lambda e, s: e.check_reg_bi(s.recommendation, s.alternatives),
+    "CONCENTRATION_LIMITS": lambda e, s: e.check_concentration_limits(s.recommendation, s.portfolio),
+    "SUITABILITY_MATCH": lambda e, s: e.check_suitability_match(s.recommendation, s.client.kyc),
+    "IA206_FIDUCIARY": _ia206,
+    "SERIES65_SUITABILITY": lambda e, s: e.check_series65_suitability(s.recommendation, s.client.profile),
+    "ADV_CURRENCY": lambda e, s: e.check_adv_currency(s.recommendation.get("adv_data", {})),
+    "CONFLICT_206_3": lambda e, s: e.check_conflict_of_interest(s.recommendation),
+}
+
+CompiledRules = Tuple[Tuple[str, Callable[[_Subject], RuleResult]], ...]
+
+
+@lru_cache(maxsize=16)
+def compile_rules(rules: Optional[Tuple[str, ...]] = None) -> CompiledRules:
+    """(rule, check) pairs for a rule selection (all rules when None), bound to one engine."""
+    names = rules or tuple(_RULES)
+    unknown = [n for n in names if n not in _RULES]
+    if unknown:
+        raise ValueError(f"Unknown compliance rule(s): {', '.join(unknown)}")
+    engine = ComplianceRulesEngine()
+    return tuple((name, partial(_RULES[name], engine)) for name in names)
+
+
+# ─── Context ────────────────────────────────────────────────────
+
+
+async def load_contexts(session: AsyncSession, client_ids: Iterable[str]) -> Dict[str, ClientContext]:
+    """Client, latest IPS and household positions for every client: three queries."""
+    ids = {UUID(str(c)) for c in client_ids if c}
+    if not ids:
+        return {}
+
+    contexts: Dict[str, ClientContext] = {}
+    households: Dict[UUID, str] = {}
+    rows = await session.execute(
+        select(
+            Client.id,
+            Client.household_id,
+            Client.risk_tolerance,
+            Client.investment_objective,
+            Client.investment_timeline,
+        ).where(Client.id.in_(ids))
+    )
+    for cid, household_id, risk, objective, timeline in rows.all():
+        key = str(household_id or cid)
+        if household_id:
+            households[household_id] = key
+        contexts[str(cid)] = ClientContext(
+            kyc={"risk_tolerance": risk, "investment_objective": objective},
+            profile=suitability_profile(risk, objective, timeline),
+            household=key,
+        )
+    if not contexts:
+        return contexts
+
+    rows = await session.execute(
+        select(InvestmentPolicyStatement.client_id, InvestmentPolicyStatement.asset_allocation_section)
+        .where(InvestmentPolicyStatement.client_id.in_(ids))
+        .order_by(InvestmentPolicyStatement.client_id, InvestmentPolicyStatement.version.desc())
+    )
+    for cid, section in rows.all():
+        ctx = contexts.get(str(cid))
+        if ctx is not None and not ctx.ips:  # first row per client is the latest version
+            ctx.ips = {"target_allocation": (section or {}).get("target_allocation", {})}
+
+    rows = await session.execute(
+        select(
+            Account.household_id,
+            Account.client_id,
+            Position.ticker,
+            Position.security_name,
+            Position.market_value,
+        )
+        .join(Account, Account.id == Position.account_id)
+        .where(or_(Account.household_id.in_(list(households)), Account.client_id.in_(ids)))
+    )
+    by_household: Dict[str, List[dict]] = {}
+    for household_id, cid, ticker, name, value in rows.all():
+        key = households.get(household_id) or str(cid)
+        by_household.setdefault(key, []).append(
+            {"ticker": ticker, "security_name": name, "market_value": value}
+        )
+    for ctx in contexts.values():
+        ctx.holdings = holdings_from_positions(by_household.get(ctx.household, []))
+    return contexts
+
+
+def _post_batch_exposures(
+    trades: Sequence[ProposedTrade], contexts: Dict[str, ClientContext]
+) -> Dict[str, Exposure]:
+    """Each household's exposure after all of its trades, in one engine call."""
+    snapshots: Dict[str, Dict[str, List[Any]]] = {}
+    for trade in trades:
+        ctx = contexts.get(str(trade.client_id))
+        if ctx is None:
+            continue
+        book = snapshots.get(ctx.household)
+        if book is None:
+            book = snapshots[ctx.household] = {}
+            for h in ctx.holdings:
+                entry = book.setdefault(h.ticker.upper(), [0.0, h.sector])
+                entry[0] += h.value
+        entry = book.setdefault(trade.symbol.upper(), [0.0, None])
+        entry[0] = max(entry[0] + trade.signed_amount, 0.0)
+    keys = list(snapshots)
+    holdings = [[Holding(t, v, s) for t, (v, s) in snapshots[k].items()] for k in keys]
+    return dict(zip(keys, get_engine().exposures(holdings)))
+
+
+# ─── Evaluation ─────────────────────────────────────────────────
+
+
+def evaluate(
+    trades: Sequence[ProposedTrade],
+    contexts: Dict[str, ClientContext],
+    rules: Optional[Tuple[str, ...]] = None,
+    deadline: Optional[float] = None,
+) -> Tuple[List[TradeCheck], int]:
+    """
+    Run the compiled rules over every trade, in input order. Returns the
+    checks and how many trades failed closed because `deadline`
+    (time.monotonic()) passed before they were evaluated.
+    """
+    compiled = compile_rules(rules)
+    exposures = _post_batch_exposures(trades, contexts)
+    empty = ClientContext()
+    checks: List[TradeCheck] = []
+    for i, trade in enumerate(trades):
+        if deadline is not None and i % _DEADLINE_EVERY == 0 and time.monotonic() > deadline:
+            break
+        ctx = contexts.get(str(trade.client_id), empty)
+        exposure = exposures.get(ctx.household) if ctx.household else None
+        subject = _Subject(
+            recommendation={
+                "id": trade.id, "symbol": trade.symbol, "side": trade.side,
+                "amount": trade.amount, **trade.details,
+            },
+            alternatives=trade.alternatives,
+            client=ctx,
+            portfolio={"exposure": exposure} if exposure is not None else {},
+        )
+        results = [check(subject) for _, check in compiled]
+        checks.append(TradeCheck(trade.id, decision(results), results))
+
+    unevaluated = len(trades) - len(checks)
+    for trade in trades[len(checks):]:
+        result = RuleResult(BUDGET_RULE, passed=False, severity="BLOCKING",
+                            details={"reason": "Latency budget exhausted before evaluation"})
+        checks.append(TradeCheck(trade.id, "REJECTED", [result]))
+    return checks, unevaluated
+
+
+# ─── Service ────────────────────────────────────────────────────
+
+
+class PreTradeCompliance:
+    """Batch pre-trade checks with bulk context loading and one audit insert."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def check_trades(
+        self,
+        trades: Sequence[ProposedTrade],
+        advisor_id: Optional[str | UUID] = None,
+        budget_ms: float = DEFAULT_BUDGET_MS,
+        rules: Optional[Tuple[str, ...]] = None,
+        prompt_version: str = PROMPT_VERSION,
+    ) -> PreTradeBatch:
+        """
+        Pass/fail per trade, in input order. The budget covers context
+        loading and evaluation; trades it does not reach are REJECTED.
+        """
+        started = time.monotonic()
+        deadline = started + budget_ms / 1000
+        contexts = await load_contexts(self.session, {t.client_id for t in trades})
+        checks, unevaluated = evaluate(trades, contexts, rules, deadline)
+        elapsed_ms = (time.monotonic() - started) * 1000
+        histogram("cim.pretrade").observe(elapsed_ms, "timeout" if unevaluated else "ok")
+        if unevaluated:
+            logger.warning(
+                "Pre-trade budget of %.0f ms exhausted: %d of %d trades failed closed",
+                budget_ms, unevaluated, len(trades),
+            )
+
+        await self._write_audit(trades, checks, advisor_id, prompt_version)
+        return PreTradeBatch(checks, elapsed_ms, budget_ms, unevaluated)
+
+    async def _write_audit(
+        self,
+        trades: Sequence[ProposedTrade],
+        checks: List[TradeCheck],
+        advisor_id: Optional[str | UUID],
+        prompt_version: str,
+    ) -> None:
+        """Every rule result as one multi-row ComplianceLog insert; blocks as a second."""
+        rows = [
+            {"id": uuid4(), **compliance_log_row(
+                recommendation_id=check.trade_id,
+                result=result,
+                client_id=trade.client_id,
+                advisor_id=advisor_id,
+                prompt_version=prompt_version,
+            )}
+            for trade, check in zip(trades, checks)
+            for result in check.results
+        ]
+        if rows:
+            await self.session.execute(insert(ComplianceLog), rows)
+
+        blocked = [c for c in checks if c.status == "REJECTED"]
+        if blocked and advisor_id:
+            try:
+                from backend.models.compliance_rules import ComplianceAuditLog
+
+                # Savepoint: a failed insert must not abort the caller's transaction
+                async with self.session.begin_nested():
+                    await self.session.execute(
+                        insert(ComplianceAuditLog),
+                        [
+                            {
+                                "id": uuid4(),
+                                "advisor_id": UUID(str(advisor_id)),
+                                "action": "RECOMMENDATION_BLOCKED",
+                                "entity_type": "trade",
+                                "entity_id": c.trade_id,
+                                "metadata_json": {"violations": c.violations},
+                            }
+                            for c in blocked
+                        ],
+                    )
+            except Exception as e:
+                logger.error("BLOCKED audit log failed: %s", e)
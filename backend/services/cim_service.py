@@ -1,6 +1,7 @@
 """Compliance Investment Model — two-layer validation (rules + LLM)."""
 
 import logging
+import re
 from typing import Any, Optional
 from uuid import UUID
 
@@ -8,10 +9,19 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.models import Client, ComplianceLog
+from .concentration import household_exposure
 from .schemas import CIMResponse, ComplianceViolation, RequiredDisclosure
 
 logger = logging.getLogger(__name__)
 
+_RISK_SCALE = {
+    "conservative": 1,
+    "moderately_conservative": 2,
+    "moderate": 3,
+    "moderately_aggressive": 4,
+    "aggressive": 5,
+}
+
 
 class RuleResult:
     """Result of a single compliance rule check."""
@@ -29,6 +39,49 @@ class RuleResult:
         self.details = details or {}
 
 
+def compliance_log_row(
+    recommendation_id: str,
+    result: RuleResult,
+    client_id: Optional[str | UUID] = None,
+    advisor_id: Optional[str | UUID] = None,
+    prompt_version: str = "",
+) -> dict:
+    """ComplianceLog column values for one rule result. Never soft-delete."""
+    return {
+        "recommendation_id": recommendation_id,
+        "rule_checked": result.rule,
+        "result": "PASS" if result.passed else "FAIL",
+        "severity": result.severity,
+        "details": result.details,
+        "client_id": UUID(str(client_id)) if client_id else None,
+        "advisor_id": UUID(str(advisor_id)) if advisor_id else None,
+        "prompt_version": prompt_version,
+    }
+
+
+def suitability_profile(
+    risk_tolerance: Optional[str],
+    investment_objective: Optional[str],
+    investment_timeline: Optional[str],
+) -> dict:
+    """Client KYC columns -> the numeric profile check_series65_suitability reads."""
+    key = (risk_tolerance or "moderate").strip().lower().replace(" ", "_").replace("-", "_")
+    years = re.search(r"\d+", investment_timeline or "")
+    return {
+        "risk_tolerance": _RISK_SCALE.get(key, 3),
+        "profile_type": (investment_objective or key).lower(),
+        "time_horizon_years": int(years.group()) if years else 10,
+    }
+
+
+def decision(results: list[RuleResult]) -> str:
+    """REJECTED on any CRITICAL/BLOCKING failure, CONDITIONAL on any other, else APPROVED."""
+    failed = [r for r in results if not r.passed]
+    if any(r.severity in ("CRITICAL", "BLOCKING") for r in failed):
+        return "REJECTED"
+    return "CONDITIONAL" if failed else "APPROVED"
+
+
 class ComplianceRulesEngine:
     """Layer 1: Deterministic regulatory checks."""
 
@@ -75,14 +128,29 @@ class ComplianceRulesEngine:
     def check_concentration_limits(
         self, recommendation: dict, portfolio: dict
     ) -> RuleResult:
-        """Internal concentration policy."""
+        """Internal concentration policy (look-through when positions are given)."""
         single_pct = portfolio.get("max_single_position_pct", 0)
-        passed = single_pct <= 25
+        details: dict = {}
+        exposure = portfolio.get("exposure")  # precomputed by batch callers
+        if exposure is None and portfolio.get("positions"):
+            exposure = household_exposure(portfolio["positions"])
+        if exposure is not None:
+            top = next(iter(exposure.securities.items()), None)
+            sectors = exposure.sector_breaches(0.0)
+            single_pct = round(exposure.weight(top[1]) * 100, 2) if top else 0
+            details = {
+                "max_single_ticker": top[0] if top else None,
+                "max_sector": sectors[0][0] if sectors else None,
+                "max_sector_pct": round(sectors[0][1] * 100, 2) if sectors else 0,
+                "sector_threshold": 40,
+                "look_through": True,
+            }
+        passed = single_pct <= 25 and details.get("max_sector_pct", 0) <= 40
         return RuleResult(
             "CONCENTRATION_LIMITS",
             passed=passed,
             severity="HIGH" if single_pct > 40 else "MEDIUM",
-            details={"max_single_pct": single_pct, "threshold": 25},
+            details={"max_single_pct": single_pct, "threshold": 25, **details},
         )
 
     def check_suitability_match(
@@ -205,6 +273,7 @@ class CIMService:
         disclosures: list[RequiredDisclosure] = []
 
         client_kyc: dict = {}
+        client_profile: dict = {}
         if client_id:
             result = await self.session.execute(
                 select(Client).where(Client.id == UUID(str(client_id)))
@@ -215,6 +284,11 @@ class CIMService:
                     "risk_tolerance": client.risk_tolerance,
                     "investment_objective": client.investment_objective,
                 }
+                client_profile = suitability_profile(
+                    client.risk_tolerance,
+                    client.investment_objective,
+                    client.investment_timeline,
+                )
 
         results = [
             self.rules_engine.check_finra_2111(recommendation, client_kyc),
@@ -232,7 +306,7 @@ class CIMService:
                 recommendation, client_kyc
             ),
             self.rules_engine.check_series65_suitability(
-                recommendation, client_kyc
+                recommendation, client_profile
             ),
             self.rules_engine.check_adv_currency(
                 recommendation.get("adv_data", {})
@@ -240,17 +314,18 @@ class CIMService:
             self.rules_engine.check_conflict_of_interest(recommendation),
         ]
 
-        for r in results:
-            await self._log_compliance(
+        self.session.add_all([
+            ComplianceLog(**compliance_log_row(
                 recommendation_id=str(recommendation.get("id", "")),
-                rule=r.rule,
-                passed=r.passed,
-                severity=r.severity,
-                details=r.details,
+                result=r,
                 client_id=client_id,
                 advisor_id=advisor_id,
                 prompt_version=prompt_version,
-            )
+            ))
+            for r in results
+        ])
+        await self.session.flush()
+        for r in results:
             if not r.passed:
                 violations.append(
                     ComplianceViolation(
@@ -261,11 +336,8 @@ class CIMService:
                     )
                 )
 
-        status = "APPROVED"
-        if any(v.severity in ("CRITICAL", "BLOCKING") for v in violations):
-            status = "REJECTED"
-        elif violations:
-            status = "CONDITIONAL"
+        status = decision(results)
+        if status == "CONDITIONAL":
             disclosures.append(
                 RequiredDisclosure(
                     id="CONDITIONAL_REVIEW",
@@ -300,31 +372,6 @@ class CIMService:
             },
         )
 
-    async def _log_compliance(
-        self,
-        recommendation_id: str,
-        rule: str,
-        passed: bool,
-        severity: str,
-        details: dict,
-        client_id: Optional[str | UUID] = None,
-        advisor_id: Optional[str | UUID] = None,
-        prompt_version: str = "",
-    ) -> None:
-        """Write to ComplianceLog. Never soft-delete."""
-        entry = ComplianceLog(
-            recommendation_id=recommendation_id,
-            rule_checked=rule,
-            result="PASS" if passed else "FAIL",
-            severity=severity,
-            details=details,
-            client_id=UUID(str(client_id)) if client_id else None,
-            advisor_id=UUID(str(advisor_id)) if advisor_id else None,
-            prompt_version=prompt_version,
-        )
-        self.session.add(entry)
-        await self.session.flush()
-
     async def compute_suitability_score(
         self, client_profile: dict, recommendation: dict
     ) -> dict:
@@ -24,6 +24,12 @@ from backend.models.compliance_docs import (
     DocumentType,
     FormCRSData,
 )
+from backend.services.search import (
+    PostgresSearchBackend,
+    SearchQuery,
+    SearchResult,
+    compliance_version_document,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -116,6 +122,7 @@ class ComplianceDocService:
         )
         self.db.add(version)
         await self.db.flush()
+        await self._index_version(document, version)
 
         # Update document's current version
         document.current_version_id = version.id
@@ -444,6 +451,7 @@ Return ONLY valid JSON, no other text."""
         )
         self.db.add(version)
         await self.db.flush()
+        await self._index_version(document, version)
 
         document.current_version_id = version.id
 
@@ -728,6 +736,9 @@ Return ONLY valid JSON, no other text."""
         version.reviewed_by = reviewer_id
         version.reviewed_at = datetime.utcnow()
         version.review_notes = review_notes
+        document = await self.get_document(version.document_id)
+        if document:
+            await self._index_version(document, version)
 
         await self.db.commit()
         await self.db.refresh(version)
@@ -751,6 +762,7 @@ Return ONLY valid JSON, no other text."""
         if document:
             document.status = DocumentStatus.PUBLISHED
             document.effective_date = datetime.utcnow()
+            await self._index_version(document, version)
 
         await self.db.commit()
         await self.db.refresh(version)
@@ -772,6 +784,45 @@ Return ONLY valid JSON, no other text."""
         logger.info(f"Archived document {document_id}")
         return document
 
+    # ==================== SEARCH ====================
+
+    async def _index_version(
+        self, document: ComplianceDocument, version: ComplianceDocumentVersion
+    ) -> None:
+        """Upsert a version into the full-text index; never fails the write."""
+        try:
+            async with self.db.begin_nested():
+                await PostgresSearchBackend(self.db).add(
+                    compliance_version_document(document, version)
+                )
+        except Exception as e:
+            logger.warning(f"Search indexing failed for version {version.id}: {e}")
+
+    async def search_documents(
+        self,
+        firm_id: UUID,
+        text: Optional[str],
+        document_type: Optional[DocumentType] = None,
+        status: Optional[DocumentStatus] = None,
+        offset: int = 0,
+        limit: int = 25,
+    ) -> SearchResult:
+        """Ranked full-text search over a firm's document versions."""
+        filters = {}
+        if document_type:
+            filters["document_type"] = document_type.value
+        if status:
+            filters["status"] = status.value
+        return await PostgresSearchBackend(self.db).search(SearchQuery(
+            collection="compliance_documents",
+            text=text,
+            owner_id=str(firm_id),
+            filters=filters,
+            facets=["document_type", "status"],
+            offset=offset,
+            limit=limit,
+        ))
+
     # ==================== TEMPLATE MANAGEMENT ====================
 
     async def get_template(
@@ -0,0 +1,370 @@
+"""
+Household look-through exposure engine.
+
+Funds are expanded into their constituents, so a household's exposure to
+a security counts shares held directly and shares held inside every ETF.
+For example, AAPL held outright plus inside VOO and VUG comes out as one
+number. Single-security and sector concentration checks (IIM, portal
+nudges, CIM) all read from here.
+
+Layout: one instrument x column matrix in CSR form (NumPy arrays), with
+columns = [securities | sectors | pooled sleeves].
+
+  - A fund row holds its constituent weights, their sector roll-up, and
+    the share of the fund that is not looked through (e.g. a bond or
+    international sleeve with no constituent feed).
+  - A stock row is 1.0 on its own column and 1.0 on its sector column.
+
+A household's exposure is one sparse vector-matrix product: its dollars
+per instrument times that matrix. In batch mode, a chunk of households is
+one gather plus one bincount. Results are cached per position snapshot.
+
+Fund holdings come from a provider (register_fund). Until a licensed
+holdings feed is wired in, the demo provider builds index and style ETFs
+from the direct-indexing benchmark universes.
+"""
+
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.services.direct_indexing.universe import get_universe
+
+logger = logging.getLogger(__name__)
+
+REPORT_FLOOR = 0.01  # securities under 1% of a household are not itemized
+UNKNOWN_SECTOR = "UNKNOWN"
+_MAX_SNAPSHOTS = 4096
+_BATCH_CHUNK = 256  # households per gather/bincount block
+
+
+@dataclass(frozen=True)
+class FundHoldings:
+    """Constituent weights for one fund (weights and pooled shares sum to ~1)."""
+
+    ticker: str
+    name: str
+    constituents: Dict[str, float]  # security -> weight
+    sectors: Dict[str, str]  # security -> sector
+    pooled: Dict[str, float] = field(default_factory=dict)  # sleeve -> weight
+
+
+@dataclass(frozen=True)
+class Holding:
+    """One line of a position snapshot, aggregated by ticker."""
+
+    ticker: str
+    value: float
+    sector: Optional[str] = None
+
+
+# ─── Demo holdings provider ─────────────────────────────────────
+
+_INDEX_FUNDS = {
+    "VOO": "S&P 500", "SPY": "S&P 500", "IVV": "S&P 500",
+    "VTI": "Russell 3000", "ITOT": "Russell 3000", "SCHB": "Russell 3000",
+    "QQQ": "Nasdaq 100",
+}
+
+_SECTOR_FUNDS = {
+    "VGT": "Technology", "XLK": "Technology", "XLF": "Financials",
+    "XLV": "Healthcare", "XLE": "Energy", "XLU": "Utilities",
+}
+
+# Style funds: S&P 500 weights scaled per sector (unlisted sectors use "*")
+_STYLE_TILTS = {
+    "VUG": {"Technology": 2.0, "Consumer Disc.": 1.6, "Communication Svcs": 1.6, "*": 0.3},
+    "VTV": {"Financials": 2.0, "Healthcare": 1.6, "Energy": 1.8, "Industrials": 1.5,
+            "Consumer Staples": 1.5, "Utilities": 1.5, "Technology": 0.25, "*": 0.8},
+    "SCHD": {"Consumer Staples": 2.5, "Energy": 2.5, "Healthcare": 1.8, "Financials": 1.5,
+             "Industrials": 1.5, "Technology": 0.4, "*": 0.6},
+}
+
+# Funds without a constituent feed: exposure is kept as one pooled sleeve
+_POOLED_FUNDS = {
+    "BND": "U.S. Aggregate Bonds", "AGG": "U.S. Aggregate Bonds",
+    "SCHZ": "U.S. Aggregate Bonds", "VBTLX": "U.S. Aggregate Bonds",
+    "VXUS": "International Equity", "IXUS": "International Equity",
+    "VEA": "Developed ex-U.S. Equity", "VWO": "Emerging Markets Equity",
+}
+
+
+def _from_universe(ticker: str, benchmark: str, scale: Optional[Dict[str, float]] = None,
+                   sector: Optional[str] = None) -> FundHoldings:
+    universe = get_universe(benchmark)
+    names = [universe.sector_names[g] for g in universe.sector_ids]
+    w = universe.weights.copy()
+    if scale is not None:
+        w *= np.array([scale.get(s, scale["*"]) for s in names])
+    if sector is not None:
+        w *= universe.sector_ids == universe.sector_of(sector)
+    w /= w.sum()
+    held = np.flatnonzero(w)
+    symbols = universe.symbols[held].tolist()
+    return FundHoldings(
+        ticker=ticker,
+        name=sector or benchmark,
+        constituents=dict(zip(symbols, w[held].tolist())),
+        sectors={s: names[i] for s, i in zip(symbols, held)},
+    )
+
+
+def _demo_funds() -> List[FundHoldings]:
+    funds = [_from_universe(t, b) for t, b in _INDEX_FUNDS.items()]
+    funds += [_from_universe(t, "S&P 500", sector=s) for t, s in _SECTOR_FUNDS.items()]
+    funds += [_from_universe(t, "S&P 500", scale=tilt) for t, tilt in _STYLE_TILTS.items()]
+    funds += [FundHoldings(t, sleeve, {}, {}, {sleeve: 1.0}) for t, sleeve in _POOLED_FUNDS.items()]
+    return funds
+
+
+_registered: Dict[str, FundHoldings] = {}
+
+
+def register_fund(fund: FundHoldings) -> None:
+    """Plug in real holdings for one fund (replaces the demo entry)."""
+    _registered[fund.ticker.upper()] = fund
+    get_engine.cache_clear()
+
+
+# ─── Exposure results ───────────────────────────────────────────
+
+
+@dataclass
+class Exposure:
+    """Look-through dollars for one household snapshot."""
+
+    total: float
+    securities: Dict[str, float]  # >= REPORT_FLOOR of total (and the largest), descending
+    sectors: Dict[str, float]
+    pooled: Dict[str, float]
+    _engine: "ExposureEngine" = field(repr=False)
+    _rows: np.ndarray = field(repr=False)  # instrument rows held
+    _values: np.ndarray = field(repr=False)  # dollars per held row
+    _direct: Dict[str, float] = field(repr=False)  # off-matrix tickers
+
+    def weight(self, dollars: float) -> float:
+        return dollars / self.total if self.total > 0 else 0.0
+
+    def concentrated(self, limit: float) -> List[Tuple[str, float]]:
+        """Securities whose look-through weight exceeds `limit` (fraction), largest first."""
+        return [(t, self.weight(v)) for t, v in self.securities.items() if self.weight(v) > limit]
+
+    def sector_breaches(self, limit: float) -> List[Tuple[str, float]]:
+        out = [(s, self.weight(v)) for s, v in self.sectors.items() if self.weight(v) > limit]
+        return sorted(out, key=lambda x: -x[1])
+
+    def contributors(self, ticker: str) -> Dict[str, float]:
+        """Where the exposure to `ticker` comes from: instrument -> dollars."""
+        if ticker in self._direct:
+            return {ticker: self._direct[ticker]}
+        return self._engine.contributors(ticker, self._rows, self._values)
+
+
+# ─── Engine ─────────────────────────────────────────────────────
+
+
+class ExposureEngine:
+    """Instrument x column CSR matrix plus a per-snapshot result cache."""
+
+    def __init__(self, funds: Iterable[FundHoldings]) -> None:
+        funds = list(funds)
+        sector_of: Dict[str, str] = {}
+        pooled: List[str] = []
+        for f in funds:
+            sector_of.update(f.sectors)
+            for sleeve in f.pooled:
+                if sleeve not in pooled:
+                    pooled.append(sleeve)
+        self.securities = sorted(sector_of)
+        self.sectors = sorted(set(sector_of.values()))
+        self.pooled = pooled
+        n_sec, n_sect = len(self.securities), len(self.sectors)
+        self.col_of = sec_col = {s: i for i, s in enumerate(self.securities)}
+        sect_col = {s: n_sec + i for i, s in enumerate(self.sectors)}
+        pool_col = {p: n_sec + n_sect + i for i, p in enumerate(pooled)}
+        self.n_cols = n_sec + n_sect + len(pooled)
+        self._sector_ids = np.array([sect_col[sector_of[s]] - n_sec for s in self.securities], int)
+
+        # Rows: every fund, then every security held directly (identity rows)
+        indptr, indices, data = [0], [], []
+        for f in funds:
+            cols = np.array([sec_col[s] for s in f.constituents], int)
+            w = np.fromiter(f.constituents.values(), float, len(cols))
+            by_sector = np.bincount(self._sector_ids[cols], weights=w, minlength=n_sect)
+            row = {int(c): float(x) for c, x in zip(cols, w)}
+            row.update({n_sec + g: float(x) for g, x in enumerate(by_sector) if x})
+            row.update({pool_col[p]: x for p, x in f.pooled.items()})
+            order = sorted(row)
+            indices.extend(order)
+            data.extend(row[c] for c in order)
+            indptr.append(len(indices))
+        for i in range(n_sec):
+            indices.extend((i, n_sec + self._sector_ids[i]))
+            data.extend((1.0, 1.0))
+            indptr.append(len(indices))
+        self.indptr = np.asarray(indptr, np.int64)
+        self.indices = np.asarray(indices, np.int64)
+        self.data = np.asarray(data, float)
+        self.row_of = {f.ticker.upper(): i for i, f in enumerate(funds)}
+        self.row_of.update({s: len(funds) + i for i, s in enumerate(self.securities)})
+        self.funds = [f.ticker.upper() for f in funds]
+        self.instruments = self.funds + self.securities
+        self._cache: "OrderedDict[tuple, Exposure]" = OrderedDict()
+
+    # ── sparse product ──────────────────────────────────────────
+
+    def _product(self, owners: np.ndarray, rows: np.ndarray, values: np.ndarray,
+                 n_owners: int) -> np.ndarray:
+        """(n_owners, n_cols) = sum over (owner, row, value) of value * H[row]."""
+        start = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - start
+        ends = np.cumsum(lengths)
+        pos = np.repeat(start - ends + lengths, lengths) + np.arange(ends[-1] if len(ends) else 0)
+        flat = np.repeat(owners, lengths) * self.n_cols + self.indices[pos]
+        weights = self.data[pos] * np.repeat(values, lengths)
+        out = np.bincount(flat, weights=weights, minlength=n_owners * self.n_cols)
+        return out.reshape(n_owners, self.n_cols)
+
+    def contributors(self, ticker: str, rows: np.ndarray, values: np.ndarray) -> Dict[str, float]:
+        col = self.col_of.get(ticker, -1)
+        out: Dict[str, float] = {}
+        for r, v in zip(rows.tolist(), values.tolist()):
+            lo, hi = self.indptr[r], self.indptr[r + 1]
+            k = lo + np.searchsorted(self.indices[lo:hi], col)
+            if k < hi and self.indices[k] == col:
+                out[self.instruments[r]] = out.get(self.instruments[r], 0.0) + v * float(self.data[k])
+        return dict(sorted(out.items(), key=lambda x: -x[1]))
+
+    # ── public API ──────────────────────────────────────────────
+
+    def exposure(self, holdings: Iterable[Holding]) -> Exposure:
+        return self.exposures([holdings])[0]
+
+    def exposures(self, snapshots: Sequence[Iterable[Holding]]) -> List[Exposure]:
+        """Exposure per snapshot; cached snapshots are served without recomputing."""
+        keys = [_snapshot_key(s) for s in snapshots]
+        out: List[Optional[Exposure]] = [None] * len(keys)
+        missing: Dict[tuple, List[int]] = {}
+        for i, key in enumerate(keys):
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+                out[i] = hit
+            else:
+                missing.setdefault(key, []).append(i)
+
+        pending = list(missing)
+        for lo in range(0, len(pending), _BATCH_CHUNK):
+            chunk = pending[lo:lo + _BATCH_CHUNK]
+            for key, exp in zip(chunk, self._compute(chunk)):
+                for i in missing[key]:
+                    out[i] = exp
+                self._cache[key] = exp
+        while len(self._cache) > _MAX_SNAPSHOTS:
+            self._cache.popitem(last=False)
+        return out  # type: ignore[return-value]
+
+    def _compute(self, keys: List[tuple]) -> List[Exposure]:
+        owners, rows, values = [], [], []
+        direct: List[Dict[str, Tuple[float, str]]] = []
+        for h, key in enumerate(keys):
+            off: Dict[str, Tuple[float, str]] = {}
+            for ticker, value, sector in key:
+                r = self.row_of.get(ticker)
+                if r is None:
+                    off[ticker] = (value, sector or UNKNOWN_SECTOR)
+                else:
+                    owners.append(h)
+                    rows.append(r)
+                    values.append(value)
+            direct.append(off)
+        owners_a = np.asarray(owners, np.int64)
+        rows_a = np.asarray(rows, np.int64)
+        values_a = np.asarray(values, float)
+        dense = self._product(owners_a, rows_a, values_a, len(keys))
+
+        n_sec, n_sect = len(self.securities), len(self.sectors)
+        sec = dense[:, :n_sec]
+        # Itemize everything above the floor plus each household's largest name;
+        # exact for any concentration limit >= REPORT_FLOOR
+        totals = np.array([sum(v for _, v, _ in key) for key in keys])
+        keep = sec >= (totals * REPORT_FLOOR)[:, None]
+        if n_sec:
+            keep[np.arange(len(keys)), sec.argmax(axis=1)] = True
+        keep &= sec > 0
+        kept_h, kept_c = np.nonzero(keep)
+        kept_v = sec[kept_h, kept_c].tolist()
+        kept_c = kept_c.tolist()
+        kept_bounds = np.searchsorted(kept_h, np.arange(len(keys) + 1)).tolist()
+        bounds = np.searchsorted(owners_a, np.arange(len(keys) + 1))
+        sector_vals = dense[:, n_sec:n_sec + n_sect].tolist()
+        pooled_vals = dense[:, n_sec + n_sect:].tolist()
+
+        results = []
+        for h, key in enumerate(keys):
+            lo, hi = kept_bounds[h], kept_bounds[h + 1]
+            securities = {self.securities[c]: v for c, v in zip(kept_c[lo:hi], kept_v[lo:hi])}
+            sectors = {self.sectors[g]: v for g, v in enumerate(sector_vals[h]) if v}
+            pooled = {p: v for p, v in zip(self.pooled, pooled_vals[h]) if v}
+            for ticker, (value, sector) in direct[h].items():
+                securities[ticker] = value
+                sectors[sector] = sectors.get(sector, 0.0) + value
+            ranked = sorted(securities.items(), key=lambda x: -x[1])
+            sl = slice(bounds[h], bounds[h + 1])
+            results.append(Exposure(
+                total=float(totals[h]),
+                securities=dict(ranked),
+                sectors=sectors,
+                pooled=pooled,
+                _engine=self,
+                _rows=rows_a[sl],
+                _values=values_a[sl],
+                _direct={t: v for t, (v, _) in direct[h].items()},
+            ))
+        return results
+
+
+def _snapshot_key(holdings: Iterable[Holding]) -> tuple:
+    """Canonical (ticker, dollars, sector) tuple; the cache key for a snapshot."""
+    merged: Dict[str, List[Any]] = {}
+    for h in holdings:
+        ticker = (h.ticker or "UNKNOWN").upper()
+        entry = merged.setdefault(ticker, [0.0, h.sector])
+        entry[0] += float(h.value or 0)
+        entry[1] = entry[1] or h.sector
+    return tuple(sorted((t, round(v, 2), s) for t, (v, s) in merged.items() if v))
+
+
+@lru_cache(maxsize=1)
+def get_engine() -> ExposureEngine:
+    funds = {f.ticker: f for f in _demo_funds()}
+    funds.update(_registered)
+    return ExposureEngine(funds.values())
+
+
+def holdings_from_positions(positions: Iterable[Any]) -> List[Holding]:
+    """Position rows (ORM objects or dicts) -> Holdings."""
+    out = []
+    for p in positions:
+        get = p.get if isinstance(p, dict) else lambda k, d=None, p=p: getattr(p, k, d)
+        ticker = get("ticker") or get("security_name") or get("symbol") or "UNKNOWN"
+        value = get("market_value")
+        if value is None:
+            value = get("value", 0)
+        out.append(Holding(str(ticker), float(value or 0), get("sector")))
+    return out
+
+
+def household_exposure(positions: Iterable[Any]) -> Exposure:
+    return get_engine().exposure(holdings_from_positions(positions))
+
+
+def household_exposures(positions_by_household: Dict[Any, Iterable[Any]]) -> Dict[Any, Exposure]:
+    """Batch form of household_exposure: one call for many households."""
+    keys = list(positions_by_household)
+    snapshots = [holdings_from_positions(positions_by_household[k]) for k in keys]
+    return dict(zip(keys, get_engine().exposures(snapshots)))
@@ -29,6 +29,12 @@ from backend.models.conversation import (
     SentimentType,
     SpeakerSegment,
 )
+from backend.services.search import (
+    PostgresSearchBackend,
+    SearchQuery,
+    SearchResult,
+    transcript_document,
+)
 
 from .action_extractor import ActionExtractor
 from .compliance_detector import ComplianceDetector
@@ -177,6 +183,7 @@ class ConversationService:
 
             analysis.analysis_status = "completed"
             analysis.analyzed_at = datetime.utcnow()
+            await self._index_transcript(analysis, transcript, segments)
 
         except Exception:
             logger.exception(
@@ -189,6 +196,48 @@ class ConversationService:
         await self.db.commit()
         return analysis
 
+    # ─────────────────────────────────────────────────────────────
+    # Transcript Search
+    # ─────────────────────────────────────────────────────────────
+
+    async def _index_transcript(
+        self,
+        analysis: ConversationAnalysis,
+        transcript: str,
+        segments: List[Dict[str, Any]],
+    ) -> None:
+        try:
+            async with self.db.begin_nested():
+                await PostgresSearchBackend(self.db).add(
+                    transcript_document(analysis, transcript, segments)
+                )
+        except Exception as e:
+            logger.warning(
+                "Transcript indexing failed for meeting %s: %s",
+                analysis.meeting_id, e,
+            )
+
+    async def search_transcripts(
+        self,
+        advisor_id: UUID,
+        text: str,
+        client_id: Optional[UUID] = None,
+        days: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 25,
+    ) -> SearchResult:
+        """Ranked full-text search over the advisor's meeting transcripts."""
+        return await PostgresSearchBackend(self.db).search(SearchQuery(
+            collection="meeting_transcripts",
+            text=text,
+            owner_id=str(advisor_id),
+            filters={"client_id": str(client_id) if client_id else None},
+            start=datetime.utcnow() - timedelta(days=days) if days else None,
+            facets=["primary_topic", "compliance_risk_level"],
+            offset=offset,
+            limit=limit,
+        ))
+
     # ─────────────────────────────────────────────────────────────
     # Sentiment
     # ─────────────────────────────────────────────────────────────
@@ -3,6 +3,7 @@
 from .custodian_service import CustodianService
 from .encryption_service import EncryptionService
 from .normalizer import normalizer, DataNormalizer
+from .position_rollup import PositionRollupService
 from .base_adapter import (
     BaseCustodianAdapter,
     OAuthTokens,
@@ -18,6 +19,7 @@ __all__ = [
     "EncryptionService",
     "normalizer",
     "DataNormalizer",
+    "PositionRollupService",
     "BaseCustodianAdapter",
     "OAuthTokens",
     "RawAccount",
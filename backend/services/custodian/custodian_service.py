@@ -11,7 +11,6 @@ import asyncio
 import logging
 import uuid
 from datetime import datetime, timedelta
-from decimal import Decimal
 from typing import Any, Dict, List, Optional
 
 from sqlalchemy import and_, select
@@ -29,10 +28,13 @@ from backend.models.custodian import (
     CustodianType,
     SyncStatus,
 )
+from backend.services.dashboard_snapshots import schedule_advisor_refresh
+
 from .adapters import get_adapter
 from .base_adapter import RawAccount, RawPosition, RawTransaction
 from .encryption_service import encryption_service
 from .normalizer import normalizer
+from .position_rollup import PositionRollupService
 
 logger = logging.getLogger(__name__)
 
@@ -202,6 +204,7 @@ class CustodianService:
         self.db.add(sync_log)
         await self.db.commit()
         await self.db.refresh(sync_log)
+        touched_households: set = set()
 
         try:
             # Refresh tokens if needed
@@ -227,6 +230,7 @@ class CustodianService:
                     connection.id, account_ext_id
                 )
                 if account:
+                    touched_households.add(account.household_id)
                     await self._clear_positions(account.id)
                     for raw_position in positions:
                         await self._create_position(account, raw_position)
@@ -283,6 +287,12 @@ class CustodianService:
                 )
             await self.db.commit()
 
+        if sync_log.status == SyncStatus.SUCCESS:
+            await self.refresh_position_rollups(connection.advisor_id)
+            schedule_advisor_refresh(
+                connection.advisor_id, touched_households - {None}
+            )
+
         return sync_log
 
     async def _background_sync(self, connection_id: uuid.UUID) -> None:
@@ -335,62 +345,12 @@ class CustodianService:
     ) -> List[Dict[str, Any]]:
         """
         Get unified position view across all custodians.
-        Aggregates by symbol for a cross-custodian total.
+        Aggregates by symbol in SQL; advisor/household scopes are served
+        from the precomputed rollup refreshed after each sync.
         """
-        query = (
-            select(AggregatedPosition)
-            .join(CustodianAccount)
-            .join(CustodianConnection)
-            .where(CustodianConnection.advisor_id == advisor_id)
+        return await PositionRollupService(self.db).unified_positions(
+            advisor_id, client_id, household_id
         )
-        if client_id:
-            query = query.where(CustodianAccount.client_id == client_id)
-        if household_id:
-            query = query.where(CustodianAccount.household_id == household_id)
-
-        result = await self.db.execute(query)
-        positions = result.scalars().all()
-
-        # Aggregate by symbol
-        aggregated: Dict[str, Dict[str, Any]] = {}
-        for pos in positions:
-            key = pos.symbol
-            if key not in aggregated:
-                aggregated[key] = {
-                    "symbol": pos.symbol,
-                    "cusip": pos.cusip,
-                    "security_name": pos.security_name,
-                    "asset_class": pos.asset_class.value if pos.asset_class else "other",
-                    "total_quantity": Decimal("0"),
-                    "total_market_value": Decimal("0"),
-                    "total_cost_basis": Decimal("0"),
-                    "accounts": [],
-                }
-            aggregated[key]["total_quantity"] += pos.quantity
-            aggregated[key]["total_market_value"] += pos.market_value
-            if pos.cost_basis:
-                aggregated[key]["total_cost_basis"] += pos.cost_basis
-            aggregated[key]["accounts"].append(
-                {
-                    "account_id": str(pos.account_id),
-                    "quantity": float(pos.quantity),
-                    "market_value": float(pos.market_value),
-                }
-            )
-
-        # Convert decimals to floats for JSON serialization
-        for data in aggregated.values():
-            if data["total_cost_basis"] > 0:
-                data["unrealized_gain_loss"] = float(
-                    data["total_market_value"] - data["total_cost_basis"]
-                )
-            else:
-                data["unrealized_gain_loss"] = None
-            data["total_quantity"] = float(data["total_quantity"])
-            data["total_market_value"] = float(data["total_market_value"])
-            data["total_cost_basis"] = float(data["total_cost_basis"])
-
-        return list(aggregated.values())
 
     async def get_asset_allocation(
         self,
@@ -402,37 +362,19 @@ class CustodianService:
         Calculate asset allocation across all custodians.
         Returns total value and percentage breakdown by asset class.
         """
-        positions = await self.get_unified_positions(
+        return await PositionRollupService(self.db).asset_allocation(
             advisor_id, client_id, household_id
         )
-        allocation: Dict[str, Decimal] = {}
-        total_value = Decimal("0")
-
-        for pos in positions:
-            asset_class = pos["asset_class"]
-            market_value = Decimal(str(pos["total_market_value"]))
-            allocation[asset_class] = (
-                allocation.get(asset_class, Decimal("0")) + market_value
-            )
-            total_value += market_value
-
-        result: Dict[str, Any] = {
-            "total_value": float(total_value),
-            "allocation": [],
-        }
-        for asset_class, value in allocation.items():
-            pct = (
-                (value / total_value * 100) if total_value > 0 else Decimal("0")
-            )
-            result["allocation"].append(
-                {
-                    "asset_class": asset_class,
-                    "market_value": float(value),
-                    "percentage": float(pct),
-                }
+
+    async def refresh_position_rollups(self, advisor_id: uuid.UUID) -> None:
+        """Rebuild the advisor's rollups; failures never fail the caller."""
+        try:
+            await PositionRollupService(self.db).refresh(advisor_id)
+        except Exception:
+            await self.db.rollback()
+            logger.exception(
+                "Position rollup refresh failed for advisor=%s", advisor_id
             )
-        result["allocation"].sort(key=lambda x: x["market_value"], reverse=True)
-        return result
 
     async def get_account_summary(
         self, advisor_id: uuid.UUID
@@ -483,11 +425,17 @@ class CustodianService:
         if not account:
             raise ValueError(f"Account not found: {account_id}")
 
+        previous_household_id = account.household_id
         account.client_id = client_id
         account.household_id = household_id
         await self.db.commit()
         await self.db.refresh(account)
 
+        if previous_household_id != household_id:
+            connection = await self._get_connection(account.connection_id)
+            if connection:
+                await self.refresh_position_rollups(connection.advisor_id)
+
         logger.info(
             "Account %s mapped to client=%s household=%s",
             account_id,
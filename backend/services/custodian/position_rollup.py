@@ -0,0 +1,305 @@
+"""
+SQL-side aggregation of custodian positions.
+
+Unified views used to load every AggregatedPosition for an advisor into ORM
+objects and sum them in Python. This module pushes the GROUP BY into SQL:
+
+  - symbol_rollup_query / allocation_query build grouped SELECTs
+    (per-account detail via json_agg when requested)
+  - PositionRollupService.refresh() materializes advisor-wide and
+    per-household symbol totals into custodian_position_rollups after
+    each sync, so dashboards answer from precomputed rows
+  - unified_positions() / asset_allocation() read the rollup when one
+    exists for the requested scope and fall back to a live grouped query
+"""
+
+import logging
+import uuid
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import JSON, Select, and_, delete, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.custodian import (
+    AggregatedPosition,
+    CustodianAccount,
+    CustodianConnection,
+    CustodianPositionRollup,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _accounts_json_agg():
+    """json_agg of per-account detail rows for one symbol group."""
+    return func.json_agg(
+        func.json_build_object(
+            "account_id", AggregatedPosition.account_id,
+            "quantity", AggregatedPosition.quantity,
+            "market_value", AggregatedPosition.market_value,
+        ),
+        type_=JSON,
+    )
+
+
+def _scoped(
+    query: Select,
+    advisor_id: uuid.UUID,
+    client_id: Optional[uuid.UUID] = None,
+    household_id: Optional[uuid.UUID] = None,
+) -> Select:
+    """Join positions to their connection and apply advisor/client/household scope."""
+    query = (
+        query.select_from(AggregatedPosition)
+        .join(CustodianAccount, AggregatedPosition.account_id == CustodianAccount.id)
+        .join(CustodianConnection, CustodianAccount.connection_id == CustodianConnection.id)
+        .where(CustodianConnection.advisor_id == advisor_id)
+    )
+    if client_id:
+        query = query.where(CustodianAccount.client_id == client_id)
+    if household_id:
+        query = query.where(CustodianAccount.household_id == household_id)
+    return query
+
+
+def symbol_rollup_query(
+    advisor_id: uuid.UUID,
+    client_id: Optional[uuid.UUID] = None,
+    household_id: Optional[uuid.UUID] = None,
+    include_accounts: bool = True,
+) -> Select:
+    """
+    GROUP BY symbol across all custodian accounts in scope.
+    A symbol classified differently by two custodians keeps a single row
+    (max() picks one class deterministically).
+    """
+    columns = [
+        AggregatedPosition.symbol.label("symbol"),
+        func.max(AggregatedPosition.cusip).label("cusip"),
+        func.max(AggregatedPosition.security_name).label("security_name"),
+        func.max(AggregatedPosition.asset_class).label("asset_class"),
+        func.sum(AggregatedPosition.quantity).label("total_quantity"),
+        func.sum(AggregatedPosition.market_value).label("total_market_value"),
+        func.coalesce(func.sum(AggregatedPosition.cost_basis), 0).label(
+            "total_cost_basis"
+        ),
+        func.count(AggregatedPosition.account_id.distinct()).label("account_count"),
+    ]
+    if include_accounts:
+        columns.append(_accounts_json_agg().label("accounts"))
+
+    query = _scoped(select(*columns), advisor_id, client_id, household_id)
+    return query.group_by(AggregatedPosition.symbol).order_by(
+        func.sum(AggregatedPosition.market_value).desc()
+    )
+
+
+def allocation_query(
+    advisor_id: uuid.UUID,
+    client_id: Optional[uuid.UUID] = None,
+    household_id: Optional[uuid.UUID] = None,
+) -> Select:
+    """GROUP BY asset class — one row per class with its market value."""
+    query = _scoped(
+        select(
+            AggregatedPosition.asset_class.label("asset_class"),
+            func.sum(AggregatedPosition.market_value).label("market_value"),
+        ),
+        advisor_id,
+        client_id,
+        household_id,
+    )
+    return query.group_by(AggregatedPosition.asset_class)
+
+
+def _asset_class_value(asset_class: Any) -> str:
+    if asset_class is None:
+        return "other"
+    return getattr(asset_class, "value", str(asset_class))
+
+
+def position_row_to_dict(row: Any) -> Dict[str, Any]:
+    """Convert a grouped row (live query or rollup) to the unified-position dict."""
+    total_mv = Decimal(row.total_market_value or 0)
+    total_cb = Decimal(row.total_cost_basis or 0)
+    accounts = row.accounts or []
+    return {
+        "symbol": row.symbol,
+        "cusip": row.cusip,
+        "security_name": row.security_name,
+        "asset_class": _asset_class_value(row.asset_class),
+        "total_quantity": float(row.total_quantity or 0),
+        "total_market_value": float(total_mv),
+        "total_cost_basis": float(total_cb),
+        "unrealized_gain_loss": float(total_mv - total_cb) if total_cb > 0 else None,
+        "accounts": [
+            {
+                "account_id": str(a["account_id"]),
+                "quantity": float(a["quantity"] or 0),
+                "market_value": float(a["market_value"] or 0),
+            }
+            for a in accounts
+        ],
+    }
+
+
+def allocation_from_rows(rows: List[Any]) -> Dict[str, Any]:
+    """
+    Build the allocation payload from (asset_class, market_value) rows.
+    Stays in Decimal until the final float conversion.
+    """
+    by_class: Dict[str, Decimal] = {}
+    for row in rows:
+        key = _asset_class_value(row.asset_class)
+        by_class[key] = by_class.get(key, Decimal("0")) + Decimal(row.market_value or 0)
+
+    total_value = sum(by_class.values(), Decimal("0"))
+    allocation = [
+        {
+            "asset_class": asset_class,
+            "market_value": float(value),
+            "percentage": float(value / total_value * 100) if total_value > 0 else 0.0,
+        }
+        for asset_class, value in by_class.items()
+    ]
+    allocation.sort(key=lambda x: x["market_value"], reverse=True)
+    return {"total_value": float(total_value), "allocation": allocation}
+
+
+class PositionRollupService:
+    """Reads and refreshes the custodian_position_rollups materialization."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    # ── Refresh ────────────────────────────────────────────────
+
+    async def refresh(self, advisor_id: uuid.UUID) -> int:
+        """
+        Rebuild all rollup rows for an advisor: one advisor-wide set plus
+        one set per mapped household. Runs as DELETE + INSERT ... SELECT,
+        so no position rows are loaded into Python.
+        Returns the number of households refreshed.
+        """
+        await self.db.execute(
+            delete(CustodianPositionRollup).where(
+                CustodianPositionRollup.advisor_id == advisor_id
+            )
+        )
+
+        target_cols = [
+            "advisor_id", "household_id", "symbol", "cusip", "security_name",
+            "asset_class", "total_quantity", "total_market_value",
+            "total_cost_basis", "account_count", "accounts",
+        ]
+
+        advisor_wide = symbol_rollup_query(advisor_id).order_by(None)
+        advisor_wide = advisor_wide.with_only_columns(
+            literal(advisor_id).label("advisor_id"),
+            literal(None, type_=CustodianPositionRollup.household_id.type).label(
+                "household_id"
+            ),
+            *advisor_wide.selected_columns,
+        )
+        await self.db.execute(
+            insert(CustodianPositionRollup).from_select(target_cols, advisor_wide)
+        )
+
+        per_household = symbol_rollup_query(advisor_id).order_by(None)
+        per_household = (
+            per_household.with_only_columns(
+                literal(advisor_id).label("advisor_id"),
+                CustodianAccount.household_id.label("household_id"),
+                *per_household.selected_columns,
+            )
+            .where(CustodianAccount.household_id.isnot(None))
+            .group_by(CustodianAccount.household_id)
+        )
+        await self.db.execute(
+            insert(CustodianPositionRollup).from_select(target_cols, per_household)
+        )
+        await self.db.commit()
+
+        household_count = (
+            await self.db.execute(
+                select(func.count(CustodianPositionRollup.household_id.distinct())).where(
+                    CustodianPositionRollup.advisor_id == advisor_id
+                )
+            )
+        ).scalar() or 0
+        logger.info(
+            "Position rollups refreshed advisor=%s households=%d",
+            advisor_id,
+            household_count,
+        )
+        return household_count
+
+    # ── Reads ──────────────────────────────────────────────────
+
+    def _rollup_scope(
+        self, advisor_id: uuid.UUID, household_id: Optional[uuid.UUID]
+    ):
+        return and_(
+            CustodianPositionRollup.advisor_id == advisor_id,
+            CustodianPositionRollup.household_id == household_id
+            if household_id
+            else CustodianPositionRollup.household_id.is_(None),
+        )
+
+    async def _rollup_rows(
+        self, advisor_id: uuid.UUID, household_id: Optional[uuid.UUID]
+    ) -> List[Any]:
+        result = await self.db.execute(
+            select(CustodianPositionRollup)
+            .where(self._rollup_scope(advisor_id, household_id))
+            .order_by(CustodianPositionRollup.total_market_value.desc())
+        )
+        return list(result.scalars().all())
+
+    async def unified_positions(
+        self,
+        advisor_id: uuid.UUID,
+        client_id: Optional[uuid.UUID] = None,
+        household_id: Optional[uuid.UUID] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Symbol-level totals across custodians. Client-scoped requests are not
+        materialized and always use the live grouped query.
+        """
+        if client_id is None:
+            rows = await self._rollup_rows(advisor_id, household_id)
+            if rows:
+                return [position_row_to_dict(r) for r in rows]
+
+        result = await self.db.execute(
+            symbol_rollup_query(advisor_id, client_id, household_id)
+        )
+        return [position_row_to_dict(r) for r in result.all()]
+
+    async def asset_allocation(
+        self,
+        advisor_id: uuid.UUID,
+        client_id: Optional[uuid.UUID] = None,
+        household_id: Optional[uuid.UUID] = None,
+    ) -> Dict[str, Any]:
+        """Allocation by asset class, from the rollup or a live GROUP BY."""
+        if client_id is None:
+            result = await self.db.execute(
+                select(
+                    CustodianPositionRollup.asset_class.label("asset_class"),
+                    func.sum(CustodianPositionRollup.total_market_value).label(
+                        "market_value"
+                    ),
+                )
+                .where(self._rollup_scope(advisor_id, household_id))
+                .group_by(CustodianPositionRollup.asset_class)
+            )
+            rows = result.all()
+            if rows:
+                return allocation_from_rows(rows)
+
+        result = await self.db.execute(
+            allocation_query(advisor_id, client_id, household_id)
+        )
+        return allocation_from_rows(result.all())
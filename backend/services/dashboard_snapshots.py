@@ -0,0 +1,200 @@
+"""
+Materialized dashboard snapshots with version stamps.
+
+Dashboards are served from a snapshot cached per subject and per data
+version. Each scope (household, advisor) has a counter that is bumped
+whenever its data changes (a statement is confirmed, a custodian sync
+finishes). A bump retires every snapshot built from the old data without
+having to find and delete keys, and the affected snapshots are rebuilt in
+the background so the next page load is a hit. Fields that change without
+a data event (the AI chat allowance) are overlaid live and never cached.
+
+Key schema:
+  dashboard:version:{scope}:{id}        -> int, INCR on every data change
+  dashboard:b2c:{user}:{household}:{tier}:v{n} -> AsyncCache envelope (B2C payload)
+  dashboard:ria:{advisor}:v{n}          -> AsyncCache envelope (RIA payload)
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from backend.services.async_cache import AsyncCache
+from backend.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FRESH_TTL = 900  # also bounds time-based drift (e.g. history windows)
+SNAPSHOT_STALE_TTL = 3600
+
+_b2c_snapshots = AsyncCache("dashboard:b2c", fresh_ttl=SNAPSHOT_FRESH_TTL, stale_ttl=SNAPSHOT_STALE_TTL)
+_ria_snapshots = AsyncCache("dashboard:ria", fresh_ttl=SNAPSHOT_FRESH_TTL, stale_ttl=SNAPSHOT_STALE_TTL)
+
+_local_versions: Dict[str, int] = {}
+_background: set = set()
+
+
+# ─── Version stamps ─────────────────────────────────────────────
+
+
+def _version_key(scope: str, subject_id: Any) -> str:
+    return f"dashboard:version:{scope}:{subject_id}"
+
+
+async def data_version(scope: str, subject_id: Any) -> int:
+    """Current data version for a household/advisor (0 until the first bump)."""
+    if subject_id is None:
+        return 0
+    key = _version_key(scope, subject_id)
+    redis = await get_redis()
+    if redis:
+        try:
+            return int(await redis.get(key) or 0)
+        except Exception as e:
+            logger.debug("Version read failed for %s: %s", key, e)
+    return _local_versions.get(key, 0)
+
+
+async def bump_version(scope: str, subject_id: Any) -> int:
+    """Mark a household/advisor's data as changed; returns the new version."""
+    key = _version_key(scope, subject_id)
+    redis = await get_redis()
+    if redis:
+        try:
+            return int(await redis.incr(key))
+        except Exception as e:
+            logger.warning("Version bump failed for %s: %s", key, e)
+    _local_versions[key] = _local_versions.get(key, 0) + 1
+    return _local_versions[key]
+
+
+def _stamp(payload: Dict[str, Any], version: int) -> Dict[str, Any]:
+    return {**payload, "snapshot_version": version}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# ─── B2C dashboard ──────────────────────────────────────────────
+
+
+def _b2c_key(user, version: int) -> str:
+    return f"{user.id}:{user.household_id}:{user.subscription_tier or 'free'}:v{version}"
+
+
+async def _build_b2c(user) -> Dict[str, Any]:
+    """Cold build on pooled sessions; independent sections run concurrently."""
+    from backend.models import get_shared_session_factory
+    from backend.services.b2c_dashboard import B2CDashboardService
+
+    factory = get_shared_session_factory()
+    async with factory() as session:
+        response = await B2CDashboardService(session, session_factory=factory).get_dashboard(user)
+    return {**response.model_dump(mode="json"), "generated_at": _now()}
+
+
+async def _chat_remaining(db, user) -> int:
+    from backend.services.b2c_dashboard import B2CDashboardService
+
+    return await B2CDashboardService(db)._get_chat_remaining(user)
+
+
+async def b2c_dashboard(db, user):
+    """Dashboard for a B2C user, served from the household's current snapshot."""
+    from backend.api.b2c.schemas import DashboardResponse
+
+    version = await data_version("household", user.household_id)
+    key = _b2c_key(user, version)
+    payload, _ = await _b2c_snapshots.get_or_compute(key, lambda: _build_b2c(user))
+    if payload.get("degraded_sections"):
+        # Serve the partial page once, but let the next load rebuild it
+        await _b2c_snapshots.invalidate(key)
+    payload = _stamp(payload, version)
+    try:
+        payload["ai_chat_remaining"] = await _chat_remaining(db, user)
+    except Exception as e:
+        logger.debug("Live chat allowance unavailable, using snapshot value: %s", e)
+    return DashboardResponse.model_validate(payload)
+
+
+# ─── RIA dashboard ──────────────────────────────────────────────
+
+
+async def ria_dashboard(
+    advisor_id: Any, build: Callable[[], Awaitable[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """Advisor dashboard payload from the advisor's current snapshot."""
+    version = await data_version("advisor", advisor_id)
+
+    async def compute() -> Dict[str, Any]:
+        return {**(await build()), "generatedAt": _now()}
+
+    payload, _ = await _ria_snapshots.get_or_compute(f"{advisor_id}:v{version}", compute)
+    return {**payload, "snapshotVersion": version}
+
+
+# ─── Materialization after syncs / uploads ──────────────────────
+
+
+async def _household_users(household_id: Any) -> Iterable[Any]:
+    from sqlalchemy import select
+
+    from backend.models import get_shared_session_factory
+    from backend.models.user import User
+
+    async with get_shared_session_factory()() as session:
+        result = await session.execute(select(User).where(User.household_id == household_id))
+        return list(result.scalars().all())
+
+
+async def refresh_household(household_id: Any) -> int:
+    """Bump the household's version and rebuild its members' dashboards."""
+    version = await bump_version("household", household_id)
+    try:
+        users = await _household_users(household_id)
+    except Exception as e:
+        logger.warning("Snapshot rebuild skipped for household %s: %s", household_id, e)
+        return version
+    for user in users:
+        try:
+            await _b2c_snapshots.get_or_compute(_b2c_key(user, version), lambda u=user: _build_b2c(u))
+        except Exception as e:
+            logger.warning("Snapshot rebuild failed for user %s: %s", user.id, e)
+    return version
+
+
+async def refresh_advisor(advisor_id: Any, household_ids: Iterable[Any] = ()) -> None:
+    """After a custodian sync: new advisor version, then each touched household."""
+    await bump_version("advisor", advisor_id)
+    for household_id in set(household_ids):
+        await refresh_household(household_id)
+
+
+def _spawn(coro: Awaitable[Any], label: str) -> None:
+    async def run() -> None:
+        try:
+            await coro
+        except Exception as e:
+            logger.warning("Dashboard snapshot refresh failed (%s): %s", label, e)
+
+    try:
+        task = asyncio.get_running_loop().create_task(run())
+    except RuntimeError:
+        coro.close()  # type: ignore[attr-defined]
+        return
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+def schedule_household_refresh(household_id: Optional[Any]) -> None:
+    """Fire-and-forget refresh_household; call after the data change is committed."""
+    if household_id is not None:
+        _spawn(refresh_household(household_id), f"household {household_id}")
+
+
+def schedule_advisor_refresh(advisor_id: Optional[Any], household_ids: Iterable[Any] = ()) -> None:
+    if advisor_id is not None:
+        _spawn(refresh_advisor(advisor_id, list(household_ids)), f"advisor {advisor_id}")
+
@@ -0,0 +1,40 @@
+"""Direct indexing: personalized index construction and lot-level tax-loss harvesting."""
+
+from .engine import DirectIndexAccount, SleeveState, run_batch, run_nightly, simulate_lots, summarize
+from .harvest import HarvestScan, HarvestTrade, LotBook, estimated_tax_savings, scan_lots
+from .optimizer import Construction, IndexSpec, construct, construct_many
+from .risk_model import FactorRiskModel, get_risk_model
+from .universe import (
+    EXCLUSION_CATEGORIES,
+    Universe,
+    allowed_mask,
+    excluded_symbols,
+    get_universe,
+    register_universe,
+)
+
+__all__ = [
+    "Construction",
+    "DirectIndexAccount",
+    "EXCLUSION_CATEGORIES",
+    "FactorRiskModel",
+    "HarvestScan",
+    "HarvestTrade",
+    "IndexSpec",
+    "LotBook",
+    "SleeveState",
+    "Universe",
+    "allowed_mask",
+    "construct",
+    "construct_many",
+    "estimated_tax_savings",
+    "excluded_symbols",
+    "get_risk_model",
+    "get_universe",
+    "register_universe",
+    "run_batch",
+    "run_nightly",
+    "scan_lots",
+    "simulate_lots",
+    "summarize",
+]
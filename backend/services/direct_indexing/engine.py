@@ -0,0 +1,173 @@
+"""
+Direct-indexing engine: sleeve construction + harvest scan per account,
+and the nightly batch that runs both across every account.
+
+Until custodial lot feeds are wired in, accounts without supplied lots get
+a deterministic simulated lot history (seeded by account id) so the API and
+the benchmark exercise the same code path production will.
+"""
+
+import logging
+import zlib
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .harvest import HarvestScan, HarvestTrade, LotBook, scan_lots, symbols_to_pairs
+from .optimizer import Construction, IndexSpec, construct_many
+from .risk_model import get_risk_model
+from .universe import allowed_mask
+
+logger = logging.getLogger(__name__)
+
+ACCOUNT_CHUNK = 256  # accounts per harvest scan (bounds the pair x n scoring blocks)
+
+
+@dataclass
+class DirectIndexAccount:
+    account_id: str
+    spec: IndexSpec
+    total_value: float
+    lots: Optional[LotBook] = None  # account field ignored; filled in by the batch
+    recent_loss_sales: Sequence[str] = ()
+    outside_purchases: Sequence[str] = ()
+
+
+@dataclass
+class SleeveState:
+    account: DirectIndexAccount
+    construction: Construction
+    lots: LotBook
+    trades: List[HarvestTrade] = field(default_factory=list)
+
+    def holdings(self) -> List[Dict]:
+        """Per-symbol rows, largest weight first."""
+        universe = self.construction.universe
+        lots = self.lots
+        qty = np.bincount(lots.symbol, weights=lots.quantity, minlength=universe.size)
+        cost = np.bincount(lots.symbol, weights=lots.quantity * lots.cost_basis, minlength=universe.size)
+        value = qty * universe.prices
+        total = value.sum() or 1.0
+        harvestable = {t.sell_symbol for t in self.trades}
+        rows = []
+        for i in np.flatnonzero(qty > 0):
+            sym = str(universe.symbols[i])
+            rows.append({
+                "symbol": sym,
+                "sector": universe.sector_names[universe.sector_ids[i]],
+                "weight_pct": round(float(value[i] / total * 100), 2),
+                "quantity": round(float(qty[i]), 4),
+                "cost_basis": round(float(cost[i] / qty[i]), 2),
+                "current_price": float(universe.prices[i]),
+                "gain_loss": round(float(value[i] - cost[i]), 2),
+                "harvestable": sym in harvestable,
+            })
+        rows.sort(key=lambda r: r["weight_pct"], reverse=True)
+        return rows
+
+
+def simulate_lots(
+    construction: Construction, total_value: float, seed_key: str, as_of: date
+) -> LotBook:
+    """
+    Seeded lot history matching the target weights at today's prices:
+    1-4 lots per name bought over ~3 years, a few inside the wash window.
+    """
+    universe = construction.universe
+    rng = np.random.default_rng(zlib.crc32(seed_key.encode()))
+    held = np.flatnonzero(construction.weights)
+    per_name = rng.integers(1, 5, len(held))
+    symbol = np.repeat(held, per_name)
+    split = rng.dirichlet(np.ones(4), len(held))
+    share = np.concatenate([split[j, :k] / split[j, :k].sum() for j, k in enumerate(per_name)])
+
+    age = rng.integers(1, 3 * 365, len(symbol))
+    age[rng.random(len(symbol)) < 0.04] = rng.integers(1, 30)
+    # Cost basis drifts with ~8%/yr market growth plus per-lot noise (some underwater)
+    drift = np.exp(-0.08 * age / 365 + rng.normal(0.0, 0.15, len(symbol)))
+    px = universe.prices[symbol]
+    quantity = construction.weights[symbol] * total_value * share / px
+    return LotBook(
+        account=np.zeros(len(symbol), int),
+        symbol=symbol,
+        quantity=np.round(quantity, 4),
+        cost_basis=np.round(px * drift, 2),
+        acquired=np.datetime64(as_of, "D") - age.astype("timedelta64[D]"),
+    )
+
+
+def _concat(books: Iterable[Tuple[int, LotBook]]) -> LotBook:
+    books = list(books)
+    return LotBook(
+        account=np.concatenate([np.full(len(b), a) for a, b in books]),
+        symbol=np.concatenate([b.symbol for _, b in books]),
+        quantity=np.concatenate([b.quantity for _, b in books]),
+        cost_basis=np.concatenate([b.cost_basis for _, b in books]),
+        acquired=np.concatenate([b.acquired for _, b in books]),
+    )
+
+
+def run_batch(
+    accounts: Sequence[DirectIndexAccount],
+    as_of: Optional[date] = None,
+    min_loss_dollars: float = 500.0,
+    min_loss_pct: float = 0.05,
+) -> List[SleeveState]:
+    """Construct every sleeve and scan every lot; results align with `accounts`."""
+    as_of = as_of or date.today()
+    constructions = construct_many([a.spec for a in accounts])
+    states = []
+    for account, construction in zip(accounts, constructions):
+        lots = account.lots if account.lots is not None else simulate_lots(
+            construction, account.total_value, account.account_id, as_of
+        )
+        states.append(SleeveState(account, construction, lots))
+
+    by_benchmark: Dict[str, List[int]] = {}
+    for i, account in enumerate(accounts):
+        by_benchmark.setdefault(account.spec.benchmark, []).append(i)
+
+    for benchmark, members in by_benchmark.items():
+        model = get_risk_model(benchmark)
+        for lo in range(0, len(members), ACCOUNT_CHUNK):
+            chunk = members[lo:lo + ACCOUNT_CHUNK]
+            universe = states[chunk[0]].construction.universe
+            allowed = np.stack([allowed_mask(universe, accounts[i].spec.exclusions) for i in chunk])
+            sold = symbols_to_pairs(
+                universe, ((j, s) for j, i in enumerate(chunk) for s in accounts[i].recent_loss_sales)
+            )
+            outside = symbols_to_pairs(
+                universe, ((j, s) for j, i in enumerate(chunk) for s in accounts[i].outside_purchases)
+            )
+            scan: HarvestScan = scan_lots(
+                universe, model,
+                _concat((j, states[i].lots) for j, i in enumerate(chunk)),
+                allowed, as_of,
+                min_loss_dollars=min_loss_dollars, min_loss_pct=min_loss_pct,
+                recent_loss_sales=sold, outside_purchases=outside,
+            )
+            for trade in scan.trades:
+                states[chunk[trade.account]].trades.append(trade)
+    return states
+
+
+def summarize(states: Sequence[SleeveState], as_of: date) -> Dict:
+    trades = [t for s in states for t in s.trades]
+    return {
+        "as_of": as_of.isoformat(),
+        "accounts": len(states),
+        "lots_scanned": sum(len(s.lots) for s in states),
+        "harvest_trades": len(trades),
+        "losses_harvestable": round(sum(t.loss_harvested for t in trades), 2),
+        "max_tracking_error_bps": max((s.construction.tracking_error_bps for s in states), default=0),
+    }
+
+
+def run_nightly(accounts: Sequence[DirectIndexAccount], as_of: Optional[date] = None) -> Dict:
+    """Nightly job entry point: summary counts for logging/alerting."""
+    as_of = as_of or date.today()
+    summary = summarize(run_batch(accounts, as_of), as_of)
+    logger.info("Direct indexing nightly: %s", summary)
+    return summary
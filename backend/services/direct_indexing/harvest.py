@@ -0,0 +1,226 @@
+"""
+Vectorized tax-loss harvest scanner for direct-index lots.
+
+Lots for any number of accounts are scanned as flat arrays. A lot is
+harvestable when its unrealized loss clears both the dollar and percentage
+thresholds and selling it cannot trigger a wash sale:
+
+  - no other lot of the same symbol in the account was bought within
+    WASH_WINDOW_DAYS (those shares would be the replacement shares), and
+  - the caller reports no pending/outside purchase of it (e.g. a DRIP or a
+    spouse's account in the same household)
+
+Each harvested symbol gets a replacement: the most correlated name in the
+same sector that the account may hold, is not being sold in this run, and
+has not been sold at a loss in the last WASH_WINDOW_DAYS (buying it back
+would wash that earlier sale).
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from backend.services.tax_harvest.wash_sale_engine import WASH_WINDOW_DAYS
+
+from .risk_model import FactorRiskModel
+from .universe import Universe
+
+LONG_TERM_DAYS = 365
+DEFAULT_TAX_RATE = 0.35
+_PAIR_CHUNK = 2048  # replacement scoring works on (pairs x n) blocks
+
+
+@dataclass
+class LotBook:
+    """Open tax lots as parallel arrays (one entry per lot)."""
+
+    account: np.ndarray  # (L,) int, index into the caller's account list
+    symbol: np.ndarray  # (L,) int, index into Universe.symbols
+    quantity: np.ndarray  # (L,) float
+    cost_basis: np.ndarray  # (L,) float, per share
+    acquired: np.ndarray  # (L,) datetime64[D]
+
+    def __len__(self) -> int:
+        return len(self.account)
+
+
+@dataclass
+class HarvestTrade:
+    account: int
+    sell_symbol: str
+    buy_symbol: str
+    sector: str
+    shares_sold: float
+    shares_bought: float
+    proceeds: float
+    loss_harvested: float
+    short_term_loss: float
+    long_term_loss: float
+    lots: int
+    correlation: float
+
+    def to_dict(self) -> Dict:
+        return {
+            "sell_symbol": self.sell_symbol,
+            "buy_symbol": self.buy_symbol,
+            "sector": self.sector,
+            "loss_harvested": round(self.loss_harvested, 2),
+            "short_term_loss": round(self.short_term_loss, 2),
+            "long_term_loss": round(self.long_term_loss, 2),
+            "shares_sold": round(self.shares_sold, 4),
+            "shares_bought": round(self.shares_bought, 4),
+            "lots_sold": self.lots,
+            "replacement_correlation": round(self.correlation, 3),
+            "wash_sale_check": "clear",
+        }
+
+
+@dataclass
+class HarvestScan:
+    trades: List[HarvestTrade]
+    lots_scanned: int
+    candidates: int
+    blocked_wash_sale: int
+    no_replacement: int
+
+    @property
+    def total_losses(self) -> float:
+        return sum(t.loss_harvested for t in self.trades)
+
+
+def _pair_keys(account: np.ndarray, symbol: np.ndarray, n: int) -> np.ndarray:
+    return account.astype(np.int64) * n + symbol
+
+
+def _key_set(pairs: Optional[Iterable[Tuple[int, int]]], n: int) -> np.ndarray:
+    pairs = list(pairs or ())
+    if not pairs:
+        return np.empty(0, np.int64)
+    arr = np.asarray(pairs, dtype=np.int64)
+    return arr[:, 0] * n + arr[:, 1]
+
+
+def scan_lots(
+    universe: Universe,
+    model: FactorRiskModel,
+    lots: LotBook,
+    allowed: np.ndarray,
+    as_of: date,
+    min_loss_dollars: float = 500.0,
+    min_loss_pct: float = 0.05,
+    recent_loss_sales: Optional[Iterable[Tuple[int, int]]] = None,
+    outside_purchases: Optional[Iterable[Tuple[int, int]]] = None,
+    prices: Optional[np.ndarray] = None,
+) -> HarvestScan:
+    """
+    Find harvest trades for every account in `lots`.
+
+    `allowed` is (accounts, n) or (n,) — what each account may buy.
+    `recent_loss_sales` / `outside_purchases` are (account, symbol index)
+    pairs from the last WASH_WINDOW_DAYS.
+    """
+    n = universe.size
+    prices = universe.prices if prices is None else prices
+    today = np.datetime64(as_of, "D")
+    if allowed.ndim == 1:
+        allowed = np.broadcast_to(allowed, (int(lots.account.max(initial=-1)) + 1, n))
+
+    # ── per-lot economics ───────────────────────────────────────
+    px = prices[lots.symbol]
+    loss = (lots.cost_basis - px) * lots.quantity
+    loss_pct = np.divide(
+        lots.cost_basis - px, lots.cost_basis,
+        out=np.zeros_like(px), where=lots.cost_basis > 0,
+    )
+    candidate = (loss >= min_loss_dollars) & (loss_pct >= min_loss_pct)
+
+    # ── wash-sale screen ────────────────────────────────────────
+    keys = _pair_keys(lots.account, lots.symbol, n)
+    recent = lots.acquired > today - np.timedelta64(WASH_WINDOW_DAYS, "D")
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    recent_per_key = np.bincount(inverse, weights=recent, minlength=len(uniq))
+    # A lot's own purchase is not a replacement purchase; any other recent lot is
+    other_recent = recent_per_key[inverse] - recent > 0
+    blocked = candidate & (other_recent | np.isin(keys, _key_set(outside_purchases, n)))
+    harvest = candidate & ~blocked
+
+    idx = np.flatnonzero(harvest)
+    if len(idx) == 0:
+        return HarvestScan([], len(lots), int(candidate.sum()), int(blocked.sum()), 0)
+
+    # ── aggregate lots into (account, symbol) sells ─────────────
+    sell_keys, pair_of = np.unique(keys[idx], return_inverse=True)
+    pair_account = (sell_keys // n).astype(int)
+    pair_symbol = (sell_keys % n).astype(int)
+    held_days = (today - lots.acquired[idx]).astype(int)
+    long_term = held_days > LONG_TERM_DAYS
+    p = len(sell_keys)
+    shares = np.bincount(pair_of, weights=lots.quantity[idx], minlength=p)
+    lt_loss = np.bincount(pair_of, weights=np.where(long_term, loss[idx], 0.0), minlength=p)
+    st_loss = np.bincount(pair_of, weights=np.where(long_term, 0.0, loss[idx]), minlength=p)
+    lot_counts = np.bincount(pair_of, minlength=p)
+    proceeds = shares * prices[pair_symbol]
+
+    # ── replacement picks ───────────────────────────────────────
+    selling = np.zeros(allowed.shape, bool)
+    selling[pair_account, pair_symbol] = True
+    recently_sold = np.zeros(allowed.shape, bool)
+    sold_keys = _key_set(recent_loss_sales, n)
+    if len(sold_keys):
+        recently_sold[sold_keys // n, sold_keys % n] = True
+
+    rows, inv = np.unique(pair_symbol, return_inverse=True)
+    corr = model.correlations(rows)
+    buy = np.full(p, -1)
+    best = np.zeros(p)
+    for lo in range(0, p, _PAIR_CHUNK):
+        sl = slice(lo, lo + _PAIR_CHUNK)
+        acct = pair_account[sl]
+        ok = (
+            allowed[acct]
+            & ~selling[acct]
+            & ~recently_sold[acct]
+            & (universe.sector_ids[None, :] == universe.sector_ids[pair_symbol[sl], None])
+        )
+        score = np.where(ok, corr[inv[sl]], -np.inf)
+        pick = score.argmax(axis=1)
+        found = np.isfinite(score[np.arange(len(pick)), pick])
+        buy[sl] = np.where(found, pick, -1)
+        best[sl] = np.where(found, score[np.arange(len(pick)), pick], 0.0)
+
+    # Without a clean replacement the sale would leave the sector short; skip it
+    trades = []
+    for i in np.flatnonzero(buy >= 0):
+        b = buy[i]
+        trades.append(HarvestTrade(
+            account=int(pair_account[i]),
+            sell_symbol=str(universe.symbols[pair_symbol[i]]),
+            buy_symbol=str(universe.symbols[b]),
+            sector=universe.sector_names[universe.sector_ids[pair_symbol[i]]],
+            shares_sold=float(shares[i]),
+            shares_bought=float(proceeds[i] / prices[b]),
+            proceeds=float(proceeds[i]),
+            loss_harvested=float(st_loss[i] + lt_loss[i]),
+            short_term_loss=float(st_loss[i]),
+            long_term_loss=float(lt_loss[i]),
+            lots=int(lot_counts[i]),
+            correlation=float(best[i]),
+        ))
+    return HarvestScan(
+        trades=trades,
+        lots_scanned=len(lots),
+        candidates=int(candidate.sum()),
+        blocked_wash_sale=int(blocked.sum()),
+        no_replacement=int((buy < 0).sum()),
+    )
+
+
+def estimated_tax_savings(trades: Iterable[HarvestTrade], rate: float = DEFAULT_TAX_RATE) -> float:
+    return round(sum(t.loss_harvested for t in trades) * rate, 2)
+
+
+def symbols_to_pairs(universe: Universe, pairs: Iterable[Tuple[int, str]]) -> Set[Tuple[int, int]]:
+    """(account, ticker) -> (account, symbol index), dropping tickers not in the universe."""
+    return {(a, universe.index_of[s]) for a, s in pairs if s in universe.index_of}
@@ -0,0 +1,190 @@
+"""
+Sparse tracking-error optimizer for personalized direct-index sleeves.
+
+    minimize    0.5 (w - b)' Sigma (w - b)
+    subject to  sum_{i in sector g} w_i = target_g      (benchmark + tilt)
+                0 <= w_i <= cap_g
+                w_i = 0 for excluded names
+
+Solved with accelerated projected gradient (FISTA). The feasible set splits
+into one capped simplex per sector, so projection is an independent
+bisection per (portfolio, sector) and the whole thing runs batched across
+portfolios as (m, n) arrays. Sparsity comes from pruning names below
+min_weight (or outside the top max_names) and re-solving on the survivors.
+
+Accounts with identical specs share one solve (construct_many dedupes).
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .risk_model import FactorRiskModel, get_risk_model
+from .universe import Universe, allowed_mask, get_universe
+
+MAX_ITER = 200
+TOLERANCE = 1e-7  # max weight change per iteration (0.001 bp)
+_BISECT_STEPS = 40
+
+
+@dataclass
+class IndexSpec:
+    benchmark: str = "S&P 500"
+    exclusions: Sequence[str] = ()
+    tilts: Dict[str, float] = field(default_factory=dict)  # sector -> percentage points
+    max_names: Optional[int] = None
+    min_weight: float = 0.0002  # 2 bps: below this a position is noise
+    max_weight: float = 0.10
+
+    def key(self) -> Tuple:
+        return (
+            self.benchmark,
+            tuple(sorted(e.strip().lower() for e in self.exclusions)),
+            tuple(sorted((k, float(v)) for k, v in self.tilts.items() if v)),
+            self.max_names, self.min_weight, self.max_weight,
+        )
+
+
+@dataclass
+class Construction:
+    spec: IndexSpec
+    universe: Universe
+    weights: np.ndarray  # (n,), zeros for names not held
+    tracking_error: float  # annualized, fraction
+    iterations: int
+
+    @property
+    def holdings_count(self) -> int:
+        return int(np.count_nonzero(self.weights))
+
+    @property
+    def tracking_error_bps(self) -> int:
+        return int(round(self.tracking_error * 10_000))
+
+    def sector_weights_pct(self) -> Dict[str, float]:
+        totals = self.universe.sector_weights(self.weights)
+        return {s: round(float(t) * 100, 1) for s, t in zip(self.universe.sector_names, totals)}
+
+
+def sector_targets(universe: Universe, allowed: np.ndarray, tilts: Dict[str, float]) -> np.ndarray:
+    """Benchmark sector weights plus tilts; sectors with nothing investable get 0."""
+    targets = universe.sector_weights().copy()
+    for name, tilt in tilts.items():
+        if name in universe.sector_names:
+            targets[universe.sector_of(name)] += float(tilt) / 100.0
+    investable = np.bincount(universe.sector_ids[allowed], minlength=len(targets)) > 0
+    targets = np.where(investable, np.maximum(targets, 0.0), 0.0)
+    total = targets.sum()
+    if total <= 0:
+        raise ValueError("Exclusions and tilts leave nothing to invest in")
+    return targets / total
+
+
+def _caps(universe: Universe, allowed: np.ndarray, targets: np.ndarray, max_weight: float) -> np.ndarray:
+    """Per-name upper bounds, loosened where a sector could not otherwise fill."""
+    counts = np.bincount(universe.sector_ids[allowed], minlength=len(targets))
+    floor = np.divide(targets, counts, out=np.zeros_like(targets), where=counts > 0)
+    return np.where(allowed, np.maximum(max_weight, floor[universe.sector_ids] * 1.0001), 0.0)
+
+
+def project(v: np.ndarray, caps: np.ndarray, sector_ids: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """
+    Euclidean projection of each row of v onto its capped sector simplices.
+
+    For each (row, sector) find tau with sum(clip(v - tau, 0, cap)) = target;
+    all (m x g) thresholds are bisected together.
+    """
+    g = targets.shape[-1]
+    onehot = np.eye(g)[sector_ids]
+    lo = (v - caps).min(axis=-1, keepdims=True) * np.ones(g) - 1.0
+    hi = v.max(axis=-1, keepdims=True) * np.ones(g)
+    for _ in range(_BISECT_STEPS):
+        mid = 0.5 * (lo + hi)
+        filled = np.clip(v - mid[..., sector_ids], 0.0, caps) @ onehot
+        over = filled > targets
+        lo = np.where(over, mid, lo)
+        hi = np.where(over, hi, mid)
+    return np.clip(v - (0.5 * (lo + hi))[..., sector_ids], 0.0, caps)
+
+
+def _solve(
+    model: FactorRiskModel,
+    benchmark: np.ndarray,
+    caps: np.ndarray,
+    sector_ids: np.ndarray,
+    targets: np.ndarray,
+    start: np.ndarray,
+    step: float,
+) -> Tuple[np.ndarray, int]:
+    """FISTA over a batch: caps/targets/start are (m, n)/(m, g)/(m, n)."""
+    w = project(start, caps, sector_ids, targets)
+    y, t = w.copy(), 1.0
+    for it in range(1, MAX_ITER + 1):
+        w_next = project(y - step * model.gradient(y - benchmark), caps, sector_ids, targets)
+        t_next = 0.5 * (1.0 + np.sqrt(1.0 + 4.0 * t * t))
+        y = w_next + ((t - 1.0) / t_next) * (w_next - w)
+        moved = np.abs(w_next - w).max()
+        w, t = w_next, t_next
+        if moved < TOLERANCE:
+            break
+    return w, it
+
+
+def _sparsify(
+    universe: Universe, weights: np.ndarray, allowed: np.ndarray, spec: IndexSpec
+) -> np.ndarray:
+    """Survivors after dropping dust / keeping the top max_names (each sector keeps its largest)."""
+    keep = allowed & (weights >= spec.min_weight)
+    if spec.max_names and keep.sum() > spec.max_names:
+        top = np.zeros_like(keep)
+        top[np.argsort(-weights)[: spec.max_names]] = True
+        keep &= top
+    for g in np.unique(universe.sector_ids[allowed & (weights > 0)]):
+        in_sector = universe.sector_ids == g
+        if not (keep & in_sector).any():
+            keep[np.argmax(np.where(in_sector & allowed, weights, -1.0))] = True
+    return keep
+
+
+def construct_many(specs: Sequence[IndexSpec]) -> List[Construction]:
+    """Build every sleeve; identical specs are solved once, one batch per benchmark."""
+    unique: Dict[Tuple, IndexSpec] = {}
+    for spec in specs:
+        unique.setdefault(spec.key(), spec)
+
+    by_benchmark: Dict[str, List[IndexSpec]] = {}
+    for spec in unique.values():
+        by_benchmark.setdefault(spec.benchmark, []).append(spec)
+
+    solved: Dict[Tuple, Construction] = {}
+    for benchmark, group in by_benchmark.items():
+        universe = get_universe(benchmark)
+        model = get_risk_model(benchmark)
+        step = 1.0 / model.lipschitz()
+        b = universe.weights
+
+        allowed = np.stack([allowed_mask(universe, s.exclusions) for s in group])
+        targets = np.stack([sector_targets(universe, a, s.tilts) for s, a in zip(group, allowed)])
+        caps = np.stack([
+            _caps(universe, a, t, s.max_weight) for s, a, t in zip(group, allowed, targets)
+        ])
+        w, iters = _solve(model, b, caps, universe.sector_ids, targets, np.where(allowed, b, 0.0), step)
+
+        # Second pass on the sparse support, warm-started from the dense answer
+        keep = np.stack([_sparsify(universe, row, a, s) for row, a, s in zip(w, allowed, group)])
+        caps = np.stack([
+            _caps(universe, k, t, s.max_weight) for s, k, t in zip(group, keep, targets)
+        ])
+        w, more = _solve(model, b, caps, universe.sector_ids, targets, np.where(keep, w, 0.0), step)
+        w[w < 1e-9] = 0.0
+
+        te = model.tracking_error(w, b)
+        for spec, row, err in zip(group, w, te):
+            solved[spec.key()] = Construction(spec, universe, row, float(err), iters + more)
+
+    return [solved[spec.key()] for spec in specs]
+
+
+def construct(spec: IndexSpec) -> Construction:
+    return construct_many([spec])[0]
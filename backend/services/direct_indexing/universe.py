@@ -0,0 +1,169 @@
+"""
+Benchmark constituent universes and exclusion screens.
+
+A Universe is column-oriented (NumPy arrays indexed by constituent) so the
+optimizer, risk model and harvest scanner all work on whole vectors.
+
+Constituent data comes from a provider registered per benchmark
+(register_universe). Until a licensed constituent feed is wired in, the
+built-in demo provider generates a deterministic universe: the named
+large caps below carry the top weights and a seeded tail fills the index
+to its real constituent count with a cap-weighted (Zipf) profile.
+"""
+
+import zlib
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+# Named large caps per sector (top of each sector by weight)
+SECTOR_LEADERS: Dict[str, List[str]] = {
+    "Technology": ["AAPL", "MSFT", "NVDA", "GOOGL", "META", "AVGO", "CRM", "ADBE", "AMD", "INTC"],
+    "Healthcare": ["UNH", "JNJ", "LLY", "ABBV", "MRK", "PFE", "TMO", "ABT", "DHR", "AMGN"],
+    "Financials": ["BRK.B", "JPM", "V", "MA", "BAC", "WFC", "GS", "MS", "SCHW", "AXP"],
+    "Consumer Disc.": ["AMZN", "TSLA", "HD", "MCD", "NKE", "LOW", "SBUX", "TJX", "BKNG", "CMG"],
+    "Consumer Staples": ["PG", "KO", "PEP", "COST", "WMT", "PM", "CL", "MDLZ", "MO", "KHC"],
+    "Energy": ["XOM", "CVX", "COP", "SLB", "EOG", "MPC", "PSX", "VLO", "OXY", "HAL"],
+    "Industrials": ["GE", "CAT", "UNP", "HON", "RTX", "DE", "BA", "LMT", "MMM", "UPS"],
+    "Real Estate": ["PLD", "AMT", "CCI", "EQIX", "SPG", "PSA", "O", "WELL", "DLR", "AVB"],
+    "Utilities": ["NEE", "DUK", "SO", "D", "AEP", "SRE", "EXC", "XEL", "WEC", "ED"],
+    "Communication Svcs": ["NFLX", "DIS", "CMCSA", "TMUS", "VZ", "T"],
+    "Materials": ["LIN", "SHW", "APD", "ECL", "FCX", "NEM"],
+}
+
+# Approximate cap-weighted sector mix (fractions) used by the demo provider
+_SECTOR_MIX = {
+    "Technology": 0.30, "Healthcare": 0.12, "Financials": 0.13,
+    "Consumer Disc.": 0.10, "Communication Svcs": 0.09, "Industrials": 0.08,
+    "Consumer Staples": 0.06, "Energy": 0.04, "Utilities": 0.025,
+    "Real Estate": 0.023, "Materials": 0.022,
+}
+
+# Tail ticker prefixes; sectors sharing their first three letters get their own
+_TAIL_PREFIX = {"Consumer Disc.": "CDI", "Consumer Staples": "CST", "Communication Svcs": "CMS"}
+
+# Exclusion screens: id -> (display name, constituents tagged by the screen)
+EXCLUSION_CATEGORIES: Dict[str, Dict] = {
+    "tobacco": {"name": "Tobacco", "symbols": {"PM", "MO"}},
+    "firearms": {"name": "Firearms & Weapons", "symbols": {"LMT", "RTX", "BA", "GE"}},
+    "fossil_fuel": {
+        "name": "Fossil Fuel Extraction",
+        "symbols": {"XOM", "CVX", "COP", "EOG", "OXY", "SLB", "HAL"},
+    },
+    "coal": {"name": "Coal Mining", "symbols": {"FCX"}},
+    "oil_sands": {"name": "Oil Sands", "symbols": {"XOM", "COP", "CVX"}},
+    "arctic": {"name": "Arctic Drilling", "symbols": {"COP", "XOM"}},
+    "alcohol": {"name": "Alcohol", "symbols": {"KO", "PEP", "COST", "WMT"}},
+    "gaming": {"name": "Gaming & Casinos", "symbols": {"BKNG", "DIS"}},
+    "adult": {"name": "Adult Entertainment", "symbols": {"NFLX", "CMCSA"}},
+    "nuclear": {"name": "Nuclear Power", "symbols": {"DUK", "SO", "D", "EXC", "NEE"}},
+    "private_prisons": {"name": "Private Prisons", "symbols": set()},
+    "animal_testing": {"name": "Animal Testing", "symbols": {"JNJ", "PG", "CL", "LLY", "PFE"}},
+}
+
+BENCHMARK_SIZES = {"S&P 500": 500, "Russell 1000": 1000, "Russell 3000": 3000, "Nasdaq 100": 100}
+
+
+@dataclass
+class Universe:
+    benchmark: str
+    symbols: np.ndarray  # (n,) str
+    sector_ids: np.ndarray  # (n,) int
+    sector_names: List[str]
+    weights: np.ndarray  # (n,) benchmark weights, sum 1
+    prices: np.ndarray  # (n,) last price
+    index_of: Dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if not self.index_of:
+            self.index_of = {s: i for i, s in enumerate(self.symbols.tolist())}
+
+    @property
+    def size(self) -> int:
+        return len(self.symbols)
+
+    def sector_weights(self, weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """Per-sector totals; accepts (n,) or (m, n)."""
+        w = self.weights if weights is None else weights
+        onehot = np.eye(len(self.sector_names))[self.sector_ids]
+        return w @ onehot
+
+    def sector_of(self, name: str) -> int:
+        return self.sector_names.index(name)
+
+
+def _demo_universe(benchmark: str) -> Universe:
+    n = BENCHMARK_SIZES.get(benchmark, 500)
+    rng = np.random.default_rng(zlib.crc32(benchmark.encode()))
+    sectors = list(_SECTOR_MIX)
+    counts = np.maximum(
+        np.round(np.array([_SECTOR_MIX[s] for s in sectors]) * n).astype(int), 1
+    )
+    counts[0] += n - counts.sum()
+
+    symbols: List[str] = []
+    sector_ids: List[int] = []
+    weights: List[float] = []
+    for g, (sector, count) in enumerate(zip(sectors, counts)):
+        leaders = SECTOR_LEADERS[sector][: min(count, len(SECTOR_LEADERS[sector]))]
+        prefix = _TAIL_PREFIX.get(sector, sector[:3].upper())
+        tail = [f"{prefix}{i:03d}" for i in range(count - len(leaders))]
+        names = leaders + tail
+        # Zipf-like cap profile inside the sector, scaled to the sector weight
+        raw = 1.0 / np.arange(1, len(names) + 1) ** 1.1
+        raw *= rng.uniform(0.8, 1.2, len(names))
+        raw[: len(leaders)] = np.sort(raw[: len(leaders)])[::-1]
+        raw = raw / raw.sum() * _SECTOR_MIX[sector]
+        symbols.extend(names)
+        sector_ids.extend([g] * len(names))
+        weights.extend(raw.tolist())
+
+    w = np.asarray(weights)
+    return Universe(
+        benchmark=benchmark,
+        symbols=np.asarray(symbols),
+        sector_ids=np.asarray(sector_ids),
+        sector_names=sectors,
+        weights=w / w.sum(),
+        prices=np.round(rng.lognormal(np.log(120), 0.7, len(symbols)), 2),
+    )
+
+
+_providers: Dict[str, Callable[[str], Universe]] = {}
+
+
+def register_universe(benchmark: str, provider: Callable[[str], Universe]) -> None:
+    """Plug in a real constituent feed for one benchmark."""
+    _providers[benchmark] = provider
+    get_universe.cache_clear()
+
+
+@lru_cache(maxsize=16)
+def get_universe(benchmark: str) -> Universe:
+    return _providers.get(benchmark, _demo_universe)(benchmark)
+
+
+def excluded_symbols(exclusions: Iterable[str]) -> Set[str]:
+    """Screens by id or display name ("fossil_fuel" / "Fossil Fuel Extraction")."""
+    out: Set[str] = set()
+    for raw in exclusions:
+        key = raw.strip().lower()
+        for cid, cat in EXCLUSION_CATEGORIES.items():
+            if key == cid or key == cat["name"].lower() or cat["name"].lower().startswith(key):
+                out |= cat["symbols"]
+    return out
+
+
+def allowed_mask(universe: Universe, exclusions: Iterable[str]) -> np.ndarray:
+    """(n,) bool: not excluded by a screen, a sector name, or a raw symbol."""
+    exclusions = list(exclusions)
+    blocked = excluded_symbols(exclusions)
+    lowered = {e.strip().lower() for e in exclusions}
+    blocked |= {e.strip().upper() for e in exclusions if e.strip().upper() in universe.index_of}
+    mask = ~np.isin(universe.symbols, list(blocked)) if blocked else np.ones(universe.size, bool)
+    for g, name in enumerate(universe.sector_names):
+        if name.lower() in lowered:
+            mask &= universe.sector_ids != g
+    return mask
@@ -0,0 +1,432 @@
+"""
+Batched email delivery through a transactional outbox.
+
+Callers add rows with enqueue_email() inside their own transaction, so the
+email goes out only if the change that caused it commits. drain_outbox()
+(a scheduler job) then does the following:
+  1. claims due rows with FOR UPDATE SKIP LOCKED, so drainers never overlap;
+  2. groups rows with the same sender, subject and body into one SendGrid
+     request with up to 1000 personalizations (per-recipient substitutions);
+  3. sends the requests over a shared async HTTP client with a concurrency
+     cap, retrying 429/5xx briefly in process;
+  4. records outcomes in bulk. Transient failures go back to pending with
+     exponential backoff; rows fail for good after MAX_ATTEMPTS.
+
+If a batch is rejected outright (4xx), its messages are resent one by one,
+so a single bad address fails only its own row.
+
+Metrics (latency histograms):
+  email.batch     provider request time, outcome ok / retry / failed
+  email.delivery  enqueue -> accepted by provider, per message
+
+FakeSendGrid is an in-process HTTP sink that speaks the same API, for tests
+and local runs.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+import httpx
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.config.settings import settings
+from backend.models.outbox import OutboundEmail
+from backend.services.latency import histogram
+
+logger = logging.getLogger(__name__)
+
+SENDGRID_URL = "https://api.sendgrid.com/v3/mail/send"
+MAX_PERSONALIZATIONS = 1000  # SendGrid limit per request
+MAX_ATTEMPTS = 6
+CLAIM_LEASE = timedelta(minutes=10)  # a crashed drainer's rows come back after this
+SEND_CONCURRENCY = 4
+INLINE_RETRIES = 2
+INLINE_BACKOFF = 0.5  # seconds, doubled per inline retry
+
+
+class DeliveryError(Exception):
+    def __init__(self, message: str, transient: bool, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.transient = transient
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class OutboxMessage:
+    """Detached copy of an outbox row, safe to use after the claim commits."""
+
+    id: UUID
+    to_email: str
+    subject: str
+    html_content: str
+    from_email: Optional[str] = None
+    from_name: Optional[str] = None
+    substitutions: Optional[Dict[str, str]] = None
+    attempts: int = 0
+    created_at: Optional[datetime] = None
+
+    @classmethod
+    def from_row(cls, row: OutboundEmail) -> "OutboxMessage":
+        return cls(
+            id=row.id,
+            to_email=row.to_email,
+            subject=row.subject,
+            html_content=row.html_content,
+            from_email=row.from_email,
+            from_name=row.from_name,
+            substitutions=row.substitutions,
+            attempts=row.attempts or 0,
+            created_at=row.created_at,
+        )
+
+
+@dataclass
+class Outcome:
+    status: str  # sent | retry | failed
+    error: Optional[str] = None
+
+
+@dataclass
+class DrainResult:
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+    suppressed: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    outcomes: Dict[UUID, Outcome] = field(default_factory=dict, repr=False)
+
+    @property
+    def per_second(self) -> float:
+        return self.sent / self.seconds if self.seconds else 0.0
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _backoff(attempts: int) -> timedelta:
+    """1 min, 2, 4, 8 ... capped at 1 hour, with jitter."""
+    seconds = min(3600, 60 * 2 ** max(0, attempts - 1))
+    return timedelta(seconds=seconds * random.uniform(0.8, 1.2))
+
+
+# ─── Enqueue ────────────────────────────────────────────────────
+
+
+def enqueue_email(
+    db: AsyncSession,
+    to_email: str,
+    subject: str,
+    html_content: str,
+    substitutions: Optional[Dict[str, str]] = None,
+    category: Optional[str] = None,
+    from_email: Optional[str] = None,
+    from_name: Optional[str] = None,
+) -> OutboundEmail:
+    """Queue an email; it is sent once the caller's transaction commits."""
+    row = OutboundEmail(
+        to_email=to_email,
+        subject=subject,
+        html_content=html_content,
+        substitutions=substitutions or None,
+        category=category,
+        from_email=from_email,
+        from_name=from_name,
+        status="pending",
+        attempts=0,
+    )
+    db.add(row)
+    return row
+
+
+# ─── Batching and transport ─────────────────────────────────────
+
+
+def plan_batches(
+    messages: Iterable[OutboxMessage], max_size: int = MAX_PERSONALIZATIONS
+) -> List[List[OutboxMessage]]:
+    """Group messages that share sender, subject and body, in arrival order."""
+    groups: Dict[Tuple, List[OutboxMessage]] = {}
+    for m in messages:
+        key = (m.from_email, m.from_name, m.subject, m.html_content)
+        groups.setdefault(key, []).append(m)
+    return [msgs[i:i + max_size] for msgs in groups.values() for i in range(0, len(msgs), max_size)]
+
+
+def sendgrid_payload(batch: List[OutboxMessage]) -> Dict[str, Any]:
+    first = batch[0]
+    sender = {"email": first.from_email or settings.sendgrid_from_email}
+    if first.from_name or settings.sendgrid_from_name:
+        sender["name"] = first.from_name or settings.sendgrid_from_name
+    personalizations = []
+    for m in batch:
+        p: Dict[str, Any] = {"to": [{"email": m.to_email}], "custom_args": {"outbox_id": str(m.id)}}
+        if m.substitutions:
+            p["substitutions"] = m.substitutions
+        personalizations.append(p)
+    return {
+        "personalizations": personalizations,
+        "from": sender,
+        "subject": first.subject,
+        "content": [{"type": "text/html", "value": first.html_content}],
+    }
+
+
+class SendGridTransport:
+    """SendGrid v3 mail/send over a shared async HTTP client."""
+
+    def __init__(
+        self,
+        api_key: str,
+        client: Optional[httpx.AsyncClient] = None,
+        url: str = SENDGRID_URL,
+    ) -> None:
+        self.url = url
+        self.client = client or httpx.AsyncClient(
+            timeout=30, limits=httpx.Limits(max_connections=SEND_CONCURRENCY * 2)
+        )
+        self.headers = {"Authorization": f"Bearer {api_key}"}
+
+    async def send(self, batch: List[OutboxMessage]) -> None:
+        try:
+            resp = await self.client.post(self.url, json=sendgrid_payload(batch), headers=self.headers)
+        except httpx.HTTPError as e:
+            raise DeliveryError(f"transport: {e}", transient=True)
+        if 200 <= resp.status_code < 300:
+            return
+        retry_after = resp.headers.get("Retry-After")
+        raise DeliveryError(
+            f"HTTP {resp.status_code}: {resp.text[:200]}",
+            transient=resp.status_code == 429 or resp.status_code >= 500,
+            retry_after=float(retry_after) if retry_after else None,
+        )
+
+
+_transport: Optional[SendGridTransport] = None
+
+
+def get_transport() -> Optional[SendGridTransport]:
+    """Process-wide transport, or None when SendGrid is not configured."""
+    global _transport
+    if _transport is None and settings.sendgrid_api_key:
+        _transport = SendGridTransport(settings.sendgrid_api_key)
+    return _transport
+
+
+async def _send_with_retries(transport, batch: List[OutboxMessage]) -> Optional[DeliveryError]:
+    for attempt in range(INLINE_RETRIES + 1):
+        t0 = time.perf_counter()
+        try:
+            await transport.send(batch)
+            histogram("email.batch").observe((time.perf_counter() - t0) * 1000)
+            return None
+        except DeliveryError as e:
+            histogram("email.batch").observe(
+                (time.perf_counter() - t0) * 1000, "retry" if e.transient else "failed"
+            )
+            if not e.transient or attempt == INLINE_RETRIES:
+                return e
+            delay = e.retry_after if e.retry_after is not None else INLINE_BACKOFF * 2 ** attempt
+            await asyncio.sleep(min(delay, 5.0))
+    return None  # unreachable
+
+
+async def deliver(
+    messages: List[OutboxMessage], transport, concurrency: int = SEND_CONCURRENCY
+) -> DrainResult:
+    """Send messages in batches; never raises, returns an outcome per message."""
+    result = DrainResult()
+    limit = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+
+    async def run(batch: List[OutboxMessage]) -> None:
+        async with limit:
+            error = await _send_with_retries(transport, batch)
+        result.batches += 1
+        if error is not None and not error.transient and len(batch) > 1:
+            # One bad recipient rejects the whole request: isolate it
+            await asyncio.gather(*(run([m]) for m in batch))
+            return
+        now = _now()
+        for m in batch:
+            if error is None:
+                result.outcomes[m.id] = Outcome("sent")
+                if m.created_at:
+                    histogram("email.delivery").observe((now - m.created_at).total_seconds() * 1000)
+            elif error.transient and m.attempts + 1 < MAX_ATTEMPTS:
+                result.outcomes[m.id] = Outcome("retry", str(error))
+            else:
+                result.outcomes[m.id] = Outcome("failed", str(error))
+
+    await asyncio.gather(*(run(b) for b in plan_batches(messages)))
+    for outcome in result.outcomes.values():
+        if outcome.status == "sent":
+            result.sent += 1
+        elif outcome.status == "retry":
+            result.retried += 1
+        else:
+            result.failed += 1
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+# ─── Outbox worker ──────────────────────────────────────────────
+
+
+async def claim_due(db: AsyncSession, limit: int) -> List[OutboxMessage]:
+    """Lease up to `limit` due rows to this drainer and commit the claim."""
+    now = _now()
+    rows = (
+        await db.execute(
+            select(OutboundEmail)
+            .where(
+                OutboundEmail.status.in_(("pending", "sending")),
+                OutboundEmail.next_attempt_at <= now,
+            )
+            .order_by(OutboundEmail.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+    ).scalars().all()
+    for row in rows:
+        row.status = "sending"
+        row.next_attempt_at = now + CLAIM_LEASE
+    messages = [OutboxMessage.from_row(r) for r in rows]
+    await db.commit()
+    return messages
+
+
+async def record_outcomes(
+    db: AsyncSession, messages: List[OutboxMessage], result: DrainResult
+) -> None:
+    """Write outcomes back with one UPDATE per outcome group."""
+    now = _now()
+    sent = [m.id for m in messages if result.outcomes[m.id].status == "sent"]
+    if sent:
+        await db.execute(
+            update(OutboundEmail)
+            .where(OutboundEmail.id.in_(sent))
+            .values(status="sent", sent_at=now, attempts=OutboundEmail.attempts + 1, last_error=None)
+        )
+    failed: Dict[str, List[UUID]] = defaultdict(list)
+    retry: Dict[Tuple[int, str], List[UUID]] = defaultdict(list)
+    for m in messages:
+        outcome = result.outcomes[m.id]
+        if outcome.status == "failed":
+            failed[outcome.error or ""].append(m.id)
+        elif outcome.status == "retry":
+            retry[(m.attempts + 1, outcome.error or "")].append(m.id)
+    for error, ids in failed.items():
+        await db.execute(
+            update(OutboundEmail)
+            .where(OutboundEmail.id.in_(ids))
+            .values(status="failed", attempts=OutboundEmail.attempts + 1, last_error=error)
+        )
+    for (attempts, error), ids in retry.items():
+        await db.execute(
+            update(OutboundEmail)
+            .where(OutboundEmail.id.in_(ids))
+            .values(
+                status="pending",
+                attempts=attempts,
+                next_attempt_at=now + _backoff(attempts),
+                last_error=error,
+            )
+        )
+    await db.commit()
+
+
+async def _suppress(db: AsyncSession, messages: List[OutboxMessage]) -> None:
+    await db.execute(
+        update(OutboundEmail)
+        .where(OutboundEmail.id.in_([m.id for m in messages]))
+        .values(status="suppressed")
+    )
+    await db.commit()
+
+
+async def drain_outbox(
+    session_factory, transport=None, batch_size: int = 2000, max_rounds: int = 20
+) -> DrainResult:
+    """Deliver everything due, up to batch_size x max_rounds messages."""
+    transport = transport or get_transport()
+    total = DrainResult()
+    started = time.perf_counter()
+    for _ in range(max_rounds):
+        async with session_factory() as db:
+            messages = await claim_due(db, batch_size)
+            if not messages:
+                break
+            if transport is None:
+                logger.info("SendGrid not configured — %d queued emails suppressed", len(messages))
+                await _suppress(db, messages)
+                total.suppressed += len(messages)
+                continue
+            result = await deliver(messages, transport)
+            await record_outcomes(db, messages, result)
+        total.sent += result.sent
+        total.retried += result.retried
+        total.failed += result.failed
+        total.batches += result.batches
+    total.seconds = time.perf_counter() - started
+    if total.sent or total.retried or total.failed:
+        logger.info(
+            "Email outbox drained: %d sent, %d retrying, %d failed in %d requests (%.0f msg/s)",
+            total.sent, total.retried, total.failed, total.batches, total.per_second,
+        )
+    return total
+
+
+# ─── Local sink ─────────────────────────────────────────────────
+
+
+class FakeSendGrid(httpx.AsyncBaseTransport):
+    """
+    In-process stand-in for the SendGrid mail/send endpoint. Records each
+    delivered message with substitutions applied. Can be told to fail the
+    next N requests with a status, or to reject given addresses with 400
+    as the real API does.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.requests: List[Dict[str, Any]] = []
+        self.delivered: List[Dict[str, str]] = []
+        self.rejected: set = set()
+        self._failures: List[int] = []
+
+    def fail_next(self, status: int, times: int = 1) -> None:
+        self._failures.extend([status] * times)
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=self, base_url="https://sink.local")
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        body = json.loads(request.content)
+        self.requests.append(body)
+        if self._failures:
+            status = self._failures.pop(0)
+            headers = {"Retry-After": "0"} if status == 429 else {}
+            return httpx.Response(status, headers=headers, json={"errors": [{"message": "injected"}]})
+        bad = [p["to"][0]["email"] for p in body["personalizations"] if p["to"][0]["email"] in self.rejected]
+        if bad:
+            return httpx.Response(400, json={"errors": [{"message": f"invalid email {bad[0]}"}]})
+        html = body["content"][0]["value"]
+        for p in body["personalizations"]:
+            rendered = html
+            for token, value in (p.get("substitutions") or {}).items():
+                rendered = rendered.replace(token, value)
+            self.delivered.append({"to": p["to"][0]["email"], "subject": body["subject"], "html": rendered})
+        return httpx.Response(202)
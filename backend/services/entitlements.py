@@ -24,12 +24,16 @@ class EntitlementService:
         tier_config = TIER_FEATURES.get(tier, TIER_FEATURES["free"])
         return bool(tier_config.get(feature, False))
 
+    def get_usage_limit(self, user: Optional["User"], feature: str) -> int:
+        """Monthly limit for a usage feature (-1 = unlimited)."""
+        tier = (user.subscription_tier or "free") if user else "free"
+        tier_config = TIER_FEATURES.get(tier, TIER_FEATURES["free"])
+        return tier_config.get(feature, 0)
+
     def check_usage_limit(
         self, user: Optional["User"], feature: str, current_count: int
     ) -> bool:
-        tier = (user.subscription_tier or "free") if user else "free"
-        tier_config = TIER_FEATURES.get(tier, TIER_FEATURES["free"])
-        limit = tier_config.get(feature, 0)
+        limit = self.get_usage_limit(user, feature)
         if limit == -1:
             return True
         return current_count < limit
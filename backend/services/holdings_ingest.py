@@ -0,0 +1,398 @@
+"""
+Streaming ingestion of brokerage CSV/XLSX exports.
+
+The first SNIFF_BYTES of a file decide everything: encoding (BOM, else UTF-8,
+else cp1252), delimiter, and which row is the header (custodian exports put
+account banners and blank lines above it). Headers are mapped to canonical
+fields once, through the alias table below, and the rest of the file is read
+in CHUNK_ROWS slices of only the mapped columns, so a 100k-row history is
+parsed in bounded memory rather than as one DataFrame.
+
+Money and quantity columns are parsed with vectorized string ops:
+"$1,234.50 ", "(12.00)", "-3", "--" and "N/A" all become floats or NaN
+without a Python call per cell. Each numeric column's decimal mark is
+sniffed from its sample values ("1.234,56" and "400,5" have a decimal
+comma); columns with no telling value default to a decimal comma in
+';'-delimited files, the European export convention, and a point elsewhere.
+
+Canonical fields: symbol, description, quantity, price, market_value,
+cost_basis, security_type.
+"""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+import re
+import statistics
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple, Union
+
+import pandas as pd
+
+SNIFF_BYTES = 64 * 1024
+CHUNK_ROWS = 20_000
+_HEADER_SCAN_ROWS = 30
+_DELIMITERS = (",", ";", "\t", "|")
+
+Source = Union[bytes, str, Path, BinaryIO]
+
+# ─── Column aliases ─────────────────────────────────────────────
+
+# Exact aliases first; a field with no exact match falls back to the first
+# header containing one of its aliases, in this order.
+COLUMN_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "symbol": (
+        "symbol", "ticker", "sym", "fund symbol", "underlying symbol", "base symbol",
+        "symbol/cusip", "cusip",
+    ),
+    "description": (
+        "description", "security description", "security name", "name", "fund name",
+        "investment name", "asset name", "instrument name", "holding name", "security",
+        "instrument", "investment", "holding",
+    ),
+    "quantity": (
+        "quantity", "qty", "shares", "share quantity", "number of shares", "units",
+        "position size",
+    ),
+    "price": (
+        "price", "last price", "market price", "current price", "closing price",
+        "share price", "price per share",
+    ),
+    "market_value": (
+        "market value", "mkt val", "current value", "current market value", "value",
+        "total value", "position value", "equity value", "value in usd", "balance",
+        "amount",
+    ),
+    "cost_basis": ("cost basis", "total cost", "cost", "book value"),
+    "security_type": (
+        "security type", "asset class", "asset type", "investment type", "type",
+    ),
+}
+NUMERIC_FIELDS = ("quantity", "price", "market_value", "cost_basis")
+
+_EXACT: Dict[str, str] = {
+    alias: name for name, aliases in COLUMN_ALIASES.items() for alias in aliases
+}
+_FUZZY: Tuple[Tuple[str, re.Pattern], ...] = tuple(
+    (name, re.compile(rf"\b{re.escape(alias)}\b"))
+    for name, aliases in COLUMN_ALIASES.items() for alias in aliases
+)
+# Headers of derived columns ("Price Chng %", "Gain $") never stand in for a field
+_DERIVED = re.compile(r"chng|change|gain|%")
+_NOT_DIGITS = re.compile(r"[^\d.]")
+_LAST_SEPARATOR = re.compile(r"([.,])(\d+)\D*$")
+
+
+def normalize_header(value: Any) -> str:
+    return re.sub(r"\s+", " ", str(value if value is not None else "").strip().lower().replace("_", " "))
+
+
+def _variants(header: str) -> Tuple[str, ...]:
+    """"qty (quantity)" is matched as itself, "qty" and "quantity"."""
+    outer = header.split("(", 1)[0].strip()
+    inner = header[len(outer):].strip().strip("()").strip() if "(" in header else ""
+    return tuple(v for v in (header, outer, inner) if v)
+
+
+def map_columns(headers: List[str]) -> Dict[str, int]:
+    """Canonical field -> column index for a header row."""
+    mapped: Dict[str, int] = {}
+    for index, header in enumerate(headers):
+        for variant in _variants(header):
+            name = _EXACT.get(variant)
+            if name and name not in mapped:
+                mapped[name] = index
+                break
+    used = set(mapped.values())
+    for name, pattern in _FUZZY:
+        if name in mapped:
+            continue
+        for index, header in enumerate(headers):
+            if index not in used and not _DERIVED.search(header) and pattern.search(header):
+                mapped[name] = index
+                used.add(index)
+                break
+    return mapped
+
+
+# ─── Vectorized cell parsing ────────────────────────────────────
+
+
+def parse_numbers(column: pd.Series, decimal: str = ".") -> pd.Series:
+    """
+    Money / quantity strings to float ("(1.50)" and "-1.50" are negative).
+    With decimal="," a point or space groups thousands and the comma is the
+    decimal mark ("1.234,5" is 1234.5).
+    """
+    text = column.astype(str).str.strip()
+    negative = (text.str.startswith("(") & text.str.endswith(")")) | text.str.startswith("-")
+    if decimal == ",":
+        text = text.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    values = pd.to_numeric(text.str.replace(_NOT_DIGITS, "", regex=True), errors="coerce")
+    return values.where(~negative, -values)
+
+
+def decimal_mark(values: List[str], default: str = ".") -> str:
+    """
+    A column's decimal mark, from the first value whose last separator can
+    only be one: followed by other than three digits ("400,5", "1,234.50")
+    or preceded by the other separator ("1.234,000").
+    """
+    for value in values:
+        match = _LAST_SEPARATOR.search(value)
+        if not match:
+            continue
+        mark, digits = match.groups()
+        other = "." if mark == "," else ","
+        if len(digits) != 3 or other in value[:match.start()]:
+            return mark
+    return default
+
+
+def _is_number(cell: str) -> bool:
+    digits = _NOT_DIGITS.sub("", cell)
+    return bool(digits) and digits.replace(".", "", 1).isdigit()
+
+
+# ─── Sniffing ───────────────────────────────────────────────────
+
+
+@dataclass
+class Dialect:
+    kind: str  # csv | xlsx
+    encoding: str = "utf-8"
+    delimiter: str = ","
+    header_row: int = 0  # records before the header
+    headers: List[str] = field(default_factory=list)  # normalized
+    columns: Dict[str, int] = field(default_factory=dict)  # field -> column index
+    inferred: Tuple[str, ...] = ()  # fields guessed from sample values, not headers
+    decimals: Dict[str, str] = field(default_factory=dict)  # numeric field -> decimal mark
+
+
+def _decode_head(head: bytes) -> Tuple[str, str]:
+    for bom, encoding in ((codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"),
+                          (codecs.BOM_UTF16_BE, "utf-16")):
+        if head.startswith(bom):
+            return encoding, head.decode(encoding, errors="replace")
+    try:
+        # final=False: a multibyte character cut at the sniff boundary is not an error
+        return "utf-8", codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+    except UnicodeDecodeError:
+        return "cp1252", head.decode("cp1252", errors="replace")
+
+
+def _pick_delimiter(lines: List[str]) -> str:
+    best, best_score = ",", 0.0
+    for delimiter in _DELIMITERS:
+        counts = [len(r) for r in csv.reader(lines, delimiter=delimiter) if any(c.strip() for c in r)]
+        score = statistics.median(counts) if counts else 0
+        if score > best_score:
+            best, best_score = delimiter, score
+    return best
+
+
+def _pick_header(rows: List[List[str]]) -> Tuple[int, List[str], Dict[str, int]]:
+    """The first row naming a security column and an amount column, else the first wordy row."""
+    fallback = None
+    for index, row in enumerate(rows[:_HEADER_SCAN_ROWS]):
+        headers = [normalize_header(c) for c in row]
+        mapped = map_columns(headers)
+        if ({"symbol", "description"} & mapped.keys()) and (
+            {"market_value", "quantity"} & mapped.keys()
+        ):
+            return index, headers, mapped
+        words = [c for c in headers if c and not _is_number(c)]
+        if fallback is None and len(words) >= 2:
+            fallback = (index, headers, mapped)
+    if fallback is None:
+        raise ValueError("File appears to be empty")
+    return fallback
+
+
+def _infer(dialect: Dialect, sample: List[List[str]]) -> None:
+    """Guess a security column and an amount column from values when headers don't say."""
+    width = len(dialect.headers)
+    columns = [[r[i].strip() for r in sample if i < len(r) and r[i].strip()] for i in range(width)]
+    mapped = dialect.columns
+    inferred = []
+    if not ({"symbol", "description"} & mapped.keys()):
+        for i, values in enumerate(columns):
+            words = [v for v in values if any(c.isalpha() for c in v)]
+            if values and len(words) / len(values) > 0.5 and i not in mapped.values():
+                mapped["symbol"] = i
+                inferred.append("symbol")
+                break
+    if not ({"market_value", "quantity"} & mapped.keys()):
+        for i, values in enumerate(columns):
+            numbers = [v for v in values if _is_number(v)]
+            if values and len(numbers) / len(values) > 0.5 and i not in mapped.values():
+                mapped["market_value"] = i
+                inferred.append("market_value")
+                break
+    dialect.inferred = tuple(inferred)
+
+
+# ─── Reader ─────────────────────────────────────────────────────
+
+
+def _open(source: Source) -> Tuple[BinaryIO, bool]:
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source), True
+    if isinstance(source, (str, Path)):
+        return open(source, "rb"), True
+    return source, False
+
+
+class HoldingsReader:
+    """
+    Sniff a holdings export and yield it as DataFrames of canonical fields
+    (text fields as str, numeric fields as float). Blocking; run in a thread.
+    """
+
+    def __init__(
+        self,
+        source: Source,
+        filename: str,
+        chunk_rows: int = CHUNK_ROWS,
+        infer_columns: bool = False,
+    ) -> None:
+        ext = filename.lower().rsplit(".", 1)[-1]
+        if ext == "csv":
+            kind = "csv"
+        elif ext in {"xlsx", "xls"}:
+            kind = "xlsx"
+        else:
+            raise ValueError(f"Unsupported file type: {ext}")
+        self.source = source
+        self.chunk_rows = chunk_rows
+        self.infer_columns = infer_columns
+        self.dialect = Dialect(kind)
+        self.rows_read = 0
+
+    @property
+    def columns(self) -> Dict[str, int]:
+        return self.dialect.columns
+
+    @property
+    def headers(self) -> List[str]:
+        return self.dialect.headers
+
+    def chunks(self) -> Iterator[pd.DataFrame]:
+        fh, owned = _open(self.source)
+        try:
+            if self.dialect.kind == "csv":
+                yield from self._csv_chunks(fh)
+            else:
+                yield from self._xlsx_chunks(fh)
+        finally:
+            if owned:
+                fh.close()
+
+    def _sniffed(self, rows: List[List[str]]) -> List[List[str]]:
+        """Set header and column map from the first rows; returns the sample body rows."""
+        d = self.dialect
+        d.header_row, d.headers, d.columns = _pick_header(rows)
+        sample = rows[d.header_row + 1:]
+        if self.infer_columns:
+            _infer(d, sample)
+        default = "," if d.delimiter == ";" else "."
+        for name, index in d.columns.items():
+            if name in NUMERIC_FIELDS:
+                values = [r[index].strip() for r in sample if index < len(r) and r[index].strip()]
+                d.decimals[name] = decimal_mark(values, default)
+        return sample
+
+    def _frame(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Rename index-labelled columns to fields and parse the numeric ones."""
+        out = pd.DataFrame(index=frame.index)
+        for name, index in self.dialect.columns.items():
+            column = frame[index] if index in frame.columns else pd.Series("", index=frame.index)
+            if name in NUMERIC_FIELDS:
+                out[name] = parse_numbers(column.fillna(""), self.dialect.decimals.get(name, "."))
+            else:
+                out[name] = column.fillna("").astype(str).str.strip()
+        self.rows_read += len(out)
+        return out
+
+    def _csv_chunks(self, fh: BinaryIO) -> Iterator[pd.DataFrame]:
+        start = fh.tell() if fh.seekable() else 0
+        head = fh.read(SNIFF_BYTES)
+        if not head.strip():
+            raise ValueError("File appears to be empty")
+        d = self.dialect
+        d.encoding, text = _decode_head(head)
+        lines = text.splitlines()
+        if len(head) == SNIFF_BYTES and len(lines) > 1:
+            lines = lines[:-1]  # last line may be cut mid-record
+        d.delimiter = _pick_delimiter(lines[:_HEADER_SCAN_ROWS])
+        self._sniffed(list(csv.reader(lines, delimiter=d.delimiter)))
+        if not d.columns:
+            return
+        if fh.seekable():
+            fh.seek(start)
+        else:  # re-attach the sniffed bytes to the unread rest
+            fh = io.BufferedReader(_Prepend(head, fh))
+        reader = pd.read_csv(
+            fh,
+            sep=d.delimiter,
+            encoding=d.encoding,
+            encoding_errors="replace",
+            header=None,
+            skiprows=d.header_row + 1,
+            usecols=sorted(set(d.columns.values())),
+            dtype=str,
+            keep_default_na=False,
+            skip_blank_lines=True,
+            on_bad_lines="skip",
+            chunksize=self.chunk_rows,
+        )
+        with reader:
+            for frame in reader:
+                yield self._frame(frame)
+
+    def _xlsx_chunks(self, fh: BinaryIO) -> Iterator[pd.DataFrame]:
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(fh, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            as_text = lambda row: ["" if v is None else str(v) for v in row]  # noqa: E731
+            head = [as_text(r) for _, r in zip(range(_HEADER_SCAN_ROWS), rows)]
+            sample = self._sniffed(head)
+            wanted = sorted(set(self.dialect.columns.values()))
+            if not wanted:
+                return
+            batch = [[r[i] if i < len(r) else "" for i in wanted] for r in sample]
+            for row in rows:
+                batch.append([row[i] if i < len(row) and row[i] is not None else "" for i in wanted])
+                if len(batch) >= self.chunk_rows:
+                    yield self._frame(pd.DataFrame(batch, columns=wanted, dtype=object))
+                    batch = []
+            if batch:
+                yield self._frame(pd.DataFrame(batch, columns=wanted, dtype=object))
+        finally:
+            workbook.close()
+
+
+class _Prepend(io.RawIOBase):
+    """Raw stream that replays already-read bytes before the rest of `fh`."""
+
+    def __init__(self, head: bytes, fh: BinaryIO) -> None:
+        self._head = memoryview(head)
+        self._fh = fh
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._head:
+            n = min(len(buffer), len(self._head))
+            buffer[:n] = self._head[:n]
+            self._head = self._head[n:]
+            return n
+        data = self._fh.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
@@ -7,7 +7,7 @@ Orders are NOT submitted automatically — advisor confirms in UI.
 
 import logging
 from datetime import datetime, timezone
-from typing import Optional
+from typing import AsyncIterator, List, Optional
 
 from backend.config.settings import settings
 
@@ -57,12 +57,18 @@ async def submit_tradier_order(
     quantity: Optional[int],
     order_type: str,
     db,
+    symbol: str = "",
+    side: str = "buy",
+    account_id: str = "",
+    pipeline=None,
 ) -> dict:
     """
     Submit an order to Tradier API. Returns order confirmation.
-    Logs the action to compliance_audit_log.
+    Goes through the order pipeline with the recommendation's tag as the
+    idempotency key, so a resubmit of the same rec_id never places a
+    second order.
     """
-    if not settings.tradier_api_key:
+    if not settings.tradier_api_key and pipeline is None:
         logger.info("Tradier not configured — simulating order for rec %s", rec_id)
         return {
             "order_id": f"sim-{rec_id[:8]}",
@@ -70,44 +76,48 @@ async def submit_tradier_order(
             "status": "simulated",
             "message": "Tradier API key not configured — order simulated",
         }
-
-    try:
-        import httpx
-        base = settings.tradier_base_url.rstrip("/")
-        headers = {
-            "Authorization": f"Bearer {settings.tradier_api_key}",
-            "Accept": "application/json",
-        }
-
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.post(
-                f"{base}/accounts/{settings.tradier_account_id}/orders",
-                headers=headers,
-                data={
-                    "class": "equity",
-                    "symbol": "AAPL",
-                    "side": "buy",
-                    "quantity": str(quantity or 1),
-                    "type": order_type,
-                    "duration": "day",
-                    "tag": f"edge-rec-{rec_id}",
-                },
-            )
-            resp.raise_for_status()
-            result = resp.json()
-
-            return {
-                "order_id": result.get("order", {}).get("id", "unknown"),
-                "rec_id": rec_id,
-                "status": "submitted",
-                "submitted_at": datetime.now(timezone.utc).isoformat(),
-            }
-
-    except Exception as e:
-        logger.error("Tradier order submission failed: %s", e)
+    if not symbol:
         return {
             "order_id": None,
             "rec_id": rec_id,
             "status": "failed",
-            "error": str(e),
+            "error": "No symbol for order",
         }
+
+    from backend.services.iim.order_pipeline import OrderLeg, default_pipeline
+
+    leg = OrderLeg(
+        account_id=account_id or settings.tradier_account_id,
+        symbol=symbol,
+        side=side,
+        quantity=quantity or 1,
+        order_type=order_type,
+        key=f"edge-rec-{rec_id}",
+    )
+    try:
+        (update,) = await (pipeline or default_pipeline()).run([leg], track=False)
+    except Exception as e:
+        logger.error("Tradier order submission failed: %s", e)
+        return {"order_id": None, "rec_id": rec_id, "status": "failed", "error": str(e)}
+
+    result = {
+        "order_id": update.order_id,
+        "rec_id": rec_id,
+        "status": update.status,
+        "submitted_at": datetime.now(timezone.utc).isoformat(),
+    }
+    if update.error:
+        result["error"] = update.error
+    return result
+
+
+async def submit_order_batch(orders: List[dict], pipeline=None) -> AsyncIterator[dict]:
+    """
+    Submit many build_order_preview payloads at once: grouped per account,
+    concurrent, idempotent on each payload's tag. Yields status updates.
+    """
+    from backend.services.iim.order_pipeline import default_pipeline, leg_from_preview
+
+    legs = [leg_from_preview(order) for order in orders]
+    async for update in (pipeline or default_pipeline()).stream(legs):
+        yield update.to_dict()
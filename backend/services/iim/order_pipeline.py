@@ -0,0 +1,566 @@
+"""
+Order submission pipeline: grouped, rate-limited, idempotent, streamed.
+
+Executing an approved rebalance signal or a harvest batch means many
+orders across many accounts. OrderPipeline.stream(legs):
+  1. groups legs per broker account. Within an account, sells go first
+     and buys are released once the sells are done, so the proceeds fund
+     the buys;
+  2. submits concurrently under a global and a per-account limit (both
+     caps on in-flight calls and on requests per second);
+  3. gives every leg a deterministic idempotency key, sent as the Tradier
+     order `tag`. Before an account's first submit, and after any
+     ambiguous failure (timeout, 5xx), the account's orders are listed and
+     legs whose tag is already there are not sent again. A retry or a
+     second run of the same batch therefore never double-fills. An order
+     the broker rejected, canceled or expired is sent again under a
+     derived key (`<key>-r1`, `-r2`, ...), which is just as idempotent;
+  4. yields an OrderUpdate for every state change (submitted, duplicate,
+     then broker statuses through filled/rejected/...), polling status
+     until each order is terminal. A duplicate is followed by the order's
+     broker status, so the final update of a leg is never "duplicate"
+     once the order is terminal.
+
+Tradier has no batch endpoint for equity orders ("multileg" is options
+only), so each leg is one call; the grouping and concurrency make up for
+it. A broker with a batch endpoint only needs to implement the same calls
+(submit, orders, status, and quotes for pricing trades given in dollars).
+
+Metrics (latency histograms):
+  broker.submit  order POST time, outcome ok / retry / failed
+
+FakeTradier is an in-process HTTP stand-in that speaks the same API, for
+tests and local runs.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, replace
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+import httpx
+
+from backend.config.settings import settings
+from backend.services.latency import histogram
+
+logger = logging.getLogger(__name__)
+
+TERMINAL = {"filled", "canceled", "rejected", "expired", "error", "failed", "skipped"}
+DEAD = {"canceled", "rejected", "expired"}  # broker statuses after which a leg is sent again
+GLOBAL_CONCURRENCY = 8
+GLOBAL_RATE = 10.0  # requests per second across all accounts
+ACCOUNT_CONCURRENCY = 2
+ACCOUNT_RATE = 2.0  # requests per second per account
+SUBMIT_RETRIES = 3
+SUBMIT_BACKOFF = 0.5  # seconds, doubled per retry
+POLL_INTERVAL = 1.0
+POLL_TIMEOUT = 120.0
+
+
+class BrokerError(Exception):
+    def __init__(self, message: str, transient: bool, ambiguous: bool = False,
+                 retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.transient = transient
+        self.ambiguous = ambiguous  # the order may have reached the broker
+        self.retry_after = retry_after
+
+
+def idempotency_key(*parts: Any) -> str:
+    """Deterministic order tag (Tradier tags: letters, digits and dashes)."""
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()
+    return f"edge-{digest[:24]}"
+
+
+@dataclass(frozen=True)
+class OrderLeg:
+    account_id: str  # broker account
+    symbol: str
+    side: str  # buy | sell
+    quantity: int  # whole shares
+    source: str = ""  # what the leg executes, e.g. "rebalance:<signal id>:3"
+    order_type: str = "market"
+    price: Optional[float] = None  # limit price
+    duration: str = "day"
+    key: str = ""
+
+    def __post_init__(self) -> None:
+        if not self.key:
+            object.__setattr__(
+                self, "key",
+                idempotency_key(self.source, self.account_id, self.symbol, self.side, self.quantity),
+            )
+
+
+@dataclass
+class OrderUpdate:
+    key: str
+    account_id: str
+    symbol: str
+    side: str
+    quantity: int
+    status: str  # submitted | duplicate | <broker status> | failed | skipped
+    order_id: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int = 0
+
+    @classmethod
+    def of(cls, leg: OrderLeg, status: str, **kwargs: Any) -> "OrderUpdate":
+        return cls(leg.key, leg.account_id, leg.symbol, leg.side, leg.quantity, status, **kwargs)
+
+    @property
+    def terminal(self) -> bool:
+        return self.status in TERMINAL
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# ─── Limits ─────────────────────────────────────────────────────
+
+
+class RateLimit:
+    """At most `concurrency` calls in flight and `rate` starts per second."""
+
+    def __init__(self, concurrency: int, rate: float) -> None:
+        self._slots = asyncio.Semaphore(concurrency)
+        self._interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "RateLimit":
+        await self._slots.acquire()
+        if self._interval:
+            async with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next)
+                self._next = start + self._interval
+            if start > now:
+                await asyncio.sleep(start - now)
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self._slots.release()
+
+
+# ─── Tradier ────────────────────────────────────────────────────
+
+
+class TradierBroker:
+    """Tradier brokerage API: one order per call, tags as idempotency keys."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        self.base = (base_url or settings.tradier_base_url).rstrip("/")
+        self.client = client or httpx.AsyncClient(
+            timeout=30, limits=httpx.Limits(max_connections=GLOBAL_CONCURRENCY * 2)
+        )
+        self.headers = {
+            "Authorization": f"Bearer {api_key or settings.tradier_api_key}",
+            "Accept": "application/json",
+        }
+
+    async def _request(self, method: str, path: str, **kwargs: Any) -> Dict[str, Any]:
+        try:
+            resp = await self.client.request(method, f"{self.base}{path}", headers=self.headers, **kwargs)
+        except httpx.ConnectError as e:
+            raise BrokerError(f"connect: {e}", transient=True)
+        except httpx.HTTPError as e:  # timeouts, dropped connections: the request may have landed
+            raise BrokerError(f"transport: {e!r}", transient=True, ambiguous=True)
+        if 200 <= resp.status_code < 300:
+            return resp.json()
+        retry_after = resp.headers.get("Retry-After")
+        raise BrokerError(
+            f"HTTP {resp.status_code}: {resp.text[:200]}",
+            transient=resp.status_code == 429 or resp.status_code >= 500,
+            ambiguous=resp.status_code >= 500,
+            retry_after=float(retry_after) if retry_after else None,
+        )
+
+    async def submit(self, leg: OrderLeg) -> str:
+        data = {
+            "class": "equity",
+            "symbol": leg.symbol,
+            "side": leg.side,
+            "quantity": str(leg.quantity),
+            "type": leg.order_type,
+            "duration": leg.duration,
+            "tag": leg.key,
+        }
+        if leg.price is not None:
+            data["price"] = f"{leg.price:.2f}"
+        body = await self._request("POST", f"/accounts/{leg.account_id}/orders", data=data)
+        return str(body.get("order", {}).get("id"))
+
+    async def orders(self, account_id: str) -> Dict[str, Tuple[str, str]]:
+        """tag -> (order id, status) for the account's orders."""
+        # Tradier leaves tags out of the listing unless asked for them
+        body = await self._request("GET", f"/accounts/{account_id}/orders", params={"includeTags": "true"})
+        orders = (body.get("orders") or {}) if isinstance(body.get("orders"), dict) else {}
+        rows = orders.get("order") or []
+        if isinstance(rows, dict):  # Tradier returns a bare object for one order
+            rows = [rows]
+        return {r["tag"]: (str(r["id"]), r.get("status", "")) for r in rows if r.get("tag")}
+
+    async def status(self, account_id: str, order_id: str) -> str:
+        body = await self._request("GET", f"/accounts/{account_id}/orders/{order_id}")
+        return body.get("order", {}).get("status", "")
+
+    async def quotes(self, symbols: List[str]) -> Dict[str, float]:
+        """symbol -> last price, for symbols Tradier has a last trade for."""
+        body = await self._request("GET", "/markets/quotes", params={"symbols": ",".join(symbols)})
+        quotes = (body.get("quotes") or {}) if isinstance(body.get("quotes"), dict) else {}
+        rows = quotes.get("quote") or []
+        if isinstance(rows, dict):
+            rows = [rows]
+        return {r["symbol"]: float(r["last"]) for r in rows if r.get("last")}
+
+
+# ─── Pipeline ───────────────────────────────────────────────────
+
+
+class OrderPipeline:
+    def __init__(
+        self,
+        broker: Any,
+        concurrency: int = GLOBAL_CONCURRENCY,
+        rate: float = GLOBAL_RATE,
+        account_concurrency: int = ACCOUNT_CONCURRENCY,
+        account_rate: float = ACCOUNT_RATE,
+        retries: int = SUBMIT_RETRIES,
+        backoff: float = SUBMIT_BACKOFF,
+        poll_interval: float = POLL_INTERVAL,
+        poll_timeout: float = POLL_TIMEOUT,
+    ) -> None:
+        self.broker = broker
+        self.retries = retries
+        self.backoff = backoff
+        self.poll_interval = poll_interval
+        self.poll_timeout = poll_timeout
+        self._global = RateLimit(concurrency, rate)
+        self._account_limit = (account_concurrency, account_rate)
+        self._accounts: Dict[str, RateLimit] = {}
+
+    def _limit(self, account_id: str) -> RateLimit:
+        limit = self._accounts.get(account_id)
+        if limit is None:
+            limit = self._accounts[account_id] = RateLimit(*self._account_limit)
+        return limit
+
+    async def _call(self, account_id: str, fn, *args: Any) -> Any:
+        async with self._limit(account_id), self._global:
+            return await fn(*args)
+
+    async def quotes(self, symbols: List[str]) -> Dict[str, float]:
+        """Last prices from the broker, under the global limit."""
+        if not symbols:
+            return {}
+        async with self._global:
+            return await self.broker.quotes(symbols)
+
+    async def stream(self, legs: Iterable[OrderLeg], track: bool = True) -> AsyncIterator[OrderUpdate]:
+        """Submit legs; yield every status change as it happens."""
+        queue: asyncio.Queue = asyncio.Queue()
+        by_account: Dict[str, List[OrderLeg]] = defaultdict(list)
+        seen = set()
+        for leg in legs:
+            if leg.key in seen:
+                continue  # the same leg twice in one batch
+            seen.add(leg.key)
+            by_account[leg.account_id].append(leg)
+
+        async def run_all() -> None:
+            try:
+                await asyncio.gather(*(
+                    self._run_account(account_id, account_legs, queue, track)
+                    for account_id, account_legs in by_account.items()
+                ))
+            finally:
+                queue.put_nowait(None)
+
+        runner = asyncio.create_task(run_all())
+        try:
+            while (update := await queue.get()) is not None:
+                yield update
+            await runner
+        finally:
+            if not runner.done():
+                runner.cancel()
+
+    async def run(self, legs: Iterable[OrderLeg], track: bool = True) -> List[OrderUpdate]:
+        """Final update per leg, in submission order."""
+        final: Dict[str, OrderUpdate] = {}
+        async for update in self.stream(legs, track):
+            final[update.key] = update
+        return list(final.values())
+
+    async def _run_account(
+        self, account_id: str, legs: List[OrderLeg], queue: asyncio.Queue, track: bool
+    ) -> None:
+        try:
+            existing = await self._call(account_id, self.broker.orders, account_id)
+        except BrokerError as e:
+            for leg in legs:
+                queue.put_nowait(OrderUpdate.of(leg, "failed", error=f"order lookup: {e}"))
+            return
+        sells = [leg for leg in legs if leg.side.startswith("sell")]
+        buys = [leg for leg in legs if not leg.side.startswith("sell")]
+        for phase in (sells, buys):
+            if phase:
+                await asyncio.gather(*(self._run_leg(leg, existing, queue, track) for leg in phase))
+
+    async def _run_leg(
+        self, leg: OrderLeg, existing: Dict[str, Tuple[str, str]], queue: asyncio.Queue, track: bool
+    ) -> None:
+        base, resend = leg.key, 0
+        while leg.key in existing and existing[leg.key][1] in DEAD:
+            resend += 1
+            leg = replace(leg, key=f"{base}-r{resend}")
+        if leg.key in existing:
+            order_id, status = existing[leg.key]
+            attempts = 0
+            queue.put_nowait(OrderUpdate.of(leg, "duplicate", order_id=order_id))
+            if status in TERMINAL:
+                queue.put_nowait(OrderUpdate.of(leg, status, order_id=order_id))
+        else:
+            update = await self._submit(leg)
+            queue.put_nowait(update)
+            if update.status != "submitted":
+                return
+            order_id, status, attempts = update.order_id, "submitted", update.attempts
+        if track and status not in TERMINAL:
+            await self._track(leg, order_id, status, attempts, queue)
+
+    async def _submit(self, leg: OrderLeg) -> OrderUpdate:
+        for attempt in range(1, self.retries + 2):
+            t0 = time.perf_counter()
+            try:
+                order_id = await self._call(leg.account_id, self.broker.submit, leg)
+                histogram("broker.submit").observe((time.perf_counter() - t0) * 1000)
+                return OrderUpdate.of(leg, "submitted", order_id=order_id, attempts=attempt)
+            except BrokerError as e:
+                last = not e.transient or attempt > self.retries
+                histogram("broker.submit").observe(
+                    (time.perf_counter() - t0) * 1000, "failed" if last else "retry"
+                )
+                if e.ambiguous:
+                    # The order may exist: look for its tag before sending again
+                    try:
+                        found = (await self._call(leg.account_id, self.broker.orders, leg.account_id)).get(leg.key)
+                    except BrokerError:
+                        found = None
+                    if found:
+                        return OrderUpdate.of(leg, "submitted", order_id=found[0], attempts=attempt)
+                if last:
+                    logger.warning("Order %s %s %s failed: %s", leg.key, leg.side, leg.symbol, e)
+                    return OrderUpdate.of(leg, "failed", error=str(e), attempts=attempt)
+                delay = e.retry_after if e.retry_after is not None else self.backoff * 2 ** (attempt - 1)
+                await asyncio.sleep(min(delay, 10.0))
+        return OrderUpdate.of(leg, "failed")  # unreachable
+
+    async def _track(
+        self, leg: OrderLeg, order_id: str, status: str, attempts: int, queue: asyncio.Queue
+    ) -> None:
+        deadline = time.monotonic() + self.poll_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                current = await self._call(leg.account_id, self.broker.status, leg.account_id, order_id)
+            except BrokerError as e:
+                if not e.transient:
+                    queue.put_nowait(OrderUpdate.of(
+                        leg, "error", order_id=order_id, error=str(e), attempts=attempts
+                    ))
+                    return
+                continue
+            if current and current != status:
+                status = current
+                queue.put_nowait(OrderUpdate.of(leg, status, order_id=order_id, attempts=attempts))
+            if status in TERMINAL:
+                return
+        logger.info("Order %s still %s after %.0fs; stopped tracking", order_id, status, self.poll_timeout)
+
+
+# ─── Building legs ──────────────────────────────────────────────
+
+
+def legs_from_trades(
+    account_id: str,
+    trades: List[Dict[str, Any]],
+    source: str,
+    prices: Optional[Dict[str, float]] = None,
+) -> Tuple[List[OrderLeg], List[OrderUpdate]]:
+    """
+    Legs for rebalance trades ({symbol, action, value, shares?, price?}),
+    in whole shares: `shares` when given, else value / price (the trade's
+    own price, then `prices`). Trades with no price or under one share come
+    back as skipped updates.
+    """
+    legs: List[OrderLeg] = []
+    skipped: List[OrderUpdate] = []
+    for i, trade in enumerate(trades):
+        symbol, side = trade["symbol"], trade["action"]
+        shares = trade.get("shares")
+        price = trade.get("price") or (prices or {}).get(symbol)
+        if shares is None and price:
+            shares = float(trade["value"]) / float(price)
+        quantity = int(shares or 0)
+        leg = OrderLeg(account_id, symbol, side, quantity, source=f"{source}:{i}")
+        if quantity < 1:
+            reason = "no price" if shares is None else "under one share"
+            skipped.append(OrderUpdate.of(leg, "skipped", error=reason))
+        else:
+            legs.append(leg)
+    return legs, skipped
+
+
+def leg_from_preview(order: Dict[str, Any]) -> OrderLeg:
+    """Leg for a build_order_preview payload; its tag is the idempotency key."""
+    return OrderLeg(
+        account_id=order["account_id"],
+        symbol=order["symbol"],
+        side=order["side"],
+        quantity=int(order["quantity"]),
+        order_type=order.get("type", "market"),
+        price=order.get("price"),
+        duration=order.get("duration", "day"),
+        key=order.get("tag", ""),
+    )
+
+
+def default_pipeline() -> OrderPipeline:
+    """Pipeline against the configured Tradier account; ValueError if unset."""
+    if not settings.tradier_api_key:
+        raise ValueError("Tradier API key not configured")
+    return OrderPipeline(TradierBroker())
+
+
+def summarize(updates: Iterable[OrderUpdate]) -> Dict[str, Any]:
+    """Final status counts and per-order results, for execution_details."""
+    final = {u.key: u for u in updates}
+    counts: Dict[str, int] = defaultdict(int)
+    for u in final.values():
+        counts[u.status] += 1
+    return {"counts": dict(counts), "orders": [u.to_dict() for u in final.values()]}
+
+
+# ─── Fake broker ────────────────────────────────────────────────
+
+
+class FakeTradier(httpx.AsyncBaseTransport):
+    """
+    In-process stand-in for the Tradier order endpoints. Orders fill after
+    `fill_after` status polls. Can be told to fail the next N submits with
+    a status, to accept the next N submits and then time out (the lost
+    response that makes a retry dangerous), or to reject symbols with 400.
+    Like Tradier, order listings carry tags only with includeTags=true.
+    Quotes come from `quotes`. Records the peak number of concurrent
+    requests, overall and per account.
+    """
+
+    def __init__(self, latency: float = 0.0, fill_after: int = 1) -> None:
+        self.latency = latency
+        self.fill_after = fill_after
+        self.orders: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.submits = 0
+        self.rejected: set = set()
+        self.quotes: Dict[str, float] = {}
+        self.peak = 0
+        self.account_peak: Dict[str, int] = defaultdict(int)
+        self._in_flight = 0
+        self._account_in_flight: Dict[str, int] = defaultdict(int)
+        self._failures: List[int] = []
+        self._timeouts = 0
+        self._next_id = 1000
+
+    def fail_next(self, status: int, times: int = 1) -> None:
+        self._failures.extend([status] * times)
+
+    def timeout_next(self, times: int = 1) -> None:
+        self._timeouts += times
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=self, base_url="https://broker.local")
+
+    def broker(self) -> TradierBroker:
+        return TradierBroker("test-key", "https://broker.local/v1", client=self.client())
+
+    def filled(self, account_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        accounts = [account_id] if account_id else list(self.orders)
+        return [o for a in accounts for o in self.orders[a] if o["status"] == "filled"]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        parts = request.url.path.strip("/").split("/")  # v1 accounts <id> orders [<order id>]
+        if parts[1] == "markets":
+            return self._quotes(request)
+        account = parts[2]
+        tags = request.url.params.get("includeTags") == "true"
+        self._in_flight += 1
+        self._account_in_flight[account] += 1
+        self.peak = max(self.peak, self._in_flight)
+        self.account_peak[account] = max(self.account_peak[account], self._account_in_flight[account])
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if request.method == "POST":
+                return self._submit(request, account)
+            if len(parts) == 5:
+                return self._status(account, parts[4], tags)
+            rows = [self._public(o, tags) for o in self.orders[account]]
+            return httpx.Response(200, json={"orders": {"order": rows} if rows else "null"})
+        finally:
+            self._in_flight -= 1
+            self._account_in_flight[account] -= 1
+
+    def _submit(self, request: httpx.Request, account: str) -> httpx.Response:
+        self.submits += 1
+        if self._failures:
+            status = self._failures.pop(0)
+            headers = {"Retry-After": "0"} if status == 429 else {}
+            return httpx.Response(status, headers=headers, json={"errors": {"error": ["injected"]}})
+        form = {k: v[0] for k, v in parse_qs(request.content.decode()).items()}
+        if form["symbol"] in self.rejected:
+            return httpx.Response(400, json={"errors": {"error": [f"Invalid symbol {form['symbol']}"]}})
+        self._next_id += 1
+        order = {
+            "id": self._next_id,
+            "tag": form.get("tag"),
+            "symbol": form["symbol"],
+            "side": form["side"],
+            "quantity": float(form["quantity"]),
+            "type": form["type"],
+            "status": "pending",
+            "polls": 0,
+        }
+        self.orders[account].append(order)
+        if self._timeouts:
+            self._timeouts -= 1
+            raise httpx.ReadTimeout("injected: order accepted, response lost", request=request)
+        return httpx.Response(200, json={"order": {"id": order["id"], "status": "ok"}})
+
+    def _quotes(self, request: httpx.Request) -> httpx.Response:
+        symbols = request.url.params.get("symbols", "").split(",")
+        rows = [{"symbol": s, "last": self.quotes[s]} for s in symbols if s in self.quotes]
+        return httpx.Response(200, json={"quotes": {"quote": rows} if rows else "null"})
+
+    def _status(self, account: str, order_id: str, tags: bool) -> httpx.Response:
+        order = next((o for o in self.orders[account] if str(o["id"]) == order_id), None)
+        if order is None:
+            return httpx.Response(404, json={"errors": {"error": ["Order not found"]}})
+        order["polls"] += 1
+        if order["status"] == "pending" and order["polls"] >= self.fill_after:
+            order["status"] = "filled"
+        return httpx.Response(200, json={"order": self._public(order, tags)})
+
+    @staticmethod
+    def _public(order: Dict[str, Any], tags: bool) -> Dict[str, Any]:
+        hidden = ("polls",) if tags else ("polls", "tag")
+        return {k: v for k, v in order.items() if k not in hidden}
@@ -9,6 +9,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.models import Account, Position
+from .concentration import household_exposure
 from .schemas import (
     AssetAllocationItem,
     ConcentrationReport,
@@ -83,39 +84,34 @@ class IIMService:
         violations: list[ConcentrationViolation] = []
         if total <= 0:
             return violations
-        by_ticker: dict[str, Decimal] = {}
-        by_sector: dict[str, Decimal] = {}
-        for p in positions:
-            ticker = p.ticker or p.security_name or "UNK"
-            by_ticker[ticker] = by_ticker.get(ticker, Decimal("0")) + p.market_value
-            sector = p.sector or "UNKNOWN"
-            by_sector[sector] = by_sector.get(sector, Decimal("0")) + p.market_value
-        for ticker, val in by_ticker.items():
-            pct = (val / total * 100)
-            if pct > Decimal("10"):
-                violations.append(
-                    ConcentrationViolation(
-                        type="SINGLE_STOCK",
-                        description=f"{ticker} represents {pct:.1f}% of portfolio",
-                        severity="HIGH" if pct > 25 else "MEDIUM",
-                        current_pct=pct,
-                        threshold_pct=Decimal("10"),
-                        suggestion="Consider diversifying.",
-                    )
+        # Look through ETFs: AAPL held directly and inside VOO/VUG is one exposure
+        exposure = household_exposure(positions)
+        for ticker, weight in exposure.concentrated(0.10):
+            pct = Decimal(str(round(weight * 100, 4)))
+            via = [src for src in exposure.contributors(ticker) if src != ticker]
+            note = f" (incl. via {', '.join(via)})" if via else ""
+            violations.append(
+                ConcentrationViolation(
+                    type="SINGLE_STOCK",
+                    description=f"{ticker} represents {pct:.1f}% of portfolio{note}",
+                    severity="HIGH" if pct > 25 else "MEDIUM",
+                    current_pct=pct,
+                    threshold_pct=Decimal("10"),
+                    suggestion="Consider diversifying.",
                 )
-        for sector, val in by_sector.items():
-            pct = (val / total * 100)
-            if pct > Decimal("25"):
-                violations.append(
-                    ConcentrationViolation(
-                        type="SECTOR",
-                        description=f"Sector {sector}: {pct:.1f}%",
-                        severity="HIGH" if pct > 40 else "MEDIUM",
-                        current_pct=pct,
-                        threshold_pct=Decimal("25"),
-                        suggestion="Consider sector rebalancing.",
-                    )
+            )
+        for sector, weight in exposure.sector_breaches(0.25):
+            pct = Decimal(str(round(weight * 100, 4)))
+            violations.append(
+                ConcentrationViolation(
+                    type="SECTOR",
+                    description=f"Sector {sector}: {pct:.1f}%",
+                    severity="HIGH" if pct > 40 else "MEDIUM",
+                    current_pct=pct,
+                    threshold_pct=Decimal("25"),
+                    suggestion="Consider sector rebalancing.",
                 )
+            )
         return violations
 
     async def calculate_fee_impact(self, account_id: str | UUID) -> FeeImpactReport:
@@ -282,20 +278,14 @@ class IIMService:
                 result["positions"] = json.loads(positions_raw)
                 return result
 
-        # Fall back to PostgreSQL snapshot
+        # Fall back to the PostgreSQL holdings time-series
         try:
-            from sqlalchemy import text
-            snap = await self.session.execute(
-                text("""
-                    SELECT holdings FROM accounts_snapshot
-                    WHERE advisor_id = :aid
-                    ORDER BY snapshot_at DESC LIMIT 1
-                """),
-                {"aid": str(advisor_id)},
+            from backend.services.market_data.holdings_store import HoldingsTimeSeriesStore
+            positions = await HoldingsTimeSeriesStore(self.session).latest_positions_for_advisor(
+                advisor_id
             )
-            row = snap.fetchone()
-            if row:
-                result["positions"] = row[0] if isinstance(row[0], list) else [row[0]]
+            if positions:
+                result["positions"] = positions
                 result["stale"] = True
                 result["source"] = "snapshot"
         except Exception:
@@ -0,0 +1,71 @@
+"""
+In-process latency histograms.
+
+Fixed log-spaced millisecond buckets, so observing is O(buckets) with no
+allocation and histograms from different workers can be summed. Each
+histogram also counts outcomes (ok / timeout / error). Everything
+registered here is exposed via latency_stats() (see /api/health).
+"""
+
+import bisect
+import math
+from typing import Dict, Optional
+
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, math.inf)
+
+
+class LatencyHistogram:
+    def __init__(self) -> None:
+        self.counts = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.outcomes: Dict[str, int] = {}
+
+    def observe(self, ms: float, outcome: str = "ok") -> None:
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th percentile (max for the last)."""
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS_MS, self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def as_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max_ms, 2),
+            "outcomes": dict(self.outcomes),
+            "buckets": {
+                ("+inf" if b == math.inf else str(b)): n for b, n in zip(BUCKETS_MS, self.counts) if n
+            },
+        }
+
+
+_registry: Dict[str, LatencyHistogram] = {}
+
+
+def histogram(name: str) -> LatencyHistogram:
+    """Get or create the named histogram."""
+    hist = _registry.get(name)
+    if hist is None:
+        hist = _registry[name] = LatencyHistogram()
+    return hist
+
+
+def latency_stats(prefix: str = "") -> Dict[str, Dict]:
+    return {name: h.as_dict() for name, h in sorted(_registry.items()) if name.startswith(prefix)}
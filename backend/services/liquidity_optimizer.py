@@ -22,9 +22,32 @@ from backend.models.liquidity import (
 )
 from backend.models.account import Account
 from backend.models.position import Position
+from backend.services.lot_engine import LotEngine, Realization
 
 logger = logging.getLogger(__name__)
 
+ZERO = Decimal("0")
+
+
+def _tally(totals: Dict[str, Decimal], realized: Realization) -> None:
+    """Add a line's short- and long-term results to the plan's gain/loss totals."""
+    for term, amount in (("short", realized.short_term), ("long", realized.long_term)):
+        if amount > 0:
+            totals[f"{term}_gains"] += amount
+        elif amount < 0:
+            totals[f"{term}_losses"] -= amount
+
+
+def _apply_totals(plan: WithdrawalPlan, totals: Dict[str, Decimal]) -> None:
+    plan.estimated_short_term_gains = totals["short_gains"]
+    plan.estimated_long_term_gains = totals["long_gains"]
+    plan.estimated_short_term_losses = totals["short_losses"]
+    plan.estimated_long_term_losses = totals["long_losses"]
+
+
+def _totals() -> Dict[str, Decimal]:
+    return {"short_gains": ZERO, "long_gains": ZERO, "short_losses": ZERO, "long_losses": ZERO}
+
 
 class LiquidityOptimizer:
     """
@@ -183,6 +206,50 @@ class LiquidityOptimizer:
         )
         return list(result.scalars().all())
 
+    async def load_lot_engine(
+        self, account_ids: List[UUID], profile: Optional[LiquidityProfile] = None
+    ) -> LotEngine:
+        """Active lots of several accounts, in one query, as a LotEngine."""
+        kwargs = {}
+        if profile and profile.capital_gains_rate_short is not None:
+            kwargs["rates"] = (profile.capital_gains_rate_short, profile.capital_gains_rate_long)
+        if not account_ids:
+            return LotEngine(**kwargs)
+        result = await self.db.execute(
+            select(TaxLot).where(
+                TaxLot.account_id.in_(account_ids),
+                TaxLot.is_active == True,
+                TaxLot.shares > 0
+            )
+        )
+        rows = result.scalars().all()
+        return LotEngine.from_rows(rows, **kwargs)
+
+    @staticmethod
+    def _realize(
+        lots: Optional[LotEngine],
+        account_id: Any,
+        symbol: str,
+        shares: Decimal,
+        price: Decimal,
+        method: LotSelectionMethod,
+        sold_on: Optional[datetime] = None,
+    ) -> Optional[Realization]:
+        """Exact lot-level gain for a planned sale; None when the lots do not cover it."""
+        if lots is None or not account_id or not symbol or shares <= 0:
+            return None
+        if method is LotSelectionMethod.SPEC_ID:
+            method = LotSelectionMethod.FIFO  # lots are picked at execution; estimate with the default
+        try:
+            realized = lots.what_if(
+                account_id, symbol, shares, price,
+                sold_on.date() if isinstance(sold_on, datetime) else sold_on, method
+            )
+        except ValueError as e:
+            logger.warning(f"Lot estimate failed for {symbol}: {e}")
+            return None
+        return realized if realized.reliefs and realized.shortfall == 0 else None
+
     # ==================== WITHDRAWAL OPTIMIZATION ====================
 
     async def create_withdrawal_request(
@@ -232,26 +299,28 @@ class LiquidityOptimizer:
         )
         accounts = list(accounts_result.scalars().all())
 
-        # Get positions for each account
-        positions_by_account: Dict[UUID, List[Position]] = {}
-        for account in accounts:
+        # Positions and open lots for all accounts, one query each
+        positions_by_account: Dict[UUID, List[Position]] = {a.id: [] for a in accounts}
+        if accounts:
             positions_result = await self.db.execute(
-                select(Position).where(Position.account_id == account.id)
+                select(Position).where(Position.account_id.in_(list(positions_by_account)))
             )
-            positions_by_account[account.id] = list(positions_result.scalars().all())
+            for position in positions_result.scalars().all():
+                positions_by_account[position.account_id].append(position)
+        lots = await self.load_lot_engine(list(positions_by_account), profile)
 
         plans = []
 
         # Plan 1: Tax-Optimized (use AI)
         tax_plan = await self._generate_tax_optimized_plan(
-            request, profile, accounts, positions_by_account
+            request, profile, accounts, positions_by_account, lots
         )
         tax_plan.is_recommended = True
         plans.append(tax_plan)
 
         # Plan 2: Preserve Allocation (pro-rata across all positions)
         allocation_plan = await self._generate_allocation_preserving_plan(
-            request, profile, accounts, positions_by_account
+            request, profile, accounts, positions_by_account, lots
         )
         plans.append(allocation_plan)
 
@@ -276,7 +345,8 @@ class LiquidityOptimizer:
         request: WithdrawalRequest,
         profile: LiquidityProfile,
         accounts: List[Account],
-        positions_by_account: Dict[UUID, List[Position]]
+        positions_by_account: Dict[UUID, List[Position]],
+        lots: Optional[LotEngine] = None
     ) -> WithdrawalPlan:
         """Use AI to generate tax-optimized withdrawal plan."""
 
@@ -379,26 +449,16 @@ Return ONLY valid JSON."""
         plan.ai_alternatives_considered = ai_result.get("alternatives_considered")
         plan.estimated_tax_cost = Decimal(str(ai_result.get("estimated_tax_cost", 0)))
 
-        # Create line items
-        total_st_gains = Decimal("0")
-        total_lt_gains = Decimal("0")
-        total_st_losses = Decimal("0")
-        total_lt_losses = Decimal("0")
+        # Create line items; where the account's lots cover a sale, the lot
+        # engine's realized gain replaces the model's estimate
+        totals = _totals()
 
         for idx, item in enumerate(ai_result.get("line_items", [])):
             gain_loss = Decimal(str(item.get("gain_loss", 0)))
             is_short = item.get("is_short_term", False)
-
-            if gain_loss > 0:
-                if is_short:
-                    total_st_gains += gain_loss
-                else:
-                    total_lt_gains += gain_loss
-            else:
-                if is_short:
-                    total_st_losses += abs(gain_loss)
-                else:
-                    total_lt_losses += abs(gain_loss)
+            shares = Decimal(str(item.get("shares_to_sell", 0)))
+            proceeds = Decimal(str(item.get("estimated_proceeds", 0)))
+            cost_basis = Decimal(str(item.get("cost_basis", 0))) if item.get("cost_basis") else None
 
             # Parse account_id (may be string UUID)
             account_id_str = item.get("account_id")
@@ -409,23 +469,38 @@ Return ONLY valid JSON."""
                 except ValueError:
                     pass
 
+            preference = str(item.get("lot_preference") or request.lot_selection.value)
+            try:
+                method = LotSelectionMethod(preference.lower())
+            except ValueError:
+                method = request.lot_selection
+            realized = self._realize(
+                lots, account_id, str(item.get("symbol", "")), shares,
+                proceeds / shares if shares > 0 else ZERO, method, request.requested_date
+            )
+            if realized is not None:
+                gain_loss, cost_basis = realized.gain, realized.basis
+                is_short = not any(r.long_term for r in realized.reliefs)
+                _tally(totals, realized)
+            elif gain_loss > 0:
+                totals["short_gains" if is_short else "long_gains"] += gain_loss
+            else:
+                totals["short_losses" if is_short else "long_losses"] += abs(gain_loss)
+
             line_item = WithdrawalLineItem(
                 plan_id=plan.id,
                 account_id=account_id,
                 symbol=item.get("symbol", "UNKNOWN"),
-                shares_to_sell=Decimal(str(item.get("shares_to_sell", 0))),
-                estimated_proceeds=Decimal(str(item.get("estimated_proceeds", 0))),
-                cost_basis=Decimal(str(item.get("cost_basis", 0))) if item.get("cost_basis") else None,
+                shares_to_sell=shares,
+                estimated_proceeds=proceeds,
+                cost_basis=cost_basis,
                 estimated_gain_loss=gain_loss,
                 is_short_term=is_short,
                 sequence=idx
             )
             self.db.add(line_item)
 
-        plan.estimated_short_term_gains = total_st_gains
-        plan.estimated_long_term_gains = total_lt_gains
-        plan.estimated_short_term_losses = total_st_losses
-        plan.estimated_long_term_losses = total_lt_losses
+        _apply_totals(plan, totals)
 
         await self.db.commit()
         return plan
@@ -435,7 +510,8 @@ Return ONLY valid JSON."""
         request: WithdrawalRequest,
         profile: LiquidityProfile,
         accounts: List[Account],
-        positions_by_account: Dict[UUID, List[Position]]
+        positions_by_account: Dict[UUID, List[Position]],
+        lots: Optional[LotEngine] = None
     ) -> WithdrawalPlan:
         """Generate plan that maintains current allocation (pro-rata)."""
 
@@ -460,8 +536,9 @@ Return ONLY valid JSON."""
         # Withdrawal percentage
         withdrawal_pct = request.requested_amount / total_value
 
-        # Create pro-rata line items
+        # Create pro-rata line items, relieving lots in the request's order
         sequence = 0
+        totals = _totals()
         for account_id, positions in positions_by_account.items():
             for position in positions:
                 if not position.market_value or position.market_value <= 0:
@@ -471,6 +548,12 @@ Return ONLY valid JSON."""
                 proceeds = (position.market_value or Decimal("0")) * withdrawal_pct
 
                 if shares_to_sell > Decimal("0.001"):  # Minimum threshold
+                    realized = self._realize(
+                        lots, account_id, position.ticker, shares_to_sell,
+                        proceeds / shares_to_sell, request.lot_selection, request.requested_date
+                    )
+                    if realized is not None:
+                        _tally(totals, realized)
                     line_item = WithdrawalLineItem(
                         plan_id=plan.id,
                         account_id=account_id,
@@ -478,11 +561,17 @@ Return ONLY valid JSON."""
                         symbol=position.ticker or position.security_name[:20],
                         shares_to_sell=shares_to_sell,
                         estimated_proceeds=proceeds,
+                        cost_basis=realized.basis if realized else None,
+                        estimated_gain_loss=realized.gain if realized else None,
+                        is_short_term=(
+                            not any(r.long_term for r in realized.reliefs) if realized else None
+                        ),
                         sequence=sequence
                     )
                     self.db.add(line_item)
                     sequence += 1
 
+        _apply_totals(plan, totals)
         await self.db.commit()
         return plan
 
@@ -491,7 +580,8 @@ Return ONLY valid JSON."""
         request: WithdrawalRequest,
         profile: LiquidityProfile,
         accounts: List[Account],
-        positions_by_account: Dict[UUID, List[Position]]
+        positions_by_account: Dict[UUID, List[Position]],
+        lots: Optional[LotEngine] = None
     ) -> WithdrawalPlan:
         """Generate plan that maximizes tax loss harvesting."""
 
@@ -522,10 +612,11 @@ Return ONLY valid JSON."""
         # Sort by loss (largest loss first)
         loss_positions.sort(key=lambda x: x["loss"])
 
-        # Create line items prioritizing losses
+        # Create line items prioritizing losses; the loss-first lots of each
+        # position (tax-optimized order) give the exact short/long-term split
         remaining = request.requested_amount
         sequence = 0
-        total_losses = Decimal("0")
+        totals = _totals()
 
         for pos in loss_positions:
             if remaining <= 0:
@@ -537,6 +628,18 @@ Return ONLY valid JSON."""
             shares_pct = proceeds / market_value if market_value > 0 else Decimal("0")
             shares_to_sell = (position.quantity or Decimal("0")) * shares_pct
             loss = pos["loss"] * shares_pct
+            realized = self._realize(
+                lots, pos["account_id"], position.ticker, shares_to_sell,
+                proceeds / shares_to_sell if shares_to_sell > 0 else ZERO,
+                LotSelectionMethod.TAX_OPT, request.requested_date
+            )
+            if realized is not None:
+                loss = realized.gain
+                _tally(totals, realized)
+            else:
+                # No lots behind the position: holding period unknown, split evenly
+                totals["short_losses"] += abs(loss) / 2
+                totals["long_losses"] += abs(loss) / 2
 
             line_item = WithdrawalLineItem(
                 plan_id=plan.id,
@@ -545,18 +648,17 @@ Return ONLY valid JSON."""
                 symbol=position.ticker or position.security_name[:20],
                 shares_to_sell=shares_to_sell,
                 estimated_proceeds=proceeds,
+                cost_basis=realized.basis if realized else None,
                 estimated_gain_loss=loss,
+                is_short_term=not any(r.long_term for r in realized.reliefs) if realized else None,
                 sequence=sequence
             )
             self.db.add(line_item)
 
             remaining -= proceeds
-            total_losses += abs(loss)
             sequence += 1
 
-        # Rough 50/50 split estimate between short/long term
-        plan.estimated_short_term_losses = total_losses / 2
-        plan.estimated_long_term_losses = total_losses / 2
+        _apply_totals(plan, totals)
 
         await self.db.commit()
         return plan
@@ -0,0 +1,536 @@
+"""
+Tax-lot engine: open lots per account and symbol, relieved by selection method.
+
+Each (account, symbol) book holds its open lots once, plus one heap per
+selection method in use, keyed by that method's order:
+
+  FIFO  (acquired, seq)               LIFO  (-acquired, -seq)
+  HIFO  (-basis per share, acquired)  LOFO  (basis per share, acquired)
+
+A heap is built on first use (O(n)) and kept current as lots are added.
+Selling through k lots costs O(k log n). A partial fill leaves the lot on
+top, since no order depends on quantity. A wash-sale adjustment changes a
+lot's basis and holding period, so the lot gets a new version and is
+re-pushed. Entries for closed lots or old versions are dropped when they
+surface (lazy deletion), and a heap is rebuilt once most of it is stale.
+
+SPEC_ID relieves the lots the caller names, in that order. TAX_OPT orders
+lots by tax per share at the sale price: biggest saving first, so losses
+come first, then long-term gains, then short-term gains. That order
+depends on price and date, so TAX_OPT sorts the open lots on each call:
+O(n log n).
+
+What-if queries (what_if, what_if_many) walk the same heaps best-first
+through a small frontier heap, without popping or copying: O(k log k).
+The withdrawal planner, the harvester and the rebalancer ask them before
+anything is sold.
+
+Holding period: a sale is long-term when it is more than one year after
+acquisition (the anniversary itself is still short-term). A wash sale adds
+the disallowed loss to the replacement shares' basis. It also moves their
+holding-period start back by the time the sold shares were held.
+"""
+
+import heapq
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from backend.models.liquidity import LotSelectionMethod
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal("0")
+CENT = Decimal("0.01")
+SHORT_TERM_RATE = Decimal("0.37")
+LONG_TERM_RATE = Decimal("0.20")
+WASH_WINDOW_DAYS = 30
+UNDATED = date(1900, 1, 1)  # lots with no acquisition date sort first and count as long-term
+_STALE_REBUILD = 2  # rebuild a heap once stale entries outnumber live lots this many times
+
+Method = Union[LotSelectionMethod, str]
+
+
+def _dec(value: Any) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(str(value or 0))
+
+
+def _as_date(value: Any) -> date:
+    if value is None:
+        return UNDATED
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+def method_of(method: Method) -> LotSelectionMethod:
+    if isinstance(method, LotSelectionMethod):
+        return method
+    text = str(method).strip().lower()
+    aliases = {"highest cost": "hifo", "lowest cost": "lofo", "specific": "spec_id", "specific_id": "spec_id"}
+    return LotSelectionMethod(aliases.get(text, text))
+
+
+def is_long_term(acquired: date, sold_on: date) -> bool:
+    """Held more than one year: sold after the first anniversary of acquisition."""
+    try:
+        anniversary = acquired.replace(year=acquired.year + 1)
+    except ValueError:  # Feb 29
+        anniversary = date(acquired.year + 1, 2, 28)
+    return sold_on > anniversary
+
+
+# ─── Lots and realizations ──────────────────────────────────────
+
+
+@dataclass(slots=True, eq=False)
+class Lot:
+    id: str
+    account_id: str
+    symbol: str
+    quantity: Decimal
+    basis_per_share: Decimal  # adjusted: includes wash-sale disallowed losses
+    acquired: date  # holding-period start (tacked for wash-sale replacements)
+    wash_adjustment: Decimal = ZERO  # disallowed loss added to this lot's basis
+    seq: int = 0  # insertion order; breaks ties between same-day lots
+    version: int = 0
+
+    @property
+    def basis(self) -> Decimal:
+        return self.basis_per_share * self.quantity
+
+
+@dataclass(frozen=True)
+class Relief:
+    """Shares taken from one lot by a sale."""
+
+    lot_id: str
+    quantity: Decimal
+    proceeds: Decimal
+    basis: Decimal
+    acquired: date
+    long_term: bool
+
+    @property
+    def gain(self) -> Decimal:
+        return self.proceeds - self.basis
+
+
+@dataclass
+class Realization:
+    """Result of a sale or a what-if: per-lot reliefs and gain by holding period."""
+
+    account_id: str
+    symbol: str
+    method: LotSelectionMethod
+    reliefs: List[Relief] = field(default_factory=list)
+    shortfall: Decimal = ZERO  # requested shares with no open lot behind them (what-if only)
+
+    @property
+    def quantity(self) -> Decimal:
+        return sum((r.quantity for r in self.reliefs), ZERO)
+
+    @property
+    def proceeds(self) -> Decimal:
+        return sum((r.proceeds for r in self.reliefs), ZERO)
+
+    @property
+    def basis(self) -> Decimal:
+        return sum((r.basis for r in self.reliefs), ZERO)
+
+    @property
+    def gain(self) -> Decimal:
+        return self.proceeds - self.basis
+
+    @property
+    def short_term(self) -> Decimal:
+        return sum((r.gain for r in self.reliefs if not r.long_term), ZERO)
+
+    @property
+    def long_term(self) -> Decimal:
+        return sum((r.gain for r in self.reliefs if r.long_term), ZERO)
+
+    def tax(self, short_rate: Decimal = SHORT_TERM_RATE, long_rate: Decimal = LONG_TERM_RATE) -> Decimal:
+        """Tax on this realization alone (negative for a net saving)."""
+        return self.short_term * short_rate + self.long_term * long_rate
+
+    def to_dict(self) -> dict:
+        return {
+            "account_id": self.account_id,
+            "symbol": self.symbol,
+            "method": self.method.value,
+            "quantity": float(self.quantity),
+            "proceeds": float(self.proceeds.quantize(CENT)),
+            "cost_basis": float(self.basis.quantize(CENT)),
+            "short_term_gain": float(self.short_term.quantize(CENT)),
+            "long_term_gain": float(self.long_term.quantize(CENT)),
+            "shortfall": float(self.shortfall),
+            "lots": [
+                {"lot_id": r.lot_id, "quantity": float(r.quantity),
+                 "gain": float(r.gain.quantize(CENT)), "long_term": r.long_term}
+                for r in self.reliefs
+            ],
+        }
+
+
+class WhatIf(NamedTuple):
+    account_id: str
+    symbol: str
+    quantity: Any
+    price: Any
+    sold_on: Optional[date] = None
+    method: Method = LotSelectionMethod.FIFO
+    lot_ids: Optional[Sequence[str]] = None
+
+
+# ─── One account's lots in one symbol ───────────────────────────
+
+
+_HEAP_METHODS = {
+    LotSelectionMethod.FIFO,
+    LotSelectionMethod.LIFO,
+    LotSelectionMethod.HIFO,
+    LotSelectionMethod.LOFO,
+}
+
+
+def _key(method: LotSelectionMethod, lot: Lot) -> tuple:
+    day = lot.acquired.toordinal()
+    if method is LotSelectionMethod.FIFO:
+        return (day, lot.seq)
+    if method is LotSelectionMethod.LIFO:
+        return (-day, -lot.seq)
+    if method is LotSelectionMethod.HIFO:
+        return (-lot.basis_per_share, day, lot.seq)
+    return (lot.basis_per_share, day, lot.seq)  # LOFO
+
+
+class LotBook:
+    """Open lots of one symbol in one account, with a heap per selection method."""
+
+    def __init__(self, account_id: str, symbol: str) -> None:
+        self.account_id = account_id
+        self.symbol = symbol
+        self.lots: Dict[str, Lot] = {}
+        self.quantity = ZERO
+        self._heaps: Dict[LotSelectionMethod, list] = {}
+
+    # ── maintenance ──
+
+    def add(self, lot: Lot) -> None:
+        if lot.id in self.lots:
+            raise ValueError(f"Lot {lot.id} is already open")
+        self.lots[lot.id] = lot
+        self.quantity += lot.quantity
+        self._push(lot)
+
+    def _push(self, lot: Lot) -> None:
+        limit = (1 + _STALE_REBUILD) * max(len(self.lots), 1)
+        for method, heap in list(self._heaps.items()):
+            if len(heap) >= limit:
+                del self._heaps[method]  # mostly stale: rebuilt from the open lots on next use
+            else:
+                heapq.heappush(heap, (_key(method, lot), lot.version, lot.id))
+
+    def _live(self, entry: tuple) -> Optional[Lot]:
+        lot = self.lots.get(entry[2])
+        return lot if lot is not None and lot.version == entry[1] else None
+
+    def _heap(self, method: LotSelectionMethod) -> list:
+        heap = self._heaps.get(method)
+        if heap is None or len(heap) > (1 + _STALE_REBUILD) * max(len(self.lots), 1):
+            heap = [(_key(method, lot), lot.version, lot.id) for lot in self.lots.values()]
+            heapq.heapify(heap)
+            self._heaps[method] = heap
+        while heap and self._live(heap[0]) is None:
+            heapq.heappop(heap)
+        return heap
+
+    def touch(self, lot: Lot) -> None:
+        """Re-key a lot whose basis or acquisition date changed."""
+        lot.version += 1
+        self._push(lot)
+
+    # ── ordering ──
+
+    def ordered(
+        self,
+        method: Method,
+        price: Any = None,
+        sold_on: Optional[date] = None,
+        lot_ids: Optional[Sequence[str]] = None,
+        rates: Tuple[Decimal, Decimal] = (SHORT_TERM_RATE, LONG_TERM_RATE),
+    ) -> Iterator[Lot]:
+        """Open lots in relief order for `method`; lazy, nothing is removed."""
+        method = method_of(method)
+        if method is LotSelectionMethod.SPEC_ID:
+            if not lot_ids:
+                raise ValueError("Specific identification needs lot_ids")
+            for lot_id in lot_ids:
+                lot = self.lots.get(str(lot_id))
+                if lot is None:
+                    raise ValueError(f"Lot {lot_id} is not open in {self.symbol}")
+                yield lot
+            return
+        if method is LotSelectionMethod.TAX_OPT:
+            if price is None:
+                raise ValueError("Tax-optimized selection needs a price")
+            p, on = _dec(price), sold_on or date.today()
+            short_rate, long_rate = rates
+
+            def tax_per_share(lot: Lot) -> tuple:
+                rate = long_rate if is_long_term(lot.acquired, on) else short_rate
+                return ((p - lot.basis_per_share) * rate, lot.acquired, lot.seq)
+
+            yield from sorted(self.lots.values(), key=tax_per_share)
+            return
+
+        # Best-first walk of the heap: children of a node are 2i+1 and 2i+2
+        heap = self._heap(method)
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier:
+            entry, i = heapq.heappop(frontier)
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+            lot = self._live(entry)
+            if lot is not None:
+                yield lot
+
+    def select(self, quantity: Decimal, lots: Iterable[Lot]) -> Tuple[List[Tuple[Lot, Decimal]], Decimal]:
+        """(lot, shares) pairs covering `quantity`, and the uncovered shortfall."""
+        picks: List[Tuple[Lot, Decimal]] = []
+        remaining = quantity
+        for lot in lots:
+            if remaining <= 0:
+                break
+            take = min(remaining, lot.quantity)
+            picks.append((lot, take))
+            remaining -= take
+        return picks, max(remaining, ZERO)
+
+    def relieve(self, picks: List[Tuple[Lot, Decimal]]) -> None:
+        for lot, take in picks:
+            lot.quantity -= take
+            self.quantity -= take
+            if lot.quantity <= 0:
+                del self.lots[lot.id]  # heap entries die lazily
+
+
+# ─── Engine ─────────────────────────────────────────────────────
+
+
+class LotEngine:
+    """All open lots, keyed by (account, symbol)."""
+
+    def __init__(self, rates: Tuple[Decimal, Decimal] = (SHORT_TERM_RATE, LONG_TERM_RATE)) -> None:
+        self.books: Dict[Tuple[str, str], LotBook] = {}
+        self.rates = (_dec(rates[0]), _dec(rates[1]))
+        self._seq = 0
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Any], **kwargs: Any) -> "LotEngine":
+        """Engine over TaxLot / HarvestTaxLot rows (ORM objects or dicts)."""
+        engine = cls(**kwargs)
+        for row in rows:
+            if not _is_open(row):
+                continue
+            lot = lot_from_row(row)
+            if lot.quantity > 0:
+                engine.add(lot)
+        return engine
+
+    # ── lots ──
+
+    def book(self, account_id: Any, symbol: str) -> Optional[LotBook]:
+        return self.books.get((str(account_id), symbol.upper()))
+
+    def add(self, lot: Lot) -> Lot:
+        lot.symbol = lot.symbol.upper()
+        lot.account_id = str(lot.account_id)
+        self._seq += 1
+        lot.seq = self._seq
+        key = (lot.account_id, lot.symbol)
+        book = self.books.get(key)
+        if book is None:
+            book = self.books[key] = LotBook(*key)
+        book.add(lot)
+        return lot
+
+    def buy(
+        self,
+        account_id: Any,
+        symbol: str,
+        quantity: Any,
+        price: Any,
+        acquired: Any,
+        lot_id: Optional[str] = None,
+    ) -> Lot:
+        return self.add(Lot(
+            id=lot_id or f"{account_id}:{symbol.upper()}:{self._seq + 1}",
+            account_id=str(account_id),
+            symbol=symbol,
+            quantity=_dec(quantity),
+            basis_per_share=_dec(price),
+            acquired=_as_date(acquired),
+        ))
+
+    def open_lots(self, account_id: Any, symbol: str, method: Method = LotSelectionMethod.FIFO,
+                  price: Any = None, as_of: Optional[date] = None) -> List[Lot]:
+        book = self.book(account_id, symbol)
+        return list(book.ordered(method, price, as_of, rates=self.rates)) if book else []
+
+    def quantity(self, account_id: Any, symbol: str) -> Decimal:
+        book = self.book(account_id, symbol)
+        return book.quantity if book else ZERO
+
+    # ── sales ──
+
+    def _realize(self, order: WhatIf, commit: bool) -> Realization:
+        method = method_of(order.method)
+        sold_on = _as_date(order.sold_on or date.today())
+        quantity, price = _dec(order.quantity), _dec(order.price)
+        book = self.book(order.account_id, order.symbol)
+        out = Realization(str(order.account_id), order.symbol.upper(), method)
+        if book is None:
+            if commit:
+                raise ValueError(f"No open lots of {out.symbol} in account {out.account_id}")
+            out.shortfall = quantity
+            return out
+        lots = book.ordered(method, price, sold_on, order.lot_ids, self.rates)
+        picks, out.shortfall = book.select(quantity, lots)
+        if commit and out.shortfall > 0:
+            raise ValueError(
+                f"Cannot sell {quantity} {out.symbol}: only {quantity - out.shortfall} "
+                f"open in the selected lots of account {out.account_id}"
+            )
+        out.reliefs = [
+            Relief(lot.id, take, take * price, take * lot.basis_per_share, lot.acquired,
+                   is_long_term(lot.acquired, sold_on))
+            for lot, take in picks
+        ]
+        if commit:
+            book.relieve(picks)
+        return out
+
+    def sell(
+        self,
+        account_id: Any,
+        symbol: str,
+        quantity: Any,
+        price: Any,
+        sold_on: Optional[date] = None,
+        method: Method = LotSelectionMethod.FIFO,
+        lot_ids: Optional[Sequence[str]] = None,
+    ) -> Realization:
+        """Relieve open lots for a sale. Raises ValueError if not enough shares are open."""
+        return self._realize(WhatIf(str(account_id), symbol, quantity, price, sold_on, method, lot_ids), True)
+
+    def what_if(
+        self,
+        account_id: Any,
+        symbol: str,
+        quantity: Any,
+        price: Any,
+        sold_on: Optional[date] = None,
+        method: Method = LotSelectionMethod.FIFO,
+        lot_ids: Optional[Sequence[str]] = None,
+    ) -> Realization:
+        """The realization a sale would produce, without relieving anything."""
+        return self._realize(WhatIf(str(account_id), symbol, quantity, price, sold_on, method, lot_ids), False)
+
+    def what_if_many(self, orders: Iterable[WhatIf]) -> List[Realization]:
+        """Bulk what-if; each order is evaluated against the current lots independently."""
+        return [self._realize(order, commit=False) for order in orders]
+
+    def unrealized(self, account_id: Any, symbol: str, price: Any,
+                   as_of: Optional[date] = None) -> Realization:
+        """Selling every open share at `price`: unrealized gain by holding period."""
+        return self.what_if(account_id, symbol, self.quantity(account_id, symbol), price, as_of)
+
+    # ── wash sales ──
+
+    def apply_wash_sale(
+        self,
+        account_id: Any,
+        symbol: str,
+        loss: Relief,
+        sold_on: date,
+        replacement_lot_ids: Optional[Sequence[str]] = None,
+    ) -> List[Lot]:
+        """
+        Disallow a loss relief against replacement shares of `symbol` (the sold
+        security or a substantially identical one). Replacement lots default to
+        those acquired within 30 days either side of the sale, earliest first;
+        a lot only partly covered is split. Each affected lot's basis rises by
+        its share of the disallowed loss and its holding period starts earlier
+        by the time the sold shares were held. Returns the adjusted lots.
+        """
+        if loss.gain >= 0:
+            return []
+        book = self.book(account_id, symbol)
+        if book is None:
+            return []
+        sold_on = _as_date(sold_on)
+        if replacement_lot_ids is None:
+            lo, hi = sold_on - timedelta(days=WASH_WINDOW_DAYS), sold_on + timedelta(days=WASH_WINDOW_DAYS)
+            candidates = [
+                lot for lot in book.ordered(LotSelectionMethod.FIFO)
+                if lo <= lot.acquired <= hi and lot.id != loss.lot_id and not lot.wash_adjustment
+            ]
+        else:
+            candidates = [book.lots[str(i)] for i in replacement_lot_ids if str(i) in book.lots]
+
+        per_share = -loss.gain / loss.quantity
+        tacked = sold_on - loss.acquired
+        remaining = loss.quantity
+        adjusted: List[Lot] = []
+        for lot in candidates:
+            if remaining <= 0:
+                break
+            shares = min(remaining, lot.quantity)
+            if shares < lot.quantity:
+                rest = Lot(f"{lot.id}.{self._seq + 1}", lot.account_id, lot.symbol,
+                           lot.quantity - shares, lot.basis_per_share, lot.acquired,
+                           lot.wash_adjustment * (lot.quantity - shares) / lot.quantity)
+                lot.wash_adjustment -= rest.wash_adjustment
+                book.quantity -= rest.quantity
+                lot.quantity = shares
+                self.add(rest)
+            lot.basis_per_share += per_share
+            lot.wash_adjustment += per_share * shares
+            lot.acquired = lot.acquired - tacked
+            book.touch(lot)
+            adjusted.append(lot)
+            remaining -= shares
+        return adjusted
+
+
+def _is_open(row: Any) -> bool:
+    get = row.get if isinstance(row, dict) else lambda k, d=None: getattr(row, k, d)
+    status = get("status")
+    return get("is_active", True) is not False and getattr(status, "value", status) != "closed"
+
+
+def lot_from_row(row: Any) -> Lot:
+    """TaxLot, HarvestTaxLot (ORM or dict) -> Lot."""
+    get = row.get if isinstance(row, dict) else lambda k, d=None: getattr(row, k, d)
+    remaining = get("remaining_quantity")
+    quantity = _dec(remaining if remaining is not None else (get("shares") or get("quantity")))
+    per_share = get("cost_basis_per_share")
+    adjusted = get("adjusted_cost_basis")
+    if adjusted is not None and get("quantity"):
+        per_share = _dec(adjusted) / _dec(get("quantity"))  # HarvestTaxLot: adjusted total basis
+    return Lot(
+        id=str(get("id")),
+        account_id=str(get("account_id")),
+        symbol=str(get("symbol") or "").upper(),
+        quantity=quantity,
+        basis_per_share=_dec(per_share),
+        acquired=_as_date(get("acquisition_date")),
+        wash_adjustment=_dec(get("wash_sale_adjustment") or 0),
+    )
@@ -1,10 +1,13 @@
-"""Market data services — Tradier WebSocket streaming and Altruist REST polling."""
+"""Market data services — Tradier WebSocket streaming, Altruist REST polling, holdings history."""
 
 from .tradier_ws import tradier_ws_listener
-from .altruist_sync import poll_altruist_holdings, periodic_altruist_poll
+from .altruist_sync import poll_altruist_holdings, poll_all_altruist, periodic_altruist_poll
+from .holdings_store import HoldingsTimeSeriesStore
 
 __all__ = [
     "tradier_ws_listener",
     "poll_altruist_holdings",
+    "poll_all_altruist",
     "periodic_altruist_poll",
+    "HoldingsTimeSeriesStore",
 ]
@@ -39,6 +39,9 @@ async def poll_altruist_holdings(advisor_id: UUID, db) -> bool:
                 return False
             accounts_resp.raise_for_status()
             accounts = accounts_resp.json()
+            households = await _account_households(
+                advisor_id, [acct.get("id", "") for acct in accounts], db
+            )
 
             redis = await get_redis()
 
@@ -61,7 +64,7 @@ async def poll_altruist_holdings(advisor_id: UUID, db) -> bool:
                 snap_key = f"{advisor_id}:{acct_id}"
                 last = _last_snapshot.get(snap_key)
                 if not last or (now - last).total_seconds() > SNAPSHOT_INTERVAL_MINUTES * 60:
-                    await _save_snapshot(advisor_id, acct_id, holdings, db)
+                    await _save_snapshot(advisor_id, acct_id, holdings, db, households.get(acct_id))
                     _last_snapshot[snap_key] = now
 
             if redis:
@@ -80,29 +83,71 @@ async def poll_altruist_holdings(advisor_id: UUID, db) -> bool:
         return False
 
 
-async def _save_snapshot(advisor_id: UUID, account_id: str, holdings: dict, db) -> None:
-    """Save holdings snapshot to PostgreSQL."""
+async def _account_households(advisor_id: UUID, account_ids: list[str], db) -> dict[str, UUID]:
+    """Altruist account id -> household, for the advisor's mapped custodian accounts."""
     try:
-        from sqlalchemy import text
-        await db.execute(
-            text("""
-                INSERT INTO accounts_snapshot (advisor_id, account_id, holdings, source)
-                VALUES (:advisor_id, :account_id, :holdings, 'altruist')
-            """),
-            {
-                "advisor_id": str(advisor_id),
-                "account_id": account_id,
-                "holdings": json.dumps(holdings),
-            },
+        from sqlalchemy import select
+
+        from backend.models.custodian import CustodianAccount, CustodianConnection
+
+        result = await db.execute(
+            select(CustodianAccount.external_account_id, CustodianAccount.household_id)
+            .join(CustodianConnection, CustodianAccount.connection_id == CustodianConnection.id)
+            .where(
+                CustodianConnection.advisor_id == advisor_id,
+                CustodianAccount.external_account_id.in_(account_ids),
+                CustodianAccount.household_id.isnot(None),
+            )
+        )
+        return dict(result.all())
+    except Exception as e:
+        logger.debug("Household mapping unavailable: %s", e)
+        await db.rollback()
+        return {}
+
+
+async def _save_snapshot(
+    advisor_id: UUID, account_id: str, holdings: dict, db, household_id: Optional[UUID] = None
+) -> None:
+    """Record holdings in the delta-encoded time-series store."""
+    try:
+        from backend.services.market_data.holdings_store import HoldingsTimeSeriesStore
+        await HoldingsTimeSeriesStore(db).record(
+            account_id, holdings, advisor_id=advisor_id, household_id=household_id, source="altruist"
         )
-        await db.commit()
     except Exception as e:
         logger.error("Snapshot save failed: %s", e)
         await db.rollback()
 
 
+async def poll_all_altruist(db, shard=None) -> int:
+    """
+    Poll every recently active advisor (or only those in `shard`).
+    Returns the number of advisors polled successfully.
+    """
+    from sqlalchemy import text
+
+    result = await db.execute(text("""
+        SELECT advisor_id FROM holdings_snapshots
+        WHERE advisor_id IS NOT NULL
+          AND snapshot_at >= now() - interval '35 days'
+        UNION
+        SELECT advisor_id FROM accounts_snapshot
+        LIMIT 50
+    """))
+    polled = 0
+    for (aid,) in result.fetchall():
+        if shard is not None and not shard.owns(aid):
+            continue
+        polled += await poll_altruist_holdings(aid, db)
+    return polled
+
+
 async def periodic_altruist_poll(db_factory, interval_seconds: int = 60) -> None:
-    """Background loop — registered as asyncio.create_task() on app startup."""
+    """
+    Single-process polling loop. The app schedules poll_all_altruist as a
+    sharded job instead, so replicas split advisors rather than repeat them.
+    """
     if not settings.altruist_api_key:
         logger.info("ALTRUIST_API_KEY not set — polling disabled")
         return
@@ -110,14 +155,7 @@ async def periodic_altruist_poll(db_factory, interval_seconds: int = 60) -> None
     while True:
         try:
             async with db_factory() as db:
-                from sqlalchemy import text
-                result = await db.execute(text("SELECT DISTINCT advisor_id FROM accounts_snapshot LIMIT 50"))
-                advisor_ids = [row[0] for row in result.fetchall()]
-                if not advisor_ids:
-                    advisor_ids = []
-
-                for aid in advisor_ids:
-                    await poll_altruist_holdings(aid, db)
+                await poll_all_altruist(db)
         except asyncio.CancelledError:
             return
         except Exception as e:
@@ -0,0 +1,465 @@
+"""
+Holdings time-series store.
+
+Replaces the append-only accounts_snapshot log with:
+  - delta encoding: each snapshot stores only quantity changes since the
+    previous one (plus the account total); unchanged snapshots are skipped
+  - keyframes: a full snapshot at least every KEYFRAME_EVERY writes and at the
+    start of each month, so a monthly partition decodes on its own
+  - monthly range partitions on holdings_snapshots, created on demand
+  - daily / weekly value rollups upserted on every write
+
+Range reads (value_series) answer from rollups for day/week granularity and
+from raw snapshot totals only for short windows.
+
+The per-process tail state (last quantities, for the next delta) is only a
+cache: accounts move between workers with the scheduler's shards, so before
+using it a write checks that the account's latest stored snapshot is still
+the cached one, and rebuilds the state from its keyframe otherwise.
+"""
+
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.holdings_series import HoldingsSnapshot, HoldingsValueRollup
+
+logger = logging.getLogger(__name__)
+
+KEYFRAME_EVERY = 96  # one keyframe per day at the 15-minute snapshot cadence
+QTY_PLACES = 6
+VALUE_PLACES = 2
+
+# account_key -> (quantities, snapshot_at, writes since keyframe, total_value)
+_last_state: Dict[str, Tuple[Dict[str, float], datetime, int, Decimal]] = {}
+_partitions_ready: set[str] = set()
+
+
+# ─────────────────────────────────────────────────────────────
+# Encoding helpers (pure)
+# ─────────────────────────────────────────────────────────────
+
+def _num(value: Any) -> Optional[Decimal]:
+    if value is None or value == "":
+        return None
+    try:
+        return Decimal(str(value).replace(",", "").replace("$", ""))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def normalize_holdings(raw: Any) -> Tuple[Dict[str, float], Dict[str, float], Decimal]:
+    """
+    Normalize a custodian holdings payload into
+    ({symbol: quantity}, {symbol: market_value}, total_value).
+
+    Accepts a list of position dicts or a dict wrapping one under
+    "holdings" / "positions", with the common custodian field spellings.
+    """
+    if isinstance(raw, dict):
+        items = raw.get("holdings") or raw.get("positions") or []
+    else:
+        items = raw or []
+
+    quantities: Dict[str, float] = {}
+    values: Dict[str, float] = {}
+    total = Decimal("0")
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        symbol = (item.get("symbol") or item.get("ticker") or "").strip().upper()
+        if not symbol:
+            continue
+        qty = _num(item.get("quantity", item.get("qty", item.get("shares")))) or Decimal("0")
+        mv = _num(
+            item.get("market_value", item.get("marketValue", item.get("value")))
+        ) or Decimal("0")
+        quantities[symbol] = round(float(quantities.get(symbol, 0)) + float(qty), QTY_PLACES)
+        values[symbol] = round(float(values.get(symbol, 0)) + float(mv), VALUE_PLACES)
+        total += mv
+    return quantities, values, total.quantize(Decimal("0.01"))
+
+
+def diff_holdings(prev: Dict[str, float], cur: Dict[str, float]) -> Dict[str, Any]:
+    """Quantity delta from prev to cur: {"q": changed, "r": removed}."""
+    delta: Dict[str, Any] = {}
+    changed = {s: q for s, q in cur.items() if prev.get(s) != q}
+    removed = sorted(s for s in prev if s not in cur)
+    if changed:
+        delta["q"] = changed
+    if removed:
+        delta["r"] = removed
+    return delta
+
+
+def apply_delta(state: Dict[str, float], payload: Dict[str, Any]) -> Dict[str, float]:
+    """Apply a delta payload to a quantity map and return the new map."""
+    result = dict(state)
+    result.update(payload.get("q") or {})
+    for symbol in payload.get("r") or []:
+        result.pop(symbol, None)
+    return result
+
+
+def bucket_start(ts: datetime, granularity: str) -> date:
+    """Bucket key for a timestamp: the UTC day, or the Monday of its ISO week."""
+    day = ts.astimezone(timezone.utc).date() if ts.tzinfo else ts.date()
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def pick_granularity(start: datetime, end: datetime) -> str:
+    """raw for <= 7 days, day for <= ~13 months, week beyond that."""
+    span = end - start
+    if span <= timedelta(days=7):
+        return "raw"
+    if span <= timedelta(days=400):
+        return "day"
+    return "week"
+
+
+def merge_series(
+    rows: Iterable[Tuple[str, Any, Decimal]],
+    carry: Dict[str, Decimal],
+) -> List[Dict[str, Any]]:
+    """
+    Sum per-account points into one series, carrying each account's last
+    known value forward across buckets where it has no point.
+    rows: (account_key, bucket, value) in any order; carry: value before range.
+    """
+    by_bucket: Dict[Any, Dict[str, Decimal]] = {}
+    for account_key, bucket, value in rows:
+        by_bucket.setdefault(bucket, {})[account_key] = Decimal(value)
+
+    latest = dict(carry)
+    series = []
+    for bucket in sorted(by_bucket):
+        latest.update(by_bucket[bucket])
+        series.append({
+            "date": bucket.isoformat(),
+            "value": sum(latest.values(), Decimal("0")),
+        })
+    return series
+
+
+def _partition_name(month: date) -> str:
+    return f"holdings_snapshots_y{month.year}m{month.month:02d}"
+
+
+def _month_start(ts: datetime) -> date:
+    return date(ts.year, ts.month, 1)
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + (month.month // 12), month.month % 12 + 1, 1)
+
+
+# ─────────────────────────────────────────────────────────────
+# Store
+# ─────────────────────────────────────────────────────────────
+
+class HoldingsTimeSeriesStore:
+    """Delta-encoded, month-partitioned holdings history with value rollups."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        self._created: set[str] = set()  # partitions created in the open transaction
+
+    # ── Writes ─────────────────────────────────────────────────
+
+    async def ensure_partition(self, ts: datetime) -> None:
+        """
+        Create the monthly partition covering ts if it does not exist yet.
+        The CREATE rolls back with its transaction and there is no default
+        partition, so the month is cached as ready only once record() commits.
+        """
+        month = _month_start(ts)
+        name = _partition_name(month)
+        if name in _partitions_ready or name in self._created:
+            return
+        await self.db.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF holdings_snapshots "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+            )
+        )
+        self._created.add(name)
+
+    async def record(
+        self,
+        account_key: str,
+        holdings: Any,
+        *,
+        advisor_id: Optional[UUID] = None,
+        household_id: Optional[UUID] = None,
+        snapshot_at: Optional[datetime] = None,
+        source: str = "altruist",
+    ) -> bool:
+        """
+        Record a holdings observation. Returns False when nothing changed
+        since the previous snapshot (no row written).
+        """
+        now = snapshot_at or datetime.now(timezone.utc)
+        quantities, values, total = normalize_holdings(holdings)
+
+        previous = await self._tail_state(account_key)
+
+        if previous is not None:
+            prev_qty, prev_at, since_keyframe, prev_total = previous
+            delta = diff_holdings(prev_qty, quantities)
+            if not delta and prev_total == total:
+                return False
+            keyframe = (
+                since_keyframe + 1 >= KEYFRAME_EVERY
+                or _month_start(prev_at) != _month_start(now)
+            )
+        else:
+            delta, since_keyframe, keyframe = {}, 0, True
+
+        payload = {"q": quantities, "mv": values} if keyframe else delta
+
+        try:
+            await self.ensure_partition(now)
+            await self.db.execute(
+                pg_insert(HoldingsSnapshot)
+                .values(
+                    account_key=account_key,
+                    snapshot_at=now,
+                    advisor_id=advisor_id,
+                    household_id=household_id,
+                    is_keyframe=keyframe,
+                    total_value=total,
+                    payload=payload,
+                    source=source,
+                )
+                .on_conflict_do_nothing()
+            )
+            await self._upsert_rollups(account_key, now, total, advisor_id, household_id)
+            await self.db.commit()
+        finally:
+            created, self._created = self._created, set()
+        _partitions_ready.update(created)
+
+        _last_state[account_key] = (
+            quantities, now, 0 if keyframe else since_keyframe + 1, total,
+        )
+        return True
+
+    async def _upsert_rollups(
+        self,
+        account_key: str,
+        ts: datetime,
+        total: Decimal,
+        advisor_id: Optional[UUID],
+        household_id: Optional[UUID],
+    ) -> None:
+        for granularity in ("day", "week"):
+            stmt = pg_insert(HoldingsValueRollup).values(
+                account_key=account_key,
+                granularity=granularity,
+                bucket_start=bucket_start(ts, granularity),
+                advisor_id=advisor_id,
+                household_id=household_id,
+                open_value=total,
+                high_value=total,
+                low_value=total,
+                close_value=total,
+                samples=1,
+                last_snapshot_at=ts,
+            )
+            excluded = stmt.excluded
+            await self.db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["account_key", "granularity", "bucket_start"],
+                    set_={
+                        "high_value": func.greatest(HoldingsValueRollup.high_value, excluded.high_value),
+                        "low_value": func.least(HoldingsValueRollup.low_value, excluded.low_value),
+                        "close_value": excluded.close_value,
+                        "samples": HoldingsValueRollup.samples + 1,
+                        "last_snapshot_at": excluded.last_snapshot_at,
+                    },
+                )
+            )
+
+    async def _tail_state(
+        self, account_key: str
+    ) -> Optional[Tuple[Dict[str, float], datetime, int, Decimal]]:
+        """Cached tail state if no other worker wrote since, else rebuilt from the DB."""
+        cached = _last_state.get(account_key)
+        if cached is not None:
+            latest = (
+                await self.db.execute(
+                    select(func.max(HoldingsSnapshot.snapshot_at)).where(
+                        HoldingsSnapshot.account_key == account_key
+                    )
+                )
+            ).scalar()
+            if latest == cached[1]:
+                return cached
+        return await self._load_last_state(account_key)
+
+    async def _load_last_state(
+        self, account_key: str
+    ) -> Optional[Tuple[Dict[str, float], datetime, int, Decimal]]:
+        """Rebuild the in-memory tail state for an account from its latest keyframe."""
+        rows = await self._rows_since_keyframe(account_key, None)
+        if not rows:
+            return None
+        state: Dict[str, float] = {}
+        for row in rows:
+            state = dict(row.payload.get("q") or {}) if row.is_keyframe else apply_delta(state, row.payload)
+        last = rows[-1]
+        result = (state, last.snapshot_at, len(rows) - 1, Decimal(last.total_value))
+        _last_state[account_key] = result
+        return result
+
+    async def _rows_since_keyframe(
+        self, account_key: str, at: Optional[datetime]
+    ) -> List[Any]:
+        """Latest keyframe at or before `at` followed by its deltas up to `at`."""
+        cond = [HoldingsSnapshot.account_key == account_key, HoldingsSnapshot.is_keyframe.is_(True)]
+        if at is not None:
+            cond.append(HoldingsSnapshot.snapshot_at <= at)
+        keyframe_at = (
+            await self.db.execute(
+                select(func.max(HoldingsSnapshot.snapshot_at)).where(and_(*cond))
+            )
+        ).scalar()
+        if keyframe_at is None:
+            return []
+
+        query = select(HoldingsSnapshot).where(
+            HoldingsSnapshot.account_key == account_key,
+            HoldingsSnapshot.snapshot_at >= keyframe_at,
+        )
+        if at is not None:
+            query = query.where(HoldingsSnapshot.snapshot_at <= at)
+        result = await self.db.execute(query.order_by(HoldingsSnapshot.snapshot_at.asc()))
+        return list(result.scalars().all())
+
+    # ── Reads ──────────────────────────────────────────────────
+
+    async def holdings_at(
+        self, account_key: str, at: Optional[datetime] = None
+    ) -> Dict[str, float]:
+        """Reconstruct {symbol: quantity} for an account as of `at` (default: latest)."""
+        if at is None:
+            tail = await self._tail_state(account_key)
+            return dict(tail[0]) if tail else {}
+        state: Dict[str, float] = {}
+        for row in await self._rows_since_keyframe(account_key, at):
+            state = dict(row.payload.get("q") or {}) if row.is_keyframe else apply_delta(state, row.payload)
+        return state
+
+    async def latest_positions_for_advisor(
+        self, advisor_id: UUID, lookback_days: int = 35
+    ) -> List[Dict[str, Any]]:
+        """Current [{symbol, quantity, account_id}] across an advisor's accounts."""
+        since = datetime.now(timezone.utc) - timedelta(days=lookback_days)
+        result = await self.db.execute(
+            select(HoldingsSnapshot.account_key)
+            .where(
+                HoldingsSnapshot.advisor_id == advisor_id,
+                HoldingsSnapshot.snapshot_at >= since,
+            )
+            .distinct()
+        )
+        positions = []
+        for account_key in result.scalars().all():
+            for symbol, qty in (await self.holdings_at(account_key)).items():
+                positions.append({"symbol": symbol, "quantity": qty, "account_id": account_key})
+        return positions
+
+    async def accounts_with_history(
+        self, account_keys: Sequence[str], since: datetime
+    ) -> set[str]:
+        """The account keys with at least one daily rollup since `since`."""
+        if not account_keys:
+            return set()
+        result = await self.db.execute(
+            select(HoldingsValueRollup.account_key)
+            .where(
+                HoldingsValueRollup.account_key.in_(account_keys),
+                HoldingsValueRollup.granularity == "day",
+                HoldingsValueRollup.bucket_start >= since.date(),
+            )
+            .distinct()
+        )
+        return set(result.scalars().all())
+
+    async def value_series(
+        self,
+        account_keys: Sequence[str],
+        start: datetime,
+        end: Optional[datetime] = None,
+        granularity: str = "auto",
+    ) -> List[Dict[str, Any]]:
+        """
+        Combined value series for one account or a household's accounts.
+        granularity: raw | day | week | auto. Returns [{date, value}].
+        """
+        if not account_keys:
+            return []
+        end = end or datetime.now(timezone.utc)
+        if granularity == "auto":
+            granularity = pick_granularity(start, end)
+
+        if granularity == "raw":
+            rows = (
+                await self.db.execute(
+                    select(
+                        HoldingsSnapshot.account_key,
+                        HoldingsSnapshot.snapshot_at,
+                        HoldingsSnapshot.total_value,
+                    ).where(
+                        HoldingsSnapshot.account_key.in_(account_keys),
+                        HoldingsSnapshot.snapshot_at >= start,
+                        HoldingsSnapshot.snapshot_at <= end,
+                    )
+                )
+            ).all()
+            carry = await self._carry_values(account_keys, start)
+            return merge_series(rows, carry)
+
+        first_bucket = bucket_start(start, granularity)
+        rows = (
+            await self.db.execute(
+                select(
+                    HoldingsValueRollup.account_key,
+                    HoldingsValueRollup.bucket_start,
+                    HoldingsValueRollup.close_value,
+                ).where(
+                    HoldingsValueRollup.account_key.in_(account_keys),
+                    HoldingsValueRollup.granularity == granularity,
+                    HoldingsValueRollup.bucket_start >= first_bucket,
+                    HoldingsValueRollup.bucket_start <= bucket_start(end, granularity),
+                )
+            )
+        ).all()
+        carry = await self._carry_values(
+            account_keys, datetime.combine(first_bucket, time.min, tzinfo=timezone.utc)
+        )
+        return merge_series(rows, carry)
+
+    async def _carry_values(
+        self, account_keys: Sequence[str], before: datetime
+    ) -> Dict[str, Decimal]:
+        """Each account's last daily close strictly before `before`."""
+        result = await self.db.execute(
+            select(HoldingsValueRollup.account_key, HoldingsValueRollup.close_value)
+            .where(
+                HoldingsValueRollup.account_key.in_(account_keys),
+                HoldingsValueRollup.granularity == "day",
+                HoldingsValueRollup.bucket_start < before.date(),
+            )
+            .order_by(HoldingsValueRollup.account_key, HoldingsValueRollup.bucket_start.desc())
+            .distinct(HoldingsValueRollup.account_key)
+        )
+        return {key: Decimal(value) for key, value in result.all()}
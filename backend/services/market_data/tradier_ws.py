@@ -20,7 +20,7 @@ MAX_BACKOFF = 60
 
 
 async def tradier_ws_listener(symbols: List[str]) -> None:
-    """Long-lived WebSocket listener. Register as asyncio.create_task() on app startup."""
+    """Long-lived WebSocket listener; run once per deployment (see harvest_quote_stream)."""
     if not settings.tradier_api_key:
         logger.info("TRADIER_API_KEY not set — WebSocket stream disabled")
         return
@@ -60,11 +60,13 @@ async def tradier_ws_listener(symbols: List[str]) -> None:
                                 await redis.setex(
                                     f"quote:{data['symbol']}", 60, payload
                                 )
+                                # Fan out to event consumers (harvest detector)
+                                await redis.publish(f"quote:{data['symbol']}", payload)
                     except (json.JSONDecodeError, KeyError) as e:
                         logger.debug("Skipping malformed WS message: %s", e)
         except asyncio.CancelledError:
             logger.info("Tradier WS listener cancelled")
-            return
+            raise
         except Exception as e:
             retries += 1
             logger.warning(
@@ -36,7 +36,12 @@ class DriftCalculator:
         model_id: UUID,
         account_id: UUID,
     ) -> Dict[str, Any]:
-        """Calculate drift between account holdings and model targets."""
+        """
+        Calculate drift between account holdings and model targets.
+
+        `positions` maps symbol to the account's AggregatedPosition rows,
+        for callers that size trades (the tax-aware optimizer).
+        """
 
         # Load model holdings
         model_result = await self.db.execute(
@@ -70,6 +75,7 @@ class DriftCalculator:
                 "max_holding_drift_pct": Decimal("0"),
                 "drift_details": {},
                 "account_value": Decimal("0"),
+                "positions": positions,
             }
 
         drift_details: Dict[str, Dict[str, Any]] = {}
@@ -125,6 +131,7 @@ class DriftCalculator:
             "max_holding_drift_pct": max_drift,
             "drift_details": drift_details,
             "account_value": total_value,
+            "positions": positions,
         }
 
     # ─────────────────────────────────────────────────────────────
@@ -138,7 +145,12 @@ class DriftCalculator:
         cash_available: Decimal = Decimal("0"),
         min_trade_value: Decimal = Decimal("100"),
     ) -> List[Dict[str, Any]]:
-        """Calculate trades needed to rebalance to targets."""
+        """
+        Calculate trades needed to rebalance to targets, ignoring lots and tax.
+
+        RebalanceService sizes signal trades with the tax-aware optimizer
+        (tax_aware.solve); this two-pass version remains the plain reference.
+        """
         trades: List[Dict[str, Any]] = []
 
         # Pass 1 — sells (overweight positions)
@@ -8,7 +8,7 @@ signals when thresholds are exceeded.
 import logging
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
 from uuid import UUID
 
 from sqlalchemy import and_, select
@@ -22,8 +22,22 @@ from backend.models.model_portfolio_marketplace import (
     RebalanceSignal,
     RebalanceSignalStatus,
 )
+from backend.models.tax_harvest import HarvestTaxLot, TaxLotStatus
+
+from backend.services.iim.order_pipeline import (
+    BrokerError,
+    OrderLeg,
+    OrderPipeline,
+    OrderUpdate,
+    default_pipeline,
+    legs_from_trades,
+    summarize,
+)
+from backend.services.lot_engine import Lot, lot_from_row
+from backend.services.tax_harvest.wash_sale_engine import WashSaleEngine
 
 from .drift_calculator import DriftCalculator
+from .tax_aware import PositionIn, RebalancePlan, RebalanceProblem, solve_batch
 
 logger = logging.getLogger(__name__)
 
@@ -31,9 +45,21 @@ logger = logging.getLogger(__name__)
 class RebalanceService:
     """Handles rebalancing operations."""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        tax_budget: Optional[Decimal] = None,
+        tolerance_pct: Decimal = Decimal("0"),
+        min_trade_value: Decimal = Decimal("100"),
+    ):
         self.db = db
         self.drift_calc = DriftCalculator(db)
+        self.wash_engine: Optional[WashSaleEngine] = None
+        # Tax-aware sizing: max tax per account's trades (None: uncapped,
+        # still cheapest lots first) and the drift band left untraded
+        self.tax_budget = tax_budget
+        self.tolerance_pct = tolerance_pct
+        self.min_trade_value = min_trade_value
 
     # ─────────────────────────────────────────────────────────────
     # Bulk Drift Check
@@ -57,12 +83,42 @@ class RebalanceService:
             )
         )
         assignments = result.scalars().all()
+        if assignments:
+            self.wash_engine = await WashSaleEngine(self.db).load(advisor_id)
+        return await self.check_assignments(assignments)
 
-        signals: List[RebalanceSignal] = []
+    async def check_assignments(
+        self, assignments: Sequence[AccountModelAssignment]
+    ) -> List[RebalanceSignal]:
+        """
+        Drift-check a batch of assignments. Lots for every drifted account
+        load in one query and the tax-aware trades are solved as one batch
+        (a process pool for large batches).
+        """
+        drifted = []
         for assignment in assignments:
-            signal = await self.check_assignment(assignment)
-            if signal:
-                signals.append(signal)
+            ctx = await self._prepare(assignment)
+            if ctx:
+                drifted.append(ctx)
+        if not drifted:
+            await self.db.commit()
+            return []
+
+        account_ids = [ctx["assignment"].account_id for ctx in drifted]
+        if self.wash_engine is None:
+            self.wash_engine = WashSaleEngine(self.db)
+        await self.wash_engine.load_accounts(account_ids)
+        lots = await self._load_lots(account_ids)
+
+        plans = await solve_batch([
+            self._problem(ctx, lots.get(ctx["assignment"].account_id, []))
+            for ctx in drifted
+        ])
+        signals = [self._signal(ctx, plan) for ctx, plan in zip(drifted, plans)]
+        self.db.add_all(signals)
+        await self.db.commit()
+        for signal in signals:
+            await self.db.refresh(signal)
         return signals
 
     # ─────────────────────────────────────────────────────────────
@@ -73,6 +129,13 @@ class RebalanceService:
         self, assignment: AccountModelAssignment
     ) -> Optional[RebalanceSignal]:
         """Check a single assignment for drift; create signal if needed."""
+        signals = await self.check_assignments([assignment])
+        return signals[0] if signals else None
+
+    async def _prepare(
+        self, assignment: AccountModelAssignment
+    ) -> Optional[Dict[str, Any]]:
+        """Refresh the assignment's drift snapshot; context if it needs a signal."""
 
         # Load model
         result = await self.db.execute(
@@ -116,7 +179,6 @@ class RebalanceService:
 
         # Below threshold — no signal
         if drift_result["max_holding_drift_pct"] < float(threshold):
-            await self.db.commit()
             return None
 
         # Skip if a pending signal already exists
@@ -130,7 +192,6 @@ class RebalanceService:
             )
         )
         if existing.scalar_one_or_none():
-            await self.db.commit()
             return None
 
         # Cash available
@@ -144,18 +205,75 @@ class RebalanceService:
             account.cash_balance if account else Decimal("0")
         )
 
-        # Calculate trades
-        trades = self.drift_calc.calculate_trades_required(
-            drift_result["drift_details"],
-            drift_result["account_value"],
-            cash_available,
+        return {
+            "assignment": assignment,
+            "model": model,
+            "subscription": subscription,
+            "drift": drift_result,
+            "cash": cash_available or Decimal("0"),
+        }
+
+    async def _load_lots(
+        self, account_ids: List[UUID]
+    ) -> Dict[UUID, List[Lot]]:
+        """Open tax lots of many accounts, one query."""
+        result = await self.db.execute(
+            select(HarvestTaxLot).where(
+                and_(
+                    HarvestTaxLot.account_id.in_(account_ids),
+                    HarvestTaxLot.status != TaxLotStatus.CLOSED,
+                )
+            )
+        )
+        lots: Dict[UUID, List[Lot]] = {}
+        for row in result.scalars().all():
+            lots.setdefault(row.account_id, []).append(lot_from_row(row))
+        return lots
+
+    def _problem(
+        self, ctx: Dict[str, Any], lots: List[Lot]
+    ) -> RebalanceProblem:
+        account_id = ctx["assignment"].account_id
+        positions = {}
+        for symbol, p in ctx["drift"]["positions"].items():
+            quantity = Decimal(str(p.quantity or 0))
+            value = Decimal(str(p.market_value or 0))
+            price = Decimal(str(p.price or 0)) or (value / quantity if quantity else Decimal("0"))
+            positions[symbol] = PositionIn(value, price, quantity, p.cost_basis_per_share)
+        targets = {
+            symbol: Decimal(str(d["target_pct"]))
+            for symbol, d in ctx["drift"]["drift_details"].items()
+            if d["in_model"]
+        }
+        wash = self.wash_engine
+        return RebalanceProblem(
+            account_id=str(account_id),
+            positions=positions,
+            targets=targets,
+            cash=Decimal(str(ctx["cash"])),
+            lots=lots,
+            tax_budget=self.tax_budget,
+            tolerance_pct=self.tolerance_pct,
+            min_trade=self.min_trade_value,
+            no_buy=frozenset(s for s in targets if wash.buy_conflicts(account_id, s)),
+            wash_risk=frozenset(s for s in positions if wash.sale_conflicts(account_id, s)),
+            as_of=wash.as_of,
         )
 
-        # Create signal
-        signal = RebalanceSignal(
-            assignment_id=assignment.id,
+    def _signal(
+        self, ctx: Dict[str, Any], plan: RebalancePlan
+    ) -> RebalanceSignal:
+        model, subscription = ctx["model"], ctx["subscription"]
+        drift_result = ctx["drift"]
+        for skip in plan.skipped:
+            logger.info(
+                "Rebalance %s: %s %s skipped (%s)",
+                plan.account_id, skip["action"], skip["symbol"], skip["reason"],
+            )
+        return RebalanceSignal(
+            assignment_id=ctx["assignment"].id,
             model_id=model.id,
-            account_id=assignment.account_id,
+            account_id=ctx["assignment"].account_id,
             advisor_id=(
                 subscription.subscriber_advisor_id
                 if subscription
@@ -166,40 +284,18 @@ class RebalanceService:
                 str(drift_result["max_holding_drift_pct"])
             ),
             account_value=drift_result["account_value"],
-            cash_available=cash_available or Decimal("0"),
+            cash_available=ctx["cash"],
             total_drift_pct=Decimal(
                 str(drift_result["total_drift_pct"])
             ),
             drift_details=drift_result["drift_details"],
-            trades_required=trades,
-            estimated_trades_count=len(trades),
-            estimated_buy_value=Decimal(
-                str(
-                    sum(
-                        t["value"]
-                        for t in trades
-                        if t["action"] == "buy"
-                    )
-                )
-            ),
-            estimated_sell_value=Decimal(
-                str(
-                    sum(
-                        t["value"]
-                        for t in trades
-                        if t["action"] == "sell"
-                    )
-                )
-            ),
+            trades_required=plan.trades,
+            estimated_trades_count=len(plan.trades),
+            estimated_buy_value=plan.buy_value,
+            estimated_sell_value=plan.sell_value,
             expires_at=datetime.utcnow() + timedelta(days=7),
         )
 
-        self.db.add(signal)
-        await self.db.commit()
-        await self.db.refresh(signal)
-
-        return signal
-
     # ─────────────────────────────────────────────────────────────
     # Signal Retrieval
     # ─────────────────────────────────────────────────────────────
@@ -307,3 +403,125 @@ class RebalanceService:
 
         await self.db.commit()
         return signal
+
+
+    # ─────────────────────────────────────────────────────────────
+    # Order Submission
+    # ─────────────────────────────────────────────────────────────
+
+    async def prepare_submission(
+        self,
+        signal_id: UUID,
+        quotes: Optional[Callable[[List[str]], Awaitable[Dict[str, float]]]] = None,
+    ) -> Tuple[List[OrderLeg], List[OrderUpdate]]:
+        """
+        Order legs of an approved signal, and the trades that cannot be
+        sent. Marks the signal executing. Trades with no price (buys into
+        symbols the account does not hold yet) are sized at `quotes`, e.g.
+        OrderPipeline.quotes. A signal left executing or failed can be
+        submitted again: the legs keep their idempotency keys, so orders
+        that already reached the broker are not repeated.
+        """
+        result = await self.db.execute(
+            select(RebalanceSignal).where(
+                RebalanceSignal.id == signal_id
+            )
+        )
+        signal = result.scalar_one_or_none()
+        if not signal:
+            raise ValueError("Signal not found")
+        if signal.status not in (
+            RebalanceSignalStatus.APPROVED,
+            RebalanceSignalStatus.EXECUTING,
+            RebalanceSignalStatus.FAILED,
+        ):
+            raise ValueError(
+                f"Signal is not approved: {signal.status.value}"
+            )
+        acct_result = await self.db.execute(
+            select(CustodianAccount).where(
+                CustodianAccount.id == signal.account_id
+            )
+        )
+        account = acct_result.scalar_one_or_none()
+        if not account:
+            raise ValueError("Account not found")
+
+        trades = signal.trades_required or []
+        unpriced = sorted({
+            t["symbol"] for t in trades
+            if t.get("shares") is None and not t.get("price")
+        })
+        prices: Dict[str, float] = {}
+        if unpriced and quotes:
+            try:
+                prices = await quotes(unpriced)
+            except BrokerError as e:
+                logger.warning("Quotes for signal %s failed: %s", signal_id, e)
+        legs, skipped = legs_from_trades(
+            account.external_account_id,
+            trades,
+            source=f"rebalance:{signal.id}",
+            prices=prices,
+        )
+        signal.status = RebalanceSignalStatus.EXECUTING
+        await self.db.commit()
+        return legs, skipped
+
+    async def record_submission(
+        self, signal_id: UUID, updates: Sequence[OrderUpdate]
+    ) -> RebalanceSignal:
+        """
+        Store the final order statuses. Completed only if every trade was
+        sent and none failed; a skipped trade leaves the signal failed, so
+        it can be submitted again.
+        """
+        details = summarize(updates)
+        failed = sum(
+            n for status, n in details["counts"].items()
+            if status in ("failed", "rejected", "canceled", "expired", "error", "skipped")
+        )
+        signal = await self.mark_executed(signal_id, details)
+        if failed:
+            signal.status = RebalanceSignalStatus.FAILED
+            await self.db.commit()
+        return signal
+
+    async def submit_signal(
+        self, signal_id: UUID, pipeline: Optional[OrderPipeline] = None
+    ) -> AsyncIterator[OrderUpdate]:
+        """Send an approved signal's trades; yields order status as it changes."""
+        pipeline = pipeline or default_pipeline()
+        legs, updates = await self.prepare_submission(signal_id, pipeline.quotes)
+        for update in updates:
+            yield update
+        async for update in pipeline.stream(legs):
+            updates.append(update)
+            yield update
+        await self.record_submission(signal_id, updates)
+
+async def check_all_rebalances(db: AsyncSession, shard=None) -> int:
+    """
+    Scheduled nightly job — drift-checks every active assignment in the
+    firm, or only advisors in `shard` (a scheduler Shard), and solves the
+    tax-aware trades of all drifted accounts as one batch.
+    Returns count of signals created.
+    """
+    result = await db.execute(
+        select(AccountModelAssignment, ModelSubscription.subscriber_advisor_id)
+        .join(ModelSubscription)
+        .join(MarketplaceModelPortfolio)
+        .where(
+            and_(
+                AccountModelAssignment.is_active.is_(True),
+                MarketplaceModelPortfolio.status == "active",
+            )
+        )
+    )
+    assignments = [
+        assignment
+        for assignment, advisor_id in result.all()
+        if shard is None or shard.owns(advisor_id)
+    ]
+    signals = await RebalanceService(db).check_assignments(assignments)
+    return len(signals)
@@ -0,0 +1,305 @@
+"""
+Tax-aware rebalance optimizer.
+
+For one account, chooses which lots to sell and how much drift to leave
+in place so that the realized tax stays within a budget:
+
+  minimize    sum |value_s - target_s|            (drift, in dollars)
+  subject to  sells_s <= overweight_s,  buys_s <= underweight_s
+              sum buys <= cash + sum sells
+              sum (tax per dollar of lot l) * sold_l <= tax budget
+
+Every dollar sold out of an overweight symbol removes the same amount of
+drift, so the LP is a fractional knapsack with one budget row. Its
+optimum sells lots cheapest-tax-first (losses, then long-term gains, then
+short-term gains) across all overweight symbols until the budget binds.
+That is solved exactly by one sort, with no LP library. The only
+non-convex constraint is the minimum trade size. Symbols whose sell would
+fall under it are dropped and the knapsack re-solved; buys under it are
+skipped.
+
+Wash sales: symbols with an open loss-sale window are not bought. Loss
+lots of a symbol bought in the last 30 days count as tax-neutral, since
+the loss would be disallowed, and their sells are flagged.
+
+The problems are plain picklable data. solve_many fans a firm-wide batch
+out over a process pool (REBALANCE_WORKERS), with the same thread fallback
+as the Monte Carlo engine.
+"""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple
+
+from backend.models.liquidity import LotSelectionMethod
+from backend.services.lot_engine import (
+    LONG_TERM_RATE,
+    SHORT_TERM_RATE,
+    CENT,
+    Lot,
+    LotEngine,
+    is_long_term,
+)
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal("0")
+HUNDRED = Decimal("100")
+INLINE_BELOW = 16  # smaller batches are not worth a round trip to the pool
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+class PositionIn(NamedTuple):
+    value: Decimal
+    price: Decimal
+    quantity: Decimal
+    basis_per_share: Optional[Decimal] = None  # used for shares without lots
+
+
+@dataclass
+class RebalanceProblem:
+    account_id: str
+    positions: Dict[str, PositionIn]
+    targets: Dict[str, Decimal]  # symbol -> target weight, percent
+    cash: Decimal = ZERO
+    lots: List[Lot] = field(default_factory=list)
+    tax_budget: Optional[Decimal] = None  # None: no cap, still cheapest lots first
+    tolerance_pct: Decimal = ZERO  # drift band left untraded
+    min_trade: Decimal = Decimal("100")
+    no_buy: FrozenSet[str] = frozenset()  # open loss-sale windows
+    wash_risk: FrozenSet[str] = frozenset()  # bought in the last 30 days
+    rates: Tuple[Decimal, Decimal] = (SHORT_TERM_RATE, LONG_TERM_RATE)
+    as_of: date = field(default_factory=date.today)
+
+
+@dataclass
+class RebalancePlan:
+    account_id: str
+    trades: List[Dict[str, Any]]
+    estimated_tax: Decimal
+    drift_before_pct: Decimal
+    drift_after_pct: Decimal
+    budget_bound: bool = False  # the tax budget, not the targets, stopped the sells
+    skipped: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def buy_value(self) -> Decimal:
+        return sum((Decimal(str(t["value"])) for t in self.trades if t["action"] == "buy"), ZERO)
+
+    @property
+    def sell_value(self) -> Decimal:
+        return sum((Decimal(str(t["value"])) for t in self.trades if t["action"] == "sell"), ZERO)
+
+
+# ─────────────────────────────────────────────────────────────
+# Solver (pure, runs inside worker processes)
+# ─────────────────────────────────────────────────────────────
+
+
+def _drift_pct(values: Dict[str, Decimal], targets: Dict[str, Decimal]) -> Decimal:
+    total = sum(values.values(), ZERO)
+    if total <= 0:
+        return ZERO
+    symbols = set(values) | set(targets)
+    drift = sum(
+        (abs(values.get(s, ZERO) / total * HUNDRED - targets.get(s, ZERO)) for s in symbols), ZERO
+    ) / 2
+    return drift.quantize(Decimal("0.001"))
+
+
+def _lot_engine(p: RebalanceProblem) -> LotEngine:
+    """Lots of the account, topped up with a basis-only lot for uncovered shares."""
+    engine = LotEngine(rates=p.rates)
+    for lot in p.lots:
+        if lot.quantity > 0:
+            engine.add(Lot(lot.id, p.account_id, lot.symbol, lot.quantity,
+                           lot.basis_per_share, lot.acquired, lot.wash_adjustment))
+    for symbol, pos in p.positions.items():
+        uncovered = pos.quantity - engine.quantity(p.account_id, symbol)
+        if uncovered > 0:
+            # No lot detail: assume short-term so the tax estimate errs high
+            engine.add(Lot(f"{symbol}:untracked", p.account_id, symbol, uncovered,
+                           pos.basis_per_share if pos.basis_per_share is not None else pos.price, p.as_of))
+    return engine
+
+
+def _knapsack(
+    p: RebalanceProblem,
+    engine: LotEngine,
+    caps: Dict[str, Decimal],
+) -> Tuple[Dict[str, List[Tuple[str, Decimal]]], Dict[str, Decimal], bool]:
+    """Cheapest-tax-first lot slices across symbols, within caps and budget."""
+    short_rate, long_rate = p.rates
+    slices = []
+    for symbol in caps:
+        price = p.positions[symbol].price
+        for lot in engine.open_lots(p.account_id, symbol, LotSelectionMethod.TAX_OPT, price, p.as_of):
+            rate = long_rate if is_long_term(lot.acquired, p.as_of) else short_rate
+            per_dollar = (price - lot.basis_per_share) / price * rate
+            if per_dollar < 0 and symbol in p.wash_risk:
+                per_dollar = ZERO  # the loss would be washed
+            slices.append((per_dollar, symbol, lot))
+    slices.sort(key=lambda s: s[0])  # stable: TAX_OPT order within a symbol
+
+    picks: Dict[str, List[Tuple[str, Decimal]]] = {}
+    sold = {symbol: ZERO for symbol in caps}
+    spent, bound = ZERO, False
+    for per_dollar, symbol, lot in slices:
+        room = caps[symbol] - sold[symbol]
+        if room <= 0:
+            continue
+        price = p.positions[symbol].price
+        amount = min(room, lot.quantity * price)
+        if per_dollar > 0 and p.tax_budget is not None:
+            affordable = (p.tax_budget - spent) / per_dollar
+            if affordable <= 0:
+                bound = True
+                break  # every later slice costs at least as much
+            if affordable < amount:
+                amount, bound = affordable, True
+        spent += per_dollar * amount
+        sold[symbol] += amount
+        picks.setdefault(symbol, []).append((lot.id, amount / price))
+    return picks, sold, bound
+
+
+def solve(p: RebalanceProblem) -> RebalancePlan:
+    """Tax-budgeted rebalance trades for one account."""
+    values = {s: pos.value for s, pos in p.positions.items()}
+    total = sum(values.values(), ZERO)
+    drift_before = _drift_pct(values, p.targets)
+    if total <= 0:
+        return RebalancePlan(p.account_id, [], ZERO, drift_before, drift_before)
+
+    band = total * p.tolerance_pct / HUNDRED
+    caps: Dict[str, Decimal] = {}
+    needs: Dict[str, Decimal] = {}
+    skipped: List[Dict[str, Any]] = []
+    for symbol in sorted(set(values) | set(p.targets)):
+        gap = values.get(symbol, ZERO) - total * p.targets.get(symbol, ZERO) / HUNDRED
+        if gap > band and gap >= p.min_trade and p.positions[symbol].price > 0:
+            caps[symbol] = gap
+        elif -gap > band and -gap >= p.min_trade:
+            if symbol in p.no_buy:
+                skipped.append({"symbol": symbol, "action": "buy", "reason": "Open wash-sale window"})
+            else:
+                needs[symbol] = -gap
+
+    engine = _lot_engine(p)
+    while True:
+        picks, sold, bound = _knapsack(p, engine, caps)
+        small = [s for s, amount in sold.items() if ZERO < amount < p.min_trade]
+        if not small:
+            break
+        for symbol in small:
+            del caps[symbol]
+            skipped.append({"symbol": symbol, "action": "sell", "reason": "Under minimum trade after tax budget"})
+
+    trades: List[Dict[str, Any]] = []
+    tax_total = ZERO
+    for symbol in sorted(picks):
+        pos = p.positions[symbol]
+        shares = sum((q for _, q in picks[symbol]), ZERO)
+        realized = engine.what_if(
+            p.account_id, symbol, shares, pos.price, p.as_of,
+            LotSelectionMethod.SPEC_ID, [lot_id for lot_id, _ in picks[symbol]],
+        )
+        tax = realized.tax(*p.rates)
+        washed = symbol in p.wash_risk and realized.gain < 0
+        if washed:
+            tax = max(tax, ZERO)
+        tax_total += tax
+        values[symbol] -= sold[symbol]
+        drift = (sold[symbol] / total * HUNDRED).quantize(CENT)
+        trade = {
+            "symbol": symbol,
+            "action": "sell",
+            "value": float(sold[symbol].quantize(CENT)),
+            "shares": float(shares),
+            "price": float(pos.price),
+            "reason": f"Overweight; selling {drift}% of the account",
+            "short_term_gain": float(realized.short_term.quantize(CENT)),
+            "long_term_gain": float(realized.long_term.quantize(CENT)),
+            "estimated_tax": float(tax.quantize(CENT)),
+            "lots": [
+                {"lot_id": r.lot_id, "shares": float(r.quantity), "long_term": r.long_term}
+                for r in realized.reliefs
+            ],
+        }
+        if washed:
+            trade["wash_sale_risk"] = True
+        trades.append(trade)
+
+    cash = p.cash + sum(sold.values(), ZERO)
+    for symbol, need in sorted(needs.items(), key=lambda kv: -kv[1]):
+        amount = min(need, cash)
+        if amount < p.min_trade:
+            continue
+        cash -= amount
+        values[symbol] = values.get(symbol, ZERO) + amount
+        trade = {
+            "symbol": symbol,
+            "action": "buy",
+            "value": float(amount.quantize(CENT)),
+            "reason": f"Underweight by {(need / total * HUNDRED).quantize(CENT)}%",
+        }
+        if symbol in p.positions and p.positions[symbol].price > 0:
+            trade["price"] = float(p.positions[symbol].price)  # sizes the order in shares
+        trades.append(trade)
+
+    return RebalancePlan(
+        p.account_id,
+        trades,
+        tax_total.quantize(CENT),
+        drift_before,
+        _drift_pct(values, p.targets),
+        budget_bound=bound,
+        skipped=skipped,
+    )
+
+
+# ─────────────────────────────────────────────────────────────
+# Batch
+# ─────────────────────────────────────────────────────────────
+
+
+def _workers() -> int:
+    return max(1, int(os.getenv("REBALANCE_WORKERS", min(4, os.cpu_count() or 1))))
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=_workers())
+    return _pool
+
+
+def solve_many(
+    problems: Sequence[RebalanceProblem],
+    pool: Optional[ProcessPoolExecutor] = None,
+    workers: Optional[int] = None,
+) -> List[RebalancePlan]:
+    """Solve a batch, in a process pool unless it is small."""
+    if len(problems) < INLINE_BELOW:
+        return [solve(p) for p in problems]
+    chunksize = max(1, len(problems) // (4 * (workers or _workers())))
+    return list((pool or _get_pool()).map(solve, problems, chunksize=chunksize))
+
+
+async def solve_batch(problems: Sequence[RebalanceProblem]) -> List[RebalancePlan]:
+    """solve_many off the event loop."""
+    global _pool
+    try:
+        return await asyncio.to_thread(solve_many, problems)
+    except (BrokenProcessPool, OSError, RuntimeError) as e:
+        # No usable worker processes (sandboxed host, pool died) — solve in a thread
+        logger.warning("Rebalance process pool unavailable, using thread: %s", e)
+        _pool = None
+        return await asyncio.to_thread(lambda: [solve(p) for p in problems])
@@ -0,0 +1,215 @@
+"""
+Vectorized Monte Carlo retirement engine.
+
+  - The full (paths x years) return matrix is drawn with NumPy in one call;
+    the balance recursion loops over years only, vectorized across paths
+  - Multi-asset runs draw correlated returns through a Cholesky factor and
+    blend them with per-year glide-path weights (annual rebalancing)
+  - Percentile bands come from a single np.percentile over the path axis
+  - Runs are seeded: an explicit seed, or one derived from the input hash,
+    so the same inputs always give the same projection
+  - Simulations run in a process pool off the event loop and results are
+    cached per input hash (AsyncCache)
+"""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from backend.services.async_cache import AsyncCache, fingerprint
+
+logger = logging.getLogger(__name__)
+
+MAX_SIMULATIONS = 100_000
+PERCENTILES = (10, 25, 50, 75, 90)
+
+_result_cache = AsyncCache("planning:monte_carlo", fresh_ttl=3600)
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+# ─────────────────────────────────────────────────────────────
+# Simulation (pure, runs inside worker processes)
+# ─────────────────────────────────────────────────────────────
+
+
+def _glide_weights(
+    start: Sequence[float],
+    end: Sequence[float],
+    years_to_retire: int,
+    total_years: int,
+) -> np.ndarray:
+    """Per-year weights: linear from start to end by retirement, then held."""
+    start_w = np.asarray(start, dtype=float)
+    end_w = np.asarray(end, dtype=float)
+    t = np.clip(np.arange(total_years) / max(years_to_retire, 1), 0.0, 1.0)
+    weights = start_w + t[:, None] * (end_w - start_w)
+    return weights / weights.sum(axis=1, keepdims=True)
+
+
+def _portfolio_returns(
+    rng: np.random.Generator,
+    simulations: int,
+    total_years: int,
+    params: Dict[str, Any],
+) -> np.ndarray:
+    """(simulations, total_years) matrix of annual portfolio returns."""
+    assets = params.get("assets")
+    if not assets:
+        return rng.normal(
+            params["expected_return"],
+            params["volatility"],
+            size=(simulations, total_years),
+        )
+
+    mu = np.array([a["expected_return"] for a in assets], dtype=float)
+    vol = np.array([a["volatility"] for a in assets], dtype=float)
+    corr = np.asarray(params.get("correlations") or np.eye(len(assets)), dtype=float)
+    cov = corr * np.outer(vol, vol)
+    # Tiny jitter keeps user-supplied correlation matrices factorizable
+    chol = np.linalg.cholesky(cov + np.eye(len(assets)) * 1e-12)
+
+    z = rng.standard_normal((simulations, total_years, len(assets)))
+    asset_returns = mu + z @ chol.T
+
+    glide = params.get("glide_path") or {}
+    default_w = [a.get("weight", 1.0) for a in assets]
+    weights = _glide_weights(
+        glide.get("start_weights", default_w),
+        glide.get("end_weights", glide.get("start_weights", default_w)),
+        params["years_to_retire"],
+        total_years,
+    )
+    return np.einsum("syk,yk->sy", asset_returns, weights)
+
+
+def simulate(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one projection. `params` must already be normalized."""
+    simulations = params["simulations"]
+    years_to_retire = params["years_to_retire"]
+    total_years = years_to_retire + params["years_in_retirement"]
+    rng = np.random.default_rng(params["seed"])
+
+    returns = _portfolio_returns(rng, simulations, total_years, params)
+
+    years = np.arange(total_years)
+    spending = params["annual_spending"] * (1 + params["inflation"]) ** (
+        years - years_to_retire
+    )
+    flows = np.where(years < years_to_retire, params["annual_contribution"], -spending)
+
+    paths = np.empty((simulations, total_years + 1))
+    paths[:, 0] = params["current_assets"]
+    failed = np.zeros(simulations, dtype=bool)
+    balance = paths[:, 0].copy()
+    for y in range(total_years):
+        balance = balance * (1 + returns[:, y]) + flows[y]
+        failed |= balance < 0
+        np.maximum(balance, 0, out=balance)
+        paths[:, y + 1] = balance
+
+    bands = np.percentile(paths, PERCENTILES, axis=0).round(0)
+    ending = bands[:, -1]
+    success = np.count_nonzero(~failed & (balance > 0))
+
+    return {
+        "success_rate": round(success / simulations * 100, 1),
+        "simulations": simulations,
+        "median_ending_balance": float(ending[2]),
+        "p10_ending": float(ending[0]),
+        "p90_ending": float(ending[4]),
+        "percentile_paths": {
+            f"p{p}": bands[i].tolist() for i, p in enumerate(PERCENTILES)
+        },
+        "total_years": total_years,
+        "seed": params["seed"],
+    }
+
+
+# ─────────────────────────────────────────────────────────────
+# Input normalization
+# ─────────────────────────────────────────────────────────────
+
+
+def normalize_params(
+    current_assets: float,
+    annual_contribution: float,
+    years_to_retire: int,
+    years_in_retirement: int,
+    annual_spending: float,
+    expected_return: float = 0.07,
+    volatility: float = 0.15,
+    inflation: float = 0.025,
+    simulations: int = 1000,
+    seed: Optional[int] = None,
+    assets: Optional[List[Dict[str, Any]]] = None,
+    correlations: Optional[List[List[float]]] = None,
+    glide_path: Optional[Dict[str, List[float]]] = None,
+) -> Dict[str, Any]:
+    """Validate inputs and fill in a deterministic seed."""
+    params: Dict[str, Any] = {
+        "current_assets": float(current_assets),
+        "annual_contribution": float(annual_contribution),
+        "years_to_retire": int(years_to_retire),
+        "years_in_retirement": int(years_in_retirement),
+        "annual_spending": float(annual_spending),
+        "expected_return": float(expected_return),
+        "volatility": float(volatility),
+        "inflation": float(inflation),
+        "simulations": max(1, min(int(simulations), MAX_SIMULATIONS)),
+        "assets": assets or None,
+        "correlations": correlations or None,
+        "glide_path": glide_path or None,
+    }
+    if params["years_to_retire"] < 0 or params["years_in_retirement"] < 0:
+        raise ValueError("Years must be non-negative")
+    if assets:
+        n = len(assets)
+        if correlations and np.asarray(correlations).shape != (n, n):
+            raise ValueError(f"correlations must be a {n}x{n} matrix")
+        for key in ("start_weights", "end_weights"):
+            weights = (glide_path or {}).get(key)
+            if weights is not None and len(weights) != n:
+                raise ValueError(f"glide_path.{key} must have {n} weights")
+    params["seed"] = (
+        int(seed) if seed is not None else int(fingerprint(params), 16) % 2**32
+    )
+    return params
+
+
+# ─────────────────────────────────────────────────────────────
+# Async entry point
+# ─────────────────────────────────────────────────────────────
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        workers = int(os.getenv("MONTE_CARLO_WORKERS", min(4, os.cpu_count() or 1)))
+        _pool = ProcessPoolExecutor(max_workers=max(1, workers))
+    return _pool
+
+
+async def _run_off_loop(params: Dict[str, Any]) -> Dict[str, Any]:
+    global _pool
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_get_pool(), simulate, params)
+    except (BrokenProcessPool, OSError, RuntimeError) as e:
+        # No usable worker processes (sandboxed host, pool died) — use a thread
+        logger.warning("Monte Carlo process pool unavailable, using thread: %s", e)
+        _pool = None
+        return await asyncio.to_thread(simulate, params)
+
+
+async def run_monte_carlo(**kwargs: Any) -> Dict[str, Any]:
+    """Cached, off-loop Monte Carlo projection (see normalize_params)."""
+    params = normalize_params(**kwargs)
+    result, _ = await _result_cache.get_or_compute(
+        fingerprint(params), lambda: _run_off_loop(params)
+    )
+    return result
@@ -1,34 +1,16 @@
 """
 Notification service — sends emails via SendGrid and logs all sends.
+Bulk sends are queued in the email outbox (see email_outbox).
 
 Used by IMM-03 (compliance alerts), IMM-04 (follow-up emails), IMM-06 (order confirmations).
 """
 
 import logging
-from datetime import datetime, timezone
 from typing import Optional
-
-from backend.config.settings import settings
+from uuid import uuid4
 
 logger = logging.getLogger(__name__)
 
-_sg_client = None
-
-
-def _get_sendgrid():
-    global _sg_client
-    if _sg_client is not None:
-        return _sg_client
-    if not settings.sendgrid_api_key:
-        return None
-    try:
-        from sendgrid import SendGridAPIClient
-        _sg_client = SendGridAPIClient(settings.sendgrid_api_key)
-        return _sg_client
-    except ImportError:
-        logger.warning("sendgrid package not installed")
-        return None
-
 
 async def send_email(
     to_email: str,
@@ -37,23 +19,29 @@ async def send_email(
     from_email: Optional[str] = None,
     from_name: Optional[str] = None,
 ) -> bool:
-    """Send a single email via SendGrid. Returns True on success."""
-    sg = _get_sendgrid()
-    if sg is None:
+    """
+    Send a single email right away via SendGrid. Returns True on success.
+    Bulk or job-driven mail should go through email_outbox.enqueue_email.
+    """
+    from backend.services.email_outbox import DeliveryError, OutboxMessage, get_transport
+
+    transport = get_transport()
+    if transport is None:
         logger.info("SendGrid not configured — email suppressed: %s -> %s", subject, to_email)
         return False
+    message = OutboxMessage(
+        id=uuid4(),
+        to_email=to_email,
+        subject=subject,
+        html_content=html_content,
+        from_email=from_email,
+        from_name=from_name,
+    )
     try:
-        from sendgrid.helpers.mail import Mail
-        message = Mail(
-            from_email=(from_email or settings.sendgrid_from_email),
-            to_emails=to_email,
-            subject=subject,
-            html_content=html_content,
-        )
-        response = sg.send(message)
-        logger.info("Email sent: %s -> %s (status=%s)", subject, to_email, response.status_code)
-        return 200 <= response.status_code < 300
-    except Exception as exc:
+        await transport.send([message])
+        logger.info("Email sent: %s -> %s", subject, to_email)
+        return True
+    except DeliveryError as exc:
         logger.error("SendGrid error: %s", exc)
         return False
 
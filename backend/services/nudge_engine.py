@@ -17,6 +17,7 @@ from backend.models.portal import (
 )
 from backend.models.account import Account
 from backend.models.position import Position
+from backend.services.concentration import household_exposure
 
 logger = logging.getLogger(__name__)
 
@@ -30,15 +31,6 @@ class NudgeEngine:
     # Thresholds for nudge triggers
     CASH_THRESHOLD = Decimal("0.10")  # 10% cash triggers cash drag nudge
     CONCENTRATION_THRESHOLD = Decimal("0.15")  # 15% single position triggers concentration nudge
-    
-    # ETFs that are considered broadly diversified (don't trigger concentration warnings)
-    BROAD_ETFS = {
-        "VTI", "VOO", "SPY", "IVV", "ITOT",  # US Total Market / S&P 500
-        "BND", "AGG", "SCHZ", "VBTLX",  # Bond funds
-        "VXUS", "VEA", "VWO", "IXUS",  # International
-        "QQQ", "VGT", "XLK",  # Tech (broad)
-        "VTV", "VUG", "SCHD",  # Value/Growth/Dividend
-    }
 
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -168,46 +160,36 @@ class NudgeEngine:
         if await self._has_recent_nudge(user.id, NudgeType.CONCENTRATION, days=60):
             return None
 
-        total_value = Decimal("0")
-        ticker_values: dict[str, Decimal] = {}
-
+        positions = []
         for account in accounts:
             result = await self.db.execute(
                 select(Position).where(Position.account_id == account.id)
             )
-            positions = result.scalars().all()
-
-            for position in positions:
-                market_val = position.market_value or Decimal("0")
-                total_value += market_val
-
-                ticker = (position.ticker or "UNKNOWN").upper()
-                ticker_values[ticker] = ticker_values.get(ticker, Decimal("0")) + market_val
+            positions.extend(result.scalars().all())
 
-        if total_value == 0:
+        # Look-through exposure: a stock held directly and inside ETFs counts once
+        exposure = household_exposure(positions)
+        if exposure.total <= 0:
             return None
 
-        # Check each position for concentration
-        for ticker, value in ticker_values.items():
-            # Skip broadly diversified ETFs
-            if ticker in self.BROAD_ETFS:
-                continue
-
-            pct = value / total_value
-
-            if pct > self.CONCENTRATION_THRESHOLD:
-                return await self._create_nudge(
-                    user_id=user.id,
-                    nudge_type=NudgeType.CONCENTRATION,
-                    title=f"Large position in {ticker}",
-                    message=f"{ticker} represents {pct:.0%} of your portfolio. "
-                            f"Consider diversifying to reduce risk.",
-                    action_url="/portal/accounts",
-                    action_label="View Holdings",
-                    priority=3,
-                    metadata={"ticker": ticker, "pct": float(pct), "value": float(value)},
-                    expires_days=90
-                )
+        concentrated = exposure.concentrated(float(self.CONCENTRATION_THRESHOLD))
+        if concentrated:
+            ticker, pct = concentrated[0]
+            value = exposure.securities[ticker]
+            via = [src for src in exposure.contributors(ticker) if src != ticker]
+            through = f" (including what you hold through {', '.join(via)})" if via else ""
+            return await self._create_nudge(
+                user_id=user.id,
+                nudge_type=NudgeType.CONCENTRATION,
+                title=f"Large position in {ticker}",
+                message=f"{ticker} represents {pct:.0%} of your portfolio{through}. "
+                        f"Consider diversifying to reduce risk.",
+                action_url="/portal/accounts",
+                action_label="View Holdings",
+                priority=3,
+                metadata={"ticker": ticker, "pct": pct, "value": value, "via": via},
+                expires_days=90
+            )
 
         return None
 
@@ -2,10 +2,13 @@
 PDF text extraction service using PyMuPDF.
 Falls back to mock data if PyMuPDF is not installed.
 """
+import asyncio
 import os
 import logging
 from typing import Optional, Dict, Any
 
+from backend.parsers.layout import DocumentLayout, extract_layout
+
 logger = logging.getLogger(__name__)
 
 # Try to import PyMuPDF
@@ -26,10 +29,10 @@ class PDFService:
         return HAS_PYMUPDF
     
     @staticmethod
-    async def extract_text_from_path(file_path: str) -> str:
-        """Extract text from a PDF file on disk."""
+    async def extract_text_from_path(file_path: str, filename: str = "") -> str:
+        """Extract text from a PDF file on disk (`filename` = original upload name)."""
         if not HAS_PYMUPDF:
-            return PDFService._mock_text_from_filename(os.path.basename(file_path))
+            return PDFService._mock_text_from_filename(filename or os.path.basename(file_path))
         
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"PDF not found: {file_path}")
@@ -64,6 +67,38 @@ class PDFService:
         
         return "\n".join(text_parts)
     
+    @staticmethod
+    async def extract_layout_from_bytes(file_bytes: bytes, filename: str = "") -> DocumentLayout:
+        """Rows and cells with coordinates, extracted off the event loop and cached."""
+        if not HAS_PYMUPDF:
+            return DocumentLayout.from_text(PDFService._mock_text_from_filename(filename))
+        try:
+            return await asyncio.to_thread(extract_layout, file_bytes)
+        except Exception as e:
+            logger.error(f"Error extracting layout from PDF bytes: {e}")
+            raise
+
+    @staticmethod
+    async def extract_layout_from_path(
+        file_path: str, filename: str = "", digest: Optional[str] = None
+    ) -> DocumentLayout:
+        """
+        Layout of a PDF file on disk (`filename` = original upload name,
+        `digest` = its sha256, e.g. the BlobRef's, to skip hashing the file).
+        The file is opened and read in the worker thread.
+        """
+        if not HAS_PYMUPDF:
+            return DocumentLayout.from_text(
+                PDFService._mock_text_from_filename(filename or os.path.basename(file_path))
+            )
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"PDF not found: {file_path}")
+        try:
+            return await asyncio.to_thread(extract_layout, file_path, digest)
+        except Exception as e:
+            logger.error(f"Error extracting layout from PDF: {e}")
+            raise
+
     @staticmethod
     def _mock_text_from_filename(filename: str) -> str:
         """Generate mock PDF content based on filename for demo."""
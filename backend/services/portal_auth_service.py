@@ -10,13 +10,14 @@ import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 
-import bcrypt
 from jose import JWTError, jwt
 from pydantic import BaseModel, EmailStr
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.models.portal import ClientPortalUser
+from backend.services import auth_crypto
+from backend.services.auth_crypto import TokenClaimsCache
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +37,12 @@ PORTAL_JWT_ALGORITHM = "HS256"
 PORTAL_ACCESS_TOKEN_EXPIRE_HOURS = 24
 PORTAL_REFRESH_TOKEN_EXPIRE_DAYS = 30
 
+_claims_cache = TokenClaimsCache("auth:portal_claims")
+
+
+def _decode(token: str) -> dict:
+    return jwt.decode(token, PORTAL_JWT_SECRET, algorithms=[PORTAL_JWT_ALGORITHM])
+
 
 # ============================================================================
 # SCHEMAS
@@ -81,21 +88,10 @@ class PortalAuthService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    @staticmethod
-    def hash_password(password: str) -> str:
-        """Hash a password using bcrypt (72-byte limit)."""
-        pw_bytes = password.encode("utf-8")[:72]
-        return bcrypt.hashpw(pw_bytes, bcrypt.gensalt()).decode("utf-8")
-
-    @staticmethod
-    def verify_password(plain: str, hashed: str) -> bool:
-        """Verify a password against a bcrypt hash."""
-        try:
-            pw_bytes = plain.encode("utf-8")[:72]
-            return bcrypt.checkpw(pw_bytes, hashed.encode("utf-8"))
-        except Exception as e:
-            logger.warning("Portal password verification error: %s", e)
-            return False
+    # Sync hashing stays available for scripts; request paths use the
+    # off-loop variants from auth_crypto.
+    hash_password = staticmethod(auth_crypto.hash_password_sync)
+    verify_password = staticmethod(auth_crypto.verify_password_sync)
 
     @staticmethod
     def create_portal_token(
@@ -123,7 +119,7 @@ class PortalAuthService:
     def decode_portal_token(token: str) -> PortalTokenPayload:
         """Decode and validate a portal JWT token."""
         try:
-            payload = jwt.decode(token, PORTAL_JWT_SECRET, algorithms=[PORTAL_JWT_ALGORITHM])
+            payload = _claims_cache.decode(token, _decode)
             if payload.get("type") not in ("portal_access", "portal_refresh"):
                 raise ValueError("Invalid portal token type")
             return PortalTokenPayload(**payload)
@@ -135,7 +131,7 @@ class PortalAuthService:
     def verify_portal_token(token: str) -> Optional[dict]:
         """Verify portal token and return payload if valid."""
         try:
-            payload = jwt.decode(token, PORTAL_JWT_SECRET, algorithms=[PORTAL_JWT_ALGORITHM])
+            payload = _claims_cache.decode(token, _decode)
             if payload.get("type") not in ("portal_access", "portal_refresh"):
                 return None
             return payload
@@ -157,7 +153,7 @@ class PortalAuthService:
             return None
         user = result.scalar_one_or_none()
 
-        if not user or not self.verify_password(password, user.hashed_password):
+        if not user or not await auth_crypto.verify_password(password, user.hashed_password):
             return None
 
         # Update last login timestamp
@@ -240,7 +236,7 @@ class PortalAuthService:
             id=uuid.uuid4(),
             client_id=uuid.UUID(data.client_id),
             email=data.email,
-            hashed_password=self.hash_password(data.password),
+            hashed_password=await auth_crypto.hash_password(data.password),
             firm_id=uuid.UUID(data.firm_id) if data.firm_id else None,
         )
         self.db.add(user)
@@ -279,7 +275,7 @@ class PortalAuthService:
         if not user:
             return False
 
-        user.hashed_password = self.hash_password(new_password)
+        user.hashed_password = await auth_crypto.hash_password(new_password)
         await self.db.flush()
 
         logger.info("Portal user password reset: %s", user.email)
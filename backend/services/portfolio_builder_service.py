@@ -1,16 +1,25 @@
 """
 ETF Portfolio Builder Service
 
-Generates AI-recommended ETF portfolios based on client risk questionnaire.
-Supports preset portfolios and custom AI-generated allocations.
+Generates ETF portfolios from a client risk questionnaire. The risk level
+sets the asset-class budgets (equity target from the score, alternatives
+and cash from the level's preset); weights inside them come from the
+mean-variance optimizer's cached efficient frontier for those budgets.
 """
 
 import logging
 from decimal import Decimal
-from typing import Optional
+from typing import Dict, List, Optional
 from uuid import UUID
 
+import numpy as np
+
 from backend.data.etf_universe import ETF_UNIVERSE, PRESET_PORTFOLIOS
+from backend.services.portfolio_optimizer import (
+    Constraints,
+    get_frontier,
+    portfolio_statistics,
+)
 from backend.models.portfolio_models import (
     RiskQuestionnaire,
     ModelPortfolio,
@@ -80,6 +89,62 @@ class PortfolioBuilderService:
             raise ValueError(f"Unknown risk level: {risk_level}")
         return PRESET_PORTFOLIOS[risk_level]
 
+    def constraints_for(
+        self, risk_level: str, equity_pct: float, customize: Optional[dict] = None
+    ) -> Constraints:
+        """Class budgets for a risk level and equity target, plus any overrides."""
+        preset = self.get_preset_portfolio(risk_level)
+        overrides = {
+            k: float(customize[k])
+            for k in ("min_weight", "max_weight", "max_expense_ratio")
+            if customize and customize.get(k) is not None
+        }
+        return Constraints.from_percentages(
+            equity_pct,
+            alternatives=preset.get("alternatives_allocation", 0),
+            cash=preset.get("cash_allocation", 0),
+            **overrides,
+        )
+
+    def risk_position(self, total_score: int, risk_level: str) -> float:
+        """Where the score sits inside its level's band: 0 = bottom, 1 = top."""
+        for (low, high), level in self.RISK_THRESHOLDS.items():
+            if level.value == risk_level:
+                return min(max((total_score - low) / (high - low), 0.0), 1.0)
+        return 0.5
+
+    def optimize_holdings(
+        self,
+        constraints: Constraints,
+        position: float,
+        rationales: Optional[Dict[str, str]] = None,
+    ) -> List[dict]:
+        """
+        Holdings (weight in whole-portfolio percent, summing to 100) at
+        `position` along the cached frontier for `constraints`.
+        """
+        frontier = get_frontier(constraints)
+        point = frontier.at(position)
+        symbols = list(ETF_UNIVERSE)
+        held = np.flatnonzero(point.weights)
+        # Round to 0.1% with largest-remainder so the weights still sum to 100
+        raw = point.weights[held] * 1000
+        tenths = np.floor(raw).astype(int)
+        tenths[np.argsort(tenths - raw)[: 1000 - tenths.sum()]] += 1
+        holdings = []
+        for i, t in sorted(zip(held, tenths), key=lambda x: -x[1]):
+            if t <= 0:
+                continue
+            symbol = symbols[i]
+            sub_class = ETF_UNIVERSE[symbol].get("sub_class", "")
+            holdings.append({
+                "symbol": symbol,
+                "weight": t / 10,
+                "rationale": (rationales or {}).get(symbol)
+                or f"Mean-variance allocation to {sub_class.replace('_', ' ')}",
+            })
+        return holdings
+
     def build_portfolio_from_questionnaire(
         self,
         questionnaire: RiskQuestionnaire,
@@ -90,6 +155,15 @@ class PortfolioBuilderService:
         risk_level = scores["risk_tolerance"]
 
         preset = self.get_preset_portfolio(risk_level)
+        constraints = self.constraints_for(risk_level, scores["recommended_equity_pct"], customize)
+        holdings = self.optimize_holdings(
+            constraints,
+            self.risk_position(scores["total_score"], risk_level),
+            rationales={h["symbol"]: h.get("rationale", "") for h in preset["holdings"]},
+        )
+        equity, fixed_income, alternatives, cash = (
+            round(b * 100, 2) for b in constraints.class_budgets
+        )
 
         portfolio = ModelPortfolio(
             name=f"{preset['name']} - {questionnaire.client_id}",
@@ -97,15 +171,15 @@ class PortfolioBuilderService:
             risk_level=risk_level,
             is_preset=False,
             questionnaire_id=questionnaire.id,
-            equity_allocation=Decimal(str(preset["equity_allocation"])),
-            fixed_income_allocation=Decimal(str(preset["fixed_income_allocation"])),
-            alternatives_allocation=Decimal(str(preset.get("alternatives_allocation", 0))),
-            cash_allocation=Decimal(str(preset.get("cash_allocation", 0))),
+            equity_allocation=Decimal(str(equity)),
+            fixed_income_allocation=Decimal(str(fixed_income)),
+            alternatives_allocation=Decimal(str(alternatives)),
+            cash_allocation=Decimal(str(cash)),
         )
 
-        self._calculate_sub_allocations(portfolio, preset["holdings"])
+        self._calculate_sub_allocations(portfolio, holdings)
 
-        for holding_data in preset["holdings"]:
+        for holding_data in holdings:
             symbol = holding_data["symbol"]
             etf_info = ETF_UNIVERSE.get(symbol, {})
 
@@ -187,7 +261,7 @@ class PortfolioBuilderService:
             portfolio.tax_efficiency_optimized = True
 
     def calculate_portfolio_metrics(self, portfolio: ModelPortfolio) -> dict:
-        """Calculate aggregate portfolio metrics."""
+        """Calculate aggregate cost, risk and diversification metrics."""
         total_expense = Decimal("0")
         total_yield = Decimal("0")
 
@@ -197,7 +271,13 @@ class PortfolioBuilderService:
             total_yield += weight * (holding.dividend_yield or Decimal("0"))
 
         num_holdings = len(portfolio.holdings)
-        diversification_score = min(100, num_holdings * 10 + 20)
+        stats = portfolio_statistics(
+            [h.symbol for h in portfolio.holdings],
+            [float(h.target_weight) for h in portfolio.holdings],
+        )
+        # 0 when one holding carries all the risk; 50 at two equal risk bets, 90 at ten
+        effective_bets = stats.get("effective_risk_bets", 1.0)
+        diversification_score = round(100 * (1 - 1 / max(effective_bets, 1.0)))
 
         return {
             "weighted_expense_ratio": float(total_expense),
@@ -205,4 +285,14 @@ class PortfolioBuilderService:
             "estimated_yield": float(total_yield),
             "num_holdings": num_holdings,
             "diversification_score": diversification_score,
+            **stats,
         }
+
+
+def precompute_frontiers() -> int:
+    """Trace and cache the efficient frontier for each risk level's standard budgets."""
+    service = PortfolioBuilderService()
+    for level in RiskToleranceLevel:
+        if level.value in PRESET_PORTFOLIOS:
+            get_frontier(service.constraints_for(level.value, service.EQUITY_ALLOCATIONS[level]))
+    return len(PRESET_PORTFOLIOS)
@@ -2,159 +2,113 @@
 
 from __future__ import annotations
 
-import io
-import re
-from decimal import Decimal, InvalidOperation
+import math
 from pathlib import Path
 from typing import Any
 
 import pandas as pd
 
+from backend.services.holdings_ingest import HoldingsReader, Source
+
 _CASH_TYPES = {"cash and money market", "cash", "money market"}
+_CASH_SYMBOLS = {"CASH", "SGUXX"}
 _SKIP_SYMBOLS = {"--", "account total", "cash & cash investments"}
 
 
-def _parse_money(value: Any) -> Decimal | None:
-    if value is None or (isinstance(value, float) and pd.isna(value)):
-        return None
-    text = str(value).strip()
-    if not text or text == "--":
-        return None
-    cleaned = text.replace("$", "").replace(",", "").replace(" ", "")
-    if cleaned.startswith("(") and cleaned.endswith(")"):
-        cleaned = f"-{cleaned[1:-1]}"
-    try:
-        return Decimal(cleaned)
-    except InvalidOperation:
-        return None
-
-
-def _parse_qty(value: Any) -> Decimal | None:
-    if value is None or (isinstance(value, float) and pd.isna(value)):
-        return None
-    text = str(value).strip().replace(",", "")
-    if not text or text == "--":
-        return None
-    try:
-        return Decimal(text)
-    except InvalidOperation:
-        return None
-
-
-def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df.columns = [
-        re.sub(r"\s+", " ", str(c).strip().lower().replace("_", " "))
-        for c in df.columns
-    ]
-    return df
-
-
-def _find_header_row(raw_lines: list[str]) -> int | None:
-    for idx, line in enumerate(raw_lines[:20]):
-        lower = line.lower()
-        if "symbol" in lower and ("mkt val" in lower or "market value" in lower):
-            return idx
-    return None
-
-
-def _read_csv_dataframe(file_content: bytes) -> pd.DataFrame:
-    text = file_content.decode("utf-8", errors="replace")
-    lines = text.splitlines()
-    header_idx = _find_header_row(lines)
-    if header_idx is not None:
-        trimmed = "\n".join(lines[header_idx:])
-        df = pd.read_csv(io.StringIO(trimmed))
-    else:
-        try:
-            df = pd.read_csv(io.BytesIO(file_content), encoding="utf-8")
-        except UnicodeDecodeError:
-            df = pd.read_csv(io.BytesIO(file_content), encoding="latin-1")
-    return _normalize_columns(df.dropna(how="all"))
-
-
-def _column(df: pd.DataFrame, *candidates: str) -> str | None:
-    for col in df.columns:
-        for candidate in candidates:
-            if candidate in col:
-                return col
-    return None
-
-
-def parse_portfolio_file(file_content: bytes, filename: str) -> dict[str, Any]:
+def _positions(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Vectorized row filter and derived columns for one chunk of positions."""
+    symbol = chunk["symbol"]
+    out = pd.DataFrame({
+        "symbol": symbol,
+        "description": chunk["description"].where(chunk["description"] != "", symbol)
+        if "description" in chunk else symbol,
+        "quantity": chunk["quantity"] if "quantity" in chunk else math.nan,
+        "price": chunk["price"] if "price" in chunk else math.nan,
+    })
+    value = chunk["market_value"] if "market_value" in chunk else pd.Series(math.nan, index=chunk.index)
+    out["market_value"] = value.fillna(out["quantity"] * out["price"])
+    out["security_type"] = (
+        chunk["security_type"].where(chunk["security_type"] != "", "Equity")
+        if "security_type" in chunk else "Equity"
+    )
+    keep = (symbol != "") & ~symbol.str.lower().isin(_SKIP_SYMBOLS) & (out["market_value"] > 0)
+    out = out[keep]
+    is_cash = out["security_type"].str.lower().isin(_CASH_TYPES) | out["symbol"].str.upper().isin(_CASH_SYMBOLS)
+    out["symbol"] = out["symbol"].where(is_cash, out["symbol"].str.upper())
+    out["asset_class"] = out["security_type"].map(_map_asset_class).where(~is_cash, "Cash & Equivalents")
+    return out
+
+
+def parse_portfolio_file(source: Source, filename: str) -> dict[str, Any]:
     """
-    Parse CSV or XLSX portfolio export.
+    Parse CSV or XLSX portfolio export (bytes, a path or a binary file).
     Returns {holdings, total_value, custodian, position_count}.
     """
-    ext = filename.lower().rsplit(".", 1)[-1]
-    if ext == "csv":
-        df = _read_csv_dataframe(file_content)
-    elif ext in {"xlsx", "xls"}:
-        df = _normalize_columns(pd.read_excel(io.BytesIO(file_content), engine="openpyxl", sheet_name=0))
-        df = df.dropna(how="all")
-    else:
-        raise ValueError(f"Unsupported file type: {ext}")
-
-    if df.empty:
+    reader = HoldingsReader(source, filename)
+    holdings: list[dict[str, Any]] = []
+    values: list[float] = []
+    for chunk in reader.chunks():
+        if "symbol" not in chunk:
+            break
+        rows = _positions(chunk)
+        values.extend(rows["market_value"].tolist())
+        rows = rows.astype(object).where(rows.notna(), None)
+        holdings.extend(rows.to_dict("records"))
+
+    if not reader.rows_read and not reader.columns:
         raise ValueError("File appears to be empty")
-
-    symbol_col = _column(df, "symbol", "ticker")
-    value_col = _column(df, "mkt val", "market value", "value", "total value")
-    qty_col = _column(df, "qty", "quantity", "shares")
-    price_col = _column(df, "price", "last price", "market price")
-    desc_col = _column(df, "description", "security name", "name")
-    type_col = _column(df, "security type", "asset class", "type")
-
-    if not symbol_col:
+    if "symbol" not in reader.columns:
         raise ValueError("Could not identify symbol column in file.")
 
-    holdings: list[dict[str, Any]] = []
-    total_value = Decimal("0")
-
-    for _, row in df.iterrows():
-        symbol = str(row.get(symbol_col, "")).strip()
-        if not symbol or symbol.lower() in _SKIP_SYMBOLS:
-            continue
-
-        security_type = str(row.get(type_col, "Equity")).strip() if type_col else "Equity"
-        description = str(row.get(desc_col, symbol)).strip() if desc_col else symbol
-
-        market_value = _parse_money(row.get(value_col)) if value_col else None
-        quantity = _parse_qty(row.get(qty_col)) if qty_col else None
-        price = _parse_money(row.get(price_col)) if price_col else None
-
-        if market_value is None and quantity is not None and price is not None:
-            market_value = quantity * price
-
-        if market_value is None or market_value <= 0:
-            continue
-
-        is_cash = security_type.lower() in _CASH_TYPES or symbol.upper() in {"CASH", "SGUXX"}
-        asset_class = "Cash & Equivalents" if is_cash else _map_asset_class(security_type)
-
-        holdings.append(
-            {
-                "symbol": symbol.upper() if not is_cash else symbol,
-                "description": description,
-                "quantity": float(quantity) if quantity is not None else None,
-                "price": float(price) if price is not None else None,
-                "market_value": float(market_value),
-                "security_type": security_type,
-                "asset_class": asset_class,
-            }
-        )
-        total_value += market_value
-
-    custodian = _detect_custodian(filename, df.columns.tolist())
-
     return {
         "holdings": holdings,
-        "total_value": float(total_value),
-        "custodian": custodian,
+        "total_value": math.fsum(values),
+        "custodian": _detect_custodian(filename, reader.headers),
         "position_count": len(holdings),
     }
 
 
+def parse_ticker_amounts(source: Source, filename: str) -> list[dict[str, Any]]:
+    """
+    Lenient parse for the public analyzer: one {ticker, amount} per ticker,
+    summed across rows. Guesses the security and amount columns from values
+    when the headers don't name them; amount is market value, else
+    quantity x price, else quantity.
+    """
+    reader = HoldingsReader(source, filename, infer_columns=True)
+    totals: dict[str, float] = {}
+    for chunk in reader.chunks():
+        names = chunk["symbol"] if "symbol" in chunk else chunk.get("description")
+        if names is None:
+            break
+        ticker = (
+            names.str.split().str[0].fillna("").str.upper().str.strip("()[]{}")
+            .str.split(".").str[0].str.split("-").str[0].str.split("(").str[0]
+        )
+        nan = pd.Series(math.nan, index=chunk.index)
+        quantity = chunk.get("quantity", nan)
+        amount = chunk.get("market_value", nan).fillna(quantity * chunk.get("price", nan)).fillna(quantity)
+        keep = (
+            ~names.str.lower().isin(_SKIP_SYMBOLS)
+            & ticker.str.len().between(1, 10)
+            & ticker.str.replace("$", "", regex=False).str.isalnum()
+            & ~ticker.isin(["NAN", "NONE"])
+            & (amount >= 0.01)
+        )
+        sums = amount[keep].round(2).groupby(ticker[keep], sort=False).sum()
+        for symbol, value in sums.items():
+            totals[symbol] = totals.get(symbol, 0.0) + value
+
+    if not ({"symbol", "description"} & reader.columns.keys()):
+        raise ValueError("Could not identify ticker/symbol column. Please check file format.")
+    if not totals:
+        raise ValueError(
+            "No valid holdings found in file. Please check that the file contains "
+            "ticker symbols and dollar amounts."
+        )
+    return [{"ticker": t, "amount": round(a, 2)} for t, a in totals.items()]
+
+
 def _map_asset_class(security_type: str) -> str:
     lower = security_type.lower()
     if "etf" in lower or "closed end" in lower:
@@ -243,7 +197,7 @@ def load_demo_schwab_holdings(
     path = csv_path or Path(__file__).resolve().parent.parent / "data" / "demo_schwab_positions.csv"
     if not path.exists():
         return []
-    parsed = parse_portfolio_file(path.read_bytes(), path.name)
+    parsed = parse_portfolio_file(path, path.name)
     scaled, _ = scale_holdings(
         parsed["holdings"],
         target_invested=target_invested,
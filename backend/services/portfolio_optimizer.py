@@ -0,0 +1,423 @@
+"""
+Constrained mean-variance optimizer over the curated ETF universe.
+
+    maximize    mu_net' w - lambda * er' w - (gamma / 2) w' Sigma w
+    subject to  sum of w over each asset class = class budget
+                0 <= w_i <= max_weight, and w_i >= min_weight if held
+                er' w <= max_expense_ratio
+
+mu_net is expected return net of each fund's expense ratio, so among funds
+tracking the same exposure the cheapest one wins. The expense cap is
+enforced through its multiplier lambda (bisected); the class budgets and
+box bounds by a primal active-set QP (n is ~30, so each pivot is one small
+dense KKT solve). Warm starts are made feasible with the direct-indexing
+optimizer's capped-simplex projection, asset classes playing sectors.
+
+An efficient frontier (one solution per gamma on a fixed grid) is computed
+once per constraint set and cached; a questionnaire answer is a lookup on
+that frontier. A budget that is not cached yet is solved warm-started from
+the nearest cached frontier.
+
+Risk assumptions are long-run, per ETF sub-class, expressed as loadings on
+five risk factors plus a sub-class-specific term (funds in the same
+sub-class are perfectly correlated with each other). Expected returns
+default to market-implied equilibrium returns; callers with their own
+views pass a Universe with different expected_returns.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.data.etf_universe import ETF_UNIVERSE
+from backend.services.direct_indexing.optimizer import project
+
+ASSET_CLASSES = ("equity", "fixed_income", "alternatives", "cash")
+RISK_FREE_RATE = 0.035
+
+# equity, international, rates, credit, real assets
+FACTOR_VOLS = np.array([0.16, 0.06, 0.05, 0.04, 0.12])
+
+# sub_class -> (factor loadings, specific vol)
+CAPITAL_MARKET_ASSUMPTIONS: Dict[str, Tuple[Tuple[float, ...], float]] = {
+    "total_us_market": ((1.00, 0.0, 0.00, 0.00, 0.0), 0.010),
+    "large_cap_us": ((0.98, 0.0, 0.00, 0.00, 0.0), 0.010),
+    "large_cap_growth": ((1.10, 0.0, 0.00, 0.00, 0.0), 0.040),
+    "large_cap_value": ((0.90, 0.0, 0.00, 0.10, 0.0), 0.030),
+    "mid_cap_us": ((1.10, 0.0, 0.00, 0.10, 0.0), 0.050),
+    "small_cap_us": ((1.20, 0.0, 0.00, 0.20, 0.0), 0.070),
+    "small_cap_value": ((1.20, 0.0, 0.00, 0.25, 0.0), 0.080),
+    "international_developed": ((0.85, 1.0, 0.00, 0.00, 0.0), 0.030),
+    "total_international": ((0.85, 1.1, 0.00, 0.00, 0.0), 0.030),
+    "emerging_markets": ((0.90, 1.6, 0.00, 0.10, 0.1), 0.060),
+    "total_bond": ((0.00, 0.0, 0.90, 0.30, 0.0), 0.010),
+    "govt_bonds": ((0.00, 0.0, 1.00, 0.00, 0.0), 0.010),
+    "short_term_treasury": ((0.00, 0.0, 0.30, 0.00, 0.0), 0.005),
+    "intermediate_treasury": ((0.00, 0.0, 0.90, 0.00, 0.0), 0.010),
+    "long_term_treasury": ((0.00, 0.0, 2.20, 0.00, 0.0), 0.020),
+    "corp_bonds": ((0.10, 0.0, 0.90, 0.80, 0.0), 0.015),
+    "tips": ((0.00, 0.0, 0.50, 0.00, 0.3), 0.010),
+    "high_yield": ((0.35, 0.0, 0.20, 1.20, 0.0), 0.030),
+    "intl_bonds": ((0.00, 0.0, 0.80, 0.20, 0.0), 0.015),
+    "reits": ((0.80, 0.0, 0.40, 0.40, 0.5), 0.080),
+    "commodities": ((0.30, 0.0, 0.00, 0.00, 1.3), 0.060),
+    "gold": ((0.00, 0.0, 0.20, 0.00, 0.8), 0.120),
+    "money_market_equivalent": ((0.00, 0.0, 0.02, 0.00, 0.0), 0.003),
+    "t_bills": ((0.00, 0.0, 0.01, 0.00, 0.0), 0.003),
+}
+
+# Global market portfolio by sub-class. Default expected returns are the
+# equilibrium returns it implies (reverse optimization): mu = rf + delta * Sigma w_mkt,
+# which keeps unconstrained mean-variance answers close to market weights
+# instead of piling into whichever sub-class has the highest point estimate.
+MARKET_PORTFOLIO = {
+    "total_us_market": 0.38, "international_developed": 0.15, "emerging_markets": 0.05,
+    "total_bond": 0.26, "intl_bonds": 0.09, "tips": 0.02, "reits": 0.03,
+    "commodities": 0.01, "gold": 0.01,
+}
+EQUILIBRIUM_RISK_AVERSION = 2.5
+
+# Risk aversion grid, most to least risk-averse; brackets the equilibrium
+# delta since the class budgets already set the overall risk level
+GAMMA_GRID = tuple(np.geomspace(6.0, 1.5, 13).round(4))
+
+_MAX_PIVOTS = 500
+_BOUND_EPS = 1e-10
+# Funds in one sub-class are perfectly correlated (Sigma is singular); the
+# ridge makes the split between them strictly convex without changing which
+# (cheapest) fund wins
+_RIDGE = 1e-7
+_TIE_BREAK = 1e-6
+_EXPENSE_BISECT_STEPS = 30
+
+
+@dataclass(frozen=True)
+class Universe:
+    symbols: Tuple[str, ...]
+    asset_classes: Tuple[str, ...]
+    expected_returns: np.ndarray  # gross, annual
+    covariance: np.ndarray
+    expense_ratios: np.ndarray
+
+    @property
+    def class_ids(self) -> np.ndarray:
+        return np.array([ASSET_CLASSES.index(c) for c in self.asset_classes])
+
+    @property
+    def volatilities(self) -> np.ndarray:
+        return np.sqrt(np.diag(self.covariance))
+
+
+def default_universe(symbols: Optional[Sequence[str]] = None) -> Universe:
+    """Universe from ETF_UNIVERSE and the capital market assumptions above."""
+    symbols = tuple(symbols or ETF_UNIVERSE)
+    subs = sorted(set(CAPITAL_MARKET_ASSUMPTIONS))
+    loadings = np.array([CAPITAL_MARKET_ASSUMPTIONS[s][0] for s in subs]) * FACTOR_VOLS
+    specific = np.array([CAPITAL_MARKET_ASSUMPTIONS[s][1] for s in subs])
+    sub_cov = loadings @ loadings.T + np.diag(specific**2)
+    w_mkt = np.array([MARKET_PORTFOLIO.get(s, 0.0) for s in subs])
+    sub_mu = RISK_FREE_RATE + EQUILIBRIUM_RISK_AVERSION * (sub_cov @ w_mkt)
+
+    idx = np.array([subs.index(ETF_UNIVERSE[s]["sub_class"]) for s in symbols])
+    # Funds tracking the same sub-class are interchangeable apart from cost;
+    # a sliver of return by listing order breaks exact ties (BND vs AGG)
+    rank = np.array([list(idx[:i]).count(idx[i]) for i in range(len(idx))])
+    return Universe(
+        symbols=symbols,
+        asset_classes=tuple(ETF_UNIVERSE[s]["asset_class"] for s in symbols),
+        expected_returns=sub_mu[idx] - rank * _TIE_BREAK,
+        covariance=sub_cov[np.ix_(idx, idx)],
+        expense_ratios=np.array([float(ETF_UNIVERSE[s]["expense_ratio"]) for s in symbols]),
+    )
+
+
+@dataclass(frozen=True)
+class Constraints:
+    """Class budgets are fractions summing to 1, in ASSET_CLASSES order."""
+
+    class_budgets: Tuple[float, float, float, float]
+    min_weight: float = 0.02
+    max_weight: float = 0.35
+    max_expense_ratio: float = 0.0015
+
+    @classmethod
+    def from_percentages(cls, equity: float, alternatives: float = 0, cash: float = 0, **kwargs) -> "Constraints":
+        """Fixed income takes the remainder; alternatives then cash give way if over 100."""
+        equity = min(max(equity, 0.0), 100.0)
+        alternatives = min(alternatives, 100.0 - equity)
+        cash = min(cash, 100.0 - equity - alternatives)
+        fixed_income = 100.0 - equity - alternatives - cash
+        return cls(
+            tuple(round(x / 100.0, 6) for x in (equity, fixed_income, alternatives, cash)),
+            **kwargs,
+        )
+
+
+@dataclass
+class FrontierPoint:
+    gamma: float
+    weights: np.ndarray
+    expected_return: float
+    volatility: float
+    expense_ratio: float
+
+
+@dataclass
+class Frontier:
+    constraints: Constraints
+    points: List[FrontierPoint] = field(default_factory=list)
+
+    def at(self, position: float) -> FrontierPoint:
+        """position 0 = most risk-averse point, 1 = least."""
+        position = min(max(position, 0.0), 1.0)
+        return self.points[int(round(position * (len(self.points) - 1)))]
+
+
+# ─────────────────────────────────────────────────────────────
+# Solver
+# ─────────────────────────────────────────────────────────────
+
+
+def _solve(
+    universe: Universe,
+    gamma: float,
+    budgets: np.ndarray,
+    caps: np.ndarray,
+    penalty: float,
+    start: np.ndarray,
+) -> np.ndarray:
+    """
+    Primal active-set QP for one gamma / expense multiplier:
+    minimize 0.5 w'Qw + g'w with Q = gamma * Sigma (+ ridge), class sums
+    fixed, 0 <= w <= caps. Starts from the projection of `start`, so a warm
+    start from a neighbouring solution usually finishes in a few pivots.
+    """
+    n = len(caps)
+    class_ids = universe.class_ids
+    q = gamma * universe.covariance + _RIDGE * np.eye(n)
+    g = -(universe.expected_returns - (1.0 + penalty) * universe.expense_ratios)
+    a = np.eye(len(budgets))[:, class_ids]  # (classes, n)
+
+    w = project(start[None, :], caps[None, :], class_ids, budgets[None, :])[0]
+    at_lower = w <= _BOUND_EPS
+    at_upper = ~at_lower & (w >= caps - _BOUND_EPS)
+    w = np.where(at_lower, 0.0, np.where(at_upper, caps, w))
+
+    for _ in range(_MAX_PIVOTS):
+        free = ~(at_lower | at_upper)
+        rows = np.flatnonzero(a[:, free].any(axis=1))
+        f = np.flatnonzero(free)
+        k = len(f) + len(rows)
+        kkt = np.zeros((k, k))
+        kkt[: len(f), : len(f)] = q[np.ix_(f, f)]
+        kkt[: len(f), len(f):] = a[np.ix_(rows, f)].T
+        kkt[len(f):, : len(f)] = a[np.ix_(rows, f)]
+        fixed = ~free
+        rhs = np.concatenate([
+            -g[f] - q[np.ix_(f, fixed)] @ w[fixed],
+            budgets[rows] - a[np.ix_(rows, fixed)] @ w[fixed],
+        ])
+        sol = np.linalg.lstsq(kkt, rhs, rcond=None)[0]
+        target = w.copy()
+        target[f] = sol[: len(f)]
+        step = target - w
+
+        if np.abs(step).max() < 1e-12:
+            nu = np.zeros(len(budgets))
+            nu[rows] = sol[len(f):]
+            # Multipliers of the bound constraints: d(objective)/dw_i + nu_class
+            r = q @ w + g + a.T @ nu
+            lower_bad = np.where(at_lower, -r, 0.0)
+            upper_bad = np.where(at_upper, r, 0.0)
+            worst = int(np.argmax(np.maximum(lower_bad, upper_bad)))
+            if max(lower_bad[worst], upper_bad[worst]) <= 1e-12:
+                break
+            at_lower[worst] = at_upper[worst] = False
+            continue
+
+        # Longest step toward target that keeps every free variable in its box
+        with np.errstate(divide="ignore", invalid="ignore"):
+            to_lower = np.where(free & (step < 0), -w / step, np.inf)
+            to_upper = np.where(free & (step > 0), (caps - w) / step, np.inf)
+        alpha = min(1.0, to_lower.min(), to_upper.min())
+        w = w + alpha * step
+        if alpha < 1.0:
+            if to_lower.min() <= to_upper.min():
+                i = int(np.argmin(to_lower))
+                at_lower[i], w[i] = True, 0.0
+            else:
+                i = int(np.argmin(to_upper))
+                at_upper[i], w[i] = True, caps[i]
+    return np.clip(w, 0.0, caps)
+
+
+def _caps(universe: Universe, constraints: Constraints, allowed: np.ndarray) -> np.ndarray:
+    """Box upper bounds; loosened where a class could not otherwise be filled."""
+    budgets = np.array(constraints.class_budgets)
+    counts = np.bincount(universe.class_ids[allowed], minlength=len(ASSET_CLASSES))
+    floor = np.divide(budgets, counts, out=np.zeros_like(budgets), where=counts > 0)
+    return np.where(allowed, np.maximum(constraints.max_weight, floor[universe.class_ids]), 0.0)
+
+
+def _solve_with_expense_cap(
+    universe: Universe,
+    gamma: float,
+    constraints: Constraints,
+    allowed: np.ndarray,
+    start: np.ndarray,
+) -> np.ndarray:
+    budgets = np.array(constraints.class_budgets)
+    caps = _caps(universe, constraints, allowed)
+    w = _solve(universe, gamma, budgets, caps, 0.0, start)
+    if universe.expense_ratios @ w <= constraints.max_expense_ratio + 1e-12:
+        return w
+    # Expense cap binds: bisect its multiplier (expense falls as lambda grows)
+    lo, hi = 0.0, 1.0
+    while universe.expense_ratios @ _solve(universe, gamma, budgets, caps, hi, w) > constraints.max_expense_ratio:
+        lo, hi = hi, hi * 4.0
+        if hi > 1e6:
+            raise ValueError("Expense-ratio cap cannot be met with these class budgets")
+    for _ in range(_EXPENSE_BISECT_STEPS):
+        mid = 0.5 * (lo + hi)
+        w = _solve(universe, gamma, budgets, caps, mid, w)
+        if universe.expense_ratios @ w > constraints.max_expense_ratio:
+            lo = mid
+        else:
+            hi = mid
+    return _solve(universe, gamma, budgets, caps, hi, w)
+
+
+def optimize(
+    universe: Universe,
+    gamma: float,
+    constraints: Constraints,
+    start: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Optimal weights (fractions) for one risk aversion, min_weight enforced."""
+    allowed = np.ones(len(universe.symbols), bool)
+    w = _solve_with_expense_cap(
+        universe, gamma, constraints, allowed, _equal_start(universe, constraints) if start is None else start
+    )
+    # Semi-continuous min weight: drop dust positions and re-solve on survivors
+    while True:
+        keep = allowed & (w >= constraints.min_weight - 1e-9)
+        for c in np.flatnonzero(np.array(constraints.class_budgets) > 0):
+            in_class = universe.class_ids == c
+            if not (keep & in_class).any():
+                keep[np.argmax(np.where(in_class, w, -1.0))] = True
+        if (keep == allowed).all():
+            break
+        allowed = keep
+        w = _solve_with_expense_cap(universe, gamma, constraints, allowed, np.where(allowed, w, 0.0))
+    w[w < 1e-9] = 0.0
+    return w
+
+
+def _equal_start(universe: Universe, constraints: Constraints) -> np.ndarray:
+    """Equal weight inside each class, scaled to the class budgets."""
+    ids = universe.class_ids
+    counts = np.bincount(ids, minlength=len(ASSET_CLASSES))
+    return np.array(constraints.class_budgets)[ids] / counts[ids]
+
+
+def trace_frontier(
+    universe: Universe,
+    constraints: Constraints,
+    warm_start: Optional["Frontier"] = None,
+) -> Frontier:
+    """Solve every gamma on the grid, warm-started from `warm_start` or the previous point."""
+    frontier = Frontier(constraints)
+    w = None
+    for i, gamma in enumerate(GAMMA_GRID):
+        start = warm_start.points[i].weights if warm_start is not None else w
+        w = optimize(universe, gamma, constraints, start)
+        frontier.points.append(FrontierPoint(
+            gamma=float(gamma),
+            weights=w,
+            expected_return=float(universe.expected_returns @ w - universe.expense_ratios @ w),
+            volatility=float(math.sqrt(max(w @ universe.covariance @ w, 0.0))),
+            expense_ratio=float(universe.expense_ratios @ w),
+        ))
+    return frontier
+
+
+_frontiers: Dict[Constraints, Frontier] = {}
+_MAX_FRONTIERS = 64
+
+
+def get_frontier(constraints: Constraints, universe: Optional[Universe] = None) -> Frontier:
+    """
+    Frontier for a constraint set over the default universe, cached; a new
+    set warm-starts from the cached frontier with the closest class budgets.
+    A caller-supplied universe (own covariance / return views) is not cached.
+    """
+    if universe is not None:
+        return trace_frontier(universe, constraints)
+    frontier = _frontiers.get(constraints)
+    if frontier is not None:
+        return frontier
+    nearest = min(
+        _frontiers.values(),
+        key=lambda f: np.abs(np.subtract(f.constraints.class_budgets, constraints.class_budgets)).sum(),
+        default=None,
+    )
+    frontier = trace_frontier(_default_universe(), constraints, warm_start=nearest)
+    if len(_frontiers) >= _MAX_FRONTIERS:
+        _frontiers.pop(next(iter(_frontiers)))
+    _frontiers[constraints] = frontier
+    return frontier
+
+
+_universe: Optional[Universe] = None
+
+
+def _default_universe() -> Universe:
+    global _universe
+    if _universe is None:
+        _universe = default_universe()
+    return _universe
+
+
+# ─────────────────────────────────────────────────────────────
+# Metrics
+# ─────────────────────────────────────────────────────────────
+
+
+def portfolio_statistics(
+    symbols: Sequence[str], weights: Sequence[float], universe: Optional[Universe] = None
+) -> Dict[str, float]:
+    """Return, volatility and diversification measures for weights (fractions)."""
+    universe = universe or _default_universe()
+    index = {s: i for i, s in enumerate(universe.symbols)}
+    w = np.zeros(len(universe.symbols))
+    for sym, weight in zip(symbols, weights):
+        if sym in index:
+            w[index[sym]] += float(weight)
+    if w.sum() <= 0:
+        return {}
+    w = w / w.sum()
+
+    cov = universe.covariance
+    variance = float(w @ cov @ w)
+    vol = math.sqrt(max(variance, 0.0))
+    exp_ret = float(universe.expected_returns @ w - universe.expense_ratios @ w)
+    # Share of total variance each holding contributes (sums to 1)
+    contrib = w * (cov @ w) / variance if variance > 0 else w
+    shares = np.clip(contrib[contrib > 0], 1e-12, None)
+    shares = shares / shares.sum()
+    effective_bets = float(np.exp(-(shares * np.log(shares)).sum()))
+    held = w > 0
+    return {
+        "expected_return": round(exp_ret, 4),
+        "volatility": round(vol, 4),
+        "sharpe_ratio": round((exp_ret - RISK_FREE_RATE) / vol, 3) if vol > 0 else 0.0,
+        "diversification_ratio": round(float(universe.volatilities @ w) / vol, 3) if vol > 0 else 1.0,
+        "effective_holdings": round(1.0 / float((w[held] ** 2).sum()), 2),
+        "effective_risk_bets": round(effective_bets, 2),
+        "max_risk_contribution": round(float(contrib.max()), 4),
+        "risk_contributions": {
+            universe.symbols[i]: round(float(contrib[i]), 4) for i in np.flatnonzero(held)
+        },
+    }
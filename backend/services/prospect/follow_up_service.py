@@ -1,22 +1,28 @@
 """
 Automated follow-up service for prospect pipeline (IMM-04).
 
-Runs periodic checks via APScheduler to send follow-up emails
+Runs periodic checks via the job scheduler to send follow-up emails
 and advisor alerts based on prospect stage and inactivity.
 """
 
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import List
+from typing import Dict, List, Optional, Set, Tuple
 
-from sqlalchemy import and_, select
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.models.prospect import Prospect, ProspectCommunication, ProspectStatus
-from backend.services.notifications import send_advisor_alert, send_email
+from backend.services.email_outbox import enqueue_email
+from backend.services.notifications import send_advisor_alert
+from backend.services.scheduler.watermarks import crossed, job_key, load_watermark, save_watermark
 
 logger = logging.getLogger(__name__)
 
+# Substitution tokens filled in per recipient by the email provider
+FIRST_NAME = "-first_name-"
+FULL_NAME = "-full_name-"
+
 FOLLOW_UP_RULES = [
     {
         "stage": ProspectStatus.CONTACTED,
@@ -50,105 +56,180 @@ FOLLOW_UP_RULES = [
 ]
 
 
-async def check_follow_ups(db: AsyncSession) -> int:
+FOLLOW_UP_JOB = "prospect_follow_ups"
+
+
+async def check_follow_ups(db: AsyncSession, shard=None, now: Optional[datetime] = None) -> int:
     """
-    Check all prospects for follow-up needs. Returns count of actions taken.
-    Called by APScheduler every hour.
+    Check prospects for follow-up needs. Returns count of actions taken.
+    Called by the job scheduler every 4 hours; with a `shard`, only prospects
+    of advisors in that shard are handled.
+
+    Incremental: a rule becomes due for a prospect only when its inactivity
+    or its last send of the template crosses the rule's window, or when the
+    prospect changes (e.g. its stage). Since the last run's watermark, only
+    those prospects are loaded, in one query; each is evaluated against
+    every rule of its stage, and the actions and the new watermark are
+    committed together.
     """
-    actions_taken = 0
-    now = datetime.now(timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    key = job_key(FOLLOW_UP_JOB, shard)
+    since = await load_watermark(db, key)
+    last_sent = await _recent_sends(db, now, since)
+
+    result = await db.execute(_candidates(since, now, last_sent))
+    prospects = [
+        p for p in result.scalars().all()
+        if shard is None or shard.owns(p.advisor_id)
+    ]
+
+    actions: List[Tuple[Prospect, dict]] = [
+        (prospect, rule)
+        for prospect in prospects
+        for rule in due_rules(prospect, last_sent, now)
+    ]
+    for prospect, rule in actions:
+        if rule.get("advisor_only"):
+            await send_advisor_alert(
+                str(prospect.advisor_id),
+                rule["template"],
+                f"{prospect.first_name} {prospect.last_name} — {rule['subject']}",
+            )
+        elif prospect.email:
+            html, substitutions = _render_template(rule["template"], prospect)
+            enqueue_email(
+                db,
+                prospect.email,
+                rule["subject"],
+                html,
+                substitutions=substitutions,
+                category=rule["template"],
+            )
 
-    for rule in FOLLOW_UP_RULES:
-        cutoff = now - timedelta(days=rule["days_inactive"])
-        result = await db.execute(
-            select(Prospect).where(
-                and_(
-                    Prospect.status == rule["stage"],
-                    Prospect.last_activity_at < cutoff,
-                    Prospect.last_activity_at.isnot(None),
-                )
+        if rule.get("alert_advisor"):
+            await send_advisor_alert(
+                str(prospect.advisor_id),
+                "prospect_needs_attention",
+                f"{prospect.first_name} {prospect.last_name} inactive for {rule['days_inactive']}+ days",
             )
+
+    db.add_all([
+        ProspectCommunication(
+            prospect_id=prospect.id,
+            comm_type="EMAIL" if not rule.get("advisor_only") else "NOTE",
+            template_name=rule["template"],
         )
-        prospects = list(result.scalars().all())
+        for prospect, rule in actions
+    ])
+    await save_watermark(db, key, now)
+    await db.commit()
+    logger.info("Follow-up check complete: %d actions taken (%d prospects evaluated)",
+                len(actions), len(prospects))
+    return len(actions)
+
+
+def due_rules(prospect: Prospect, last_sent: Dict[Tuple, datetime], now: datetime) -> List[dict]:
+    """Rules of the prospect's stage it is inactive past and not recently sent."""
+    due = []
+    for rule in FOLLOW_UP_RULES:
+        if rule["stage"] != prospect.status or prospect.last_activity_at is None:
+            continue
+        cutoff = now - timedelta(days=rule["days_inactive"])
+        sent_at = last_sent.get((prospect.id, rule["template"]))
+        if prospect.last_activity_at < cutoff and (sent_at is None or sent_at <= cutoff):
+            due.append(rule)
+    return due
+
+
+def _resent_ids(last_sent: Dict[Tuple, datetime], since: datetime, now: datetime) -> Set:
+    """Prospects whose last send of a template aged out of its rule window since the watermark."""
+    windows = {r["template"]: crossed(since, now, r["days_inactive"]) for r in FOLLOW_UP_RULES}
+    # A send blocks its rule while sent_at > cutoff, so the window is (lo, hi]
+    return {
+        pid for (pid, template), sent_at in last_sent.items()
+        if windows[template][0] < sent_at <= windows[template][1]
+    }
 
-        for prospect in prospects:
-            already_sent = await _already_sent(
-                db, prospect.id, rule["template"], rule["days_inactive"]
-            )
-            if already_sent:
-                continue
-
-            if rule.get("advisor_only"):
-                await send_advisor_alert(
-                    str(prospect.advisor_id),
-                    rule["template"],
-                    f"{prospect.first_name} {prospect.last_name} — {rule['subject']}",
-                )
-            elif prospect.email:
-                await send_email(
-                    prospect.email,
-                    rule["subject"],
-                    _render_template(rule["template"], prospect),
-                )
-
-            if rule.get("alert_advisor"):
-                await send_advisor_alert(
-                    str(prospect.advisor_id),
-                    "prospect_needs_attention",
-                    f"{prospect.first_name} {prospect.last_name} inactive for {rule['days_inactive']}+ days",
-                )
-
-            comm = ProspectCommunication(
-                prospect_id=prospect.id,
-                comm_type="EMAIL" if not rule.get("advisor_only") else "NOTE",
-                template_name=rule["template"],
-            )
-            db.add(comm)
-            actions_taken += 1
 
-    if actions_taken:
-        await db.commit()
-    logger.info("Follow-up check complete: %d actions taken", actions_taken)
-    return actions_taken
+def _candidates(since: Optional[datetime], now: datetime, last_sent: Dict[Tuple, datetime]):
+    """Prospects that may have a rule newly due; every prospect in a rule stage on a first run."""
+    stmt = select(Prospect).where(
+        and_(
+            Prospect.status.in_({r["stage"] for r in FOLLOW_UP_RULES}),
+            Prospect.last_activity_at.isnot(None),
+        )
+    )
+    if since is None:
+        return stmt
+    changed = [Prospect.updated_at > since]
+    for rule in FOLLOW_UP_RULES:
+        lo, hi = crossed(since, now, rule["days_inactive"])
+        changed.append(
+            and_(
+                Prospect.status == rule["stage"],
+                Prospect.last_activity_at >= lo,
+                Prospect.last_activity_at < hi,
+            )
+        )
+    resent = _resent_ids(last_sent, since, now)
+    if resent:
+        changed.append(Prospect.id.in_(resent))
+    return stmt.where(or_(*changed))
 
 
-async def _already_sent(
-    db: AsyncSession, prospect_id, template: str, days_window: int
-) -> bool:
-    """Check if this template was already sent within the window."""
-    cutoff = datetime.now(timezone.utc) - timedelta(days=days_window)
+async def _recent_sends(
+    db: AsyncSession, now: datetime, since: Optional[datetime] = None
+) -> Dict[Tuple, datetime]:
+    """
+    Last send per (prospect, template) inside the widest rule window, back
+    to the watermark, in one query, instead of an already-sent lookup per
+    prospect and rule.
+    """
+    widest = (since or now) - timedelta(days=max(r["days_inactive"] for r in FOLLOW_UP_RULES))
     result = await db.execute(
-        select(ProspectCommunication.id).where(
+        select(
+            ProspectCommunication.prospect_id,
+            ProspectCommunication.template_name,
+            func.max(ProspectCommunication.sent_at),
+        )
+        .where(
             and_(
-                ProspectCommunication.prospect_id == prospect_id,
-                ProspectCommunication.template_name == template,
-                ProspectCommunication.sent_at > cutoff,
+                ProspectCommunication.template_name.in_({r["template"] for r in FOLLOW_UP_RULES}),
+                ProspectCommunication.sent_at > widest,
             )
-        ).limit(1)
+        )
+        .group_by(ProspectCommunication.prospect_id, ProspectCommunication.template_name)
     )
-    return result.scalar() is not None
+    return {(pid, template): sent_at for pid, template, sent_at in result.all()}
 
 
-def _render_template(template_name: str, prospect: Prospect) -> str:
-    """Simple HTML email template rendering."""
-    name = f"{prospect.first_name} {prospect.last_name}"
+def _render_template(template_name: str, prospect: Prospect) -> Tuple[str, Dict[str, str]]:
+    """
+    Simple HTML email template rendering. The body keeps name tokens and
+    returns their values separately, so every recipient of a template
+    shares one body and the outbox can batch them into one request.
+    """
+    substitutions = {
+        FIRST_NAME: prospect.first_name or "",
+        FULL_NAME: f"{prospect.first_name} {prospect.last_name}",
+    }
     templates = {
         "follow_up_1": f"""
-            <p>Hi {prospect.first_name},</p>
+            <p>Hi {FIRST_NAME},</p>
             <p>I wanted to follow up on our recent conversation about your
             financial goals. I'd love to explore how Firmum can help you build
             and protect your wealth.</p>
             <p>Would you have time for a brief call this week?</p>
         """,
         "follow_up_2": f"""
-            <p>Hi {prospect.first_name},</p>
+            <p>Hi {FIRST_NAME},</p>
             <p>I haven't heard back yet and wanted to make sure my previous
             message didn't get lost. I'm confident we can help you achieve
             your investment objectives.</p>
             <p>Could we schedule 15 minutes to discuss?</p>
         """,
         "proposal_reminder": f"""
-            <p>Hi {prospect.first_name},</p>
+            <p>Hi {FIRST_NAME},</p>
             <p>Your personalized investment proposal is ready for review.
             I'd love to walk you through the strategy we've designed
             specifically for your goals.</p>
@@ -156,4 +237,4 @@ def _render_template(template_name: str, prospect: Prospect) -> str:
             a good time to review it together.</p>
         """,
     }
-    return templates.get(template_name, f"<p>Follow-up for {name}</p>")
+    return templates.get(template_name, f"<p>Follow-up for {FULL_NAME}</p>"), substitutions
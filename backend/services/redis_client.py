@@ -3,10 +3,13 @@ Async Redis client singleton.
 
 Key schema:
   quote:{symbol}                    -> JSON {bid, ask, last, volume, timestamp}, TTL=60s
+                                       (also published on pub/sub channel quote:{symbol})
   positions:{advisor_id}            -> JSON list [{symbol, quantity, account_id}], TTL=120s
   holdings:{advisor_id}:{acct_id}   -> JSON holdings, TTL=120s
   data_freshness:{advisor_id}       -> Unix timestamp of last successful sync, TTL=300s
   tax_job:{job_id}                  -> JSON {status, result, error}, TTL=3600s
+  usage:{user_id}:{feature}:{YYYYMM} -> monthly usage counter, TTL=40d (see usage_tracker)
+  dashboard:version:{scope}:{id}    -> dashboard data version, INCR (see dashboard_snapshots)
 """
 
 import logging
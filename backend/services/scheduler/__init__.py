@@ -0,0 +1,19 @@
+"""Leader-elected, sharded job scheduler shared by every worker and replica."""
+
+from .coordination import LocalCoordinator, RedisCoordinator, get_coordinator
+from .runner import JobScheduler, ScheduledJob, Shard, shard_of
+from .watermarks import crossed, job_key, load_watermark, save_watermark
+
+__all__ = [
+    "JobScheduler",
+    "LocalCoordinator",
+    "RedisCoordinator",
+    "ScheduledJob",
+    "Shard",
+    "crossed",
+    "get_coordinator",
+    "job_key",
+    "load_watermark",
+    "save_watermark",
+    "shard_of",
+]
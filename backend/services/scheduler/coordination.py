@@ -0,0 +1,118 @@
+"""
+Cross-worker coordination for the job scheduler: leader lease, fire
+de-duplication, last-fire bookkeeping and the shared shard queue.
+
+RedisCoordinator is used whenever Redis is reachable. LocalCoordinator keeps
+the same contract inside one process (single worker, or several schedulers
+sharing one instance in tests).
+
+Key schema:
+  scheduler:leader             -> worker id holding the lease, PX=lease ttl
+  scheduler:fired:{job}:{ts}   -> 1, NX guard so a scheduled time fires once
+  scheduler:last:{job}         -> epoch seconds of the last fired schedule
+  scheduler:shards             -> list of JSON shard tasks (RPUSH / BLPOP)
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, Dict, Optional
+
+LEADER_KEY = "scheduler:leader"
+QUEUE_KEY = "scheduler:shards"
+
+# Acquire the lease or extend it if we already hold it
+_ACQUIRE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+  return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+if redis.call('set', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then return 1 end
+return 0
+"""
+
+_RELEASE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end
+return 0
+"""
+
+
+class LocalCoordinator:
+    def __init__(self) -> None:
+        self._leader: Optional[str] = None
+        self._lease_until = 0.0
+        self._fired: Dict[str, float] = {}
+        self._last: Dict[str, float] = {}
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    async def acquire(self, worker_id: str, ttl: float) -> bool:
+        now = time.monotonic()
+        if self._leader in (None, worker_id) or now >= self._lease_until:
+            self._leader, self._lease_until = worker_id, now + ttl
+            return True
+        return False
+
+    async def release(self, worker_id: str) -> None:
+        if self._leader == worker_id:
+            self._leader = None
+
+    async def claim_fire(self, job_id: str, scheduled: float, ttl: float) -> bool:
+        now = time.monotonic()
+        self._fired = {k: exp for k, exp in self._fired.items() if exp > now}
+        key = f"{job_id}:{scheduled:.0f}"
+        if key in self._fired:
+            return False
+        self._fired[key] = now + ttl
+        return True
+
+    async def last_fire(self, job_id: str) -> Optional[float]:
+        return self._last.get(job_id)
+
+    async def set_last_fire(self, job_id: str, scheduled: float) -> None:
+        self._last[job_id] = scheduled
+
+    async def push(self, task: Dict[str, Any]) -> None:
+        self._queue.put_nowait(task)
+
+    async def pop(self, timeout: float) -> Optional[Dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class RedisCoordinator:
+    def __init__(self, redis) -> None:
+        self.redis = redis
+
+    async def acquire(self, worker_id: str, ttl: float) -> bool:
+        return bool(await self.redis.eval(_ACQUIRE, 1, LEADER_KEY, worker_id, int(ttl * 1000)))
+
+    async def release(self, worker_id: str) -> None:
+        await self.redis.eval(_RELEASE, 1, LEADER_KEY, worker_id)
+
+    async def claim_fire(self, job_id: str, scheduled: float, ttl: float) -> bool:
+        key = f"scheduler:fired:{job_id}:{scheduled:.0f}"
+        return bool(await self.redis.set(key, 1, nx=True, ex=max(1, int(ttl))))
+
+    async def last_fire(self, job_id: str) -> Optional[float]:
+        raw = await self.redis.get(f"scheduler:last:{job_id}")
+        return float(raw) if raw else None
+
+    async def set_last_fire(self, job_id: str, scheduled: float) -> None:
+        await self.redis.set(f"scheduler:last:{job_id}", scheduled)
+
+    async def push(self, task: Dict[str, Any]) -> None:
+        await self.redis.rpush(QUEUE_KEY, json.dumps(task))
+
+    async def pop(self, timeout: float) -> Optional[Dict[str, Any]]:
+        # Must stay under the client's socket timeout (5s)
+        item = await self.redis.blpop(QUEUE_KEY, timeout=max(1, int(timeout)))
+        return json.loads(item[1]) if item else None
+
+
+async def get_coordinator():
+    """Redis-backed coordination when available, else single-process."""
+    from backend.services.redis_client import get_redis
+
+    redis = await get_redis()
+    return RedisCoordinator(redis) if redis else LocalCoordinator()
@@ -0,0 +1,136 @@
+"""
+The app's recurring jobs, as ScheduledJob definitions.
+
+Advisor batch jobs are split into BATCH_SHARDS shards by advisor id so the
+workers share one run; the direct-indexing batch rebuilds shared sleeves
+and stays a single shard.
+"""
+
+import logging
+from typing import Any, Awaitable, Callable, Dict, List
+
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+
+from backend.config.settings import settings
+from backend.services.scheduler.runner import ScheduledJob, Shard
+
+logger = logging.getLogger(__name__)
+
+BATCH_SHARDS = 8
+
+
+def default_jobs(session_factory) -> List[ScheduledJob]:
+    async def adv_currency_check(shard: Shard) -> None:
+        from backend.services.cim.adv_monitor import check_all_adv_currency
+
+        async with session_factory() as db:
+            count = await check_all_adv_currency(db, shard=shard)
+            await db.commit()
+        logger.info("ADV currency check completed (shard %d/%d): %d warnings",
+                    shard.index + 1, shard.count, count)
+
+    async def follow_up_check(shard: Shard) -> None:
+        from backend.services.prospect.follow_up_service import check_follow_ups
+
+        async with session_factory() as db:
+            count = await check_follow_ups(db, shard=shard)
+            await db.commit()
+        logger.info("Follow-up check completed (shard %d/%d): %d actions",
+                    shard.index + 1, shard.count, count)
+
+    async def rebalance_check(shard: Shard) -> None:
+        from backend.services.model_portfolio.rebalance_service import check_all_rebalances
+
+        async with session_factory() as db:
+            count = await check_all_rebalances(db, shard=shard)
+        logger.info("Rebalance drift check completed (shard %d/%d): %d signals",
+                    shard.index + 1, shard.count, count)
+
+    async def altruist_poll(shard: Shard) -> None:
+        from backend.services.market_data import poll_all_altruist
+
+        async with session_factory() as db:
+            await poll_all_altruist(db, shard=shard)
+
+    async def email_outbox(shard: Shard) -> None:
+        from backend.services.email_outbox import drain_outbox
+
+        await drain_outbox(session_factory)
+
+    async def direct_index_nightly(shard: Shard) -> None:
+        from backend.api.direct_indexing import nightly_direct_index_batch
+
+        await nightly_direct_index_batch()
+
+    jobs = [
+        # Incremental: each shard evaluates only rows changed since its watermark
+        ScheduledJob(
+            "adv_currency_check",
+            CronTrigger(hour=6, minute=0, timezone="UTC"),
+            adv_currency_check,
+            shards=BATCH_SHARDS,
+            misfire_grace=300,
+            jitter=30,
+        ),
+        ScheduledJob(
+            "prospect_follow_ups",
+            IntervalTrigger(hours=4, timezone="UTC"),
+            follow_up_check,
+            shards=BATCH_SHARDS,
+            misfire_grace=120,
+            jitter=30,
+        ),
+        # Nightly drift check; trades are sized by the tax-aware optimizer
+        ScheduledJob(
+            "rebalance_drift_check",
+            CronTrigger(hour=6, minute=30, timezone="UTC"),
+            rebalance_check,
+            shards=BATCH_SHARDS,
+            misfire_grace=600,
+            jitter=30,
+        ),
+        # Drainers claim rows with SKIP LOCKED, so overlapping runs are safe
+        ScheduledJob(
+            "email_outbox",
+            IntervalTrigger(seconds=15, timezone="UTC"),
+            email_outbox,
+            misfire_grace=60,
+        ),
+        ScheduledJob(
+            "direct_index_nightly",
+            CronTrigger(hour=5, minute=0, timezone="UTC"),
+            direct_index_nightly,
+            misfire_grace=600,
+        ),
+    ]
+    if settings.altruist_api_key:
+        # IMM-01: replaces the per-worker polling loop
+        jobs.append(ScheduledJob(
+            "altruist_poll",
+            IntervalTrigger(seconds=60, timezone="UTC"),
+            altruist_poll,
+            shards=BATCH_SHARDS,
+            misfire_grace=60,
+            jitter=5,
+        ))
+    else:
+        logger.info("ALTRUIST_API_KEY not set — polling disabled")
+    return jobs
+
+
+def default_services(session_factory) -> Dict[str, Callable[[], Awaitable[Any]]]:
+    """Long-running consumers run by the scheduler leader only, once per deployment."""
+
+    async def quote_stream() -> None:
+        from backend.services.tax_harvest import harvest_quote_stream
+
+        await harvest_quote_stream(session_factory)
+
+    async def harvest_detector() -> None:
+        from backend.services.tax_harvest import harvest_quote_listener
+
+        await harvest_quote_listener(session_factory)
+
+    # Tradier quotes -> quote:{symbol} pub/sub -> realtime harvest detector
+    return {"quote_stream": quote_stream, "harvest_detector": harvest_detector}
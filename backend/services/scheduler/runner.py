@@ -0,0 +1,278 @@
+"""
+Leader-elected, sharded job scheduler.
+
+Every worker runs a JobScheduler. Workers compete for a short lease and only
+the leader evaluates triggers, so a cron fire happens once however many
+workers or replicas are up. Each fire is split into `shards` tasks on the
+shared queue and every worker consumes them, so a large batch job runs in
+parallel across workers instead of N times over the same rows. Jobs pick
+their slice of the work with Shard.owns(advisor_id), a stable hash.
+
+Triggers are APScheduler trigger objects; the leader loop evaluates them
+itself so it knows each fire's scheduled time. The last fired schedule is
+persisted, so a new leader (after a failover or deploy) catches up on a
+fire it missed. Missed runs of one job are coalesced into one, and a fire
+later than the job's grace window is skipped and counted as a misfire.
+
+Leader services are long-running consumers that must exist once per
+deployment (e.g. the quote stream and the harvest detector reading it).
+The leader starts them when it takes the lease and cancels them when it
+loses it; a service that exits or crashes is restarted after
+SERVICE_RESTART seconds while this worker stays leader.
+
+Metrics (latency histograms, see /api/health):
+  scheduler.{job}.lag       scheduled time -> shard start, jitter included
+  scheduler.{job}.duration  shard run time, outcome ok / error
+"""
+
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from uuid import uuid4
+
+from backend.services.latency import histogram
+
+logger = logging.getLogger(__name__)
+
+FIRE_GUARD_TTL = 86400  # how long a scheduled time stays claimed
+SERVICE_RESTART = 60.0  # seconds before a leader service that exited runs again
+_MAX_COALESCE = 1000
+
+
+def shard_of(key: Any, count: int) -> int:
+    """Stable shard index for a key (same on every worker and restart)."""
+    return zlib.crc32(str(key).encode()) % count if count > 1 else 0
+
+
+@dataclass(frozen=True)
+class Shard:
+    index: int = 0
+    count: int = 1
+
+    def owns(self, key: Any) -> bool:
+        return self.count <= 1 or shard_of(key, self.count) == self.index
+
+
+@dataclass
+class ScheduledJob:
+    id: str
+    trigger: Any  # apscheduler.triggers.base.BaseTrigger
+    run: Callable[[Shard], Awaitable[Any]]
+    shards: int = 1
+    misfire_grace: float = 300.0  # seconds late a fire may still start
+    jitter: float = 0.0  # max random delay before each shard starts
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobScheduler:
+    def __init__(
+        self,
+        coordinator,
+        jobs: Iterable[ScheduledJob] = (),
+        worker_id: Optional[str] = None,
+        lease_ttl: float = 30.0,
+        tick: float = 1.0,
+        consumers: int = 2,
+        services: Optional[Dict[str, Callable[[], Awaitable[Any]]]] = None,
+    ) -> None:
+        self.coordinator = coordinator
+        self.jobs: Dict[str, ScheduledJob] = {j.id: j for j in jobs}
+        self.services = services or {}
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:6]}"
+        self.lease_ttl = lease_ttl
+        self.tick = tick
+        self.consumers = consumers
+        self.is_leader = False
+        self._next: Dict[str, Optional[datetime]] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._service_tasks: Dict[str, asyncio.Task] = {}
+
+    # ─── Lifecycle ──────────────────────────────────────────────────
+
+    async def start(self) -> None:
+        self._tasks.append(asyncio.create_task(self._leader_loop()))
+        for _ in range(self.consumers):
+            self._tasks.append(asyncio.create_task(self._consume_loop()))
+        logger.info("Job scheduler %s started — %d jobs: %s",
+                    self.worker_id, len(self.jobs), sorted(self.jobs))
+
+    async def shutdown(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        await self._stop_services()
+        if self.is_leader:
+            try:
+                await self.coordinator.release(self.worker_id)
+            except Exception as e:
+                logger.debug("Lease release failed: %s", e)
+            self.is_leader = False
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "leader": self.is_leader,
+            "services": sorted(self._service_tasks),
+            "jobs": {
+                job_id: {
+                    "shards": job.shards,
+                    "next_run": (
+                        self._next[job_id].isoformat()
+                        if self.is_leader and self._next.get(job_id) else None
+                    ),
+                }
+                for job_id, job in self.jobs.items()
+            },
+        }
+
+    # ─── Leadership ─────────────────────────────────────────────────
+
+    async def elect(self) -> bool:
+        """Acquire or renew the lease; load the schedule on becoming leader."""
+        try:
+            leader = await self.coordinator.acquire(self.worker_id, self.lease_ttl)
+        except Exception as e:
+            logger.warning("Scheduler lease check failed: %s", e)
+            leader = False
+        if leader and not self.is_leader:
+            logger.info("Scheduler %s is now leader", self.worker_id)
+            await self._load_schedule()
+            self._start_services()
+        elif self.is_leader and not leader:
+            logger.info("Scheduler %s lost leadership", self.worker_id)
+            await self._stop_services()
+        self.is_leader = leader
+        return leader
+
+    # ─── Leader services ────────────────────────────────────────────
+
+    def _start_services(self) -> None:
+        for name, factory in self.services.items():
+            if name not in self._service_tasks:
+                self._service_tasks[name] = asyncio.create_task(self._supervise(name, factory))
+
+    async def _stop_services(self) -> None:
+        tasks = list(self._service_tasks.values())
+        self._service_tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _supervise(self, name: str, factory: Callable[[], Awaitable[Any]]) -> None:
+        while True:
+            try:
+                await factory()
+                if asyncio.current_task().cancelling():
+                    raise asyncio.CancelledError  # the service swallowed our cancel
+                logger.info("Leader service %s exited", name)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Leader service %s failed: %s", name, e)
+            await asyncio.sleep(SERVICE_RESTART)
+
+    async def _load_schedule(self) -> None:
+        now = _now()
+        for job in self.jobs.values():
+            last = await self.coordinator.last_fire(job.id)
+            prev = datetime.fromtimestamp(last, timezone.utc) if last else None
+            # With a previous fire this can be in the past: a missed run
+            self._next[job.id] = job.trigger.get_next_fire_time(prev, now)
+
+    async def _leader_loop(self) -> None:
+        renew_at = 0.0
+        while True:
+            try:
+                if time.monotonic() >= renew_at:
+                    await self.elect()
+                    renew_at = time.monotonic() + self.lease_ttl / 3
+                if self.is_leader:
+                    await self.fire_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Scheduler leader loop error: %s", e)
+            await asyncio.sleep(self.tick)
+
+    # ─── Firing (leader only) ───────────────────────────────────────
+
+    async def fire_due(self, now: Optional[datetime] = None) -> int:
+        """Enqueue shards for every job that is due; returns jobs fired."""
+        now = now or _now()
+        fired = 0
+        for job in self.jobs.values():
+            due = []
+            nxt = self._next.get(job.id)
+            while nxt is not None and nxt <= now and len(due) < _MAX_COALESCE:
+                due.append(nxt)
+                nxt = job.trigger.get_next_fire_time(nxt, now)
+            if nxt is not None and nxt <= now:
+                nxt = job.trigger.get_next_fire_time(None, now)
+            self._next[job.id] = nxt
+            if due and await self._fire(job, due, now):
+                fired += 1
+        return fired
+
+    async def _fire(self, job: ScheduledJob, due: List[datetime], now: datetime) -> bool:
+        scheduled = due[-1]
+        ts = scheduled.timestamp()
+        late = (now - scheduled).total_seconds()
+        if not await self.coordinator.claim_fire(job.id, ts, FIRE_GUARD_TTL):
+            return False  # a previous leader already fired this one
+        await self.coordinator.set_last_fire(job.id, ts)
+        if late > job.misfire_grace:
+            histogram(f"scheduler.{job.id}.lag").observe(late * 1000, "misfire")
+            logger.warning("Job %s misfired: %.0fs late (grace %.0fs), skipped",
+                           job.id, late, job.misfire_grace)
+            return False
+        if len(due) > 1:
+            logger.info("Job %s: %d missed runs coalesced", job.id, len(due) - 1)
+        for index in range(job.shards):
+            await self.coordinator.push(
+                {"job": job.id, "shard": index, "shards": job.shards, "scheduled": ts}
+            )
+        return True
+
+    # ─── Shard execution (every worker) ─────────────────────────────
+
+    async def _consume_loop(self) -> None:
+        while True:
+            try:
+                task = await self.coordinator.pop(timeout=2)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Scheduler queue read failed: %s", e)
+                await asyncio.sleep(self.tick)
+                continue
+            if task:
+                await self.run_task(task)
+
+    async def run_task(self, task: Dict[str, Any]) -> None:
+        job = self.jobs.get(task["job"])
+        if job is None:
+            logger.warning("Dropping shard for unknown job %s", task["job"])
+            return
+        if job.jitter:
+            await asyncio.sleep(random.uniform(0, job.jitter))
+        shard = Shard(task["shard"], task["shards"])
+        histogram(f"scheduler.{job.id}.lag").observe((time.time() - task["scheduled"]) * 1000)
+        t0 = time.perf_counter()
+        outcome = "ok"
+        try:
+            await job.run(shard)
+        except Exception as e:
+            outcome = "error"
+            logger.warning("Job %s shard %d/%d failed: %s", job.id, shard.index, shard.count, e)
+        histogram(f"scheduler.{job.id}.duration").observe((time.perf_counter() - t0) * 1000, outcome)
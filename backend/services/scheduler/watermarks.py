@@ -0,0 +1,50 @@
+"""
+Watermarks for incremental scheduled jobs.
+
+A job that checks "has X been idle for more than N days" over every row
+does work proportional to the firm, even though between two runs only a
+few rows can change their answer: rows that were modified, and rows whose
+timestamp crossed the threshold in the meantime. With the previous run's
+instant as the watermark, the rows that crossed "t < now - N days" since
+then are exactly those with t in crossed(since, now, N), a range scan on
+an index. Jobs query that union, evaluate it, and save the new watermark
+in the same transaction as their results, so a failed run is simply
+covered again by the next one. With no watermark (first run, new shard
+layout) a job falls back to a full evaluation.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from backend.models.job_watermark import JobWatermark
+
+
+def job_key(job_id: str, shard=None) -> str:
+    """Watermark key of a job, per shard when the job is sharded."""
+    if shard is None or shard.count <= 1:
+        return job_id
+    return f"{job_id}:{shard.index}/{shard.count}"
+
+
+def crossed(since: datetime, now: datetime, days: float) -> Tuple[datetime, datetime]:
+    """[lo, hi) of timestamps t for which `t < instant - days` turned true between since and now."""
+    age = timedelta(days=days)
+    return since - age, now - age
+
+
+async def load_watermark(db, key: str) -> Optional[datetime]:
+    result = await db.execute(select(JobWatermark.watermark).where(JobWatermark.job_key == key))
+    return result.scalar_one_or_none()
+
+
+async def save_watermark(db, key: str, at: datetime) -> None:
+    """Move the watermark forward; committed with the caller's results."""
+    stmt = pg_insert(JobWatermark).values(job_key=key, watermark=at)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["job_key"],
+        set_={"watermark": at, "updated_at": func.now()},
+    )
+    await db.execute(stmt)
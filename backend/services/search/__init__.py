@@ -0,0 +1,29 @@
+"""Full-text search over archived communications, transcripts and compliance documents."""
+
+from .documents import (
+    SearchDocument,
+    SearchHit,
+    SearchQuery,
+    SearchResult,
+    compliance_version_document,
+    message_document,
+    parse_query,
+    tokenize,
+    transcript_document,
+)
+from .local import LocalSearchIndex
+from .postgres import PostgresSearchBackend
+
+__all__ = [
+    "SearchDocument",
+    "SearchQuery",
+    "SearchHit",
+    "SearchResult",
+    "LocalSearchIndex",
+    "PostgresSearchBackend",
+    "parse_query",
+    "tokenize",
+    "message_document",
+    "compliance_version_document",
+    "transcript_document",
+]
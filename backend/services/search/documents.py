@@ -0,0 +1,255 @@
+"""
+Shared search types, tokenizer, and query language.
+
+Both backends (LocalSearchIndex, PostgresSearchBackend) accept the same
+SearchDocument / SearchQuery and return the same SearchResult, so callers
+can switch between them without touching their own code.
+
+Query syntax (all clauses AND together):
+  rmd distribution        both terms
+  "tax loss harvesting"   exact phrase
+  guarant*                prefix
+  -commission             exclude
+A hyphenated or dotted word (tax-loss, j.park) is treated as a phrase.
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from html import unescape
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Field weights used by both backends (title > participants > body)
+FIELD_WEIGHTS = {"title": 3.0, "participants": 2.0, "body": 1.0}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_CLAUSE_RE = re.compile(r'(-?)"([^"]*)"|(-?)(\S+)')
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase alphanumeric tokens; no stemming (matches Postgres 'simple')."""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+def period_of(moment: datetime) -> str:
+    """Monthly partition key (YYYYMM) for a timestamp."""
+    return _as_utc(moment).strftime("%Y%m")
+
+
+def _as_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+# ─────────────────────────────────────────────────────────────
+# Documents and results
+# ─────────────────────────────────────────────────────────────
+
+
+@dataclass
+class SearchDocument:
+    """One searchable record (message, transcript, compliance document)."""
+
+    collection: str
+    doc_id: str
+    occurred_at: datetime
+    title: str = ""
+    body: str = ""
+    participants: str = ""
+    owner_id: Optional[str] = None
+    facets: Dict[str, str] = field(default_factory=dict)
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.occurred_at = _as_utc(self.occurred_at)
+        self.facets = {k: str(v) for k, v in self.facets.items() if v is not None}
+
+    @property
+    def period(self) -> str:
+        return period_of(self.occurred_at)
+
+    def fields(self) -> Iterable[Tuple[str, str]]:
+        return (("title", self.title), ("participants", self.participants), ("body", self.body))
+
+
+@dataclass
+class SearchQuery:
+    collection: str
+    text: Optional[str] = None
+    owner_id: Optional[str] = None
+    filters: Dict[str, str] = field(default_factory=dict)
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    facets: List[str] = field(default_factory=list)
+    sort: str = "relevance"  # or "recent"
+    offset: int = 0
+    limit: int = 25
+
+    def __post_init__(self) -> None:
+        self.filters = {k: str(v) for k, v in self.filters.items() if v is not None}
+        if self.start is not None:
+            self.start = _as_utc(self.start)
+        if self.end is not None:
+            self.end = _as_utc(self.end)
+
+
+@dataclass
+class SearchHit:
+    doc_id: str
+    score: float
+    occurred_at: datetime
+    payload: Dict[str, Any]
+
+
+@dataclass
+class SearchResult:
+    hits: List[SearchHit]
+    total: int
+    facets: Dict[str, Dict[str, int]]
+
+    def payloads(self) -> List[Dict[str, Any]]:
+        return [h.payload for h in self.hits]
+
+
+# ─────────────────────────────────────────────────────────────
+# Query language
+# ─────────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class Clause:
+    """One AND-ed clause: a term, a prefix, or a phrase (len(tokens) > 1)."""
+
+    tokens: Tuple[str, ...]
+    prefix: bool = False
+    negated: bool = False
+
+
+def parse_query(text: Optional[str]) -> List[Clause]:
+    clauses: List[Clause] = []
+    for m in _CLAUSE_RE.finditer(text or ""):
+        if m.group(2) is not None:
+            negated, raw, prefix = bool(m.group(1)), m.group(2), False
+        else:
+            negated, raw = bool(m.group(3)), m.group(4)
+            prefix = raw.endswith("*")
+        tokens = tuple(tokenize(raw))
+        if tokens:
+            clauses.append(Clause(tokens, prefix=prefix and len(tokens) == 1, negated=negated))
+    return clauses
+
+
+def to_tsquery(clauses: List[Clause]) -> str:
+    """Compile parsed clauses to a to_tsquery('simple', ...) expression."""
+    parts = []
+    for c in clauses:
+        if c.prefix:
+            expr = f"{c.tokens[0]}:*"
+        elif len(c.tokens) > 1:
+            expr = "(" + " <-> ".join(c.tokens) + ")"
+        else:
+            expr = c.tokens[0]
+        parts.append(f"!{expr}" if c.negated else expr)
+    return " & ".join(parts)
+
+
+# ─────────────────────────────────────────────────────────────
+# Adapters
+# ─────────────────────────────────────────────────────────────
+
+
+def _parse_ts(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+
+def _flatten(content: Any) -> Iterable[str]:
+    if isinstance(content, str):
+        yield content
+    elif isinstance(content, dict):
+        for v in content.values():
+            yield from _flatten(v)
+    elif isinstance(content, (list, tuple)):
+        for v in content:
+            yield from _flatten(v)
+
+
+def message_document(message: Dict[str, Any]) -> SearchDocument:
+    """Archived email / SMS / chat message (comm_archiving)."""
+    participants = " ".join(
+        message.get(k) or "" for k in ("from_name", "from_email", "to_name", "to_email")
+    )
+    return SearchDocument(
+        collection="comm_archive",
+        doc_id=message["id"],
+        occurred_at=_parse_ts(message["timestamp"]),
+        title=message.get("subject") or "",
+        body=message.get("body_full") or message.get("body_preview") or "",
+        participants=participants,
+        owner_id=message.get("advisor_id"),
+        facets={
+            "channel": message.get("channel"),
+            "status": message.get("status"),
+            "flagged": "yes" if message.get("flagged_keywords") else "no",
+        },
+        payload=message,
+    )
+
+
+def compliance_version_document(document: Any, version: Any) -> SearchDocument:
+    """ComplianceDocument + one ComplianceDocumentVersion."""
+    if version.content_html:
+        body = unescape(_TAG_RE.sub(" ", version.content_html))
+    else:
+        body = " ".join(_flatten(version.content_json or {}))
+    return SearchDocument(
+        collection="compliance_documents",
+        doc_id=str(version.id),
+        occurred_at=version.created_at or datetime.now(timezone.utc),
+        title=document.title or "",
+        body=body,
+        owner_id=str(document.firm_id),
+        facets={
+            "document_type": getattr(document.document_type, "value", document.document_type),
+            "status": getattr(version.status, "value", version.status),
+        },
+        payload={
+            "document_id": str(document.id),
+            "version_id": str(version.id),
+            "version_number": version.version_number,
+            "title": document.title,
+        },
+    )
+
+
+def transcript_document(
+    analysis: Any, transcript: str, segments: List[Dict[str, Any]]
+) -> SearchDocument:
+    """Meeting transcript for a ConversationAnalysis."""
+    speakers = sorted({s.get("speaker_label") or "" for s in segments} - {""})
+    return SearchDocument(
+        collection="meeting_transcripts",
+        doc_id=str(analysis.meeting_id),
+        occurred_at=analysis.analyzed_at or datetime.now(timezone.utc),
+        title=analysis.primary_topic or "",
+        body=transcript or " ".join(s.get("text", "") for s in segments),
+        participants=" ".join(speakers),
+        owner_id=str(analysis.advisor_id),
+        facets={
+            "primary_topic": analysis.primary_topic,
+            "compliance_risk_level": getattr(
+                analysis.compliance_risk_level, "value", analysis.compliance_risk_level
+            ),
+            "client_id": str(analysis.client_id) if analysis.client_id else None,
+        },
+        payload={
+            "analysis_id": str(analysis.id),
+            "meeting_id": str(analysis.meeting_id),
+            "executive_summary": analysis.executive_summary,
+        },
+    )
@@ -0,0 +1,293 @@
+"""
+Embedded in-process search backend.
+
+An inverted index per (collection, month) partition:
+  - postings: term -> {doc -> [positions]}; positions are offset per field
+    so phrases never match across subject/participants/body
+  - facet sets: field -> value -> {doc}; filters and facet counts are set
+    intersections, never a rescan of the documents
+  - queries only open the partitions inside the requested time range
+  - ranking is BM25 with field weights (FIELD_WEIGHTS), statistics taken
+    across the partitions searched
+
+Documents are added or replaced one at a time (incremental indexing on
+ingest). Used directly for the communication archive and as the test
+double for PostgresSearchBackend.
+"""
+
+import heapq
+import math
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .documents import (
+    FIELD_WEIGHTS,
+    Clause,
+    SearchDocument,
+    SearchHit,
+    SearchQuery,
+    SearchResult,
+    parse_query,
+    period_of,
+    tokenize,
+)
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_FIELD_SPAN = 1 << 20
+_FIELD_ORDER = ("title", "participants", "body")
+
+
+class _Partition:
+    """All documents of one collection for one month."""
+
+    def __init__(self) -> None:
+        self.docs: Dict[int, SearchDocument] = {}
+        self.keys: Dict[str, int] = {}
+        self.postings: Dict[str, Dict[int, List[int]]] = {}
+        self.lengths: Dict[int, float] = {}
+        self.facets: Dict[str, Dict[str, Set[int]]] = {}
+        self.owners: Dict[str, Set[int]] = {}
+        self._terms: Dict[int, Set[str]] = {}
+        self._next = 0
+        self._vocab: Optional[List[str]] = None
+
+    # ── writes ───────────────────────────────────────────────
+
+    def add(self, doc: SearchDocument) -> None:
+        self.remove(doc.doc_id)
+        num = self._next
+        self._next += 1
+        self.docs[num] = doc
+        self.keys[doc.doc_id] = num
+
+        length = 0.0
+        terms: Set[str] = set()
+        for name, text in doc.fields():
+            base = _FIELD_ORDER.index(name) * _FIELD_SPAN
+            tokens = tokenize(text)
+            length += len(tokens) * FIELD_WEIGHTS[name]
+            for pos, token in enumerate(tokens):
+                self.postings.setdefault(token, {}).setdefault(num, []).append(base + pos)
+                terms.add(token)
+        self.lengths[num] = length
+        self._terms[num] = terms
+        for key, value in doc.facets.items():
+            self.facets.setdefault(key, {}).setdefault(value, set()).add(num)
+        if doc.owner_id is not None:
+            self.owners.setdefault(doc.owner_id, set()).add(num)
+        self._vocab = None
+
+    def remove(self, doc_id: str) -> bool:
+        num = self.keys.pop(doc_id, None)
+        if num is None:
+            return False
+        doc = self.docs.pop(num)
+        for term in self._terms.pop(num):
+            postings = self.postings[term]
+            postings.pop(num, None)
+            if not postings:
+                del self.postings[term]
+        del self.lengths[num]
+        for key, value in doc.facets.items():
+            members = self.facets[key][value]
+            members.discard(num)
+            if not members:
+                del self.facets[key][value]
+        if doc.owner_id is not None:
+            self.owners[doc.owner_id].discard(num)
+        self._vocab = None
+        return True
+
+    # ── reads ────────────────────────────────────────────────
+
+    def expand_prefix(self, prefix: str) -> List[str]:
+        if self._vocab is None:
+            self._vocab = sorted(self.postings)
+        out = []
+        for term in self._vocab[bisect_left(self._vocab, prefix):]:
+            if not term.startswith(prefix):
+                break
+            out.append(term)
+        return out
+
+    def clause_terms(self, clause: Clause) -> List[str]:
+        if clause.prefix:
+            return self.expand_prefix(clause.tokens[0])
+        return list(clause.tokens)
+
+    def clause_docs(self, clause: Clause) -> Set[int]:
+        if clause.prefix:
+            matched: Set[int] = set()
+            for term in self.expand_prefix(clause.tokens[0]):
+                matched.update(self.postings[term])
+            return matched
+        lists = [self.postings.get(t) for t in clause.tokens]
+        if not all(lists):
+            return set()
+        candidates = set.intersection(*(set(p) for p in lists))
+        if len(clause.tokens) == 1:
+            return candidates
+        return {n for n in candidates if self._has_phrase(n, clause.tokens)}
+
+    def _has_phrase(self, num: int, tokens: Tuple[str, ...]) -> bool:
+        following = [set(self.postings[t][num]) for t in tokens[1:]]
+        for start in self.postings[tokens[0]][num]:
+            if all(start + i + 1 in positions for i, positions in enumerate(following)):
+                return True
+        return False
+
+    def weighted_tf(self, term: str, num: int) -> float:
+        positions = self.postings.get(term, {}).get(num, ())
+        return sum(FIELD_WEIGHTS[_FIELD_ORDER[p // _FIELD_SPAN]] for p in positions)
+
+    def match(self, query: SearchQuery, clauses: List[Clause]) -> Set[int]:
+        positive = [c for c in clauses if not c.negated]
+        if positive:
+            sets = sorted((self.clause_docs(c) for c in positive), key=len)
+            matched = sets[0].intersection(*sets[1:])
+        else:
+            matched = set(self.docs)
+        for c in clauses:
+            if c.negated and matched:
+                matched -= self.clause_docs(c)
+        for key, value in query.filters.items():
+            if not matched:
+                break
+            matched &= self.facets.get(key, {}).get(value, set())
+        if query.owner_id is not None:
+            matched &= self.owners.get(query.owner_id, set())
+        if query.start is not None or query.end is not None:
+            matched = {
+                n for n in matched
+                if (query.start is None or self.docs[n].occurred_at >= query.start)
+                and (query.end is None or self.docs[n].occurred_at < query.end)
+            }
+        return matched
+
+
+class LocalSearchIndex:
+    """In-memory, month-partitioned inverted index."""
+
+    def __init__(self) -> None:
+        self._partitions: Dict[Tuple[str, str], _Partition] = {}
+        self._locator: Dict[Tuple[str, str], str] = {}
+
+    def __len__(self) -> int:
+        return len(self._locator)
+
+    # ── writes ───────────────────────────────────────────────
+
+    def add(self, doc: SearchDocument) -> None:
+        """Index or replace one document."""
+        self.remove(doc.collection, doc.doc_id)
+        key = (doc.collection, doc.period)
+        self._partitions.setdefault(key, _Partition()).add(doc)
+        self._locator[(doc.collection, doc.doc_id)] = doc.period
+
+    def add_many(self, docs: Iterable[SearchDocument]) -> int:
+        count = 0
+        for doc in docs:
+            self.add(doc)
+            count += 1
+        return count
+
+    def remove(self, collection: str, doc_id: str) -> bool:
+        period = self._locator.pop((collection, doc_id), None)
+        if period is None:
+            return False
+        partition = self._partitions[(collection, period)]
+        partition.remove(doc_id)
+        if not partition.docs:
+            del self._partitions[(collection, period)]
+        return True
+
+    def get(self, collection: str, doc_id: str) -> Optional[SearchDocument]:
+        period = self._locator.get((collection, doc_id))
+        if period is None:
+            return None
+        partition = self._partitions[(collection, period)]
+        return partition.docs[partition.keys[doc_id]]
+
+    # ── reads ────────────────────────────────────────────────
+
+    def _partitions_for(self, query: SearchQuery) -> List[_Partition]:
+        lo = period_of(query.start) if query.start else None
+        hi = period_of(query.end) if query.end else None
+        return [
+            p for (collection, period), p in self._partitions.items()
+            if collection == query.collection
+            and (lo is None or period >= lo)
+            and (hi is None or period <= hi)
+        ]
+
+    def search(self, query: SearchQuery) -> SearchResult:
+        clauses = parse_query(query.text)
+        partitions = self._partitions_for(query)
+        matches = [(p, p.match(query, clauses)) for p in partitions]
+        total = sum(len(m) for _, m in matches)
+
+        facets: Dict[str, Dict[str, int]] = {}
+        for name in query.facets:
+            counts: Dict[str, int] = {}
+            for p, matched in matches:
+                for value, members in p.facets.get(name, {}).items():
+                    n = len(members & matched)
+                    if n:
+                        counts[value] = counts.get(value, 0) + n
+            facets[name] = counts
+
+        want = query.offset + query.limit
+        scored = self._ranked(partitions, matches, clauses, query.sort, want)
+        hits = [
+            SearchHit(doc.doc_id, round(score, 4), doc.occurred_at, doc.payload)
+            for score, doc in scored[query.offset:want]
+        ]
+        return SearchResult(hits=hits, total=total, facets=facets)
+
+    def _ranked(
+        self,
+        partitions: List[_Partition],
+        matches: List[Tuple[_Partition, Set[int]]],
+        clauses: List[Clause],
+        sort: str,
+        want: int,
+    ) -> List[Tuple[float, SearchDocument]]:
+        positive = [c for c in clauses if not c.negated]
+        if sort == "recent" or not positive:
+            recent = heapq.nlargest(
+                want,
+                ((p.docs[n].occurred_at, id(p), n, p) for p, matched in matches for n in matched),
+            )
+            return [(0.0, p.docs[n]) for _, _, n, p in recent]
+
+        doc_count = sum(len(p.docs) for p in partitions)
+        avg_len = (sum(sum(p.lengths.values()) for p in partitions) / doc_count) if doc_count else 0.0
+        idf: Dict[str, float] = {}
+
+        def _idf(term: str) -> float:
+            if term not in idf:
+                df = sum(len(p.postings.get(term, ())) for p in partitions)
+                idf[term] = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            return idf[term]
+
+        def _score(p: _Partition, n: int) -> float:
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * p.lengths[n] / (avg_len or 1.0))
+            score = 0.0
+            for c in positive:
+                for term in p.clause_terms(c):
+                    tf = p.weighted_tf(term, n)
+                    if tf:
+                        score += _idf(term) * tf * (BM25_K1 + 1) / (tf + norm)
+            return score
+
+        best = heapq.nlargest(
+            want,
+            (
+                (_score(p, n), p.docs[n].occurred_at, id(p), n, p)
+                for p, matched in matches
+                for n in matched
+            ),
+        )
+        return [(score, p.docs[n]) for score, _, _, n, p in best]
@@ -0,0 +1,193 @@
+"""
+Postgres full-text backend over search_entries.
+
+  - the weighted tsvector is a generated column with a GIN index, so
+    ingest is a single upsert and matching never touches the raw text.
+    occurred_at is part of the key (it is the partition key), so a
+    re-indexed document whose timestamp moved first has its old row
+    deleted: one row per (collection, doc_id), as in the local index
+  - search_entries is range-partitioned by month; the occurred_at bounds
+    of a query let the planner prune to the partitions in range, and
+    partitions are created on demand before the first insert of a month
+  - ranking is ts_rank_cd; facet counts are GROUP BYs over the same
+    filtered set (jsonb @> filters use the facets GIN index)
+"""
+
+import logging
+from typing import Dict, Iterable, List, Set
+
+from sqlalchemy import and_, delete, func, literal_column, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.search_index import SearchEntry
+
+from .documents import (
+    SearchDocument,
+    SearchHit,
+    SearchQuery,
+    SearchResult,
+    parse_query,
+    to_tsquery,
+)
+
+logger = logging.getLogger(__name__)
+
+# Months known to have a partition (per process; creation is idempotent)
+_known_partitions: Set[str] = set()
+
+
+def _partition_bounds(period: str) -> tuple:
+    year, month = int(period[:4]), int(period[4:])
+    nxt = (year + 1, 1) if month == 12 else (year, month + 1)
+    return f"{year:04d}-{month:02d}-01", f"{nxt[0]:04d}-{nxt[1]:02d}-01"
+
+
+class PostgresSearchBackend:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    # ─────────────────────────────────────────────────────────────
+    # Indexing
+    # ─────────────────────────────────────────────────────────────
+
+    async def ensure_partition(self, period: str) -> None:
+        if period in _known_partitions:
+            return
+        lo, hi = _partition_bounds(period)
+        try:
+            async with self.db.begin_nested():
+                await self.db.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS search_entries_{period} "
+                    f"PARTITION OF search_entries "
+                    f"FOR VALUES FROM ('{lo}') TO ('{hi}')"
+                ))
+        except Exception as e:
+            # Rows for this month already sit in the default partition
+            logger.warning("Search partition %s not created, using default: %s", period, e)
+        _known_partitions.add(period)
+
+    async def add_many(self, docs: Iterable[SearchDocument]) -> int:
+        docs = list(docs)
+        rows = [
+            {
+                "collection": d.collection,
+                "doc_id": d.doc_id,
+                "occurred_at": d.occurred_at,
+                "owner_id": d.owner_id,
+                "title": d.title,
+                "participants": d.participants,
+                "body": d.body,
+                "facets": d.facets,
+                "payload": d.payload,
+            }
+            for d in docs
+        ]
+        if not rows:
+            return 0
+        for period in sorted({d.period for d in docs}):
+            await self.ensure_partition(period)
+        await self.db.execute(
+            delete(SearchEntry)
+            .where(tuple_(SearchEntry.collection, SearchEntry.doc_id).in_(
+                [(d.collection, d.doc_id) for d in docs]
+            ))
+            .where(tuple_(SearchEntry.collection, SearchEntry.doc_id, SearchEntry.occurred_at).not_in(
+                [(d.collection, d.doc_id, d.occurred_at) for d in docs]
+            ))
+        )
+        stmt = pg_insert(SearchEntry).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["collection", "doc_id", "occurred_at"],
+            set_={
+                "owner_id": stmt.excluded.owner_id,
+                "title": stmt.excluded.title,
+                "participants": stmt.excluded.participants,
+                "body": stmt.excluded.body,
+                "facets": stmt.excluded.facets,
+                "payload": stmt.excluded.payload,
+                "indexed_at": func.now(),
+            },
+        )
+        await self.db.execute(stmt)
+        return len(rows)
+
+    async def add(self, doc: SearchDocument) -> None:
+        await self.add_many([doc])
+
+    async def remove(self, collection: str, doc_id: str) -> bool:
+        result = await self.db.execute(
+            delete(SearchEntry)
+            .where(SearchEntry.collection == collection)
+            .where(SearchEntry.doc_id == doc_id)
+        )
+        return bool(result.rowcount)
+
+    # ─────────────────────────────────────────────────────────────
+    # Querying
+    # ─────────────────────────────────────────────────────────────
+
+    def _conditions(self, query: SearchQuery, tsquery) -> List:
+        conds = [SearchEntry.collection == query.collection]
+        if tsquery is not None:
+            conds.append(SearchEntry.search_vector.op("@@")(tsquery))
+        if query.owner_id is not None:
+            conds.append(SearchEntry.owner_id == query.owner_id)
+        if query.filters:
+            conds.append(SearchEntry.facets.contains(query.filters))
+        if query.start is not None:
+            conds.append(SearchEntry.occurred_at >= query.start)
+        if query.end is not None:
+            conds.append(SearchEntry.occurred_at < query.end)
+        return conds
+
+    async def search(self, query: SearchQuery) -> SearchResult:
+        clauses = parse_query(query.text)
+        positive = any(not c.negated for c in clauses)
+        tsquery = func.to_tsquery("simple", to_tsquery(clauses)) if clauses else None
+        where = and_(*self._conditions(query, tsquery))
+
+        if tsquery is not None and positive and query.sort != "recent":
+            rank = func.ts_rank_cd(SearchEntry.search_vector, tsquery)
+            order = [rank.desc(), SearchEntry.occurred_at.desc()]
+        else:
+            rank = literal_column("0.0")
+            order = [SearchEntry.occurred_at.desc()]
+
+        rows = (await self.db.execute(
+            select(
+                SearchEntry.doc_id,
+                SearchEntry.occurred_at,
+                SearchEntry.payload,
+                rank.label("rank"),
+                func.count().over().label("total"),
+            )
+            .where(where)
+            .order_by(*order)
+            .offset(query.offset)
+            .limit(query.limit)
+        )).all()
+
+        if rows:
+            total = rows[0].total
+        else:
+            total = (await self.db.execute(
+                select(func.count()).select_from(SearchEntry).where(where)
+            )).scalar() or 0
+
+        facets: Dict[str, Dict[str, int]] = {}
+        for name in query.facets:
+            value = SearchEntry.facets[name].astext
+            counts = await self.db.execute(
+                select(value, func.count())
+                .where(where)
+                .where(value.isnot(None))
+                .group_by(value)
+            )
+            facets[name] = {v: n for v, n in counts.all()}
+
+        hits = [
+            SearchHit(r.doc_id, round(float(r.rank), 4), r.occurred_at, r.payload)
+            for r in rows
+        ]
+        return SearchResult(hits=hits, total=total, facets=facets)
@@ -0,0 +1,131 @@
+"""
+Dependency-aware page sections with per-section deadlines.
+
+A page (e.g. a dashboard) is split into named sections. Each section lists
+the sections whose results it needs and starts as soon as those finish, so
+independent work overlaps. A cold page then costs about as much as its
+slowest dependency chain, not the sum of all sections.
+
+A section that raises or misses its deadline degrades to its placeholder
+instead of stalling the page, unless it is marked required. Run times
+(deadline misses and errors included) are recorded in the latency
+histograms as {metric}.{section}, plus {metric}.total for the whole page.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from backend.services.latency import histogram
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SECTION_TIMEOUT = 2.0
+
+
+@dataclass
+class Section:
+    fn: Callable[..., Awaitable[Any]]  # called with the needed results as kwargs
+    needs: Tuple[str, ...] = ()
+    placeholder: Any = None
+    timeout: float = DEFAULT_SECTION_TIMEOUT
+    required: bool = False
+
+
+@dataclass
+class SectionResults:
+    values: Dict[str, Any]
+    degraded: List[str] = field(default_factory=list)
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+
+    def __getitem__(self, name: str) -> Any:
+        return self.values[name]
+
+
+def _check_graph(sections: Dict[str, Section]) -> None:
+    state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+    def visit(name: str) -> None:
+        if state.get(name) == 2:
+            return
+        if state.get(name) == 1:
+            raise ValueError(f"Section dependency cycle through '{name}'")
+        state[name] = 1
+        for dep in sections[name].needs:
+            if dep not in sections:
+                raise ValueError(f"Section '{name}' needs unknown section '{dep}'")
+            visit(dep)
+        state[name] = 2
+
+    for name in sections:
+        visit(name)
+
+
+async def run_sections(
+    sections: Dict[str, Section],
+    metric: str,
+    concurrency: Optional[int] = None,
+) -> SectionResults:
+    """
+    Run every section once. `concurrency` caps how many run at the same time
+    (1 when they must share a single DB session).
+    """
+    _check_graph(sections)
+    results = SectionResults(values={})
+    limit = asyncio.Semaphore(concurrency) if concurrency else None
+    tasks: Dict[str, asyncio.Task] = {}
+    started = time.perf_counter()
+
+    async def call(section: Section, kwargs: Dict[str, Any]) -> Any:
+        async with asyncio.timeout(section.timeout):
+            return await section.fn(**kwargs)
+
+    async def run(name: str) -> Any:
+        section = sections[name]
+        kwargs = {dep: await tasks[dep] for dep in section.needs}
+        if limit is not None:
+            await limit.acquire()
+        t0 = time.perf_counter()
+        outcome = "ok"
+        try:
+            value = await call(section, kwargs)
+        except TimeoutError:
+            outcome = "timeout"
+            if section.required:
+                raise
+            logger.warning("Section %s.%s missed its %.1fs deadline", metric, name, section.timeout)
+            value = section.placeholder
+        except Exception as e:
+            outcome = "error"
+            if section.required:
+                raise
+            logger.warning("Section %s.%s failed: %s", metric, name, e)
+            value = section.placeholder
+        finally:
+            if limit is not None:
+                limit.release()
+            ms = (time.perf_counter() - t0) * 1000
+            results.timings_ms[name] = round(ms, 2)
+            histogram(f"{metric}.{name}").observe(ms, outcome)
+        if outcome != "ok":
+            results.degraded.append(name)
+        results.values[name] = value
+        return value
+
+    # Every section gets its task up front; dependents await their inputs
+    for name in sections:
+        tasks[name] = asyncio.create_task(run(name))
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        histogram(f"{metric}.total").observe((time.perf_counter() - started) * 1000, "error")
+        raise
+    histogram(f"{metric}.total").observe(
+        (time.perf_counter() - started) * 1000, "degraded" if results.degraded else "ok"
+    )
+    return results
@@ -13,6 +13,7 @@ from datetime import datetime, timezone
 from typing import Optional
 
 from backend.config.settings import settings
+from backend.services.blob_store import BlobRef, get_blob_store
 
 logger = logging.getLogger(__name__)
 
@@ -33,9 +34,9 @@ TAX_PROFILE_SCHEMA = {
 }
 
 
-async def ingest_tax_document(file_bytes: bytes, client_id, db) -> str:
+async def ingest_tax_document(blob: BlobRef, client_id, db) -> str:
     """
-    Accept PDF bytes, launch background extraction, return job_id for polling.
+    Accept a stored PDF, launch background extraction, return job_id for polling.
     """
     job_id = str(uuid.uuid4())
 
@@ -52,14 +53,15 @@ async def ingest_tax_document(file_bytes: bytes, client_id, db) -> str:
     except Exception:
         pass
 
-    asyncio.create_task(_process_ingest(job_id, file_bytes, client_id, db))
+    asyncio.create_task(_process_ingest(job_id, blob, client_id, db))
     return job_id
 
 
-async def _process_ingest(job_id: str, file_bytes: bytes, client_id, db) -> None:
+async def _process_ingest(job_id: str, blob: BlobRef, client_id, db) -> None:
     """Background task: convert PDF, call Claude Vision, store results."""
     try:
-        images = _pdf_to_base64_images(file_bytes)
+        async with get_blob_store().local_path(blob, suffix=".pdf") as pdf_path:
+            images = await asyncio.to_thread(_pdf_to_base64_images, pdf_path)
         if not images:
             await _update_job_status(job_id, "error", error="No pages extracted from PDF")
             return
@@ -80,12 +82,12 @@ async def _process_ingest(job_id: str, file_bytes: bytes, client_id, db) -> None
         await _update_job_status(job_id, "error", error=str(e))
 
 
-def _pdf_to_base64_images(pdf_bytes: bytes) -> list[str]:
-    """Convert PDF pages to base64-encoded PNG images."""
+def _pdf_to_base64_images(pdf_path: str) -> list[str]:
+    """Convert the first 10 PDF pages to base64-encoded PNG images."""
     try:
-        from pdf2image import convert_from_bytes
+        from pdf2image import convert_from_path
 
-        images = convert_from_bytes(pdf_bytes, dpi=200, fmt="png")
+        images = convert_from_path(pdf_path, dpi=200, fmt="png", last_page=10)
         result = []
         for img in images[:10]:
             import io
@@ -100,7 +102,7 @@ def _pdf_to_base64_images(pdf_bytes: bytes) -> list[str]:
         try:
             import fitz
 
-            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+            doc = fitz.open(pdf_path)
             result = []
             for page in doc[:10]:
                 pix = page.get_pixmap(dpi=200)
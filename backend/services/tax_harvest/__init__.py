@@ -2,6 +2,16 @@
 
 from .harvest_scanner import HarvestScanner
 from .harvest_service import TaxHarvestService
+from .realtime_detector import RealtimeHarvestDetector, harvest_quote_listener, harvest_quote_stream
 from .replacement_recommender import ReplacementRecommender
+from .wash_sale_engine import WashSaleEngine
 
-__all__ = ["TaxHarvestService", "HarvestScanner", "ReplacementRecommender"]
+__all__ = [
+    "TaxHarvestService",
+    "HarvestScanner",
+    "ReplacementRecommender",
+    "RealtimeHarvestDetector",
+    "harvest_quote_listener",
+    "harvest_quote_stream",
+    "WashSaleEngine",
+]
@@ -4,33 +4,29 @@ Identifies positions with unrealized losses that meet harvesting thresholds.
 """
 
 import logging
-from datetime import date, datetime, timedelta
+from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from sqlalchemy import and_, or_, select
+from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.models.custodian import (
     AggregatedPosition,
-    AggregatedTransaction,
     CustodianAccount,
     CustodianConnection,
-    CustodianTransactionType,
 )
 from backend.models.tax_harvest import (
     HarvestOpportunity,
     HarvestStatus,
     HarvestTaxLot,
     HarvestingSettings,
-    SecurityRelationship,
-    SecurityRelationType,
     TaxLotStatus,
-    WashSaleStatus,
-    WashSaleTransaction,
 )
 
+from .wash_sale_engine import WashSaleEngine
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,6 +35,7 @@ class HarvestScanner:
 
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.wash_engine: Optional[WashSaleEngine] = None
 
     # ─────────────────────────────────────────────────────────────
     # Public API
@@ -59,6 +56,11 @@ class HarvestScanner:
         positions = await self._get_positions_with_losses(
             advisor_id, client_id, account_id, settings
         )
+        if positions:
+            # One load for the whole scan instead of queries per position
+            self.wash_engine = await WashSaleEngine(self.db).load(
+                advisor_id, client_id
+            )
 
         opportunities: List[HarvestOpportunity] = []
         for position in positions:
@@ -283,151 +285,10 @@ class HarvestScanner:
         cusip: Optional[str],
     ) -> Dict[str, Any]:
         """Analyse wash sale risk for a potential harvest."""
-        today = date.today()
-        window_start = today - timedelta(days=30)
-        window_end = today + timedelta(days=30)
-
-        identical_securities = await self._get_identical_securities(
-            symbol, cusip
-        )
-        watch_symbols = [symbol] + [
-            s["symbol"] for s in identical_securities
-        ]
-
-        blocking_transactions = await self._get_blocking_transactions(
-            account_id, watch_symbols, window_start, today
-        )
-
-        active_windows = await self._get_active_wash_windows(
-            account_id, watch_symbols
-        )
-
-        risk_amount = Decimal("0")
-        for txn in blocking_transactions:
-            risk_amount += abs(Decimal(str(txn.get("amount", 0))))
-
-        return {
-            "status": (
-                WashSaleStatus.IN_WINDOW
-                if blocking_transactions
-                else WashSaleStatus.CLEAR
-            ),
-            "window_start": window_start,
-            "window_end": window_end,
-            "watch_symbols": watch_symbols,
-            "blocking_transactions": blocking_transactions,
-            "active_windows": active_windows,
-            "risk_amount": risk_amount,
-        }
-
-    async def _get_identical_securities(
-        self,
-        symbol: str,
-        cusip: Optional[str],
-    ) -> List[Dict[str, Any]]:
-        """Get substantially identical securities."""
-        result = await self.db.execute(
-            select(SecurityRelationship).where(
-                and_(
-                    or_(
-                        SecurityRelationship.symbol_a == symbol,
-                        SecurityRelationship.symbol_b == symbol,
-                    ),
-                    SecurityRelationship.relation_type
-                    == SecurityRelationType.SUBSTANTIALLY_IDENTICAL,
-                    SecurityRelationship.is_active.is_(True),
-                )
-            )
-        )
-        relationships = result.scalars().all()
-
-        identical: List[Dict[str, Any]] = []
-        for rel in relationships:
-            other_symbol = (
-                rel.symbol_b if rel.symbol_a == symbol else rel.symbol_a
-            )
-            identical.append(
-                {
-                    "symbol": other_symbol,
-                    "cusip": (
-                        rel.cusip_b
-                        if rel.symbol_a == symbol
-                        else rel.cusip_a
-                    ),
-                    "confidence": float(rel.confidence_score),
-                }
-            )
-
-        return identical
-
-    async def _get_blocking_transactions(
-        self,
-        account_id: UUID,
-        symbols: List[str],
-        start_date: date,
-        end_date: date,
-    ) -> List[Dict[str, Any]]:
-        """Get purchases that would trigger wash sale."""
-        result = await self.db.execute(
-            select(AggregatedTransaction).where(
-                and_(
-                    AggregatedTransaction.account_id == account_id,
-                    AggregatedTransaction.symbol.in_(symbols),
-                    AggregatedTransaction.transaction_type
-                    == CustodianTransactionType.BUY,
-                    AggregatedTransaction.trade_date
-                    >= datetime.combine(start_date, datetime.min.time()),
-                    AggregatedTransaction.trade_date
-                    <= datetime.combine(end_date, datetime.max.time()),
-                )
-            )
-        )
-        transactions = result.scalars().all()
-
-        return [
-            {
-                "id": str(t.id),
-                "symbol": t.symbol,
-                "date": (
-                    t.trade_date.date().isoformat()
-                    if hasattr(t.trade_date, "date")
-                    else str(t.trade_date)
-                ),
-                "quantity": float(t.quantity) if t.quantity else 0,
-                "amount": float(t.net_amount),
-            }
-            for t in transactions
-        ]
-
-    async def _get_active_wash_windows(
-        self,
-        account_id: UUID,
-        symbols: List[str],
-    ) -> List[Dict[str, Any]]:
-        """Get active wash sale windows from prior sales."""
-        today = date.today()
-
-        result = await self.db.execute(
-            select(WashSaleTransaction).where(
-                and_(
-                    WashSaleTransaction.account_id == account_id,
-                    WashSaleTransaction.symbol.in_(symbols),
-                    WashSaleTransaction.window_end >= today,
-                    WashSaleTransaction.status == WashSaleStatus.IN_WINDOW,
-                )
-            )
-        )
-        windows = result.scalars().all()
-
-        return [
-            {
-                "symbol": w.symbol,
-                "sale_date": w.sale_date.isoformat(),
-                "window_end": w.window_end.isoformat(),
-                "loss_amount": float(w.loss_amount),
-            }
-            for w in windows
-        ]
+        if self.wash_engine is None:
+            self.wash_engine = WashSaleEngine(self.db)
+        await self.wash_engine.ensure_account(account_id)
+        return self.wash_engine.analyze_sale(account_id, symbol, cusip)
 
     # ─────────────────────────────────────────────────────────────
     # Opportunity creation
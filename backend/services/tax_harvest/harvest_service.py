@@ -12,20 +12,22 @@ from uuid import UUID
 from sqlalchemy import and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.models.custodian import (
-    AggregatedTransaction,
-    CustodianTransactionType,
-)
+from backend.models.liquidity import LotSelectionMethod
 from backend.models.tax_harvest import (
     HarvestingSettings,
     HarvestOpportunity,
     HarvestStatus,
+    HarvestTaxLot,
+    TaxLotStatus,
     WashSaleStatus,
     WashSaleTransaction,
 )
 
+from backend.services.lot_engine import LotEngine, Realization
+
 from .harvest_scanner import HarvestScanner
 from .replacement_recommender import ReplacementRecommender
+from .wash_sale_engine import WashSaleEngine
 
 logger = logging.getLogger(__name__)
 
@@ -287,8 +289,11 @@ class TaxHarvestService:
         opportunity.executed_at = datetime.utcnow()
         opportunity.sell_transaction_id = sell_transaction_id
         opportunity.buy_transaction_id = buy_transaction_id
+        realized = await self._relieve_lots(opportunity)
         opportunity.actual_loss_realized = (
-            actual_loss or opportunity.unrealized_loss
+            actual_loss
+            or (-realized.gain if realized is not None and realized.gain < 0 else None)
+            or opportunity.unrealized_loss
         )
 
         # Create wash sale tracking window for the executed harvest
@@ -313,6 +318,39 @@ class TaxHarvestService:
 
         return opportunity
 
+    async def _relieve_lots(self, opportunity: HarvestOpportunity) -> Optional[Realization]:
+        """Close the harvested shares out of the opportunity's lots (specific ID)."""
+        lot_ids = [UUID(str(i)) for i in opportunity.tax_lot_ids or []]
+        if not lot_ids:
+            return None
+        result = await self.db.execute(
+            select(HarvestTaxLot).where(HarvestTaxLot.id.in_(lot_ids))
+        )
+        rows = {str(row.id): row for row in result.scalars().all()}
+        lots = LotEngine.from_rows(rows.values())
+        book = lots.book(opportunity.account_id, opportunity.symbol)
+        open_ids = [str(i) for i in lot_ids if book is not None and str(i) in book.lots]
+        if not open_ids:
+            return None
+        quantity = min(opportunity.quantity_to_harvest, book.quantity)
+        try:
+            realized = lots.sell(
+                opportunity.account_id, opportunity.symbol, quantity,
+                opportunity.current_price, date.today(),
+                LotSelectionMethod.SPEC_ID, open_ids,
+            )
+        except ValueError as e:
+            logger.warning(f"Could not relieve lots for opportunity {opportunity.id}: {e}")
+            return None
+
+        for relief in realized.reliefs:
+            row = rows[relief.lot_id]
+            row.remaining_quantity = (row.remaining_quantity or row.quantity) - relief.quantity
+            row.status = (
+                TaxLotStatus.CLOSED if row.remaining_quantity <= 0 else TaxLotStatus.PARTIALLY_CLOSED
+            )
+        return realized
+
     # ─────────────────────────────────────────────────────────────
     # Wash Sale Monitoring
     # ─────────────────────────────────────────────────────────────
@@ -337,6 +375,9 @@ class TaxHarvestService:
         )
         active_windows = list(result.scalars().all())
 
+        # Buys for every account of the advisor, indexed once
+        engine = await WashSaleEngine(self.db).load(advisor_id, as_of=today)
+
         violations: List[WashSaleTransaction] = []
         for window in active_windows:
             # Window has passed without violation
@@ -345,7 +386,7 @@ class TaxHarvestService:
                 continue
 
             # Check for violating purchases
-            if await self._check_window_for_violation(window):
+            if await self._check_window_for_violation(window, engine):
                 violations.append(window)
 
         await self.db.commit()
@@ -354,39 +395,18 @@ class TaxHarvestService:
     async def _check_window_for_violation(
         self,
         window: WashSaleTransaction,
+        engine: Optional[WashSaleEngine] = None,
     ) -> bool:
         """Check if a wash sale window has been violated."""
-        result = await self.db.execute(
-            select(AggregatedTransaction).where(
-                and_(
-                    AggregatedTransaction.account_id == window.account_id,
-                    AggregatedTransaction.symbol.in_(
-                        window.watch_symbols or []
-                    ),
-                    AggregatedTransaction.transaction_type
-                    == CustodianTransactionType.BUY,
-                    AggregatedTransaction.trade_date
-                    >= datetime.combine(
-                        window.window_start, datetime.min.time()
-                    ),
-                    AggregatedTransaction.trade_date
-                    <= datetime.combine(
-                        window.window_end, datetime.max.time()
-                    ),
-                    AggregatedTransaction.id != window.sell_transaction_id,
-                )
-            )
-        )
-        violating_txn = result.scalar_one_or_none()
+        if engine is None:
+            engine = WashSaleEngine(self.db)
+        await engine.ensure_account(window.account_id)
+        violating_txn = engine.first_violation(window)
 
         if violating_txn:
             window.status = WashSaleStatus.VIOLATED
-            window.violating_transaction_id = violating_txn.id
-            window.violation_date = (
-                violating_txn.trade_date.date()
-                if hasattr(violating_txn.trade_date, "date")
-                else violating_txn.trade_date
-            )
+            window.violating_transaction_id = UUID(violating_txn["id"])
+            window.violation_date = date.fromisoformat(violating_txn["date"])
             window.disallowed_loss = window.loss_amount
             return True
 
@@ -0,0 +1,390 @@
+"""
+Event-driven harvest opportunity detection.
+
+Instead of rescanning whole books on POST /scan, the detector keeps an
+in-memory index of open HarvestTaxLots keyed by symbol and re-evaluates
+only the lots whose symbol just printed a new quote:
+
+  quote:{symbol} (Redis pub/sub, published by tradier_ws on the leader)
+      → lots for symbol, grouped by position
+      → HarvestScanner._calculate_harvest_details at the live price
+      → create HarvestOpportunity when thresholds are crossed
+      → expire IDENTIFIED opportunities once the loss recovers
+
+Expiry uses a hysteresis band (EXPIRE_RATIO) so a price oscillating around
+the threshold does not create and expire opportunities on every tick.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, distinct, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.custodian import (
+    AggregatedPosition,
+    CustodianAccount,
+    CustodianConnection,
+)
+from backend.models.tax_harvest import (
+    HarvestOpportunity,
+    HarvestStatus,
+    HarvestTaxLot,
+    HarvestingSettings,
+    TaxLotStatus,
+)
+from .harvest_scanner import HarvestScanner
+
+logger = logging.getLogger(__name__)
+
+EXPIRE_RATIO = Decimal("0.8")  # expire when loss falls below 80% of thresholds
+MIN_PRICE_MOVE = Decimal("0.0005")  # ignore sub-5bp ticks
+INDEX_REFRESH_SECONDS = 900
+
+_ACTIVE_STATUSES = [
+    HarvestStatus.IDENTIFIED,
+    HarvestStatus.RECOMMENDED,
+    HarvestStatus.APPROVED,
+    HarvestStatus.EXECUTING,
+    HarvestStatus.WASH_SALE_RISK,
+]
+# Statuses nobody has acted on yet — safe for the detector to expire
+_AUTO_EXPIRABLE = {HarvestStatus.IDENTIFIED, HarvestStatus.WASH_SALE_RISK}
+
+
+@dataclass(frozen=True)
+class IndexedLot:
+    """Lot fields needed to value a harvest at a live price."""
+
+    id: UUID
+    position_id: UUID
+    account_id: UUID
+    advisor_id: UUID
+    client_id: Optional[UUID]
+    account_type: Optional[str]
+    symbol: str
+    remaining_quantity: Decimal
+    total_cost_basis: Decimal
+    adjusted_cost_basis: Optional[Decimal]
+    is_long_term: bool
+    current_value: Optional[Decimal] = None
+    unrealized_gain_loss: Optional[Decimal] = None
+
+    def at_price(self, price: Decimal) -> "IndexedLot":
+        value = (self.remaining_quantity * price).quantize(Decimal("0.01"))
+        basis = self.adjusted_cost_basis or self.total_cost_basis
+        return replace(self, current_value=value, unrealized_gain_loss=value - basis)
+
+
+class HarvestLotIndex:
+    """symbol → open lots, plus the settings and active-opportunity state to judge them."""
+
+    def __init__(self) -> None:
+        self.lots_by_symbol: Dict[str, List[IndexedLot]] = {}
+        self.settings: Dict[Tuple[UUID, Optional[UUID], Optional[UUID]], HarvestingSettings] = {}
+        self.active: Dict[UUID, Tuple[UUID, HarvestStatus]] = {}  # position_id → (opp id, status)
+        self.built_at: float = 0.0
+
+    def add(self, lot: IndexedLot) -> None:
+        self.lots_by_symbol.setdefault(lot.symbol, []).append(lot)
+
+    @property
+    def symbols(self) -> Set[str]:
+        return set(self.lots_by_symbol)
+
+    def settings_for(self, lot: IndexedLot) -> HarvestingSettings:
+        """Same precedence as HarvestScanner._get_settings, resolved in memory."""
+        for key in (
+            (lot.advisor_id, lot.client_id, lot.account_id),
+            (lot.advisor_id, lot.client_id, None),
+            (lot.advisor_id, None, None),
+        ):
+            if key in self.settings:
+                return self.settings[key]
+        default = HarvestingSettings(
+            advisor_id=lot.advisor_id,
+            min_loss_amount=Decimal("100"),
+            min_loss_percentage=Decimal("0.05"),
+            min_tax_savings=Decimal("50"),
+            short_term_tax_rate=Decimal("0.37"),
+            long_term_tax_rate=Decimal("0.20"),
+        )
+        self.settings[(lot.advisor_id, None, None)] = default
+        return default
+
+
+def _excluded(lot: IndexedLot, settings: HarvestingSettings) -> bool:
+    if settings.excluded_symbols and lot.symbol in settings.excluded_symbols:
+        return True
+    if settings.excluded_account_types and lot.account_type in settings.excluded_account_types:
+        return True
+    return False
+
+
+def _relaxed(settings: HarvestingSettings) -> HarvestingSettings:
+    """Thresholds scaled by EXPIRE_RATIO for the expiry side of the hysteresis band."""
+    return HarvestingSettings(
+        advisor_id=settings.advisor_id,
+        min_loss_amount=settings.min_loss_amount * EXPIRE_RATIO,
+        min_tax_savings=settings.min_tax_savings * EXPIRE_RATIO,
+        short_term_tax_rate=settings.short_term_tax_rate,
+        long_term_tax_rate=settings.long_term_tax_rate,
+    )
+
+
+class RealtimeHarvestDetector:
+    """Re-evaluates harvest thresholds for one symbol at a time on price moves."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        self.scanner = HarvestScanner(db)
+        self.index = HarvestLotIndex()
+        self._last_price: Dict[str, Decimal] = {}
+
+    # ── Index build ────────────────────────────────────────────
+
+    async def rebuild_index(self) -> int:
+        """Load all open lots, settings and active opportunities in three queries."""
+        index = HarvestLotIndex()
+
+        result = await self.db.execute(
+            select(
+                HarvestTaxLot,
+                CustodianConnection.advisor_id,
+                CustodianAccount.client_id,
+                CustodianAccount.account_type,
+            )
+            .join(CustodianAccount, HarvestTaxLot.account_id == CustodianAccount.id)
+            .join(CustodianConnection, CustodianAccount.connection_id == CustodianConnection.id)
+            .where(
+                HarvestTaxLot.status == TaxLotStatus.OPEN,
+                HarvestTaxLot.remaining_quantity > 0,
+            )
+        )
+        for lot, advisor_id, client_id, account_type in result.all():
+            index.add(
+                IndexedLot(
+                    id=lot.id,
+                    position_id=lot.position_id,
+                    account_id=lot.account_id,
+                    advisor_id=advisor_id,
+                    client_id=client_id,
+                    account_type=getattr(account_type, "value", account_type),
+                    symbol=lot.symbol,
+                    remaining_quantity=lot.remaining_quantity,
+                    total_cost_basis=lot.total_cost_basis,
+                    adjusted_cost_basis=lot.adjusted_cost_basis,
+                    is_long_term=bool(lot.is_long_term),
+                )
+            )
+
+        settings_result = await self.db.execute(
+            select(HarvestingSettings).where(HarvestingSettings.is_active.is_(True))
+        )
+        for s in settings_result.scalars().all():
+            index.settings[(s.advisor_id, s.client_id, s.account_id)] = s
+
+        active_result = await self.db.execute(
+            select(
+                HarvestOpportunity.position_id,
+                HarvestOpportunity.id,
+                HarvestOpportunity.status,
+            ).where(HarvestOpportunity.status.in_(_ACTIVE_STATUSES))
+        )
+        for position_id, opp_id, status in active_result.all():
+            index.active[position_id] = (opp_id, status)
+
+        index.built_at = time.monotonic()
+        self.index = index
+        # Wash-sale state is reloaded lazily per client on the next opportunity
+        self.scanner.wash_engine = None
+        logger.info(
+            "Harvest lot index built: %d symbols, %d active opportunities",
+            len(index.lots_by_symbol),
+            len(index.active),
+        )
+        return sum(len(v) for v in index.lots_by_symbol.values())
+
+    # ── Quote handling ─────────────────────────────────────────
+
+    def _moved(self, symbol: str, price: Decimal) -> bool:
+        last = self._last_price.get(symbol)
+        if last is None or last == 0:
+            return True
+        return abs(price - last) / last >= MIN_PRICE_MOVE
+
+    async def on_quote(self, symbol: str, price: Decimal) -> Dict[str, int]:
+        """Evaluate the lots for one symbol at `price`. Returns counts of changes."""
+        counts = {"created": 0, "expired": 0}
+        lots = self.index.lots_by_symbol.get(symbol)
+        if not lots or price <= 0 or not self._moved(symbol, price):
+            return counts
+        self._last_price[symbol] = price
+
+        by_position: Dict[UUID, List[IndexedLot]] = {}
+        for lot in lots:
+            by_position.setdefault(lot.position_id, []).append(lot.at_price(price))
+
+        for position_id, position_lots in by_position.items():
+            settings = self.index.settings_for(position_lots[0])
+            if _excluded(position_lots[0], settings):
+                continue
+            losing = sorted(
+                (l for l in position_lots if l.unrealized_gain_loss < 0),
+                key=lambda l: l.unrealized_gain_loss,
+            )
+            active = self.index.active.get(position_id)
+
+            if active is None:
+                details = self.scanner._calculate_harvest_details(losing, settings)
+                if details:
+                    await self._open_opportunity(position_id, losing, details, settings, price)
+                    counts["created"] += 1
+            elif active[1] in _AUTO_EXPIRABLE:
+                if not self.scanner._calculate_harvest_details(losing, _relaxed(settings)):
+                    await self._expire(position_id, active[0])
+                    counts["expired"] += 1
+
+        if counts["created"] or counts["expired"]:
+            await self.db.commit()
+            logger.info(
+                "Harvest detector %s @ %s: created=%d expired=%d",
+                symbol, price, counts["created"], counts["expired"],
+            )
+        return counts
+
+    async def _open_opportunity(
+        self,
+        position_id: UUID,
+        lots: List[IndexedLot],
+        details: Dict[str, Any],
+        settings: HarvestingSettings,
+        price: Decimal,
+    ) -> None:
+        result = await self.db.execute(
+            select(AggregatedPosition).where(AggregatedPosition.id == position_id)
+        )
+        position = result.scalar_one_or_none()
+        if position is None:
+            return
+        # Detached copy: the live price goes on the opportunity, not the synced position
+        self.db.expunge(position)
+        position.price = price
+
+        wash_sale_analysis = await self.scanner._analyze_wash_sale_risk(
+            position.account_id, position.symbol, position.cusip
+        )
+        opportunity = await self.scanner._create_opportunity(
+            advisor_id=lots[0].advisor_id,
+            position=position,
+            tax_lots=lots,
+            harvest_details=details,
+            wash_sale_analysis=wash_sale_analysis,
+            settings=settings,
+            client_id=lots[0].client_id,
+        )
+        self.index.active[position_id] = (opportunity.id, opportunity.status)
+
+    async def _expire(self, position_id: UUID, opportunity_id: UUID) -> None:
+        await self.db.execute(
+            update(HarvestOpportunity)
+            .where(
+                and_(
+                    HarvestOpportunity.id == opportunity_id,
+                    HarvestOpportunity.status.in_(list(_AUTO_EXPIRABLE)),
+                )
+            )
+            .values(status=HarvestStatus.EXPIRED, expires_at=datetime.utcnow())
+        )
+        self.index.active.pop(position_id, None)
+
+
+async def open_lot_symbols(db: AsyncSession) -> List[str]:
+    """Symbols with open harvest lots: what the quote stream subscribes to."""
+    result = await db.execute(
+        select(distinct(HarvestTaxLot.symbol)).where(
+            HarvestTaxLot.status == TaxLotStatus.OPEN,
+            HarvestTaxLot.remaining_quantity > 0,
+        )
+    )
+    return sorted(result.scalars().all())
+
+
+async def harvest_quote_stream(db_factory) -> None:
+    """
+    Tradier quote stream for the symbols of open lots, reconnected every
+    INDEX_REFRESH_SECONDS so newly opened lots get quotes too.
+    """
+    from backend.services.market_data import tradier_ws_listener
+
+    while True:
+        async with db_factory() as db:
+            symbols = await open_lot_symbols(db)
+        started = time.monotonic()
+        if symbols:
+            try:
+                await asyncio.wait_for(tradier_ws_listener(symbols), INDEX_REFRESH_SECONDS)
+            except asyncio.TimeoutError:
+                continue  # refresh the subscription
+        # No symbols, no API key or retries exhausted: wait out the period
+        await asyncio.sleep(max(0.0, INDEX_REFRESH_SECONDS - (time.monotonic() - started)))
+
+
+def parse_quote_message(channel: str, data: Any) -> Optional[Tuple[str, Decimal]]:
+    """(symbol, last price) from a quote:{symbol} pub/sub message, or None."""
+    if isinstance(channel, bytes):
+        channel = channel.decode()
+    if not channel.startswith("quote:"):
+        return None
+    try:
+        payload = json.loads(data)
+        last = payload.get("last")
+        if last in (None, ""):
+            return None
+        return channel.split(":", 1)[1], Decimal(str(last))
+    except (ValueError, TypeError, ArithmeticError):
+        return None
+
+
+async def harvest_quote_listener(db_factory) -> None:
+    """
+    Long-running consumer of quote:{symbol} events. Runs as a scheduler
+    leader service, so one detector (not one per worker) creates
+    opportunities; exits quietly without Redis.
+    """
+    from backend.services.redis_client import get_redis
+
+    redis = await get_redis()
+    if not redis:
+        logger.info("Redis unavailable — realtime harvest detection disabled")
+        return
+
+    pubsub = redis.pubsub()
+    await pubsub.psubscribe("quote:*")
+    try:
+        async with db_factory() as db:
+            detector = RealtimeHarvestDetector(db)
+            await detector.rebuild_index()
+            while True:
+                if time.monotonic() - detector.index.built_at > INDEX_REFRESH_SECONDS:
+                    await detector.rebuild_index()
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if not message:
+                    continue
+                parsed = parse_quote_message(message.get("channel", ""), message.get("data"))
+                if not parsed:
+                    continue
+                try:
+                    await detector.on_quote(*parsed)
+                except Exception as e:
+                    await db.rollback()
+                    logger.error("Harvest detector failed for %s: %s", parsed[0], e)
+    finally:
+        await pubsub.close()
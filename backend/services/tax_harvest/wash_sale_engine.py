@@ -0,0 +1,431 @@
+"""
+Indexed wash-sale engine.
+
+Loads a client's buys and open loss-sale windows once and answers
+"does this buy/sell conflict?" from memory:
+
+  - Substantially identical securities (SecurityRelationship) are merged
+    into groups with union-find, so QQQ/QQQM or share classes share one key
+  - Events are keyed by (taxpayer scope, group); the scope is the mapped
+    client so every account the client owns (IRA included) is covered
+  - Each key holds date-sorted timelines; wash windows are fixed at
+    +/-30 days, so interval overlap reduces to a bisect range lookup
+    (O(log n + k)) instead of a query per symbol per account
+"""
+
+import logging
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.custodian import (
+    AggregatedTransaction,
+    CustodianAccount,
+    CustodianConnection,
+    CustodianTransactionType,
+)
+from backend.models.tax_harvest import (
+    SecurityRelationship,
+    SecurityRelationType,
+    WashSaleStatus,
+    WashSaleTransaction,
+)
+
+logger = logging.getLogger(__name__)
+
+# IRS wash-sale window: 30 days either side of the loss sale
+WASH_WINDOW_DAYS = 30
+
+
+def _as_date(value: Any) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+# ─────────────────────────────────────────────────────────────
+# Substantially identical groups
+# ─────────────────────────────────────────────────────────────
+
+
+class SecurityGroups:
+    """Union-find over substantially identical symbol pairs."""
+
+    def __init__(self, pairs: Iterable[Tuple[str, str]] = ()):
+        self._parent: Dict[str, str] = {}
+        self._members: Dict[str, List[str]] = {}
+        for a, b in pairs:
+            self.union(a, b)
+
+    def _find(self, symbol: str) -> str:
+        parent = self._parent.setdefault(symbol, symbol)
+        if parent != symbol:
+            parent = self._parent[symbol] = self._find(parent)
+        return parent
+
+    def union(self, a: str, b: str) -> None:
+        ra, rb = self._find(a.upper()), self._find(b.upper())
+        if ra == rb:
+            return
+        # Smallest symbol is the root so keys are deterministic
+        root, child = (ra, rb) if ra < rb else (rb, ra)
+        self._parent[child] = root
+        self._members.setdefault(root, [root]).extend(
+            self._members.pop(child, [child])
+        )
+
+    def key(self, symbol: str) -> str:
+        symbol = symbol.upper()
+        return self._find(symbol) if symbol in self._parent else symbol
+
+    def identical_to(self, symbol: str) -> List[str]:
+        """Other symbols in the group, sorted."""
+        symbol = symbol.upper()
+        members = self._members.get(self.key(symbol), [])
+        return sorted(s for s in members if s != symbol)
+
+
+# ─────────────────────────────────────────────────────────────
+# Interval index
+# ─────────────────────────────────────────────────────────────
+
+
+class _Timeline:
+    """Date-sorted events with bisect range lookup."""
+
+    __slots__ = ("dates", "items")
+
+    def __init__(self) -> None:
+        self.dates: List[date] = []
+        self.items: List[Dict[str, Any]] = []
+
+    def add(self, on: date, item: Dict[str, Any]) -> None:
+        i = bisect_right(self.dates, on)
+        self.dates.insert(i, on)
+        self.items.insert(i, item)
+
+    def between(self, lo: date, hi: date) -> List[Dict[str, Any]]:
+        return self.items[bisect_left(self.dates, lo):bisect_right(self.dates, hi)]
+
+
+class WashSaleIndex:
+    """Buys and loss-sale windows keyed by (scope, security group)."""
+
+    def __init__(self, groups: Optional[SecurityGroups] = None):
+        self.groups = groups or SecurityGroups()
+        self._buys: Dict[Tuple[str, str], _Timeline] = {}
+        self._sales: Dict[Tuple[str, str], _Timeline] = {}
+
+    def add_buy(self, scope: str, symbol: str, on: date, item: Dict[str, Any]) -> None:
+        key = (scope, self.groups.key(symbol))
+        self._buys.setdefault(key, _Timeline()).add(on, item)
+
+    def add_window(
+        self,
+        scope: str,
+        symbols: Iterable[str],
+        sale_date: date,
+        item: Dict[str, Any],
+    ) -> None:
+        """Register a loss sale under every group its watch list touches."""
+        for group in {self.groups.key(s) for s in symbols if s}:
+            self._sales.setdefault((scope, group), _Timeline()).add(sale_date, item)
+
+    def buys_near(self, scope: str, symbol: str, on: date) -> List[Dict[str, Any]]:
+        """Buys of an identical security within +/-30 days of a sale on `on`."""
+        timeline = self._buys.get((scope, self.groups.key(symbol)))
+        if timeline is None:
+            return []
+        span = timedelta(days=WASH_WINDOW_DAYS)
+        return timeline.between(on - span, on + span)
+
+    def buys_between(
+        self, scope: str, symbol: str, start: date, end: date
+    ) -> List[Dict[str, Any]]:
+        timeline = self._buys.get((scope, self.groups.key(symbol)))
+        return timeline.between(start, end) if timeline else []
+
+    def windows_covering(self, scope: str, symbol: str, on: date) -> List[Dict[str, Any]]:
+        """Open loss-sale windows that a buy on `on` would fall into."""
+        timeline = self._sales.get((scope, self.groups.key(symbol)))
+        if timeline is None:
+            return []
+        span = timedelta(days=WASH_WINDOW_DAYS)
+        return [
+            w
+            for w in timeline.between(on - span, on + span)
+            if w["window_start"] <= on <= w["window_end"]
+        ]
+
+
+# ─────────────────────────────────────────────────────────────
+# Engine
+# ─────────────────────────────────────────────────────────────
+
+
+class WashSaleEngine:
+    """Loads wash-sale state for an advisor or client and answers conflicts."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.index = WashSaleIndex()
+        self.as_of = date.today()
+        self._scope_of: Dict[UUID, str] = {}
+        self._groups_loaded = False
+
+    # ─────────────────────────────────────────────────────────────
+    # Loading
+    # ─────────────────────────────────────────────────────────────
+
+    async def load(
+        self,
+        advisor_id: UUID,
+        client_id: Optional[UUID] = None,
+        as_of: Optional[date] = None,
+    ) -> "WashSaleEngine":
+        """Load every account (or one client's accounts) of an advisor."""
+        query = (
+            select(CustodianAccount.id, CustodianAccount.client_id)
+            .join(CustodianConnection)
+            .where(CustodianConnection.advisor_id == advisor_id)
+        )
+        if client_id:
+            query = query.where(CustodianAccount.client_id == client_id)
+        result = await self.db.execute(query)
+        await self._load_accounts(result.all(), as_of)
+        return self
+
+    async def ensure_account(self, account_id: UUID) -> "WashSaleEngine":
+        """Load the taxpayer scope of an account unless already indexed."""
+        if account_id in self._scope_of:
+            return self
+        result = await self.db.execute(
+            select(CustodianAccount.client_id).where(
+                CustodianAccount.id == account_id
+            )
+        )
+        client_id = result.scalar_one_or_none()
+        if client_id:
+            result = await self.db.execute(
+                select(CustodianAccount.id, CustodianAccount.client_id).where(
+                    CustodianAccount.client_id == client_id
+                )
+            )
+            rows = result.all()
+        else:
+            rows = [(account_id, None)]
+        await self._load_accounts(rows, self.as_of)
+        return self
+
+    async def load_accounts(self, account_ids: Iterable[UUID]) -> "WashSaleEngine":
+        """Load the taxpayer scopes of many accounts (any advisors) in one pass."""
+        ids = [a for a in account_ids if a not in self._scope_of]
+        if not ids:
+            return self
+        clients = select(CustodianAccount.client_id).where(
+            and_(CustodianAccount.id.in_(ids), CustodianAccount.client_id.isnot(None))
+        )
+        result = await self.db.execute(
+            select(CustodianAccount.id, CustodianAccount.client_id).where(
+                or_(CustodianAccount.id.in_(ids), CustodianAccount.client_id.in_(clients))
+            )
+        )
+        await self._load_accounts(result.all(), self.as_of)
+        return self
+
+    async def _load_accounts(
+        self,
+        rows: Iterable[Tuple[UUID, Optional[UUID]]],
+        as_of: Optional[date],
+    ) -> None:
+        if as_of:
+            self.as_of = as_of
+        new_ids: List[UUID] = []
+        for account_id, client_id in rows:
+            if account_id in self._scope_of:
+                continue
+            # Unmapped accounts cannot be tied to a taxpayer — scope alone
+            self._scope_of[account_id] = str(client_id or account_id)
+            new_ids.append(account_id)
+
+        if not self._groups_loaded:
+            await self._load_groups()
+        if new_ids:
+            await self._load_events(new_ids)
+
+    async def _load_groups(self) -> None:
+        result = await self.db.execute(
+            select(SecurityRelationship.symbol_a, SecurityRelationship.symbol_b).where(
+                and_(
+                    SecurityRelationship.relation_type
+                    == SecurityRelationType.SUBSTANTIALLY_IDENTICAL,
+                    SecurityRelationship.is_active.is_(True),
+                )
+            )
+        )
+        for a, b in result.all():
+            self.index.groups.union(a, b)
+        self._groups_loaded = True
+
+    async def _load_events(self, account_ids: List[UUID]) -> None:
+        span = timedelta(days=WASH_WINDOW_DAYS)
+        # A window still open today started up to 60 days ago
+        earliest = self.as_of - 2 * span
+        latest = self.as_of + span
+
+        result = await self.db.execute(
+            select(
+                AggregatedTransaction.id,
+                AggregatedTransaction.account_id,
+                AggregatedTransaction.symbol,
+                AggregatedTransaction.trade_date,
+                AggregatedTransaction.quantity,
+                AggregatedTransaction.net_amount,
+            ).where(
+                and_(
+                    AggregatedTransaction.account_id.in_(account_ids),
+                    AggregatedTransaction.symbol.isnot(None),
+                    AggregatedTransaction.transaction_type
+                    == CustodianTransactionType.BUY,
+                    AggregatedTransaction.trade_date
+                    >= datetime.combine(earliest, datetime.min.time()),
+                    AggregatedTransaction.trade_date
+                    <= datetime.combine(latest, datetime.max.time()),
+                )
+            )
+        )
+        for txn_id, account_id, symbol, trade_date, quantity, net_amount in result.all():
+            on = _as_date(trade_date)
+            self.index.add_buy(
+                self._scope_of[account_id],
+                symbol,
+                on,
+                {
+                    "id": str(txn_id),
+                    "account_id": str(account_id),
+                    "symbol": symbol,
+                    "date": on.isoformat(),
+                    "quantity": float(quantity) if quantity else 0,
+                    "amount": float(net_amount),
+                },
+            )
+
+        result = await self.db.execute(
+            select(WashSaleTransaction).where(
+                and_(
+                    WashSaleTransaction.account_id.in_(account_ids),
+                    WashSaleTransaction.status == WashSaleStatus.IN_WINDOW,
+                    WashSaleTransaction.window_end >= earliest,
+                )
+            )
+        )
+        for window in result.scalars().all():
+            self.index.add_window(
+                self._scope_of[window.account_id],
+                [window.symbol, *(window.watch_symbols or [])],
+                window.sale_date,
+                {
+                    "id": str(window.id),
+                    "account_id": str(window.account_id),
+                    "symbol": window.symbol,
+                    "sale_date": window.sale_date.isoformat(),
+                    "window_start": window.window_start,
+                    "window_end": window.window_end,
+                    "loss_amount": float(window.loss_amount),
+                },
+            )
+
+    # ─────────────────────────────────────────────────────────────
+    # Queries
+    # ─────────────────────────────────────────────────────────────
+
+    def scope_of(self, account_id: UUID) -> str:
+        return self._scope_of.get(account_id, str(account_id))
+
+    def sale_conflicts(
+        self, account_id: UUID, symbol: str, on: Optional[date] = None
+    ) -> List[Dict[str, Any]]:
+        """Buys that would wash a loss sale of `symbol` on `on`."""
+        return self.index.buys_near(self.scope_of(account_id), symbol, on or self.as_of)
+
+    def buy_conflicts(
+        self, account_id: UUID, symbol: str, on: Optional[date] = None
+    ) -> List[Dict[str, Any]]:
+        """Open loss-sale windows that a buy of `symbol` on `on` would violate."""
+        return [
+            _window_out(w)
+            for w in self.index.windows_covering(
+                self.scope_of(account_id), symbol, on or self.as_of
+            )
+        ]
+
+    def analyze_sale(
+        self,
+        account_id: UUID,
+        symbol: str,
+        cusip: Optional[str] = None,
+        on: Optional[date] = None,
+    ) -> Dict[str, Any]:
+        """Wash-sale analysis for a potential harvest (HarvestScanner shape)."""
+        on = on or self.as_of
+        blocking = self.sale_conflicts(account_id, symbol, on)
+        active_windows = self.buy_conflicts(account_id, symbol, on)
+        risk_amount = Decimal("0")
+        for txn in blocking:
+            risk_amount += abs(Decimal(str(txn.get("amount", 0))))
+
+        return {
+            "status": (
+                WashSaleStatus.IN_WINDOW if blocking else WashSaleStatus.CLEAR
+            ),
+            "window_start": on - timedelta(days=WASH_WINDOW_DAYS),
+            "window_end": on + timedelta(days=WASH_WINDOW_DAYS),
+            "watch_symbols": [symbol] + self.index.groups.identical_to(symbol),
+            "blocking_transactions": blocking,
+            "active_windows": active_windows,
+            "risk_amount": risk_amount,
+        }
+
+    def first_violation(self, window: WashSaleTransaction) -> Optional[Dict[str, Any]]:
+        """Earliest identical buy inside a recorded loss-sale window."""
+        scope = self.scope_of(window.account_id)
+        sell_id = str(window.sell_transaction_id)
+        seen = set()
+        for symbol in [window.symbol, *(window.watch_symbols or [])]:
+            group = self.index.groups.key(symbol)
+            if group in seen:
+                continue
+            seen.add(group)
+            for buy in self.index.buys_between(
+                scope, symbol, window.window_start, window.window_end
+            ):
+                if buy["id"] != sell_id:
+                    return buy
+        return None
+
+    def check_trades(
+        self,
+        account_id: UUID,
+        trades: List[Dict[str, Any]],
+        on: Optional[date] = None,
+    ) -> List[Dict[str, Any]]:
+        """Flag proposed buys that land in an open loss-sale window (in place)."""
+        for trade in trades:
+            if trade.get("action") != "buy":
+                continue
+            windows = self.buy_conflicts(account_id, trade["symbol"], on)
+            if windows:
+                trade["wash_sale_risk"] = True
+                trade["wash_sale_windows"] = windows
+        return trades
+
+
+def _window_out(window: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        **window,
+        "window_start": window["window_start"].isoformat(),
+        "window_end": window["window_end"].isoformat(),
+    }
@@ -1,35 +1,270 @@
 """
 Track monthly usage for rate-limited features (AI chat, statement uploads).
+
+Counters, not COUNT(*):
+  - Per-user, per-feature, per-month totals live in Redis (INCR) and are
+    written back to usage_counters by usage_metering_worker
+  - Without Redis the usage_counters row is updated directly with a single
+    upsert, which is also the atomic increment-and-check
+  - Raw UsageLog rows are buffered in-process and appended in batches for
+    audit; without a running worker they are written inline as before
+
+Key schema:
+  usage:{user_id}:{feature}:{YYYYMM}  -> int counter, TTL=40d
+  usage:dirty                         -> SET of counter keys awaiting write-back
 """
 
+import asyncio
 import logging
-from datetime import date, datetime
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
 
-from sqlalchemy import func, select
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.models.usage_log import UsageLog
+from backend.models.usage_log import UsageCounter, UsageLog
+from backend.services.redis_client import get_redis
 
 logger = logging.getLogger(__name__)
 
+COUNTER_TTL_SECONDS = 40 * 24 * 3600
+DIRTY_KEY = "usage:dirty"
+FLUSH_INTERVAL_SECONDS = 5
+FLUSH_BATCH_SIZE = 500
+
+# Pending audit events: (user_id, feature, timestamp)
+_event_buffer: List[Tuple[Any, str, datetime]] = []
+_worker_running = False
+
+
+def current_period(now: Optional[datetime] = None) -> str:
+    return (now or datetime.now(timezone.utc)).strftime("%Y%m")
+
+
+def _counter_key(user_id, feature: str, period: str) -> str:
+    return f"usage:{user_id}:{feature}:{period}"
+
+
+def _parse_counter_key(key: str) -> Tuple[UUID, str, str]:
+    _, user_id, feature, period = key.split(":", 3)
+    return UUID(user_id), feature, period
+
 
 class UsageTracker:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    # ─────────────────────────────────────────────────────────────
+    # Public API
+    # ─────────────────────────────────────────────────────────────
+
     async def record_usage(self, user_id, feature: str) -> None:
-        """Record a single usage event."""
-        log = UsageLog(user_id=user_id, feature=feature)
-        self.db.add(log)
-        await self.db.flush()
+        """Count one usage event and append it to the audit log."""
+        await self._increment(user_id, feature, limit=None)
+        await self.log_event(user_id, feature)
+
+    async def try_consume(
+        self, user_id, feature: str, limit: int
+    ) -> Tuple[bool, int]:
+        """
+        Atomically count one use if it stays within `limit` (-1 = unlimited).
+        Returns (allowed, count after the attempt).
+        """
+        if limit == 0:
+            return False, await self.get_monthly_count(user_id, feature)
+        return await self._increment(
+            user_id, feature, limit=None if limit == -1 else limit
+        )
+
+    async def release(self, user_id, feature: str) -> None:
+        """Give back a unit taken by try_consume (request did not complete)."""
+        period = current_period()
+        redis = await get_redis()
+        if redis:
+            try:
+                key = _counter_key(user_id, feature, period)
+                if await redis.exists(key):
+                    await redis.decr(key)
+                    await redis.sadd(DIRTY_KEY, key)
+                    return
+            except Exception as e:
+                logger.warning("Usage counter release via Redis failed: %s", e)
+        await self.db.execute(
+            update(UsageCounter)
+            .where(UsageCounter.user_id == user_id)
+            .where(UsageCounter.feature == feature)
+            .where(UsageCounter.period == period)
+            .where(UsageCounter.count > 0)
+            .values(count=UsageCounter.count - 1, updated_at=func.now())
+        )
 
     async def get_monthly_count(self, user_id, feature: str) -> int:
         """Get usage count for current month."""
-        first_of_month = date.today().replace(day=1)
+        period = current_period()
+        redis = await get_redis()
+        if redis:
+            try:
+                value = await redis.get(_counter_key(user_id, feature, period))
+                if value is not None:
+                    return int(value)
+            except Exception as e:
+                logger.warning("Usage counter read via Redis failed: %s", e)
+        return await self._db_count(user_id, feature, period)
+
+    async def log_event(self, user_id, feature: str) -> None:
+        """Append a raw usage event for audit (batched when the worker runs)."""
+        now = datetime.now(timezone.utc)
+        if _worker_running:
+            _event_buffer.append((user_id, feature, now))
+            return
+        self.db.add(UsageLog(user_id=user_id, feature=feature, timestamp=now))
+        await self.db.flush()
+
+    # ─────────────────────────────────────────────────────────────
+    # Counter storage
+    # ─────────────────────────────────────────────────────────────
+
+    async def _db_count(self, user_id, feature: str, period: str) -> int:
         result = await self.db.execute(
-            select(func.count(UsageLog.id))
-            .where(UsageLog.user_id == user_id)
-            .where(UsageLog.feature == feature)
-            .where(UsageLog.timestamp >= first_of_month)
+            select(UsageCounter.count)
+            .where(UsageCounter.user_id == user_id)
+            .where(UsageCounter.feature == feature)
+            .where(UsageCounter.period == period)
         )
         return result.scalar() or 0
+
+    async def _increment(
+        self, user_id, feature: str, limit: Optional[int]
+    ) -> Tuple[bool, int]:
+        period = current_period()
+        redis = await get_redis()
+        if redis:
+            try:
+                return await self._increment_redis(redis, user_id, feature, period, limit)
+            except Exception as e:
+                logger.warning("Usage counter via Redis failed, using DB: %s", e)
+        return await self._increment_db(user_id, feature, period, limit)
+
+    async def _increment_redis(
+        self, redis, user_id, feature: str, period: str, limit: Optional[int]
+    ) -> Tuple[bool, int]:
+        key = _counter_key(user_id, feature, period)
+        if not await redis.exists(key):
+            # Seed from the durable counter; NX so concurrent seeders agree
+            base = await self._db_count(user_id, feature, period)
+            await redis.set(key, base, nx=True, ex=COUNTER_TTL_SECONDS)
+        count = await redis.incr(key)
+        if limit is not None and count > limit:
+            await redis.decr(key)
+            return False, count - 1
+        await redis.sadd(DIRTY_KEY, key)
+        return True, count
+
+    async def _increment_db(
+        self, user_id, feature: str, period: str, limit: Optional[int]
+    ) -> Tuple[bool, int]:
+        stmt = pg_insert(UsageCounter).values(
+            user_id=user_id, feature=feature, period=period, count=1
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "feature", "period"],
+            set_={"count": UsageCounter.count + 1, "updated_at": func.now()},
+            where=(UsageCounter.count < limit) if limit is not None else None,
+        ).returning(UsageCounter.count)
+        result = await self.db.execute(stmt)
+        count = result.scalar()
+        if count is None:
+            # Conflict row already at the limit — nothing was updated
+            return False, await self._db_count(user_id, feature, period)
+        return True, count
+
+
+# ─────────────────────────────────────────────────────────────
+# Background write-back and audit batching
+# ─────────────────────────────────────────────────────────────
+
+
+async def flush_usage_events(db: AsyncSession) -> int:
+    """Write buffered audit events in one batch."""
+    if not _event_buffer:
+        return 0
+    batch = _event_buffer[:FLUSH_BATCH_SIZE]
+    del _event_buffer[: len(batch)]
+    try:
+        await db.execute(
+            insert(UsageLog),
+            [
+                {"id": uuid4(), "user_id": u, "feature": f, "timestamp": ts}
+                for u, f, ts in batch
+            ],
+        )
+        await db.commit()
+    except Exception:
+        # Put the batch back so the next pass retries it
+        _event_buffer[:0] = batch
+        raise
+    return len(batch)
+
+
+async def write_back_counters(db: AsyncSession) -> int:
+    """Copy dirty Redis counters into usage_counters."""
+    redis = await get_redis()
+    if not redis:
+        return 0
+    keys = await redis.spop(DIRTY_KEY, FLUSH_BATCH_SIZE)
+    if not keys:
+        return 0
+    values = await redis.mget(keys)
+    rows = []
+    for key, value in zip(keys, values):
+        if value is None:
+            continue
+        user_id, feature, period = _parse_counter_key(key)
+        rows.append(
+            {"user_id": user_id, "feature": feature, "period": period, "count": int(value)}
+        )
+    if not rows:
+        return 0
+    try:
+        stmt = pg_insert(UsageCounter).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "feature", "period"],
+            set_={"count": stmt.excluded.count, "updated_at": func.now()},
+        )
+        await db.execute(stmt)
+        await db.commit()
+    except Exception:
+        await redis.sadd(DIRTY_KEY, *keys)
+        raise
+    return len(rows)
+
+
+async def usage_metering_worker(
+    db_factory: Callable[[], Any], interval_seconds: int = FLUSH_INTERVAL_SECONDS
+) -> None:
+    """Long-running task: batch audit events and write counters back."""
+    global _worker_running
+    _worker_running = True
+    logger.info("Usage metering worker started (interval=%ds)", interval_seconds)
+    try:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await flush_usage(db_factory)
+    finally:
+        _worker_running = False
+
+
+async def flush_usage(db_factory: Callable[[], Any]) -> Dict[str, int]:
+    """One write-back pass; also called on shutdown to drain the buffer."""
+    stats = {"events": 0, "counters": 0}
+    async with db_factory() as db:
+        try:
+            while _event_buffer:
+                stats["events"] += await flush_usage_events(db)
+            stats["counters"] = await write_back_counters(db)
+        except Exception as e:
+            await db.rollback()
+            logger.warning("Usage metering flush failed: %s", e)
+    return stats
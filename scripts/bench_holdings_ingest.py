@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Holdings ingestion benchmark: whole-file row loop vs. streaming chunks.
+
+Generates a Schwab-style positions export (account preamble, "$1,234.56"
+amounts, parenthesised negatives, "--" placeholders) and parses it two ways:
+  - legacy:    decode the whole upload, pd.read_csv() every column, then
+               DataFrame.iterrows() with per-cell Decimal parsing (the
+               pre-streaming portfolio_csv_parser);
+  - streaming: HoldingsReader chunks of only the mapped columns, with
+               vectorized number parsing (parse_portfolio_file today).
+Reports wall time, rows/s and tracemalloc peak for each, and checks that
+both produce the same position count and total.
+
+Usage:
+  python scripts/bench_holdings_ingest.py --rows 100000
+"""
+import argparse
+import io
+import random
+import sys
+import time
+import tracemalloc
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+# ── project root on sys.path ───────────────────────────────────────────────
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pandas as pd
+
+from backend.services.portfolio_csv_parser import parse_portfolio_file
+
+HEADER = (
+    '"Symbol","Description","Qty (Quantity)","Price","Price Chng %","Mkt Val (Market Value)",'
+    '"Day Chng $","Cost Basis","Gain $","Gain %","Reinvest?","Security Type"'
+)
+
+
+def _generate(rows: int, seed: int = 7) -> bytes:
+    rng = random.Random(seed)
+    out = io.StringIO()
+    out.write('"Positions for account Individual ...123 as of 10:00 AM ET, 2026/01/31"\n\n')
+    out.write(HEADER + "\n")
+    for i in range(rows):
+        qty = rng.randint(1, 5000)
+        price = rng.uniform(5, 900)
+        gain = rng.uniform(-5000, 5000)
+        gain_text = f"(${-gain:,.2f})" if gain < 0 else f"${gain:,.2f}"
+        out.write(
+            f'"T{i:05d}","Security {i}","{qty:,}","${price:,.2f}","--","${qty * price:,.2f}",'
+            f'"{gain_text}","${qty * price - gain:,.2f}","{gain_text}","--","No","Equity"\n'
+        )
+    out.write('"Account Total","--","--","--","--","$0.00","--","--","--","--","--","--"\n')
+    return out.getvalue().encode()
+
+
+# ── legacy path (pre-streaming parser, trimmed to the hot loop) ─────────────
+
+def _money(value):
+    text = str(value).strip()
+    if not text or text == "--" or text == "nan":
+        return None
+    cleaned = text.replace("$", "").replace(",", "").replace(" ", "")
+    if cleaned.startswith("(") and cleaned.endswith(")"):
+        cleaned = f"-{cleaned[1:-1]}"
+    try:
+        return Decimal(cleaned)
+    except InvalidOperation:
+        return None
+
+
+def _legacy(content: bytes, filename: str) -> dict:
+    lines = content.decode("utf-8", errors="replace").splitlines()
+    header = next(i for i, line in enumerate(lines[:20]) if "symbol" in line.lower())
+    df = pd.read_csv(io.StringIO("\n".join(lines[header:]))).dropna(how="all")
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    holdings, total = [], Decimal("0")
+    for _, row in df.iterrows():
+        symbol = str(row["symbol"]).strip()
+        if not symbol or symbol.lower() in {"--", "account total"}:
+            continue
+        mv = _money(row["mkt val (market value)"])
+        if mv is None or mv <= 0:
+            continue
+        holdings.append({
+            "symbol": symbol.upper(),
+            "description": str(row["description"]),
+            "quantity": float(q) if (q := _money(row["qty (quantity)"])) is not None else None,
+            "price": float(p) if (p := _money(row["price"])) is not None else None,
+            "market_value": float(mv),
+        })
+        total += mv
+    return {"holdings": holdings, "total_value": float(total), "position_count": len(holdings)}
+
+
+def _measure(label, parse, content, rows):
+    t0 = time.perf_counter()
+    parsed = parse(content, "schwab_positions.csv")
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()  # second run: tracing slows the parse, so it is not timed
+    parse(content, "schwab_positions.csv")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<12}{elapsed:>9.2f}s{rows / elapsed:>12,.0f}/s{peak / 2**20:>10.1f} MiB"
+        f"{parsed['position_count']:>12,}{parsed['total_value']:>20,.2f}"
+    )
+    return parsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    content = _generate(args.rows)
+    print(f"{args.rows:,} rows, {len(content) / 2**20:.1f} MiB upload\n")
+    print(f"{'path':<12}{'time':>10}{'throughput':>13}{'peak':>14}{'positions':>12}{'total':>20}")
+    old = _measure("legacy", _legacy, content, args.rows)
+    new = _measure("streaming", parse_portfolio_file, content, args.rows)
+    same = old["position_count"] == new["position_count"] and abs(old["total_value"] - new["total_value"]) < 0.01
+    print(f"\nresults match: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Login-storm benchmark: latency of an unrelated endpoint during a burst of logins.
+
+Runs the real RIA auth router in-process (one event loop, like one uvicorn
+worker) next to a trivial /ping route, fires a burst of concurrent logins,
+and samples /ping the whole time. Compares the off-loop bcrypt pool with
+the previous inline behaviour.
+
+Usage:
+  python scripts/bench_login_storm.py --logins 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# ── project root on sys.path ───────────────────────────────────────────────
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import httpx
+from fastapi import FastAPI
+
+from backend.api import auth
+from backend.services import auth_crypto
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(auth.router)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+def _pct(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000
+
+
+async def _storm(logins: int, concurrency: int) -> dict:
+    auth.get_users_db()  # seed the demo user before timing
+    transport = httpx.ASGITransport(app=_build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        gate = asyncio.Semaphore(concurrency)
+        statuses = []
+
+        async def login():
+            async with gate:
+                r = await client.post(
+                    "/api/v1/auth/login",
+                    json={"email": "leslie@iabadvisors.com", "password": "CreateWEalth2024$"},
+                )
+                statuses.append(r.status_code)
+
+        ping_latencies = []
+        done = asyncio.Event()
+
+        async def sample_ping():
+            # Open-loop: a ping is "sent" every 5ms; latency counts from the
+            # scheduled send time, so time spent waiting on a blocked loop shows
+            start = time.perf_counter()
+            i = 0
+            while not done.is_set():
+                scheduled = start + i * 0.005
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                await client.get("/ping")
+                ping_latencies.append(time.perf_counter() - scheduled)
+                i = int((time.perf_counter() - start) / 0.005) + 1
+
+        sampler = asyncio.create_task(sample_ping())
+        t0 = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - t0
+        done.set()
+        await sampler
+
+    return {
+        "logins_per_s": logins / elapsed,
+        "ok": statuses.count(200),
+        "shed_503": statuses.count(503),
+        "ping_samples": len(ping_latencies),
+        "ping_p50_ms": statistics.median(ping_latencies) * 1000,
+        "ping_p99_ms": _pct(ping_latencies, 0.99),
+        "ping_max_ms": max(ping_latencies) * 1000,
+    }
+
+
+async def _inline_verify(password: str, hashed: str) -> bool:
+    return auth_crypto.verify_password_sync(password, hashed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    results = {"off-loop pool": asyncio.run(_storm(args.logins, args.concurrency))}
+
+    original = auth.verify_password_async
+    auth.verify_password_async = _inline_verify
+    try:
+        results["inline (before)"] = asyncio.run(_storm(args.logins, args.concurrency))
+    finally:
+        auth.verify_password_async = original
+
+    print(f"{args.logins} logins, concurrency {args.concurrency}, "
+          f"{auth_crypto.BCRYPT_WORKERS} bcrypt workers\n")
+    print(f"{'mode':<18}{'logins/s':>10}{'ok':>6}{'503':>6}"
+          f"{'ping p50':>11}{'ping p99':>11}{'ping max':>11}")
+    for mode, r in results.items():
+        print(f"{mode:<18}{r['logins_per_s']:>10.1f}{r['ok']:>6}{r['shed_503']:>6}"
+              f"{r['ping_p50_ms']:>9.1f}ms{r['ping_p99_ms']:>9.1f}ms{r['ping_max_ms']:>9.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
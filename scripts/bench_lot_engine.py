@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Lot engine benchmark: sort-per-sale relief vs. per-method heaps.
+
+Builds --lots open lots spread over --books (account, symbol) books, then
+runs --sales HIFO sales and --what-ifs bulk what-if queries two ways:
+  - sorted:  order every open lot of the book on each sale (what
+             get_lots_for_symbol + a sort in the caller amounts to);
+  - engine:  LotEngine heaps, O(k log n) per sale, O(k log k) per what-if.
+Both relieve the same lots; the script checks that realized gains match.
+
+Usage:
+  python scripts/bench_lot_engine.py --lots 1000000 --books 2000
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# ── project root on sys.path ───────────────────────────────────────────────
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.models.liquidity import LotSelectionMethod
+from backend.services.lot_engine import LotEngine, WhatIf
+
+HIFO = LotSelectionMethod.HIFO
+SOLD = date(2026, 6, 1)
+
+
+def _rows(lots: int, books: int, seed: int = 3):
+    rng = random.Random(seed)
+    start = date(2015, 1, 1)
+    for i in range(lots):
+        b = i % books
+        yield {
+            "id": f"L{i}",
+            "account_id": f"A{b // 4}",
+            "symbol": f"S{b % 4}",
+            "shares": Decimal(rng.randint(1, 200)),
+            "cost_basis_per_share": Decimal(rng.randint(1000, 90000)) / 100,
+            "acquisition_date": start + timedelta(days=rng.randint(0, 4000)),
+        }
+
+
+def _sales(count: int, books: int, seed: int = 5):
+    rng = random.Random(seed)
+    for _ in range(count):
+        b = rng.randrange(books)
+        yield f"A{b // 4}", f"S{b % 4}", Decimal(rng.randint(50, 400)), Decimal(rng.randint(1000, 90000)) / 100
+
+
+def _sorted_path(rows, sales) -> Decimal:
+    books = {}
+    for row in rows:
+        books.setdefault((row["account_id"], row["symbol"]), []).append(dict(row))
+    total = Decimal(0)
+    for account, symbol, qty, price in sales:
+        lots = sorted(books[(account, symbol)], key=lambda r: (-r["cost_basis_per_share"], r["acquisition_date"]))
+        remaining = qty
+        for lot in lots:
+            if remaining <= 0:
+                break
+            take = min(remaining, lot["shares"])
+            total += take * (price - lot["cost_basis_per_share"])
+            lot["shares"] -= take
+            remaining -= take
+        books[(account, symbol)] = [lot for lot in lots if lot["shares"] > 0]
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--lots", type=int, default=1_000_000)
+    parser.add_argument("--books", type=int, default=2_000)
+    parser.add_argument("--sales", type=int, default=20_000)
+    parser.add_argument("--what-ifs", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rows = list(_rows(args.lots, args.books))
+    sales = list(_sales(args.sales, args.books))
+    print(f"{args.lots:,} lots in {args.books:,} books, {args.sales:,} HIFO sales\n")
+    print(f"{'path':<22}{'time':>10}{'ops/s':>12}")
+
+    t0 = time.perf_counter()
+    expected = _sorted_path(rows, sales)
+    elapsed = time.perf_counter() - t0
+    print(f"{'sorted (build+sell)':<22}{elapsed:>9.2f}s{args.sales / elapsed:>12,.0f}")
+
+    t0 = time.perf_counter()
+    engine = LotEngine.from_rows(rows)
+    built = time.perf_counter() - t0
+    print(f"{'engine build':<22}{built:>9.2f}s{args.lots / built:>12,.0f}")
+
+    t0 = time.perf_counter()
+    gain = sum(engine.sell(a, s, q, p, SOLD, HIFO).gain for a, s, q, p in sales)
+    elapsed = time.perf_counter() - t0
+    print(f"{'engine sell':<22}{elapsed:>9.2f}s{args.sales / elapsed:>12,.0f}")
+
+    orders = [WhatIf(a, s, q, p, SOLD, HIFO) for a, s, q, p in _sales(args.what_ifs, args.books, seed=9)]
+    t0 = time.perf_counter()
+    results = engine.what_if_many(orders)
+    elapsed = time.perf_counter() - t0
+    print(f"{'engine what-if (bulk)':<22}{elapsed:>9.2f}s{len(orders) / elapsed:>12,.0f}")
+
+    long_term = sum(r.long_term for r in results)
+    print(f"\nrealized gain matches: {gain == expected}; what-if long-term gain {float(long_term):,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Pre-trade compliance benchmark: per-recommendation CIM vs. batch checks.
+
+Checks one proposed trade per account for N accounts two ways:
+  - sequential: CIMService.validate_recommendation per trade (client
+                lookup, concentration on that client's positions, one
+                ComplianceLog flush per trade);
+  - batch:      PreTradeCompliance.check_trades (three bulk context
+                queries, compiled rules, one multi-row audit insert).
+No database is needed: a stand-in session answers queries from memory
+and sleeps --rtt-ms per round trip, so the numbers show round trips and
+rule evaluation cost rather than Postgres performance.
+
+Usage:
+  python scripts/bench_pretrade_compliance.py --accounts 2000 --rtt-ms 0.5
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from uuid import uuid4
+
+# ── project root on sys.path ───────────────────────────────────────────────
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.services.cim.pretrade import PreTradeCompliance, ProposedTrade
+from backend.services.cim_service import CIMService
+
+TICKERS = ["VOO", "VTI", "QQQ", "VUG", "VTV", "SCHD", "BND", "VXUS", "AAPL", "MSFT", "NVDA", "JPM"]
+ALT = [{"desc": "Model sleeve alternative"}]
+
+
+class _Session:
+    """Answers every execute with `rows` after one simulated round trip."""
+
+    def __init__(self, rtt: float, rows=()):
+        self.rtt = rtt
+        self.rows = list(rows)
+        self.round_trips = 0
+
+    async def _trip(self):
+        self.round_trips += 1
+        await asyncio.sleep(self.rtt)
+
+    async def execute(self, stmt, params=None):
+        await self._trip()
+        rows = self.rows.pop(0) if self.rows else []
+        return SimpleNamespace(all=lambda: rows, scalar_one_or_none=lambda: rows)
+
+    def add_all(self, objs):
+        pass
+
+    async def flush(self):
+        await self._trip()
+
+
+def _book(accounts: int, seed: int = 11):
+    rng = random.Random(seed)
+    clients, positions, trades = [], [], []
+    for i in range(accounts):
+        cid, hid = uuid4(), uuid4()
+        clients.append((cid, hid, "moderate", "growth", "10 years"))
+        held = [(hid, cid, t, t, rng.uniform(5_000, 80_000)) for t in rng.sample(TICKERS, 6)]
+        positions.extend(held)
+        trades.append(ProposedTrade(
+            f"t{i}", str(cid), rng.choice(TICKERS), rng.choice(["BUY", "SELL"]),
+            round(rng.uniform(500, 20_000), 2), alternatives=ALT,
+        ))
+    return clients, positions, trades
+
+
+async def _sequential(trades, positions, rtt):
+    by_client = {}
+    for hid, cid, ticker, name, value in positions:
+        by_client.setdefault(str(cid), []).append({"ticker": ticker, "market_value": value})
+    client = SimpleNamespace(risk_tolerance="moderate", investment_objective="growth", investment_timeline="10 years")
+    session = _Session(rtt)
+    cim = CIMService(session)
+    for t in trades:
+        session.rows = [client]
+        await cim.validate_recommendation(
+            {"id": t.id, "symbol": t.symbol, "side": t.side, "amount": t.amount},
+            client_id=t.client_id,
+            alternatives=t.alternatives,
+            portfolio={"positions": by_client[t.client_id]},
+        )
+    return session.round_trips
+
+
+async def _batch(trades, clients, positions, rtt):
+    session = _Session(rtt, [clients, [], positions])
+    batch = await PreTradeCompliance(session).check_trades(trades, budget_ms=60_000)
+    return session.round_trips, batch
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--accounts", type=int, default=2000)
+    parser.add_argument("--rtt-ms", type=float, default=0.5)
+    args = parser.parse_args()
+    rtt = args.rtt_ms / 1000
+
+    clients, positions, trades = _book(args.accounts)
+    print(f"{len(trades):,} trades, {len(positions):,} positions, {args.rtt_ms} ms per round trip\n")
+    print(f"{'path':<12}{'time':>10}{'trades/s':>12}{'round trips':>14}")
+
+    t0 = time.perf_counter()
+    trips = await _sequential(trades, positions, rtt)
+    elapsed = time.perf_counter() - t0
+    print(f"{'sequential':<12}{elapsed:>9.2f}s{len(trades) / elapsed:>12,.0f}{trips:>14,}")
+
+    t0 = time.perf_counter()
+    trips, batch = await _batch(trades, clients, positions, rtt)
+    elapsed = time.perf_counter() - t0
+    print(f"{'batch':<12}{elapsed:>9.2f}s{len(trades) / elapsed:>12,.0f}{trips:>14,}")
+    print(f"\nbatch: {len(batch.rejected)} rejected, {batch.unevaluated} over budget")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: cold worker time-to-first-response, eager vs. lazy routers.
+
+Each run is a fresh interpreter (as on an autoscaled container) that imports
+backend.app, answers GET /api/health, then one request per feature router
+that has not been loaded yet. With ROUTER_LOADING=eager every router is
+imported before the first response; on_demand defers each router's import
+to its first request, which is what the lazy default does until the
+background warm-up finishes.
+
+Usage:
+  python scripts/bench_startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+FEATURE_PATHS = ["/api/v1/help/articles", "/api/v1/prospects", "/api/v1/portal/meetings/availability"]
+
+_CHILD = """
+import json, logging, sys, time
+t0 = time.perf_counter()
+import backend.app as m
+t_import = time.perf_counter()
+from fastapi.testclient import TestClient
+client = TestClient(m.app)
+client.get("/api/health")
+t_health = time.perf_counter()
+features = []
+for path in sys.argv[1:]:
+    t = time.perf_counter()
+    client.get(path)
+    features.append((time.perf_counter() - t) * 1000)
+print(json.dumps({
+    "import_ms": (t_import - t0) * 1000,
+    "ready_ms": (t_health - t0) * 1000,
+    "first_feature_ms": features,
+    "modules": len(sys.modules),
+}))
+"""
+
+
+def _run(mode: str) -> dict:
+    env = {k: v for k, v in os.environ.items() if k != "DATABASE_URL"}
+    env.update(ROUTER_LOADING=mode, PYTHONPATH=str(ROOT))
+    proc = subprocess.run(
+        [sys.executable, "-c", _CHILD, *FEATURE_PATHS],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.exit(proc.stderr[-2000:])
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.runs} cold starts per mode, median ms (no DATABASE_URL)\n")
+    print(f"{'mode':<12}{'import':>9}{'ready':>9}{'modules':>9}  first request per feature")
+    for mode in ("eager", "on_demand"):
+        runs = [_run(mode) for _ in range(args.runs)]
+        med = lambda key: statistics.median(r[key] for r in runs)  # noqa: E731
+        features = [statistics.median(r["first_feature_ms"][i] for r in runs) for i in range(len(FEATURE_PATHS))]
+        print(f"{mode:<12}{med('import_ms'):>9.0f}{med('ready_ms'):>9.0f}{med('modules'):>9.0f}  "
+              + "  ".join(f"{p.split('/')[3]} {ms:.0f}" for p, ms in zip(FEATURE_PATHS, features)))
+
+
+if __name__ == "__main__":
+    main()
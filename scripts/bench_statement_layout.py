@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Statement parsing benchmark: layout tables vs. line heuristics.
+
+Renders each sample in tests/fixtures/statement_samples.py to a PDF with
+PyMuPDF, then parses it two ways:
+  - text:   page.get_text() plus each parser's line-by-line parse();
+  - layout: word boxes grouped into rows and cells (extract_layout) plus
+            the parsers' declared position tables.
+Reports position accuracy against known-good values, how many statements
+fell through to the universal (LLM) fallback, and throughput cold and with
+the layout cache warm. The LLM is disabled so the run stays offline;
+fallbacks are counted, not called.
+
+Usage:
+  python scripts/bench_statement_layout.py --repeat 200
+"""
+import argparse
+import os
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+# ── project root on sys.path ───────────────────────────────────────────────
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.pop("ANTHROPIC_API_KEY", None)
+os.environ.pop("OPENAI_API_KEY", None)
+
+import fitz  # PyMuPDF
+
+from backend.parsers import get_default_registry
+from backend.parsers import layout as layout_mod
+from tests.fixtures import statement_samples as samples
+
+D = Decimal
+# (ticker or fund name) -> (quantity or None when not reported, market value)
+EXPECTED = {
+    "NW_MUTUAL_VA_TEXT": {
+        "Index 500 (BlackRock)": (None, D("4627.18")),
+        "Select Bond (Allspring)": (None, D("5468.49")),
+        "International Equity": (None, D("5047.84")),
+    },
+    "ROBINHOOD_TEXT": {
+        "AAPL": (D("10.5"), D("1234.50")),
+        "GOOGL": (D("5.2"), D("789.30")),
+        "META": (D("3.0"), D("1456.00")),
+    },
+    "ETRADE_TEXT": {
+        "META": (D("2.5"), D("6856.27")),
+    },
+}
+FALLBACK_PARSERS = {"llm_fallback", "heuristic_fallback"}
+
+
+def _render(text: str) -> bytes:
+    doc = fitz.open()
+    page = doc.new_page()
+    y = 40
+    for line in text.strip("\n").split("\n"):
+        if line.strip():
+            page.insert_text((36, y), line, fontname="cour", fontsize=9)
+        y += 11
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _parse_text(registry, pdf: bytes):
+    """The pre-layout path: flat text, first matching parser's parse()."""
+    with fitz.open(stream=pdf, filetype="pdf") as doc:
+        text = "\n".join(page.get_text() for page in doc)
+    for parser in registry._parsers:
+        if parser.can_handle(text):
+            return parser.parse(text)
+    return registry._fallback_parser.parse(text)
+
+
+def _parse_layout(registry, pdf: bytes):
+    return registry.detect_and_parse_layout(layout_mod.extract_layout(pdf))
+
+
+def _score(parsed, expected) -> tuple:
+    found = {(p.ticker or p.security_name): p for p in parsed.positions}
+    correct = 0
+    for key, (qty, value) in expected.items():
+        p = found.get(key)
+        if p is not None and p.market_value == value and (qty is None or p.quantity == qty):
+            correct += 1
+    return correct, len(parsed.positions)
+
+
+def _run(label, parse, registry, corpus, repeat, clear_cache):
+    correct = extracted = expected = fallbacks = 0
+    for name, pdf in corpus:
+        if clear_cache:
+            layout_mod._layout_cache.clear()
+        parsed = parse(registry, pdf)
+        c, n = _score(parsed, EXPECTED[name])
+        correct += c
+        extracted += n
+        expected += len(EXPECTED[name])
+        fallbacks += parsed.metadata.get("parser") in FALLBACK_PARSERS
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for _, pdf in corpus:
+            if clear_cache:
+                layout_mod._layout_cache.clear()
+            parse(registry, pdf)
+    elapsed = time.perf_counter() - t0
+    rate = repeat * len(corpus) / elapsed
+    precision = correct / extracted if extracted else 0.0
+    print(f"{label:<20}{correct:>4}/{expected:<4}{precision:>10.0%}{fallbacks:>11}{rate:>12,.0f}/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    registry = get_default_registry()
+    corpus = [(name, _render(getattr(samples, name))) for name in EXPECTED]
+    print(f"{len(corpus)} statements, {sum(len(v) for v in EXPECTED.values())} known positions\n")
+    print(f"{'path':<20}{'correct':>9}{'precision':>10}{'fallbacks':>11}{'throughput':>14}")
+    _run("text + heuristics", _parse_text, registry, corpus, args.repeat, clear_cache=False)
+    _run("layout, cold", _parse_layout, registry, corpus, args.repeat, clear_cache=True)
+    _run("layout, cached", _parse_layout, registry, corpus, args.repeat, clear_cache=False)
+
+
+if __name__ == "__main__":
+    main()
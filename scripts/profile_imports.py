@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Import-time profiler: what a cold worker spends importing before it serves.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter (so
+nothing is cached in sys.modules) and summarises the report: the slowest
+modules by cumulative and by self time, and the totals per top-level package.
+Run it after adding a module-level import to a router or service to see what
+that import drags in.
+
+Usage:
+  python scripts/profile_imports.py                      # backend.app
+  python scripts/profile_imports.py --module backend.api.b2c.dashboard
+  python scripts/profile_imports.py --grep backend. --top 40
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile(module: str, env: dict) -> list:
+    """[(module, self_us, cumulative_us, depth)] in import order."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.exit(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), (len(m.group(3)) - 1) // 2))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--module", default="backend.app")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--grep", default="", help="only list modules containing this")
+    parser.add_argument("--router-loading", default="on_demand",
+                        help="ROUTER_LOADING for the profiled process (eager shows the old cost)")
+    args = parser.parse_args()
+
+    env = {**os.environ, "ROUTER_LOADING": args.router_loading, "PYTHONPATH": str(ROOT)}
+    rows = profile(args.module, env)
+    root = next((r for r in rows if r[0] == args.module), None)
+    total_ms = root[2] / 1000 if root else sum(r[1] for r in rows) / 1000
+    print(f"import {args.module}: {total_ms:,.0f}ms, {len(rows)} modules "
+          f"(ROUTER_LOADING={args.router_loading})\n")
+
+    listed = [r for r in rows if args.grep in r[0]]
+    print(f"{'slowest (cumulative)':<56}{'cum ms':>9}{'self ms':>9}")
+    for name, self_us, cum_us, depth in sorted(listed, key=lambda r: -r[2])[:args.top]:
+        print(f"{'  ' * min(depth, 4) + name:<56}{cum_us / 1000:>9.1f}{self_us / 1000:>9.1f}")
+
+    print(f"\n{'slowest (self)':<56}{'self ms':>9}")
+    for name, self_us, _, _ in sorted(listed, key=lambda r: -r[1])[:args.top]:
+        print(f"{name:<56}{self_us / 1000:>9.1f}")
+
+    packages = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        packages[name.split(".")[0]] += self_us
+    print(f"\n{'by top-level package':<56}{'self ms':>9}")
+    for name, us in sorted(packages.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"{name:<56}{us / 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
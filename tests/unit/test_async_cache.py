@@ -0,0 +1,80 @@
+"""Unit tests for the async cache-aside layer."""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from backend.services.async_cache import AsyncCache, fingerprint
+
+
+async def _no_redis():
+    return None
+
+
+def test_fingerprint_ignores_key_order():
+    assert fingerprint({"a": 1, "b": [1, 2]}) == fingerprint({"b": [1, 2], "a": 1})
+    assert fingerprint({"a": 1}) != fingerprint({"a": 2})
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_computation():
+    cache = AsyncCache("test:single_flight", fresh_ttl=60)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"n": calls}
+
+    with patch("backend.services.async_cache.get_redis", _no_redis):
+        results = await asyncio.gather(*[cache.get_or_compute("k", compute) for _ in range(10)])
+
+    assert calls == 1
+    assert all(value == {"n": 1} for value, _ in results)
+    assert cache.stats.misses == 1
+    assert cache.stats.coalesced == 9
+
+
+@pytest.mark.asyncio
+async def test_fresh_hit_and_stale_while_revalidate():
+    cache = AsyncCache("test:swr", fresh_ttl=60, stale_ttl=600)
+    version = 0
+
+    async def compute():
+        nonlocal version
+        version += 1
+        return version
+
+    with patch("backend.services.async_cache.get_redis", _no_redis):
+        assert await cache.get_or_compute("k", compute) == (1, False)
+        assert await cache.get_or_compute("k", compute) == (1, True)
+
+        # Age the entry past the fresh TTL: stale value served, refresh in background
+        with patch("backend.services.async_cache.time.time", return_value=time.time() + 120):
+            assert await cache.get_or_compute("k", compute) == (1, True)
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+        assert await cache.get_or_compute("k", compute) == (2, True)
+
+    assert cache.stats.stale_hits == 1
+    assert cache.stats.refreshes == 1
+    assert cache.stats.hit_rate > 0.5
+
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached():
+    cache = AsyncCache("test:errors", fresh_ttl=60)
+
+    async def boom():
+        raise RuntimeError("upstream down")
+
+    async def ok():
+        return "ok"
+
+    with patch("backend.services.async_cache.get_redis", _no_redis):
+        with pytest.raises(RuntimeError):
+            await cache.get_or_compute("k", boom)
+        assert await cache.get_or_compute("k", ok) == ("ok", False)
@@ -0,0 +1,78 @@
+"""Unit tests for off-loop password hashing and the verified-token cache."""
+
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from jose import JWTError
+
+from backend.services import auth_crypto
+from backend.services.auth_crypto import PasswordHasherBusy, TokenClaimsCache
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_run_off_loop():
+    hashed = await auth_crypto.hash_password("correct horse")
+    assert await auth_crypto.verify_password("correct horse", hashed)
+    assert not await auth_crypto.verify_password("wrong", hashed)
+    assert not await auth_crypto.verify_password("x", "not-a-bcrypt-hash")
+    assert auth_crypto.pending_hashes() == 0
+
+
+@pytest.mark.asyncio
+async def test_event_loop_keeps_ticking_during_hash():
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    task = asyncio.create_task(ticker())
+    await auth_crypto.hash_password("password123")
+    task.cancel()
+    assert ticks > 3
+
+
+@pytest.mark.asyncio
+async def test_full_queue_fails_fast():
+    with patch.object(auth_crypto, "_pending", auth_crypto.BCRYPT_MAX_PENDING):
+        with pytest.raises(PasswordHasherBusy):
+            await auth_crypto.verify_password("pw", "hash")
+
+
+def test_claims_cached_until_token_exp():
+    cache = TokenClaimsCache("test:claims")
+    decoder = MagicMock(return_value={"sub": "u1", "exp": time.time() + 60})
+
+    assert cache.decode("tok", decoder)["sub"] == "u1"
+    assert cache.decode("tok", decoder)["sub"] == "u1"
+    assert decoder.call_count == 1
+    assert cache.stats.hits == 1 and cache.stats.misses == 1
+
+    expired = MagicMock(return_value={"sub": "u2", "exp": time.time() - 1})
+    cache.decode("old", expired)
+    cache.decode("old", expired)
+    assert expired.call_count == 2
+
+
+def test_decode_errors_are_not_cached_and_results_are_copies():
+    cache = TokenClaimsCache("test:claims_errors")
+    failing = MagicMock(side_effect=JWTError("bad signature"))
+    for _ in range(2):
+        with pytest.raises(JWTError):
+            cache.decode("forged", failing)
+    assert failing.call_count == 2
+
+    cache.decode("tok", lambda t: {"sub": "u1", "exp": time.time() + 60})["sub"] = "mutated"
+    assert cache.get("tok")["sub"] == "u1"
+
+
+def test_lru_bound():
+    cache = TokenClaimsCache("test:claims_lru", max_entries=2)
+    exp = time.time() + 60
+    for token in ("a", "b", "c"):
+        cache.put(token, {"exp": exp})
+    assert cache.get("a") is None and cache.get("c") is not None
@@ -0,0 +1,53 @@
+"""B2C net-worth history: custodian feed and statement-only accounts combined."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from backend.services.b2c_dashboard import B2CDashboardService, _last4
+
+
+def _account(masked):
+    return SimpleNamespace(id=uuid4(), household_id=uuid4(), account_number_masked=masked)
+
+
+@pytest.mark.asyncio
+async def test_statement_only_accounts_are_added_to_the_feed_series():
+    fed, manual = _account("***1234"), _account("***9876")
+    monday = date.today() - timedelta(days=date.today().weekday())
+    weeks = [monday - timedelta(weeks=n) for n in (2, 1, 0)]
+    feed = [("feed", w, Decimal(v)) for w, v in zip(weeks, ("1000", "1100", "1200"))]
+
+    statements = MagicMock()
+    statements.all.return_value = [
+        (manual.id, date(2020, 1, 31), Decimal("400")),  # before the window: carried in
+        (manual.id, weeks[1] + timedelta(days=2), Decimal("500")),
+    ]
+    svc = B2CDashboardService(db=MagicMock(execute=AsyncMock(return_value=statements)))
+    svc._feed_history = AsyncMock(return_value=({fed.id}, feed))
+
+    points = await svc._get_net_worth_history([fed, manual])
+    assert [(p.date, p.value) for p in points] == [
+        (weeks[0].isoformat(), Decimal("1400")),
+        (weeks[1].isoformat(), Decimal("1600")),
+        (weeks[2].isoformat(), Decimal("1700")),
+    ]
+    sql = str(svc.db.execute.await_args.args[0])
+    assert "statements.account_id IN" in sql
+
+
+@pytest.mark.asyncio
+async def test_without_feed_history_statements_are_summed_per_date():
+    accounts = [_account(None), _account("***1")]
+    rows = MagicMock()
+    rows.all.return_value = [(date(2026, 9, 30), Decimal("900"))]
+    svc = B2CDashboardService(db=MagicMock(execute=AsyncMock(return_value=rows)))
+    svc._feed_history = AsyncMock(side_effect=RuntimeError("no holdings tables"))
+
+    points = await svc._get_net_worth_history(accounts)
+    assert [(p.date, p.value) for p in points] == [("2026-09-30", Decimal("900"))]
+    assert _last4("***1234") == "1234" and _last4("ACCT-00071234") == "1234" and _last4("***1") == ""
@@ -0,0 +1,132 @@
+"""Unit tests for the content-addressed blob store."""
+
+import hashlib
+import os
+import tracemalloc
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from backend.services import blob_store
+from backend.services.blob_store import (
+    BlobStore,
+    BlobTooLarge,
+    FilesystemBackend,
+    RangeNotSatisfiable,
+    parse_range,
+)
+
+
+class FakeUpload:
+    """Generates `size` bytes on demand, like a spooled UploadFile."""
+
+    def __init__(self, size, content_type="application/pdf", seed=b"x"):
+        self.remaining = size
+        self.content_type = content_type
+        self.seed = seed
+
+    async def read(self, n=-1):
+        n = self.remaining if n < 0 else min(n, self.remaining)
+        self.remaining -= n
+        return (self.seed * n)[:n]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(FilesystemBackend(str(tmp_path / "blobs")))
+
+
+@pytest.mark.asyncio
+async def test_upload_is_hashed_while_streaming_and_deduplicated(store, tmp_path):
+    ref, created = await store.save_upload(FakeUpload(3_000_000))
+    assert created and ref.size == 3_000_000
+    assert ref.digest == hashlib.sha256(b"x" * 3_000_000).hexdigest()
+    assert ref.key.startswith(f"sha256/{ref.digest[:2]}/{ref.digest[2:4]}/")
+
+    again, created = await store.save_upload(FakeUpload(3_000_000))
+    assert again == ref and created is False
+    assert os.listdir(store.tmp_dir) == []
+
+    with pytest.raises(BlobTooLarge):
+        await store.save_upload(FakeUpload(5_000_000, seed=b"y"), max_bytes=4_000_000)
+    assert os.listdir(store.tmp_dir) == []
+
+
+@pytest.mark.asyncio
+async def test_peak_memory_is_independent_of_upload_size(store):
+    tracemalloc.start()
+    try:
+        await store.save_upload(FakeUpload(64 * 1024 * 1024, seed=b"z"))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < 8 * blob_store.CHUNK_SIZE
+
+
+@pytest.mark.asyncio
+async def test_range_reads_and_local_path(store):
+    data = bytes(range(256)) * 10_000
+    ref, _ = await store.save_bytes(data, "application/octet-stream")
+
+    chunks = [c async for c in store.iter_range(ref, 1000, 2_000_999)]
+    assert b"".join(chunks) == data[1000:2_001_000]
+    assert max(len(c) for c in chunks) <= blob_store.CHUNK_SIZE
+
+    async with store.local_path(ref, suffix=".pdf") as path:
+        assert path.endswith(".pdf")
+        with open(path, "rb") as fh:
+            assert fh.read(16) == data[:16]
+    assert not os.path.exists(path)
+
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=10-19", 100) == (10, 19)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-5", 100) == (95, 99)
+    assert parse_range("bytes=0-999", 100) == (0, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=100-", 100)
+
+
+@pytest.mark.asyncio
+async def test_vault_upload_and_range_download(store, monkeypatch):
+    from backend.api import document_vault
+
+    monkeypatch.setattr(blob_store, "_store", store)
+    monkeypatch.setattr(document_vault, "_uploaded_docs", [])
+    app = FastAPI()
+    app.include_router(document_vault.router)
+    app.dependency_overrides[document_vault.get_current_user] = lambda: {"id": "u1"}
+
+    body = b"%PDF-1.4 " + b"0123456789" * 1000
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        first = (await client.post(
+            "/api/v1/documents/upload",
+            data={"name": "IPS"},
+            files={"file": ("ips.pdf", body, "application/pdf")},
+        )).json()
+        second = (await client.post(
+            "/api/v1/documents/upload",
+            data={"name": "IPS copy"},
+            files={"file": ("copy.pdf", body, "application/pdf")},
+        )).json()
+        assert first["size_bytes"] == len(body)
+        assert first["sha256"] == second["sha256"] and second["deduplicated"]
+
+        full = await client.get(f"/api/v1/documents/{first['id']}/download")
+        assert full.status_code == 200 and full.content == body
+
+        part = await client.get(
+            f"/api/v1/documents/{first['id']}/download", headers={"Range": "bytes=9-18"}
+        )
+        assert part.status_code == 206
+        assert part.content == b"0123456789"
+        assert part.headers["content-range"] == f"bytes 9-18/{len(body)}"
+
+        bad = await client.get(
+            f"/api/v1/documents/{first['id']}/download", headers={"Range": "bytes=999999-"}
+        )
+        assert bad.status_code == 416
@@ -0,0 +1,113 @@
+"""Unit tests for the look-through concentration engine and its callers."""
+
+from decimal import Decimal
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from backend.services import concentration
+from backend.services.cim_service import ComplianceRulesEngine
+from backend.services.concentration import Holding, get_engine, household_exposure
+from backend.services.iim_service import IIMService
+
+
+def _fund_weight(fund: str, security: str) -> float:
+    engine = get_engine()
+    row, col = engine.row_of[fund], engine.col_of[security]
+    lo, hi = engine.indptr[row], engine.indptr[row + 1]
+    hit = np.flatnonzero(engine.indices[lo:hi] == col)
+    return float(engine.data[lo + hit[0]]) if len(hit) else 0.0
+
+
+def test_overlap_through_etfs_is_one_exposure():
+    holdings = [
+        Holding("AAPL", 10_000, "Technology"),
+        Holding("voo", 50_000),
+        Holding("VUG", 30_000),
+        Holding("BND", 20_000),
+        Holding("PRIVCO", 5_000, "Private Equity"),
+    ]
+    exp = get_engine().exposure(holdings)
+
+    expected = 10_000 + 50_000 * _fund_weight("VOO", "AAPL") + 30_000 * _fund_weight("VUG", "AAPL")
+    assert exp.total == 115_000
+    assert exp.securities["AAPL"] == pytest.approx(expected)
+    assert next(iter(exp.securities)) == "AAPL"
+    assert exp.contributors("AAPL") == pytest.approx({
+        "AAPL": 10_000,
+        "VOO": 50_000 * _fund_weight("VOO", "AAPL"),
+        "VUG": 30_000 * _fund_weight("VUG", "AAPL"),
+    })
+
+    # Bond funds are a pooled sleeve, not a security; unknown tickers count as themselves
+    assert "BND" not in exp.securities and exp.pooled == {"U.S. Aggregate Bonds": 20_000}
+    assert exp.securities["PRIVCO"] == 5_000 and exp.sectors["Private Equity"] == 5_000
+    assert sum(exp.sectors.values()) + sum(exp.pooled.values()) == pytest.approx(exp.total)
+
+
+def test_batch_matches_single_and_snapshots_are_cached(monkeypatch):
+    engine = get_engine()
+    monkeypatch.setattr(engine, "_cache", type(engine._cache)())
+    rng = np.random.default_rng(4)
+    snapshots = [
+        [Holding(t, float(rng.integers(1_000, 90_000))) for t in rng.choice(["VTI", "QQQ", "XLK", "MSFT", "JPM", "VXUS"], 3, replace=False)]
+        for _ in range(300)
+    ]
+    batch = engine.exposures(snapshots)
+    for snap, exp in zip(snapshots[:20], batch):
+        single = engine.exposure(list(reversed(snap)))  # order-independent key
+        assert single is exp
+
+    engine._cache.clear()
+    fresh = engine.exposure(snapshots[7])
+    assert fresh is not batch[7]
+    assert fresh.securities == pytest.approx(batch[7].securities)
+    assert fresh.sectors == pytest.approx(batch[7].sectors)
+
+
+@pytest.mark.asyncio
+async def test_iim_flags_look_through_overlap_not_broad_etfs():
+    def pos(ticker, value, sector=None):
+        return SimpleNamespace(ticker=ticker, security_name=ticker, market_value=Decimal(value), sector=sector)
+
+    iim = IIMService(session=None)
+    # 8% AAPL directly is under the 10% limit on its own, not once VOO/VUG are looked through
+    positions = [pos("AAPL", 8_000, "Technology"), pos("VOO", 42_000), pos("VUG", 20_000), pos("BND", 30_000)]
+    violations = await iim._compute_concentration_violations(positions, Decimal("100000"))
+    single = [v for v in violations if v.type == "SINGLE_STOCK"]
+    assert [v.description.split()[0] for v in single] == ["AAPL"]
+    assert single[0].current_pct > 10 and "VUG" in single[0].description
+
+    # A total-market fund alone is not single-stock risk
+    violations = await iim._compute_concentration_violations([pos("VTI", 100_000)], Decimal("100000"))
+    assert not [v for v in violations if v.type == "SINGLE_STOCK"]
+
+
+def test_cim_rule_uses_look_through_positions():
+    rules = ComplianceRulesEngine()
+    assert rules.check_concentration_limits({}, {"max_single_position_pct": 20}).passed
+
+    diversified = rules.check_concentration_limits({}, {"positions": [
+        {"ticker": "VTI", "market_value": 60_000}, {"ticker": "BND", "market_value": 40_000},
+    ]})
+    assert diversified.passed and diversified.details["look_through"]
+
+    concentrated = rules.check_concentration_limits({}, {"positions": [
+        {"ticker": "NVDA", "market_value": 30_000}, {"ticker": "QQQ", "market_value": 70_000},
+    ]})
+    assert not concentrated.passed
+    assert concentrated.details["max_single_ticker"] == "NVDA"
+    assert concentrated.details["max_single_pct"] > 30
+
+
+def test_registered_fund_replaces_demo_holdings(monkeypatch):
+    monkeypatch.setattr(concentration, "_registered", {})
+    concentration.register_fund(concentration.FundHoldings(
+        "MYETF", "Two-stock fund", {"AAPL": 0.5, "MSFT": 0.5}, {"AAPL": "Technology", "MSFT": "Technology"},
+    ))
+    try:
+        exp = household_exposure([{"ticker": "MYETF", "market_value": 1_000}])
+        assert exp.securities == pytest.approx({"AAPL": 500, "MSFT": 500})
+    finally:
+        concentration.get_engine.cache_clear()
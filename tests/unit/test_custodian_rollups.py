@@ -0,0 +1,107 @@
+"""Unit tests for SQL-side custodian position aggregation and rollups."""
+
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from backend.models.custodian import CustodianAssetClass
+from backend.services.custodian.position_rollup import (
+    PositionRollupService,
+    allocation_from_rows,
+    position_row_to_dict,
+    symbol_rollup_query,
+)
+
+
+def _compile(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_symbol_rollup_groups_in_sql():
+    """Aggregation is a single GROUP BY with per-account json_agg detail."""
+    sql = _compile(symbol_rollup_query(uuid4(), household_id=uuid4()))
+    assert "GROUP BY aggregated_positions.symbol" in sql
+    assert "json_agg(json_build_object(" in sql
+    assert "custodian_accounts.household_id" in sql
+
+
+def test_symbol_rollup_without_accounts_skips_json_agg():
+    sql = _compile(symbol_rollup_query(uuid4(), include_accounts=False))
+    assert "json_agg" not in sql
+
+
+def test_position_row_to_dict_matches_unified_shape():
+    account_id = uuid4()
+    row = SimpleNamespace(
+        symbol="AAPL",
+        cusip="037833100",
+        security_name="Apple Inc.",
+        asset_class=CustodianAssetClass.EQUITY,
+        total_quantity=Decimal("15"),
+        total_market_value=Decimal("3300.00"),
+        total_cost_basis=Decimal("2250.00"),
+        accounts=[{"account_id": str(account_id), "quantity": 15, "market_value": 3300.0}],
+    )
+    data = position_row_to_dict(row)
+    assert data["asset_class"] == "equity"
+    assert data["total_market_value"] == 3300.0
+    assert data["unrealized_gain_loss"] == pytest.approx(1050.0)
+    assert data["accounts"][0]["account_id"] == str(account_id)
+
+
+def test_position_row_without_cost_basis_has_no_gain():
+    row = SimpleNamespace(
+        symbol="CASH", cusip=None, security_name="Cash", asset_class=None,
+        total_quantity=Decimal("100"), total_market_value=Decimal("100"),
+        total_cost_basis=Decimal("0"), accounts=None,
+    )
+    data = position_row_to_dict(row)
+    assert data["asset_class"] == "other"
+    assert data["unrealized_gain_loss"] is None
+    assert data["accounts"] == []
+
+
+def test_allocation_from_rows_stays_exact():
+    rows = [
+        SimpleNamespace(asset_class=CustodianAssetClass.EQUITY, market_value=Decimal("0.1")),
+        SimpleNamespace(asset_class=CustodianAssetClass.EQUITY, market_value=Decimal("0.2")),
+        SimpleNamespace(asset_class=CustodianAssetClass.CASH, market_value=Decimal("0.7")),
+    ]
+    result = allocation_from_rows(rows)
+    assert result["total_value"] == 1.0
+    assert [a["asset_class"] for a in result["allocation"]] == ["cash", "equity"]
+    assert result["allocation"][1]["percentage"] == pytest.approx(30.0)
+
+
+@pytest.mark.asyncio
+async def test_unified_positions_prefers_rollup():
+    """Advisor-scope reads come from the rollup without a live aggregation."""
+    rollup = SimpleNamespace(
+        symbol="VTI", cusip=None, security_name="Vanguard Total", asset_class=CustodianAssetClass.ETF,
+        total_quantity=Decimal("10"), total_market_value=Decimal("2900"),
+        total_cost_basis=Decimal("0"), accounts=[],
+    )
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = [rollup]
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+
+    positions = await PositionRollupService(db).unified_positions(uuid4())
+    assert positions[0]["symbol"] == "VTI"
+    assert db.execute.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_client_scope_uses_live_query():
+    result = MagicMock()
+    result.all.return_value = []
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+
+    await PositionRollupService(db).unified_positions(uuid4(), client_id=uuid4())
+    stmt = db.execute.await_args.args[0]
+    assert "GROUP BY aggregated_positions.symbol" in _compile(stmt)
@@ -0,0 +1,113 @@
+"""Unit tests for versioned dashboard snapshots."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+
+from backend.services import dashboard_snapshots as snapshots
+from backend.services.async_cache import AsyncCache
+
+
+async def _no_redis():
+    return None
+
+
+def _payload(n: int) -> dict:
+    return {
+        "total_aum": str(1000 * n),
+        "accounts": [],
+        "allocation": [],
+        "alerts": [],
+        "ai_chat_remaining": 10,
+        "subscription_tier": "free",
+    }
+
+
+@pytest.fixture
+def isolated(monkeypatch):
+    monkeypatch.setattr(snapshots, "_b2c_snapshots", AsyncCache("test:dash_b2c", fresh_ttl=900))
+    monkeypatch.setattr(snapshots, "_ria_snapshots", AsyncCache("test:dash_ria", fresh_ttl=900))
+    monkeypatch.setattr(snapshots, "_local_versions", {})
+    builds = []
+
+    async def build(user):
+        builds.append(user.id)
+        return _payload(len(builds))
+
+    async def chat_remaining(db, user):
+        return 7
+
+    monkeypatch.setattr(snapshots, "_build_b2c", build)
+    monkeypatch.setattr(snapshots, "_chat_remaining", chat_remaining)
+    with patch("backend.services.async_cache.get_redis", _no_redis), \
+            patch("backend.services.dashboard_snapshots.get_redis", _no_redis):
+        yield builds
+
+
+@pytest.mark.asyncio
+async def test_snapshot_served_until_household_version_bumps(isolated, monkeypatch):
+    builds = isolated
+    user = SimpleNamespace(id=uuid4(), household_id=uuid4(), subscription_tier="free")
+
+    first = await snapshots.b2c_dashboard(None, user)
+    second = await snapshots.b2c_dashboard(None, user)
+    assert len(builds) == 1
+    assert first.total_aum == second.total_aum == 1000
+    assert first.snapshot_version == 0
+    assert second.ai_chat_remaining == 7  # overlaid live, not from the snapshot
+
+    # A confirmed statement bumps the version and rebuilds in the background
+    async def members(household_id):
+        return [user]
+
+    monkeypatch.setattr(snapshots, "_household_users", members)
+    snapshots.schedule_household_refresh(user.household_id)
+    await asyncio.gather(*snapshots._background)
+    assert len(builds) == 2
+
+    third = await snapshots.b2c_dashboard(None, user)
+    assert len(builds) == 2  # served from the rebuilt snapshot
+    assert third.snapshot_version == 1 and third.total_aum == 2000
+
+    # Tier changes alter gated alerts, so they get their own snapshot
+    user.subscription_tier = "pro"
+    await snapshots.b2c_dashboard(None, user)
+    assert len(builds) == 3
+
+
+@pytest.mark.asyncio
+async def test_ria_snapshot_is_per_advisor_and_versioned(isolated):
+    calls = []
+
+    async def build():
+        calls.append(1)
+        return {"kpis": {"n": len(calls)}}
+
+    a = await snapshots.ria_dashboard("adv-1", build)
+    assert (await snapshots.ria_dashboard("adv-1", build))["kpis"] == a["kpis"]
+    assert a["snapshotVersion"] == 0 and "generatedAt" in a
+    await snapshots.ria_dashboard("adv-2", build)
+    assert len(calls) == 2
+
+    await snapshots.refresh_advisor("adv-1")
+    b = await snapshots.ria_dashboard("adv-1", build)
+    assert b["snapshotVersion"] == 1 and b["kpis"] == {"n": 3}
+
+
+@pytest.mark.asyncio
+async def test_degraded_snapshot_is_not_kept(isolated, monkeypatch):
+    builds = isolated
+
+    async def build(user):
+        builds.append(user.id)
+        return {**_payload(len(builds)), "degraded_sections": ["allocation"]}
+
+    monkeypatch.setattr(snapshots, "_build_b2c", build)
+    user = SimpleNamespace(id=uuid4(), household_id=uuid4(), subscription_tier="free")
+    first = await snapshots.b2c_dashboard(None, user)
+    assert first.degraded_sections == ["allocation"]
+    await snapshots.b2c_dashboard(None, user)
+    assert len(builds) == 2
@@ -0,0 +1,163 @@
+"""Unit tests for the direct-indexing optimizer and harvest scanner."""
+
+from datetime import date
+
+import httpx
+import numpy as np
+import pytest
+from fastapi import FastAPI
+
+from backend.services.direct_indexing import (
+    IndexSpec,
+    LotBook,
+    allowed_mask,
+    construct,
+    construct_many,
+    get_risk_model,
+    get_universe,
+    scan_lots,
+)
+from backend.services.direct_indexing.optimizer import project
+
+AS_OF = date(2026, 10, 16)
+
+
+def test_factor_tracking_error_matches_dense_covariance():
+    universe, model = get_universe("S&P 500"), get_risk_model("S&P 500")
+    rng = np.random.default_rng(0)
+    w = np.abs(rng.normal(universe.weights, 0.001, (4, universe.size)))
+    w /= w.sum(axis=1, keepdims=True)
+    sigma = model.exposures @ model.factor_cov @ model.exposures.T + np.diag(model.specific_var)
+    active = w - universe.weights
+    dense = np.sqrt(np.einsum("mi,ij,mj->m", active, sigma, active))
+    np.testing.assert_allclose(model.tracking_error(w, universe.weights), dense)
+    np.testing.assert_allclose(model.gradient(active), active @ sigma)
+    assert model.lipschitz() >= np.linalg.eigvalsh(sigma)[-1] - 1e-12
+
+
+def test_projection_hits_sector_targets_within_caps():
+    sector_ids = np.array([0, 0, 0, 1, 1])
+    caps = np.array([0.3, 0.3, 0.3, 0.6, 0.0])
+    w = project(np.array([[0.9, 0.1, -0.2, 0.5, 0.5]]), caps, sector_ids, np.array([[0.4, 0.6]]))
+    np.testing.assert_allclose(w, [[0.3, 0.1, 0.0, 0.6, 0.0]], atol=1e-9)
+
+
+def test_construction_respects_exclusions_tilts_and_sparsity():
+    spec = IndexSpec(
+        exclusions=("Tobacco", "Fossil Fuel Extraction"),
+        tilts={"Technology": 5},
+    )
+    sleeve = construct(spec)
+    universe = sleeve.universe
+    for sym in ("MO", "PM", "XOM", "CVX"):
+        assert sleeve.weights[universe.index_of[sym]] == 0
+    assert sleeve.weights.sum() == pytest.approx(1.0)
+    assert (sleeve.weights >= 0).all()
+
+    tech = universe.sector_of("Technology")
+    sectors = universe.sector_weights(sleeve.weights)
+    expected = universe.sector_weights()[tech] + 0.05
+    assert sectors[tech] == pytest.approx(expected / (1 + 0.05), abs=1e-6)
+    assert 0 < sleeve.tracking_error_bps < 150
+    assert sleeve.holdings_count < universe.size
+
+    plain = construct(IndexSpec())
+    assert plain.tracking_error < sleeve.tracking_error
+
+    small = construct(IndexSpec(max_names=100))
+    assert small.holdings_count <= 100 + len(universe.sector_names)
+    assert small.tracking_error > plain.tracking_error
+    # Every sector is still represented
+    assert (universe.sector_weights(small.weights) > 0).all()
+
+
+def test_identical_specs_share_one_solve():
+    a = IndexSpec(exclusions=("Alcohol",), tilts={"Energy": -1})
+    b = IndexSpec(exclusions=("alcohol",), tilts={"Energy": -1.0})
+    first, second, other = construct_many([a, b, IndexSpec()])
+    np.testing.assert_array_equal(first.weights, second.weights)
+    assert not np.array_equal(first.weights, other.weights)
+
+
+def _lots(universe, rows):
+    """rows: (account, symbol, qty, cost, days held)"""
+    account, symbol, qty, cost, held = zip(*rows)
+    return LotBook(
+        account=np.array(account),
+        symbol=np.array([universe.index_of[s] for s in symbol]),
+        quantity=np.array(qty, float),
+        cost_basis=np.array(cost, float),
+        acquired=np.datetime64(AS_OF, "D") - np.array(held).astype("timedelta64[D]"),
+    )
+
+
+def test_harvest_scan_is_wash_sale_safe():
+    universe, model = get_universe("S&P 500"), get_risk_model("S&P 500")
+    px = {s: universe.prices[universe.index_of[s]] for s in ("MSFT", "JPM", "XOM", "AAPL")}
+    lots = _lots(universe, [
+        (0, "MSFT", 100, px["MSFT"] * 1.5, 400),   # long-term loss
+        (0, "MSFT", 50, px["MSFT"] * 1.3, 90),     # short-term loss, same sell
+        (0, "JPM", 100, px["JPM"] * 1.5, 200),     # loss, but JPM was bought 10 days ago
+        (0, "JPM", 1, px["JPM"], 10),
+        (0, "AAPL", 100, px["AAPL"] * 1.01, 200),  # 1% loss: under the % threshold
+        (1, "XOM", 100, px["XOM"] * 1.5, 200),     # account 1: outside purchase
+        (1, "MSFT", 100, px["MSFT"] * 1.5, 200),
+    ])
+    allowed = np.stack([
+        allowed_mask(universe, []),
+        allowed_mask(universe, ["Fossil Fuel Extraction"]),
+    ])
+    recently_sold = {(0, universe.index_of["GOOGL"])}
+    scan = scan_lots(
+        universe, model, lots, allowed, AS_OF,
+        min_loss_dollars=100, min_loss_pct=0.05,
+        recent_loss_sales=recently_sold,
+        outside_purchases={(1, universe.index_of["XOM"])},
+    )
+    sells = {(t.account, t.sell_symbol): t for t in scan.trades}
+    assert set(sells) == {(0, "MSFT"), (1, "MSFT")}
+    assert scan.blocked_wash_sale == 2
+
+    msft = sells[(0, "MSFT")]
+    assert msft.lots == 2 and msft.shares_sold == 150
+    assert msft.long_term_loss == pytest.approx(100 * px["MSFT"] * 0.5)
+    assert msft.short_term_loss == pytest.approx(50 * px["MSFT"] * 0.3)
+    for trade in scan.trades:
+        assert trade.buy_symbol != trade.sell_symbol
+        assert trade.sector == "Technology"
+        assert universe.sector_names[universe.sector_ids[universe.index_of[trade.buy_symbol]]] == "Technology"
+    assert msft.buy_symbol != "GOOGL"
+    buy_px = universe.prices[universe.index_of[msft.buy_symbol]]
+    assert msft.shares_bought * buy_px == pytest.approx(msft.proceeds)
+
+
+@pytest.mark.asyncio
+async def test_api_builds_index_and_harvests(monkeypatch):
+    from backend.api import direct_indexing
+
+    monkeypatch.setattr(direct_indexing, "_sleeves", {})
+    app = FastAPI()
+    app.include_router(direct_indexing.router)
+    app.dependency_overrides[direct_indexing.get_current_user] = lambda: {"id": "u1"}
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        ix = (await client.get("/api/v1/direct-indexing/indices/dix-001")).json()
+        symbols = {h["symbol"] for h in ix["holdings"]}
+        assert not symbols & {"PM", "MO", "XOM", "CVX", "LMT"}
+        assert ix["holdings_count"] > 300 and ix["tracking_error_bps"] > 0
+        assert sum(ix["sector_weights"].values()) == pytest.approx(100, abs=0.5)
+
+        harvest = (await client.post("/api/v1/direct-indexing/harvest/dix-001")).json()
+        assert harvest["lots_scanned"] >= ix["holdings_count"]
+        assert len(harvest["trades"]) == ix["harvest_opportunities"]
+        for trade in harvest["trades"]:
+            assert trade["wash_sale_check"] == "clear"
+            assert trade["buy_symbol"] not in {"PM", "MO", "XOM", "CVX", "LMT"}
+        assert harvest["estimated_tax_savings"] == pytest.approx(
+            harvest["total_losses_harvested"] * 0.35, abs=0.05
+        )
+
+        cats = (await client.get("/api/v1/direct-indexing/exclusions")).json()["categories"]
+        assert {c["id"]: c["companies_excluded"] for c in cats}["tobacco"] == 2
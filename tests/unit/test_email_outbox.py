@@ -0,0 +1,126 @@
+"""Unit tests for the batched email outbox."""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from backend.models.outbox import OutboundEmail
+from backend.services import email_outbox
+from backend.services.email_outbox import (
+    FakeSendGrid,
+    OutboxMessage,
+    SendGridTransport,
+    deliver,
+    plan_batches,
+    record_outcomes,
+)
+from backend.services.latency import histogram
+
+
+def _msg(i, body="<p>Hi -first_name-</p>", subject="Hello", attempts=0):
+    return OutboxMessage(
+        id=uuid4(),
+        to_email=f"p{i}@example.com",
+        subject=subject,
+        html_content=body,
+        substitutions={"-first_name-": f"P{i}"},
+        attempts=attempts,
+        created_at=datetime.now(timezone.utc) - timedelta(seconds=5),
+    )
+
+
+def _transport(sink):
+    return SendGridTransport("test-key", client=sink.client(), url="https://sink.local/v3/mail/send")
+
+
+@pytest.mark.asyncio
+async def test_messages_sharing_a_body_go_out_in_personalization_batches():
+    sink = FakeSendGrid()
+    messages = [_msg(i) for i in range(2300)] + [_msg(i, subject="Reminder") for i in range(40)]
+    assert [len(b) for b in plan_batches(messages)] == [1000, 1000, 300, 40]
+
+    delivered_before = histogram("email.delivery").count
+    result = await deliver(messages, _transport(sink))
+    assert result.sent == 2340 and len(sink.requests) == 4
+    assert sink.delivered[7] == {"to": "p7@example.com", "subject": "Hello", "html": "<p>Hi P7</p>"}
+    assert histogram("email.delivery").count - delivered_before == 2340
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_retry_and_bad_addresses_are_isolated(monkeypatch):
+    monkeypatch.setattr(email_outbox, "INLINE_BACKOFF", 0.0)
+    sink = FakeSendGrid()
+    sink.fail_next(503)  # absorbed by the in-process retry
+    result = await deliver([_msg(i) for i in range(3)], _transport(sink))
+    assert result.sent == 3 and len(sink.requests) == 2
+
+    sink.fail_next(429, times=3)  # outlasts inline retries: back to the outbox
+    old = _msg(9, attempts=email_outbox.MAX_ATTEMPTS - 1)
+    result = await deliver([_msg(1), old], _transport(sink))
+    assert result.retried == 1 and result.failed == 1
+    assert result.outcomes[old.id].status == "failed"
+
+    sink.rejected = {"p2@example.com"}
+    batch = [_msg(i) for i in range(4)]
+    result = await deliver(batch, _transport(sink))
+    assert result.sent == 3 and result.failed == 1
+    assert result.outcomes[batch[2].id].status == "failed"
+
+
+@pytest.mark.asyncio
+async def test_outcomes_are_written_with_one_update_per_group():
+    messages = [_msg(i) for i in range(5)]
+    outcomes = {m.id: email_outbox.Outcome("sent") for m in messages[:3]}
+    outcomes[messages[3].id] = email_outbox.Outcome("retry", "HTTP 503")
+    outcomes[messages[4].id] = email_outbox.Outcome("failed", "HTTP 400")
+    db = MagicMock()
+    db.execute = AsyncMock()
+    db.commit = AsyncMock()
+
+    await record_outcomes(db, messages, email_outbox.DrainResult(outcomes=outcomes))
+    assert db.execute.await_count == 3
+    db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_follow_ups_enqueue_with_one_dedupe_query():
+    from backend.models.prospect import ProspectStatus
+    from backend.services.prospect import follow_up_service as fus
+
+    now = datetime.now(timezone.utc)
+    recent, due = uuid4(), uuid4()
+    prospects = [
+        SimpleNamespace(id=pid, advisor_id=uuid4(), first_name="Ana", last_name="Ruiz",
+                        email=f"{pid}@example.com", status=ProspectStatus.CONTACTED,
+                        last_activity_at=now - timedelta(days=4))
+        for pid in (recent, due)
+    ]
+
+    def result(rows=None, scalars=None):
+        r = MagicMock()
+        r.all.return_value = rows or []
+        r.scalars.return_value.all.return_value = scalars or []
+        r.scalar_one_or_none.return_value = None  # no watermark yet
+        return r
+
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=[
+        result(),  # watermark
+        result(rows=[(recent, "follow_up_1", now - timedelta(days=1))]),
+        result(scalars=prospects),  # every rule stage at once
+        result(),  # new watermark
+    ])
+    db.commit = AsyncMock()
+    added = []
+    db.add = added.append
+    db.add_all = added.extend
+
+    assert await fus.check_follow_ups(db, now=now) == 1
+    assert db.execute.await_count == 4
+    queued = [a for a in added if isinstance(a, OutboundEmail)]
+    assert len(queued) == 1 and queued[0].to_email == f"{due}@example.com"
+    assert queued[0].substitutions[fus.FIRST_NAME] == "Ana"
+    assert fus.FIRST_NAME in queued[0].html_content
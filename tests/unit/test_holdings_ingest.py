@@ -0,0 +1,121 @@
+"""Streaming holdings ingestion: dialect sniffing, alias mapping, vectorized numbers."""
+
+import io
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from backend.services.holdings_ingest import (
+    HoldingsReader,
+    decimal_mark,
+    map_columns,
+    normalize_header,
+    parse_numbers,
+)
+from backend.services.portfolio_csv_parser import parse_portfolio_file, parse_ticker_amounts
+
+DEMO_CSV = Path(__file__).resolve().parents[2] / "backend" / "data" / "demo_schwab_positions.csv"
+
+
+def test_demo_schwab_export_past_preamble():
+    parsed = parse_portfolio_file(DEMO_CSV, DEMO_CSV.name)
+    assert parsed["position_count"] == 57
+    assert parsed["total_value"] == pytest.approx(8827409.25)
+    assert parsed["custodian"] == "Charles Schwab"
+    assert not any(h["symbol"].lower() == "account total" for h in parsed["holdings"])
+
+
+def test_chunk_size_does_not_change_result():
+    whole = parse_portfolio_file(DEMO_CSV.read_bytes(), "positions.csv")
+    reader = HoldingsReader(DEMO_CSV, "positions.csv", chunk_rows=3)
+    chunks = list(reader.chunks())
+    assert len(chunks) > 10
+    assert sum(len(c) for c in chunks) == reader.rows_read
+    with DEMO_CSV.open("rb") as fh:  # a file object streams the same way
+        assert parse_portfolio_file(fh, "positions.csv") == whole
+
+
+def test_semicolon_cp1252_with_parenthesised_negatives():
+    text = (
+        "Positions for account ‘Joint’\n"
+        "\n"
+        "Ticker;Security Name;Shares;Last Price;Current Value;Gain/Loss\n"
+        "NESN;Nestlé SA;10;100.00;$1,000.00;(50.00)\n"
+        "SAP;SAP SE;--;--;\"$2,500.50\";--\n"
+        "XYZ;Short position;-5;10;(50.00);0\n"
+    )
+    parsed = parse_portfolio_file(text.encode("cp1252"), "export.csv")
+    rows = {h["symbol"]: h for h in parsed["holdings"]}
+    assert set(rows) == {"NESN", "SAP"}  # non-positive values are not holdings
+    assert rows["NESN"]["description"] == "Nestlé SA"
+    assert rows["SAP"]["quantity"] is None
+    assert parsed["total_value"] == pytest.approx(3500.50)
+
+
+def test_xlsx_with_preamble_rows():
+    openpyxl = pytest.importorskip("openpyxl")
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["Account Summary as of 2026-01-31"])
+    ws.append([])
+    ws.append(["Symbol", "Description", "Quantity", "Price", "Market Value"])
+    ws.append(["VTI", "Vanguard Total Stock", 100, 250.5, 25050])
+    ws.append(["BND", "Vanguard Total Bond", 50, 72, None])
+    ws.append(["Account Total", None, None, None, 28650])
+    buf = io.BytesIO()
+    wb.save(buf)
+    parsed = parse_portfolio_file(buf.getvalue(), "fidelity.xlsx")
+    assert [h["symbol"] for h in parsed["holdings"]] == ["VTI", "BND"]
+    assert parsed["holdings"][1]["market_value"] == pytest.approx(3600)  # quantity x price
+    assert parsed["custodian"] == "Fidelity"
+
+
+def test_ticker_amounts_aggregate_and_value_positions():
+    text = b"Ticker,Shares,Price\nAAPL,10,$150.00\nMSFT,5,300\nAAPL,2,150\n"
+    assert parse_ticker_amounts(text, "mine.csv") == [
+        {"ticker": "AAPL", "amount": 1800.0},
+        {"ticker": "MSFT", "amount": 1500.0},
+    ]
+
+
+def test_ticker_amounts_errors_keep_their_messages():
+    with pytest.raises(ValueError, match="Could not identify ticker/symbol column"):
+        parse_ticker_amounts(b"Foo,Bar\n1,2\n3,4\n", "x.csv")
+    with pytest.raises(ValueError, match="No valid holdings"):
+        parse_ticker_amounts(b"Symbol,Value\nAAPL,0\n", "x.csv")
+
+
+def test_alias_mapping_prefers_exact_and_skips_derived_columns():
+    headers = ["Symbol", "Day Change $", "Mkt Val (Market Value)", "Cost Basis", "Qty (Quantity)"]
+    columns = map_columns([normalize_header(h) for h in headers])
+    assert columns == {"symbol": 0, "market_value": 2, "cost_basis": 3, "quantity": 4}
+
+
+def test_parse_numbers_vectorized():
+    values = parse_numbers(pd.Series(["$1,234.50", "(12.5)", "-3", "--", "", "N/A", "7%"]))
+    assert values.tolist()[:3] == [1234.5, -12.5, -3.0]
+    assert values.iloc[3:6].isna().all()
+    assert values.iloc[6] == 7.0
+
+
+def test_decimal_comma_columns():
+    text = (
+        "Symbol;Description;Quantity;Price;Market Value\n"
+        "MSFT;Microsoft;5;400,5;2.002,50\n"
+        "SAP;SAP SE;1 200;120;144 000\n"
+    )
+    parsed = parse_portfolio_file(text.encode(), "export.csv")
+    rows = {h["symbol"]: h for h in parsed["holdings"]}
+    assert rows["MSFT"]["price"] == pytest.approx(400.5)
+    assert rows["MSFT"]["market_value"] == pytest.approx(2002.5)
+    assert rows["SAP"]["quantity"] == pytest.approx(1200)
+    assert parsed["total_value"] == pytest.approx(146002.5)
+
+
+def test_decimal_mark_from_unambiguous_values():
+    assert decimal_mark(["5", "400,5"]) == ","
+    assert decimal_mark(["1,234", "1,234.50"], default=",") == "."
+    assert decimal_mark(["1.234.000,000"]) == ","
+    assert decimal_mark(["1,234", "12"], default=",") == ","  # nothing telling: the default
+    assert parse_numbers(pd.Series(["1.234,5", "(2,25)", "1 000"]), ",").tolist() == [1234.5, -2.25, 1000.0]
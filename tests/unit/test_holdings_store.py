@@ -0,0 +1,125 @@
+"""Unit tests for the delta-encoded holdings time-series store."""
+
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from backend.services.market_data import holdings_store
+from backend.services.market_data.holdings_store import (
+    HoldingsTimeSeriesStore,
+    apply_delta,
+    bucket_start,
+    diff_holdings,
+    merge_series,
+    normalize_holdings,
+    pick_granularity,
+)
+
+
+def test_normalize_accepts_wrapped_payload_and_field_variants():
+    raw = {
+        "holdings": [
+            {"symbol": "aapl", "quantity": "10", "market_value": "2,200.00"},
+            {"ticker": "VTI", "shares": 5, "marketValue": 1450.5},
+            {"symbol": "AAPL", "qty": 2, "value": 440},
+            {"quantity": 1},  # no symbol — ignored
+        ]
+    }
+    quantities, values, total = normalize_holdings(raw)
+    assert quantities == {"AAPL": 12.0, "VTI": 5.0}
+    assert values["AAPL"] == 2640.0
+    assert total == Decimal("4090.50")
+
+
+def test_diff_and_apply_round_trip():
+    prev = {"AAPL": 10.0, "VTI": 5.0, "BND": 3.0}
+    cur = {"AAPL": 10.0, "VTI": 7.0, "SPY": 1.0}
+    delta = diff_holdings(prev, cur)
+    assert delta == {"q": {"VTI": 7.0, "SPY": 1.0}, "r": ["BND"]}
+    assert apply_delta(prev, delta) == cur
+
+
+def test_unchanged_holdings_produce_empty_delta():
+    assert diff_holdings({"AAPL": 1.0}, {"AAPL": 1.0}) == {}
+
+
+def test_week_bucket_is_monday():
+    ts = datetime(2026, 10, 18, 15, 0, tzinfo=timezone.utc)  # Sunday
+    assert bucket_start(ts, "day") == date(2026, 10, 18)
+    assert bucket_start(ts, "week") == date(2026, 10, 12)
+
+
+def test_pick_granularity_by_span():
+    end = datetime(2026, 10, 18, tzinfo=timezone.utc)
+    assert pick_granularity(datetime(2026, 10, 14, tzinfo=timezone.utc), end) == "raw"
+    assert pick_granularity(datetime(2026, 1, 1, tzinfo=timezone.utc), end) == "day"
+    assert pick_granularity(datetime(2023, 1, 1, tzinfo=timezone.utc), end) == "week"
+
+
+def test_merge_series_carries_forward_missing_accounts():
+    d1, d2, d3 = date(2026, 1, 5), date(2026, 1, 12), date(2026, 1, 19)
+    rows = [
+        ("a", d1, Decimal("100")),
+        ("b", d2, Decimal("50")),
+        ("a", d3, Decimal("110")),
+    ]
+    series = merge_series(rows, carry={"b": Decimal("40")})
+    assert [p["value"] for p in series] == [Decimal("140"), Decimal("150"), Decimal("160")]
+    assert series[0]["date"] == "2026-01-05"
+
+
+@pytest.mark.asyncio
+async def test_tail_cache_is_used_only_while_it_is_the_latest_snapshot(monkeypatch):
+    at = datetime(2026, 10, 18, 15, 0, tzinfo=timezone.utc)
+    cached = ({"AAPL": 10.0}, at, 3, Decimal("2200.00"))
+    rebuilt = ({"AAPL": 12.0}, at + timedelta(minutes=15), 4, Decimal("2640.00"))
+    monkeypatch.setitem(holdings_store._last_state, "acct-1", cached)
+
+    latest = MagicMock()
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=latest)
+    store = HoldingsTimeSeriesStore(db)
+    store._load_last_state = AsyncMock(return_value=rebuilt)
+
+    latest.scalar.return_value = at
+    assert await store._tail_state("acct-1") == cached
+    store._load_last_state.assert_not_awaited()
+
+    latest.scalar.return_value = rebuilt[1]  # another worker wrote since
+    assert await store.holdings_at("acct-1") == {"AAPL": 12.0}
+    store._load_last_state.assert_awaited_once_with("acct-1")
+
+
+@pytest.mark.asyncio
+async def test_partition_is_cached_only_after_its_transaction_commits(monkeypatch):
+    monkeypatch.setattr(holdings_store, "_partitions_ready", set())
+    at = datetime(2026, 11, 2, 9, 30, tzinfo=timezone.utc)
+
+    def _store(execute):
+        db = MagicMock(execute=AsyncMock(side_effect=execute), commit=AsyncMock())
+        store = HoldingsTimeSeriesStore(db)
+        store._tail_state = AsyncMock(return_value=None)
+        return store, db
+
+    def _creates(db):
+        return [c for c in db.execute.await_args_list if "PARTITION OF" in str(c.args[0])]
+
+    async def insert_fails(stmt, *args):
+        if "PARTITION OF" not in str(stmt):
+            raise RuntimeError("insert failed")  # the caller rolls back, CREATE TABLE included
+
+    store, db = _store(insert_fails)
+    with pytest.raises(RuntimeError):
+        await store.record("acct-1", [{"symbol": "VTI", "quantity": 1}], snapshot_at=at)
+    assert len(_creates(db)) == 1 and holdings_store._partitions_ready == set()
+
+    store, db = _store(None)
+    assert await store.record("acct-1", [{"symbol": "VTI", "quantity": 1}], snapshot_at=at)
+    assert len(_creates(db)) == 1  # created again, then cached
+    assert holdings_store._partitions_ready == {"holdings_snapshots_y2026m11"}
+
+    store, db = _store(None)
+    await store.record("acct-2", [{"symbol": "BND", "quantity": 2}], snapshot_at=at)
+    assert _creates(db) == []
@@ -0,0 +1,115 @@
+"""Incremental ADV and follow-up jobs: watermark windows match a full scan."""
+
+import random
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.orm.evaluator import _EvaluatorCompiler
+
+from backend.models.compliance_rules import ComplianceAuditLog
+from backend.models.prospect import Prospect, ProspectStatus
+from backend.services.cim.adv_monitor import adv_changes, adv_windows, check_all_adv_currency
+from backend.services.prospect.follow_up_service import FOLLOW_UP_RULES, _candidates, due_rules
+from backend.services.scheduler import Shard, crossed, job_key
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+WIDEST = timedelta(days=max(r["days_inactive"] for r in FOLLOW_UP_RULES))
+STAGES = [ProspectStatus.CONTACTED, ProspectStatus.PROPOSAL_SENT, ProspectStatus.QUALIFIED]
+
+
+def test_crossed_window_and_job_keys():
+    since, now = START, START + timedelta(hours=4)
+    lo, hi = crossed(since, now, 3)
+    assert (lo, hi) == (START - timedelta(days=3), now - timedelta(days=3))
+    assert job_key("adv_currency_check") == "adv_currency_check"
+    assert job_key("adv_currency_check", Shard(3, 8)) == "adv_currency_check:3/8"
+    assert job_key("adv_currency_check", Shard(0, 1)) == "adv_currency_check"
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_follow_up_candidates_cover_every_due_prospect(seed):
+    rng = random.Random(seed)
+    prospects = []
+    for _ in range(200):
+        activity = START - timedelta(hours=rng.randint(0, 24 * 20))
+        prospects.append(Prospect(
+            id=uuid4(), status=rng.choice(STAGES), last_activity_at=activity, updated_at=activity,
+        ))
+    sends = {}
+    since, now = None, START
+    evaluated = []
+    for _ in range(90):
+        matches = _EvaluatorCompiler(Prospect).process(
+            _candidates(since, now, {k: t for k, t in sends.items() if t > (since or now) - WIDEST}).whereclause
+        )
+        expected = {(p.id, r["template"]) for p in prospects for r in due_rules(p, sends, now)}
+        candidates = [p for p in prospects if matches(p)]
+        assert {(p.id, r["template"]) for p in candidates for r in due_rules(p, sends, now)} == expected
+        evaluated.append(len(candidates))
+        for pid, template in expected:
+            sends[(pid, template)] = now
+
+        # Up to a day later: a few prospects are touched or change stage
+        since, now = now, now + timedelta(hours=rng.choice([4, 4, 4, 9, 24]))
+        for p in rng.sample(prospects, 5):
+            at = since + (now - since) * rng.random()
+            if rng.random() < 0.5:
+                p.last_activity_at = at
+            else:
+                p.status = rng.choice(STAGES)
+            p.updated_at = at
+    assert evaluated[0] > 100 and sum(evaluated[1:]) / len(evaluated[1:]) < 40  # scales with changes
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_adv_windows_find_every_severity_change(seed):
+    rng = random.Random(seed)
+    latest = {uuid4(): START - timedelta(days=rng.randint(0, 400), hours=rng.randint(0, 23)) for _ in range(500)}
+    since, now = None, START
+    for _ in range(60):
+        windows = adv_windows(since, now) if since else []
+        candidates = [
+            (a, t) for a, t in latest.items()
+            if since is None or t > since or any(lo <= t < hi for lo, hi in windows)
+        ]
+        assert adv_changes(candidates, since, now) == adv_changes(latest.items(), since, now)
+        if since is not None:
+            assert len(candidates) < 60
+        since, now = now, now + timedelta(days=rng.choice([1, 1, 1, 3]), minutes=rng.randint(0, 90))
+        for advisor in rng.sample(list(latest), 2):
+            latest[advisor] = since + (now - since) * rng.random()  # a new ADV filing
+
+
+@pytest.mark.asyncio
+async def test_adv_job_writes_alerts_and_watermark_in_bulk():
+    now = START
+    fresh, warning, blocking = uuid4(), uuid4(), uuid4()
+
+    def result(rows=None, scalar=None):
+        r = MagicMock()
+        r.fetchall.return_value = rows or []
+        r.scalar_one_or_none.return_value = scalar
+        return r
+
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=[
+        result(scalar=now - timedelta(days=1)),  # watermark
+        result(rows=[
+            (fresh, (now - timedelta(hours=2)).replace(tzinfo=None)),
+            (warning, now - timedelta(days=301, hours=1)),
+            (blocking, now - timedelta(days=366, hours=1)),
+        ]),
+        result(),  # new watermark
+    ])
+    added = []
+    db.add_all = added.extend
+
+    assert await check_all_adv_currency(db, now=now) == 2
+    assert db.execute.await_count == 3
+    assert all(isinstance(a, ComplianceAuditLog) for a in added)
+    assert sorted(a.action for a in added) == ["ADV_CURRENCY_BLOCKING", "ADV_CURRENCY_WARNING"]
+    assert {a.metadata_json["previous"] for a in added} == {"LOW", "WARNING"}
+    save = db.execute.await_args_list[2].args[0]
+    assert save.compile().params["watermark"] == now
@@ -0,0 +1,131 @@
+"""Unit tests for the leader-elected, sharded job scheduler."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+
+from backend.services.latency import latency_stats
+from backend.services.scheduler import JobScheduler, LocalCoordinator, ScheduledJob, Shard
+
+
+def _at(hour, minute=0, day=2):
+    return datetime(2026, 3, day, hour, minute, tzinfo=timezone.utc)
+
+
+async def _drain(coordinator, schedulers):
+    """Hand queued shards to workers round-robin, as competing consumers would."""
+    n = 0
+    while (task := await coordinator.pop(timeout=0.01)) is not None:
+        await schedulers[n % len(schedulers)].run_task(task)
+        n += 1
+    return n
+
+
+@pytest.mark.asyncio
+async def test_only_leader_fires_and_workers_split_shards():
+    coordinator = LocalCoordinator()
+    seen = []
+
+    async def run(shard):
+        seen.append(shard)
+
+    def job():
+        return ScheduledJob("adv", CronTrigger(hour=6, timezone="UTC"), run, shards=4)
+
+    workers = [JobScheduler(coordinator, [job()], worker_id=f"w{i}") for i in range(3)]
+    assert [await w.elect() for w in workers] == [True, False, False]
+    workers[0]._next["adv"] = _at(6)
+
+    fired = 0
+    for w in workers:
+        fired += await w.fire_due(_at(6, 1)) if w.is_leader else 0
+    assert fired == 1
+    assert await _drain(coordinator, workers) == 4
+    assert sorted(s.index for s in seen) == [0, 1, 2, 3]
+
+    # Every advisor lands in exactly one shard
+    advisors = [f"adv-{i}" for i in range(200)]
+    owners = [sum(Shard(i, 4).owns(a) for i in range(4)) for a in advisors]
+    assert set(owners) == {1}
+    assert latency_stats("scheduler.adv")["scheduler.adv.duration"]["count"] == 4
+
+
+@pytest.mark.asyncio
+async def test_new_leader_catches_up_and_misfires_are_skipped():
+    coordinator = LocalCoordinator()
+    runs = []
+
+    async def run(shard):
+        runs.append(shard)
+
+    trigger = IntervalTrigger(hours=1, start_date=_at(0), timezone="UTC")
+    old = JobScheduler(coordinator, [ScheduledJob("poll", trigger, run, misfire_grace=600)], worker_id="old")
+    await old.elect()
+    old._next["poll"] = _at(1)
+    assert await old.fire_due(_at(1)) == 1
+
+    # Old leader dies; its lease expires and a new worker takes over 5 min late
+    await coordinator.release("old")
+    new = JobScheduler(coordinator, [ScheduledJob("poll", trigger, run, misfire_grace=600)], worker_id="new")
+    await new.elect()
+    assert new._next["poll"] == _at(2)
+    assert await new.fire_due(_at(2, 5)) == 1  # within grace: caught up once
+    assert new._next["poll"] == _at(3)
+
+    # Three hours of outage: missed runs coalesce and are skipped as a misfire
+    assert await new.fire_due(_at(6, 30)) == 0
+    assert latency_stats("scheduler.poll")["scheduler.poll.lag"]["outcomes"]["misfire"] == 1
+    assert new._next["poll"] == _at(7)
+
+    # A scheduled time is only ever fired once, even by a second leader
+    assert not await coordinator.claim_fire("poll", _at(2).timestamp(), 60)
+    await _drain(coordinator, [new])
+    assert len(runs) == 2
+
+
+@pytest.mark.asyncio
+async def test_failing_shard_is_recorded_not_raised():
+    async def boom(shard):
+        raise RuntimeError("db down")
+
+    scheduler = JobScheduler(LocalCoordinator(), [ScheduledJob("bad", IntervalTrigger(hours=1), boom)])
+    now = datetime.now(timezone.utc)
+    await scheduler.run_task({"job": "bad", "shard": 0, "shards": 1, "scheduled": (now - timedelta(seconds=1)).timestamp()})
+    stats = latency_stats("scheduler.bad")
+    assert stats["scheduler.bad.duration"]["outcomes"] == {"error": 1}
+    assert stats["scheduler.bad.lag"]["p50_ms"] >= 1000
+
+
+@pytest.mark.asyncio
+async def test_leader_services_run_on_the_leader_only():
+    coordinator = LocalCoordinator()
+    running = []
+
+    def service(worker):
+        async def run():
+            running.append(worker)
+            try:
+                await asyncio.sleep(3600)
+            except asyncio.CancelledError:
+                running.remove(worker)
+                return  # swallowing the cancel must not keep the service alive
+
+        return {"detector": run}
+
+    workers = [JobScheduler(coordinator, services=service(f"w{i}"), worker_id=f"w{i}") for i in range(3)]
+    for w in workers:
+        await w.elect()
+    await asyncio.sleep(0)
+    assert running == ["w0"] and workers[0].status()["services"] == ["detector"]
+
+    # w0 loses the lease: its service stops and the next leader starts one
+    await coordinator.release("w0")
+    await workers[1].elect()
+    await workers[0].elect()
+    await asyncio.sleep(0)
+    assert running == ["w1"] and workers[0].status()["services"] == []
+    await workers[1].shutdown()
+    assert running == []
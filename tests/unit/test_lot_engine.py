@@ -0,0 +1,156 @@
+"""Lot engine: relief order, holding periods, wash sales, and randomized checks against a brute-force book."""
+
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from backend.models.liquidity import LotSelectionMethod as M
+from backend.services.lot_engine import LotEngine, WhatIf, is_long_term
+
+D = Decimal
+SOLD = date(2026, 6, 1)
+
+
+def _engine():
+    e = LotEngine()
+    e.buy("A", "VTI", 10, 100, date(2023, 1, 5), "old")
+    e.buy("A", "VTI", 10, 300, date(2025, 12, 1), "new-high")
+    e.buy("A", "VTI", 10, 50, date(2024, 6, 1), "mid-low")
+    return e
+
+
+@pytest.mark.parametrize("method, order", [
+    (M.FIFO, ["old", "mid-low", "new-high"]),
+    (M.LIFO, ["new-high", "mid-low", "old"]),
+    (M.HIFO, ["new-high", "old", "mid-low"]),
+    (M.LOFO, ["mid-low", "old", "new-high"]),
+])
+def test_relief_order_by_method(method, order):
+    realized = _engine().what_if("A", "VTI", 25, 200, SOLD, method)
+    assert [r.lot_id for r in realized.reliefs] == order
+    assert [r.quantity for r in realized.reliefs] == [10, 10, 5]
+
+
+def test_sell_splits_gain_by_holding_period_and_relieves_lots():
+    e = _engine()
+    realized = e.sell("A", "VTI", 15, 200, SOLD, M.HIFO)
+    assert realized.short_term == D(-1000)  # new-high: 10 x (200 - 300)
+    assert realized.long_term == D(500)  # old: 5 x (200 - 100)
+    assert e.quantity("A", "VTI") == 15
+    assert [(lot.id, lot.quantity) for lot in e.open_lots("A", "VTI")] == [("old", 5), ("mid-low", 10)]
+    with pytest.raises(ValueError, match="only 15"):
+        e.sell("A", "VTI", 16, 200, SOLD)
+
+
+def test_tax_opt_takes_losses_then_long_term_gains():
+    realized = _engine().what_if("A", "VTI", 30, 200, SOLD, M.TAX_OPT)
+    assert [r.lot_id for r in realized.reliefs] == ["new-high", "old", "mid-low"]
+
+
+def test_spec_id_and_what_if_many_report_shortfall():
+    e = _engine()
+    assert [r.lot_id for r in e.what_if("A", "VTI", 12, 200, SOLD, M.SPEC_ID, ["mid-low", "old"]).reliefs] == [
+        "mid-low", "old"]
+    many = e.what_if_many([WhatIf("A", "VTI", 40, 200, SOLD), WhatIf("B", "VTI", 1, 200, SOLD)])
+    assert [r.shortfall for r in many] == [10, 1]
+    assert e.quantity("A", "VTI") == 30  # nothing relieved
+
+
+def test_long_term_starts_the_day_after_the_anniversary():
+    assert not is_long_term(date(2025, 3, 1), date(2026, 3, 1))
+    assert is_long_term(date(2025, 3, 1), date(2026, 3, 2))
+    assert is_long_term(date(2024, 2, 29), date(2025, 3, 1))
+
+
+def test_wash_sale_moves_loss_and_holding_period_into_replacement():
+    e = LotEngine()
+    e.buy("A", "QQQ", 10, 400, date(2025, 1, 2), "loss")
+    e.buy("A", "QQQ", 15, 310, date(2026, 6, 10), "repl")
+    loss = e.sell("A", "QQQ", 10, 300, date(2026, 6, 1), M.SPEC_ID, ["loss"]).reliefs[0]
+    adjusted = e.apply_wash_sale("A", "QQQ", loss, date(2026, 6, 1))
+
+    assert [lot.quantity for lot in adjusted] == [10]  # split: 5 shares stay unadjusted
+    assert adjusted[0].basis_per_share == D(410) and adjusted[0].wash_adjustment == D(1000)
+    assert adjusted[0].acquired == date(2026, 6, 10) - (date(2026, 6, 1) - date(2025, 1, 2))
+    assert e.quantity("A", "QQQ") == 15
+    # HIFO now sees the adjusted lot first, and it is long-term already
+    realized = e.what_if("A", "QQQ", 10, 320, date(2026, 7, 1), M.HIFO)
+    assert realized.long_term == D(-900) and realized.short_term == 0
+
+
+def test_from_rows_skips_closed_lots_and_uses_adjusted_basis():
+    rows = [
+        SimpleNamespace(id=1, account_id="A", symbol="voo", shares=D(5), cost_basis_per_share=D(400),
+                        acquisition_date=None, is_active=True),
+        SimpleNamespace(id=2, account_id="A", symbol="VOO", shares=D(5), cost_basis_per_share=D(1),
+                        acquisition_date=date(2026, 1, 1), is_active=False),
+        {"id": 3, "account_id": "A", "symbol": "VOO", "quantity": D(10), "remaining_quantity": D(4),
+         "cost_basis_per_share": D(100), "adjusted_cost_basis": D(1100), "acquisition_date": "2026-02-01",
+         "status": "open"},
+    ]
+    e = LotEngine.from_rows(rows)
+    lots = e.open_lots("A", "VOO")
+    assert [(lot.id, lot.quantity, lot.basis_per_share) for lot in lots] == [("1", 5, 400), ("3", 4, 110)]
+    assert e.unrealized("A", "VOO", 120, SOLD).long_term == D(-1400)  # undated lot counts as long-term
+
+
+# ─── Randomized: heaps agree with sorting every lot on every query ─────────
+
+
+def _brute_order(lots, method):
+    keys = {
+        M.FIFO: lambda lot: (lot["acquired"], lot["seq"]),
+        M.LIFO: lambda lot: (-lot["acquired"].toordinal(), -lot["seq"]),
+        M.HIFO: lambda lot: (-lot["basis"], lot["acquired"], lot["seq"]),
+        M.LOFO: lambda lot: (lot["basis"], lot["acquired"], lot["seq"]),
+    }
+    return sorted((lot for lot in lots if lot["qty"] > 0), key=keys[method])
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_random_buys_and_sells_match_brute_force(seed):
+    rng = random.Random(seed)
+    engine, brute, basis_in, seq = LotEngine(), [], D(0), 0
+    relieved_basis = D(0)
+    for step in range(600):
+        if rng.random() < 0.55 or not brute:
+            seq += 1
+            qty, price = D(rng.randint(1, 50)), D(rng.randint(1, 500))
+            acquired = date(2020, 1, 1) + timedelta(days=rng.randint(0, 2000))
+            engine.buy("A", "X", qty, price, acquired, f"L{seq}")
+            brute.append({"id": f"L{seq}", "qty": qty, "basis": price, "acquired": acquired, "seq": seq})
+            basis_in += qty * price
+            continue
+        method = rng.choice([M.FIFO, M.LIFO, M.HIFO, M.LOFO])
+        open_qty = sum(lot["qty"] for lot in brute)
+        qty = D(rng.randint(1, int(open_qty)))
+        price, sold_on = D(rng.randint(1, 500)), date(2026, 1, 1)
+
+        expected, remaining = [], qty
+        for lot in _brute_order(brute, method):
+            if remaining <= 0:
+                break
+            take = min(remaining, lot["qty"])
+            expected.append((lot["id"], take))
+            lot["qty"] -= take
+            remaining -= take
+        brute = [lot for lot in brute if lot["qty"] > 0]
+
+        preview = engine.what_if("A", "X", qty, price, sold_on, method)
+        realized = engine.sell("A", "X", qty, price, sold_on, method)
+        assert [(r.lot_id, r.quantity) for r in realized.reliefs] == expected
+        assert preview.reliefs == realized.reliefs
+        assert realized.short_term + realized.long_term == realized.gain
+        relieved_basis += realized.basis
+
+    open_lots = engine.open_lots("A", "X")
+    assert {(lot.id, lot.quantity) for lot in open_lots} == {(lot["id"], lot["qty"]) for lot in brute}
+    assert sum(lot.basis for lot in open_lots) + relieved_basis == basis_in  # basis is conserved
+    book = engine.book("A", "X")
+    for method in (M.FIFO, M.LIFO, M.HIFO, M.LOFO):  # stale entries are compacted on use
+        ordered = [lot.id for lot in engine.open_lots("A", "X", method)]
+        assert ordered == [lot["id"] for lot in _brute_order(brute, method)]
+        assert len(book._heap(method)) <= 3 * max(len(book.lots), 1)
@@ -0,0 +1,98 @@
+"""Unit tests for the vectorized Monte Carlo engine."""
+
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from backend.services import monte_carlo
+from backend.services.monte_carlo import _glide_weights, normalize_params, simulate
+
+BASE = dict(
+    current_assets=500000,
+    annual_contribution=24000,
+    years_to_retire=20,
+    years_in_retirement=30,
+    annual_spending=80000,
+)
+
+
+async def _no_redis():
+    return None
+
+
+def test_same_inputs_are_reproducible():
+    a = simulate(normalize_params(**BASE, simulations=2000))
+    b = simulate(normalize_params(**BASE, simulations=2000))
+    c = simulate(normalize_params(**BASE, simulations=2000, seed=7))
+    assert a == b
+    assert c["seed"] == 7 and c["percentile_paths"] != a["percentile_paths"]
+
+
+def test_result_shape_and_band_ordering():
+    result = simulate(normalize_params(**BASE, simulations=2000))
+    bands = result["percentile_paths"]
+    assert result["total_years"] == 50
+    assert all(len(bands[k]) == 51 for k in ("p10", "p25", "p50", "p75", "p90"))
+    assert bands["p10"][0] == bands["p90"][0] == 500000
+    assert all(lo <= hi for lo, hi in zip(bands["p10"], bands["p90"]))
+    assert 0 <= result["success_rate"] <= 100
+
+
+def test_zero_volatility_matches_closed_form():
+    result = simulate(
+        normalize_params(
+            current_assets=1000, annual_contribution=100, years_to_retire=2,
+            years_in_retirement=0, annual_spending=0, expected_return=0.1,
+            volatility=0.0, simulations=10,
+        )
+    )
+    # 1000 -> 1200 -> 1420
+    assert result["percentile_paths"]["p50"] == [1000, 1200, 1420]
+    assert result["success_rate"] == 100.0
+
+
+def test_glide_path_interpolates_then_holds():
+    weights = _glide_weights([0.9, 0.1], [0.5, 0.5], years_to_retire=4, total_years=6)
+    assert np.allclose(weights[0], [0.9, 0.1])
+    assert np.allclose(weights[2], [0.7, 0.3])
+    assert np.allclose(weights[4:], [0.5, 0.5])
+
+
+def test_multi_asset_validation_and_run():
+    assets = [
+        {"expected_return": 0.08, "volatility": 0.17},
+        {"expected_return": 0.035, "volatility": 0.06},
+    ]
+    with pytest.raises(ValueError):
+        normalize_params(**BASE, assets=assets, correlations=[[1.0]])
+    result = simulate(
+        normalize_params(
+            **BASE,
+            simulations=5000,
+            assets=assets,
+            correlations=[[1.0, 0.2], [0.2, 1.0]],
+            glide_path={"start_weights": [0.9, 0.1], "end_weights": [0.4, 0.6]},
+        )
+    )
+    assert result["simulations"] == 5000
+
+
+def test_100k_paths_run_quickly():
+    params = normalize_params(**BASE, simulations=monte_carlo.MAX_SIMULATIONS)
+    start = time.perf_counter()
+    simulate(params)
+    # Target is well under a second; leave headroom for shared CI runners
+    assert time.perf_counter() - start < 3.0
+
+
+@pytest.mark.asyncio
+async def test_run_monte_carlo_caches_by_input():
+    with patch("backend.services.async_cache.get_redis", _no_redis), patch.object(
+        monte_carlo, "_run_off_loop", wraps=monte_carlo._run_off_loop
+    ) as run:
+        first = await monte_carlo.run_monte_carlo(**BASE, simulations=500)
+        second = await monte_carlo.run_monte_carlo(**BASE, simulations=500)
+    assert first == second
+    assert run.call_count == 1
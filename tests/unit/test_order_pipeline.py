@@ -0,0 +1,189 @@
+"""Unit tests for the order submission pipeline against the fake broker."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+
+from backend.models.model_portfolio_marketplace import RebalanceSignalStatus
+from backend.services.iim.order_builder import build_order_preview, submit_order_batch, submit_tradier_order
+from backend.services.iim.order_pipeline import (
+    FakeTradier,
+    OrderLeg,
+    OrderPipeline,
+    legs_from_trades,
+    summarize,
+)
+from backend.services.latency import histogram
+from backend.services.model_portfolio.rebalance_service import RebalanceService
+
+
+def _pipeline(fake, **kwargs):
+    defaults = dict(rate=0, account_rate=0, backoff=0, poll_interval=0, poll_timeout=5)
+    defaults.update(kwargs)
+    return OrderPipeline(fake.broker(), **defaults)
+
+
+def _legs(accounts=3, per_account=6, source="batch-1"):
+    return [
+        OrderLeg(f"ACCT{a}", f"S{i}", "sell" if i % 2 else "buy", 10 + i, source=source)
+        for a in range(accounts)
+        for i in range(per_account)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_fills_under_global_and_per_account_limits():
+    fake = FakeTradier(latency=0.01, fill_after=2)
+    submits_before = histogram("broker.submit").count
+    updates = await _pipeline(fake, concurrency=4, account_concurrency=2).run(_legs())
+    assert len(updates) == 18 and {u.status for u in updates} == {"filled"}
+    assert len(fake.filled()) == 18 and fake.submits == 18
+    assert fake.peak <= 4 and max(fake.account_peak.values()) <= 2
+    assert fake.peak > 1  # accounts really ran concurrently
+    assert histogram("broker.submit").count - submits_before == 18
+
+
+@pytest.mark.asyncio
+async def test_sells_are_submitted_and_filled_before_buys():
+    fake = FakeTradier(fill_after=1)
+    events = [u async for u in _pipeline(fake).stream(_legs(accounts=1))]
+    sides = [u.side for u in events if u.status == "submitted"]
+    assert sides == ["sell"] * 3 + ["buy"] * 3
+    last_sell_fill = max(i for i, u in enumerate(events) if u.side == "sell" and u.status == "filled")
+    first_buy = min(i for i, u in enumerate(events) if u.side == "buy")
+    assert last_sell_fill < first_buy
+
+
+@pytest.mark.asyncio
+async def test_statuses_stream_in_order_per_leg():
+    fake = FakeTradier(fill_after=3)
+    leg = OrderLeg("ACCT0", "VTI", "buy", 5, source="x")
+    events = [u.status async for u in _pipeline(fake).stream([leg])]
+    assert events == ["submitted", "pending", "filled"]
+    assert fake.orders["ACCT0"][0]["tag"] == leg.key
+
+
+@pytest.mark.asyncio
+async def test_lost_response_is_not_resubmitted():
+    fake = FakeTradier()
+    fake.timeout_next(1)  # order accepted, response never arrives
+    (update,) = await _pipeline(fake).run([OrderLeg("ACCT0", "VTI", "buy", 5, source="x")])
+    assert update.status == "filled" and update.attempts == 1
+    assert len(fake.orders["ACCT0"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_retry_and_client_errors_do_not():
+    fake = FakeTradier()
+    fake.fail_next(503, times=1)
+    fake.fail_next(429, times=1)
+    (update,) = await _pipeline(fake).run([OrderLeg("ACCT0", "VTI", "buy", 5, source="x")])
+    assert update.status == "filled" and update.attempts == 3
+
+    fake.rejected.add("BAD")
+    (update,) = await _pipeline(fake).run([OrderLeg("ACCT0", "BAD", "buy", 5, source="x")])
+    assert update.status == "failed" and update.attempts == 1 and "Invalid symbol" in update.error
+    assert len(fake.orders["ACCT0"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_rerunning_a_batch_places_no_new_orders():
+    fake = FakeTradier()
+    legs = _legs(accounts=2, per_account=4)
+    await _pipeline(fake).run(legs)
+    submits = fake.submits
+    events = [u async for u in _pipeline(fake).stream(legs + legs[:2])]  # duplicates inside the batch too
+    assert [u.status for u in events].count("duplicate") == 8
+    again = {u.key: u.status for u in events}  # the broker's status follows each duplicate
+    assert set(again.values()) == {"filled"} and len(again) == 8
+    assert fake.submits == submits
+
+
+@pytest.mark.asyncio
+async def test_rejected_and_canceled_orders_are_sent_again_once():
+    fake = FakeTradier()
+    legs = _legs(accounts=1, per_account=3)
+    await _pipeline(fake).run(legs)
+    fake.orders["ACCT0"][0]["status"] = "rejected"
+    fake.orders["ACCT0"][1]["status"] = "canceled"
+
+    updates = await _pipeline(fake).run(legs)
+    assert [u.status for u in updates] == ["filled"] * 3 and fake.submits == 5
+    resent = {u.key for u in updates} - {leg.key for leg in legs}
+    assert len(resent) == 2 and all(key.endswith("-r1") for key in resent)
+    again = await _pipeline(fake).run(legs)  # the resent orders are idempotent too
+    assert {u.status for u in again} == {"filled"} and fake.submits == 5
+
+
+@pytest.mark.asyncio
+async def test_order_listing_carries_tags_only_when_asked():
+    fake = FakeTradier()
+    leg = OrderLeg("ACCT0", "VTI", "buy", 5, source="x")
+    await _pipeline(fake).run([leg], track=False)
+    async with fake.client() as client:
+        bare = (await client.get("/v1/accounts/ACCT0/orders")).json()["orders"]["order"]
+        tagged = (await client.get("/v1/accounts/ACCT0/orders", params={"includeTags": "true"})).json()
+    assert "tag" not in bare[0] and tagged["orders"]["order"][0]["tag"] == leg.key
+    assert await fake.broker().orders("ACCT0") == {leg.key: (str(bare[0]["id"]), "pending")}
+
+
+@pytest.mark.asyncio
+async def test_quotes_price_trades_into_new_holdings():
+    fake = FakeTradier()
+    fake.quotes.update({"NEW": 25.0, "BND": 99.0})
+    trades = [
+        {"symbol": "BND", "action": "buy", "value": 990.0, "price": 50.0},
+        {"symbol": "NEW", "action": "buy", "value": 500.0},
+        {"symbol": "GONE", "action": "buy", "value": 500.0},
+    ]
+    prices = await _pipeline(fake).quotes(["GONE", "NEW"])
+    assert prices == {"NEW": 25.0}
+    legs, skipped = legs_from_trades("ACCT0", trades, "rebalance:s1", prices)
+    assert [(leg.symbol, leg.quantity) for leg in legs] == [("BND", 19), ("NEW", 20)]
+    assert [(s.symbol, s.status, s.error) for s in skipped] == [("GONE", "skipped", "no price")]
+
+    # A skipped trade leaves the signal failed, so it can be submitted again
+    updates = skipped + await _pipeline(fake).run(legs)
+    service = RebalanceService(AsyncMock())
+    service.mark_executed = AsyncMock(
+        side_effect=lambda _, details: SimpleNamespace(status=RebalanceSignalStatus.COMPLETED, details=details)
+    )
+    signal = await service.record_submission(uuid4(), updates)
+    assert signal.status == RebalanceSignalStatus.FAILED
+    assert signal.details["counts"] == {"filled": 2, "skipped": 1}
+
+
+def test_legs_from_rebalance_trades():
+    trades = [
+        {"symbol": "VTI", "action": "sell", "value": 1000.0, "shares": 9.7},
+        {"symbol": "BND", "action": "buy", "value": 990.0, "price": 50.0},
+        {"symbol": "NEW", "action": "buy", "value": 500.0},
+        {"symbol": "TINY", "action": "buy", "value": 20.0, "price": 40.0},
+    ]
+    legs, skipped = legs_from_trades("ACCT0", trades, "rebalance:s1")
+    assert [(leg.symbol, leg.side, leg.quantity) for leg in legs] == [("VTI", "sell", 9), ("BND", "buy", 19)]
+    assert [(s.symbol, s.error) for s in skipped] == [("NEW", "no price"), ("TINY", "under one share")]
+    assert len({leg.key for leg in legs}) == 2
+    assert legs == legs_from_trades("ACCT0", trades, "rebalance:s1")[0]  # keys are stable
+    assert summarize(skipped)["counts"] == {"skipped": 2}
+
+
+@pytest.mark.asyncio
+async def test_recommendation_orders_are_idempotent_on_rec_id():
+    fake = FakeTradier()
+    pipeline = _pipeline(fake)
+    first = await submit_tradier_order("rec-1", 3, "market", None, symbol="VTI", side="sell",
+                                       account_id="ACCT0", pipeline=pipeline)
+    again = await submit_tradier_order("rec-1", 3, "market", None, symbol="VTI", side="sell",
+                                       account_id="ACCT0", pipeline=pipeline)
+    assert first["status"] == "submitted" and again["status"] == "duplicate"
+    assert again["order_id"] == first["order_id"] and fake.submits == 1
+    assert fake.orders["ACCT0"][0]["symbol"] == "VTI" and fake.orders["ACCT0"][0]["side"] == "sell"
+
+    recs = [SimpleNamespace(rec_type="BUY", symbol=s, quantity=2, rec_id=f"r-{s}") for s in ("A", "B")]
+    orders = [dict(build_order_preview(r, "ACCT1"), type="market") for r in recs]
+    events = [u async for u in submit_order_batch(orders, pipeline)]
+    assert sorted(u["symbol"] for u in events if u["status"] == "filled") == ["A", "B"]
+    assert {o["tag"] for o in fake.orders["ACCT1"]} == {"edge-rec-r-A", "edge-rec-r-B"}
@@ -0,0 +1,102 @@
+"""Unit tests for the constrained mean-variance ETF optimizer."""
+
+import numpy as np
+import pytest
+
+from backend.services import portfolio_optimizer
+from backend.services.portfolio_optimizer import (
+    Constraints,
+    default_universe,
+    get_frontier,
+    optimize,
+    portfolio_statistics,
+)
+
+UNIVERSE = default_universe()
+
+
+def _class_totals(w):
+    return np.bincount(UNIVERSE.class_ids, weights=w, minlength=4)
+
+
+def _objective(w, gamma):
+    mu = UNIVERSE.expected_returns - UNIVERSE.expense_ratios
+    return mu @ w - 0.5 * gamma * w @ UNIVERSE.covariance @ w
+
+
+def test_solution_meets_every_constraint():
+    constraints = Constraints.from_percentages(60, alternatives=6, cash=2)
+    assert constraints.class_budgets == (0.6, 0.32, 0.06, 0.02)
+    w = optimize(UNIVERSE, 2.5, constraints)
+
+    np.testing.assert_allclose(_class_totals(w), constraints.class_budgets, atol=1e-9)
+    held = w[w > 0]
+    assert held.min() >= constraints.min_weight - 1e-9
+    assert held.max() <= constraints.max_weight + 1e-9
+    assert UNIVERSE.expense_ratios @ w <= constraints.max_expense_ratio
+    # Same exposure, higher fee: never chosen over the cheap share class
+    assert w[UNIVERSE.symbols.index("SPY")] == 0
+
+
+def test_solution_beats_feasible_perturbations():
+    constraints = Constraints.from_percentages(60, alternatives=6, cash=2, min_weight=0.0)
+    gamma = 2.5
+    w = optimize(UNIVERSE, gamma, constraints)
+    best = _objective(w, gamma)
+    rng = np.random.default_rng(1)
+    ids = UNIVERSE.class_ids
+    for _ in range(200):
+        # Move weight between two funds of the same class, staying in bounds
+        c = rng.integers(0, 4)
+        members = np.flatnonzero(ids == c)
+        i, j = rng.choice(members, 2, replace=False)
+        step = min(w[i], constraints.max_weight - w[j]) * rng.random()
+        trial = w.copy()
+        trial[i] -= step
+        trial[j] += step
+        if UNIVERSE.expense_ratios @ trial <= constraints.max_expense_ratio:
+            assert _objective(trial, gamma) <= best + 1e-9
+
+
+def test_binding_expense_cap_is_met_exactly():
+    loose = Constraints.from_percentages(75, alternatives=10, cash=0, max_expense_ratio=0.01)
+    free = optimize(UNIVERSE, 1.5, loose)
+    cap = UNIVERSE.expense_ratios @ free * 0.85
+    tight = Constraints.from_percentages(75, alternatives=10, cash=0, max_expense_ratio=cap)
+    w = optimize(UNIVERSE, 1.5, tight)
+    assert UNIVERSE.expense_ratios @ w == pytest.approx(cap, rel=1e-3)
+    assert UNIVERSE.expense_ratios @ w <= cap + 1e-12
+
+    with pytest.raises(ValueError):
+        optimize(UNIVERSE, 1.5, Constraints.from_percentages(60, 10, 0, max_expense_ratio=0.0001))
+
+
+def test_frontier_is_cached_and_ordered(monkeypatch):
+    monkeypatch.setattr(portfolio_optimizer, "_frontiers", {})
+    constraints = Constraints.from_percentages(60, alternatives=6, cash=2)
+    frontier = get_frontier(constraints)
+    assert get_frontier(constraints) is frontier
+
+    vols = [p.volatility for p in frontier.points]
+    rets = [p.expected_return for p in frontier.points]
+    assert all(b >= a - 1e-9 for a, b in zip(vols, vols[1:]))
+    assert all(b >= a - 1e-9 for a, b in zip(rets, rets[1:]))
+    assert frontier.at(0.0) is frontier.points[0] and frontier.at(1.0) is frontier.points[-1]
+
+    # A new budget warm-starts from the closest cached frontier and matches a cold solve
+    nearby = Constraints.from_percentages(65, alternatives=6, cash=2)
+    warm = get_frontier(nearby)
+    cold = optimize(UNIVERSE, portfolio_optimizer.GAMMA_GRID[4], nearby)
+    np.testing.assert_allclose(warm.points[4].weights, cold, atol=1e-6)
+
+
+def test_statistics_report_volatility_and_diversification():
+    single = portfolio_statistics(["VTI"], [100])
+    assert single["volatility"] == pytest.approx(np.sqrt(UNIVERSE.covariance[0, 0]), abs=1e-4)
+    assert single["effective_risk_bets"] == pytest.approx(1.0)
+    assert single["diversification_ratio"] == pytest.approx(1.0)
+
+    mixed = portfolio_statistics(["VTI", "BND", "GLD"], [60, 30, 10])
+    assert mixed["volatility"] < single["volatility"]
+    assert mixed["diversification_ratio"] > 1.0
+    assert sum(mixed["risk_contributions"].values()) == pytest.approx(1.0, abs=1e-3)
@@ -0,0 +1,147 @@
+"""Batch pre-trade compliance: bulk context, compiled rules, one audit insert."""
+
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from backend.services.cim.pretrade import (
+    BUDGET_RULE,
+    ClientContext,
+    PreTradeCompliance,
+    ProposedTrade,
+    compile_rules,
+    evaluate,
+)
+from backend.services.concentration import Holding
+
+ALT = [{"desc": "Model sleeve alternative"}]
+
+
+def _diversified(n: int = 10, value: float = 10_000) -> list:
+    return [Holding(f"PRIV{i}", value, f"Sector {i}") for i in range(n)]
+
+
+def _trade(i, client_id, symbol="VOO", side="BUY", amount=1_000, **details):
+    return ProposedTrade(f"t{i}", client_id, symbol, side, amount, alternatives=ALT, details=details)
+
+
+def test_rules_compile_once_per_selection():
+    assert compile_rules() is compile_rules()
+    assert [name for name, _ in compile_rules(("REG_BI", "CONFLICT_206_3"))] == ["REG_BI", "CONFLICT_206_3"]
+    with pytest.raises(ValueError, match="NOPE"):
+        compile_rules(("NOPE",))
+
+
+def test_concentration_uses_post_batch_household_exposure():
+    contexts = {
+        "a": ClientContext(household="h1", holdings=_diversified()),
+        "b": ClientContext(household="h1", holdings=[]),  # same household as a
+        "c": ClientContext(household="h2", holdings=_diversified()),
+    }
+    trades = [
+        _trade(0, "a", "PRIV0", "SELL", 10_000),
+        _trade(1, "b", "PRIVX", "BUY", 60_000),  # 60k of 150k after the batch
+        _trade(2, "c", "PRIV0", "BUY", 5_000),
+    ]
+    checks, unevaluated = evaluate(trades, contexts)
+    by_id = {c.trade_id: c for c in checks}
+    assert unevaluated == 0
+    assert "CONCENTRATION_LIMITS" in by_id["t0"].violations  # the household, not the trade
+    assert "CONCENTRATION_LIMITS" in by_id["t1"].violations
+    assert by_id["t2"].status == "APPROVED"
+
+
+def test_blocking_rules_reject_and_conditional_passes():
+    contexts = {"a": ClientContext(household="h", holdings=_diversified())}
+    trades = [
+        _trade(0, "a", involves_advisor_account=True),
+        ProposedTrade("t1", "a", "VOO", "BUY", 1_000),  # no alternatives: Reg BI
+        _trade(2, "a", adv_data={"days_since_update": 320}),
+        _trade(3, "a", risk_level=5),
+    ]
+    checks, _ = evaluate(trades, contexts)
+    assert [c.status for c in checks] == ["REJECTED", "REJECTED", "APPROVED", "CONDITIONAL"]
+    assert checks[0].violations == ["CONFLICT_206_3"]
+    assert checks[3].passed and checks[3].violations == ["SERIES65_SUITABILITY"]
+
+
+def test_trades_past_the_deadline_fail_closed():
+    trades = [_trade(i, None) for i in range(5)]
+    checks, unevaluated = evaluate(trades, {}, deadline=time.monotonic() - 1)
+    assert unevaluated == 5
+    assert all(c.status == "REJECTED" and c.violations == [BUDGET_RULE] for c in checks)
+
+
+class _Session:
+    """
+    Replays canned rows for the three context queries; records every execute
+    and the outcome of each savepoint. Executes inside a savepoint raise
+    `fail_nested` when set.
+    """
+
+    def __init__(self, *results, fail_nested=None):
+        self.results = list(results)
+        self.calls = []
+        self.savepoints = []
+        self.fail_nested = fail_nested
+        self._nested = False
+
+    async def execute(self, stmt, params=None):
+        self.calls.append((stmt, params))
+        if self._nested and self.fail_nested:
+            raise self.fail_nested
+        rows = self.results.pop(0) if self.results else []
+        return SimpleNamespace(all=lambda: rows)
+
+    @asynccontextmanager
+    async def begin_nested(self):
+        self._nested = True
+        try:
+            yield
+        except Exception:
+            self.savepoints.append("rolled back")
+            raise
+        else:
+            self.savepoints.append("released")
+        finally:
+            self._nested = False
+
+
+@pytest.mark.asyncio
+async def test_check_trades_loads_in_bulk_and_audits_in_one_insert():
+    client, household, advisor = uuid4(), uuid4(), uuid4()
+    positions = [(household, client, f"PRIV{i}", f"Fund {i}", 10_000) for i in range(10)]
+    session = _Session(
+        [(client, household, "moderate", "growth", "10+ years")],
+        [(client, {"target_allocation": {"equities": 60}}), (client, {"target_allocation": {}})],
+        positions,
+    )
+    trades = [_trade(i, str(client)) for i in range(50)] + [_trade(50, str(client), involves_advisor_account=True)]
+    batch = await PreTradeCompliance(session).check_trades(trades, advisor_id=advisor)
+
+    assert len(session.calls) == 5  # 3 context queries, ComplianceLog insert, blocked-trade insert
+    log_rows = session.calls[3][1]
+    assert len(log_rows) == 51 * len(compile_rules())
+    assert {r["recommendation_id"] for r in log_rows} == {t.id for t in trades}
+    assert [c.trade_id for c in batch.rejected] == ["t50"]
+    assert session.calls[4][1][0]["entity_id"] == "t50"
+    assert session.savepoints == ["released"]  # the audit insert runs in a savepoint
+    assert batch.unevaluated == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_blocked_audit_rolls_back_only_its_savepoint():
+    client, household = uuid4(), uuid4()
+    session = _Session(
+        [(client, household, "moderate", "growth", "10+ years")], [], [],
+        fail_nested=RuntimeError("audit table missing"),
+    )
+    trades = [_trade(0, str(client)), _trade(1, str(client), involves_advisor_account=True)]
+    batch = await PreTradeCompliance(session).check_trades(trades, advisor_id=uuid4())
+
+    assert [c.trade_id for c in batch.rejected] == ["t1"]
+    assert session.savepoints == ["rolled back"]
+    assert len(session.calls) == 5
@@ -0,0 +1,93 @@
+"""Unit tests for the event-driven harvest opportunity detector."""
+
+import json
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from backend.models.tax_harvest import HarvestStatus
+from backend.services.tax_harvest.realtime_detector import (
+    IndexedLot,
+    RealtimeHarvestDetector,
+    parse_quote_message,
+)
+
+
+def _lot(position_id, advisor_id, qty="100", basis="10000", long_term=False):
+    return IndexedLot(
+        id=uuid4(),
+        position_id=position_id,
+        account_id=uuid4(),
+        advisor_id=advisor_id,
+        client_id=None,
+        account_type="individual",
+        symbol="XYZ",
+        remaining_quantity=Decimal(qty),
+        total_cost_basis=Decimal(basis),
+        adjusted_cost_basis=None,
+        is_long_term=long_term,
+    )
+
+
+def _detector():
+    db = MagicMock()
+    db.commit = AsyncMock()
+    detector = RealtimeHarvestDetector(db)
+    detector._open_opportunity = AsyncMock(
+        side_effect=lambda pid, *a, **k: detector.index.active.__setitem__(
+            pid, (uuid4(), HarvestStatus.IDENTIFIED)
+        )
+    )
+    detector._expire = AsyncMock(
+        side_effect=lambda pid, _opp: detector.index.active.pop(pid, None)
+    )
+    return detector
+
+
+def test_parse_quote_message():
+    assert parse_quote_message("quote:AAPL", json.dumps({"last": 101.5})) == ("AAPL", Decimal("101.5"))
+    assert parse_quote_message(b"quote:AAPL", json.dumps({"last": None})) is None
+    assert parse_quote_message("positions:x", "{}") is None
+
+
+@pytest.mark.asyncio
+async def test_loss_crossing_threshold_creates_once():
+    detector = _detector()
+    position_id = uuid4()
+    detector.index.add(_lot(position_id, uuid4()))
+
+    # $10,000 basis, 100 sh: at $99 loss is $100 → ST savings $37 < $50 minimum
+    assert (await detector.on_quote("XYZ", Decimal("99")))["created"] == 0
+    # at $97 loss is $300 → savings $111
+    assert (await detector.on_quote("XYZ", Decimal("97")))["created"] == 1
+    # further drop: already active, nothing new
+    assert (await detector.on_quote("XYZ", Decimal("95")))["created"] == 0
+    assert detector._open_opportunity.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_recovery_expires_with_hysteresis():
+    detector = _detector()
+    position_id = uuid4()
+    detector.index.add(_lot(position_id, uuid4()))
+    await detector.on_quote("XYZ", Decimal("97"))
+
+    # loss $140 → savings $51.8; above the relaxed (80%) bar of $40 → kept
+    assert (await detector.on_quote("XYZ", Decimal("98.6")))["expired"] == 0
+    # loss $90 → below relaxed $80 loss bar → expired
+    assert (await detector.on_quote("XYZ", Decimal("99.1")))["expired"] == 1
+    assert position_id not in detector.index.active
+
+
+@pytest.mark.asyncio
+async def test_untracked_symbols_and_tiny_moves_are_ignored():
+    detector = _detector()
+    detector.index.add(_lot(uuid4(), uuid4()))
+    await detector.on_quote("XYZ", Decimal("97"))
+    detector._open_opportunity.reset_mock()
+
+    assert await detector.on_quote("ABC", Decimal("1")) == {"created": 0, "expired": 0}
+    await detector.on_quote("XYZ", Decimal("97.01"))  # < 5bp move
+    assert detector._last_price["XYZ"] == Decimal("97")
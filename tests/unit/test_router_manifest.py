@@ -0,0 +1,88 @@
+"""Lazy router loading: same routing as eager mounting, imports deferred."""
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from backend.api.router_manifest import ROUTERS, RouterSpec, _resolve, mount_routers
+
+first = APIRouter(prefix="/x")
+second = APIRouter(prefix="/x")
+mock = APIRouter(prefix="/m")
+
+
+@first.get("/shared")
+async def _first_shared():
+    return {"from": "first"}
+
+
+@second.get("/shared")
+async def _second_shared():
+    return {"from": "second"}
+
+
+@second.get("/only-second")
+async def _only_second():
+    return {"from": "second"}
+
+
+@mock.get("/ping")
+async def _mock_ping():
+    return {"from": "mock"}
+
+
+HERE = __name__
+SPECS = (
+    RouterSpec("first", (f"{HERE}:first",), ("/x",)),
+    RouterSpec("second", (f"{HERE}:second",), ("/x",)),
+    RouterSpec("broken", ("tests.unit.no_such_module:router",), ("/m",), fallback=(f"{HERE}:mock",)),
+    RouterSpec("db_only", (f"{HERE}:mock",), ("/db",), needs_db=True),
+)
+
+
+def _app(mode):
+    app = FastAPI()
+    table = mount_routers(app, db_available=False, specs=SPECS, mode=mode)
+
+    @app.get("/{full_path:path}")
+    async def catch_all(full_path: str):
+        return {"from": "spa"}
+
+    return app, table
+
+
+def test_lazy_routes_match_eager_order():
+    lazy_app, table = _app("on_demand")
+    eager_app, _ = _app("eager")
+    assert table.status()["pending"] == ["first", "second", "broken"]
+    lazy, eager = TestClient(lazy_app), TestClient(eager_app)
+    for path in ("/x/shared", "/x/only-second", "/x/missing", "/m/ping", "/db/anything", "/other"):
+        assert lazy.get(path).json() == eager.get(path).json(), path
+    assert lazy.get("/x/shared").json() == {"from": "first"}
+    # Loaded routes took the placeholders' places, ahead of the catch-all
+    assert lazy_app.routes[-1].path == "/{full_path:path}"
+    assert table.status()["pending"] == []
+
+
+def test_failed_import_serves_fallback_and_records_error():
+    app, table = _app("on_demand")
+    assert TestClient(app).get("/m/ping").json() == {"from": "mock"}
+    status = table.status()
+    assert "broken" in status["mocked"]
+    assert "ModuleNotFoundError" in status["errors"]["broken"]
+    assert status["errors"]["db_only"] == "no database configured"
+
+
+def test_openapi_loads_pending_routers():
+    app, table = _app("on_demand")
+    paths = TestClient(app).get("/openapi.json").json()["paths"]
+    assert "/x/only-second" in paths and "/m/ping" in paths
+    assert table.status()["pending"] == []
+
+
+@pytest.mark.parametrize("spec", ROUTERS, ids=lambda s: s.name)
+def test_manifest_prefixes_cover_every_route(spec):
+    for router in _resolve(spec.targets + spec.fallback):
+        for route in router.routes:
+            path = route.path  # includes the router prefix
+            assert any(path == p or path.startswith(p + "/") for p in spec.prefixes), path
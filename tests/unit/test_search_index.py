@@ -0,0 +1,141 @@
+"""Unit tests for the full-text search subsystem."""
+
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from backend.services.search import (
+    LocalSearchIndex,
+    PostgresSearchBackend,
+    SearchDocument,
+    SearchQuery,
+    parse_query,
+)
+from backend.services.search.documents import to_tsquery
+
+
+def _doc(doc_id, title, body="", when=(2026, 1, 15), channel="email", owner="adv-1"):
+    return SearchDocument(
+        collection="comm_archive",
+        doc_id=doc_id,
+        occurred_at=datetime(*when, tzinfo=timezone.utc),
+        title=title,
+        body=body,
+        participants="Leslie Thompson leslie@iabadvisors.com",
+        owner_id=owner,
+        facets={"channel": channel},
+        payload={"id": doc_id},
+    )
+
+
+def _search(index, text=None, **kwargs):
+    return index.search(SearchQuery(collection="comm_archive", text=text, **kwargs))
+
+
+def test_query_language_parses_and_compiles_to_tsquery():
+    clauses = parse_query('rmd "tax loss" guarant* -commission tax-loss')
+    assert to_tsquery(clauses) == (
+        "rmd & (tax <-> loss) & guarant:* & !commission & (tax <-> loss)"
+    )
+    assert parse_query("  ") == []
+
+
+def test_terms_phrases_prefix_and_exclusion():
+    index = LocalSearchIndex()
+    index.add_many([
+        _doc("m1", "Tax loss harvesting opportunity", "We can guarantee savings"),
+        _doc("m2", "Loss of tax documents", "Commission schedule attached"),
+        _doc("m3", "Upcoming RMD distribution"),
+    ])
+
+    assert {h.doc_id for h in _search(index, "tax loss").hits} == {"m1", "m2"}
+    assert [h.doc_id for h in _search(index, '"tax loss"').hits] == ["m1"]
+    assert [h.doc_id for h in _search(index, "tax-loss").hits] == ["m1"]
+    assert [h.doc_id for h in _search(index, "guarant*").hits] == ["m1"]
+    assert [h.doc_id for h in _search(index, "tax -commission").hits] == ["m1"]
+    # Phrases never span fields (title "... opportunity" + participants "Leslie")
+    assert _search(index, '"opportunity leslie"').total == 0
+    # Participants are searchable, emails included
+    assert _search(index, "iabadvisors.com").total == 3
+
+
+def test_ranking_weights_title_over_body():
+    index = LocalSearchIndex()
+    index.add(_doc("body", "Quarterly note", "beneficiary beneficiary update"))
+    index.add(_doc("title", "Beneficiary change request", "signature needed"))
+    assert [h.doc_id for h in _search(index, "beneficiary").hits] == ["title", "body"]
+
+
+def test_partitions_facets_filters_and_incremental_updates():
+    index = LocalSearchIndex()
+    index.add_many([
+        _doc("jan-1", "Fee update", when=(2026, 1, 10), channel="email"),
+        _doc("jan-2", "Fee update", when=(2026, 1, 20), channel="sms"),
+        _doc("feb-1", "Fee update", when=(2026, 2, 3), channel="email"),
+        _doc("feb-2", "Fee update", when=(2026, 2, 4), channel="chat", owner="adv-2"),
+    ])
+    assert len(index._partitions) == 2
+
+    result = _search(index, "fee", facets=["channel"])
+    assert result.total == 4
+    assert result.facets["channel"] == {"email": 2, "sms": 1, "chat": 1}
+
+    feb = _search(
+        index, "fee",
+        start=datetime(2026, 2, 1, tzinfo=timezone.utc),
+        end=datetime(2026, 3, 1, tzinfo=timezone.utc),
+        facets=["channel"], sort="recent",
+    )
+    assert [h.doc_id for h in feb.hits] == ["feb-2", "feb-1"]
+    assert _search(index, "fee", filters={"channel": "email"}).total == 2
+    assert _search(index, "fee", owner_id="adv-2").total == 1
+
+    # Re-indexing replaces; removal drops postings and facet counts
+    index.add(_doc("jan-1", "Fee update", when=(2026, 1, 10), channel="chat"))
+    assert _search(index, facets=["channel"]).facets["channel"]["chat"] == 2
+    assert index.remove("comm_archive", "jan-2")
+    result = _search(index, "fee", facets=["channel"])
+    assert result.total == 3 and "sms" not in result.facets["channel"]
+    assert len(index) == 3
+
+    page = _search(index, "fee", sort="recent", offset=1, limit=1)
+    assert page.total == 3 and [h.doc_id for h in page.hits] == ["feb-1"]
+
+
+@pytest.mark.asyncio
+async def test_postgres_backend_uses_tsquery_rank_and_facet_filters():
+    row = MagicMock(doc_id="v1", occurred_at=datetime.now(timezone.utc), payload={}, rank=0.5, total=1)
+    rows = MagicMock()
+    rows.all.return_value = [row]
+    db = MagicMock(execute=AsyncMock(return_value=rows))
+
+    result = await PostgresSearchBackend(db).search(SearchQuery(
+        collection="compliance_documents",
+        text='"form crs"',
+        owner_id="firm-1",
+        filters={"status": "published"},
+    ))
+    assert result.total == 1 and result.hits[0].score == 0.5
+    sql = str(db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "search_entries.search_vector @@ to_tsquery" in sql
+    assert "ts_rank_cd(search_entries.search_vector" in sql
+    assert "search_entries.facets @>" in sql
+
+
+@pytest.mark.asyncio
+async def test_postgres_reindex_replaces_rows_whose_timestamp_moved():
+    db = MagicMock(execute=AsyncMock())
+    backend = PostgresSearchBackend(db)
+    backend.ensure_partition = AsyncMock()
+    reanalyzed = _doc("m1", "Roth conversion", when=(2026, 2, 3))
+
+    assert await backend.add_many([reanalyzed]) == 1
+    stale, upsert = [c.args[0].compile(dialect=postgresql.dialect()) for c in db.execute.await_args_list]
+    assert str(stale).startswith("DELETE FROM search_entries")
+    assert "(search_entries.collection, search_entries.doc_id, search_entries.occurred_at) NOT IN" in str(stale)
+    assert list(stale.params.values()) == [
+        [("comm_archive", "m1")], [("comm_archive", "m1", reanalyzed.occurred_at)],
+    ]
+    assert "ON CONFLICT (collection, doc_id, occurred_at) DO UPDATE" in str(upsert)
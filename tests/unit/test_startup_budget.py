@@ -0,0 +1,54 @@
+"""Cold-start budget: importing the app must stay cheap (see router_manifest)."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Generous for slow CI hosts; eager router loading takes several seconds
+BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "2.0"))
+
+# Loaded on first use only; any of these at import time is a regression
+DEFERRED = (
+    "anthropic",
+    "openai",
+    "pandas",
+    "sqlalchemy",
+    "backend.models",
+    "backend.api.mock_endpoints",
+    "backend.api.mock_b2c",
+    "backend.api.mock_portal",
+    "backend.api.auth",
+)
+
+_CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+import backend.app
+print(json.dumps({"seconds": time.perf_counter() - t0,
+                  "loaded": [m for m in sys.argv[1:] if m in sys.modules]}))
+"""
+
+
+def _cold_import() -> dict:
+    env = {k: v for k, v in os.environ.items() if k != "DATABASE_URL"}
+    env.update(ROUTER_LOADING="lazy", PYTHONPATH=str(ROOT))
+    proc = subprocess.run(
+        [sys.executable, "-c", _CHILD, *DEFERRED],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_app_import_defers_heavy_modules_and_fits_budget():
+    runs = [_cold_import() for _ in range(2)]
+    assert runs[0]["loaded"] == [], f"imported at startup: {runs[0]['loaded']}"
+    best = min(r["seconds"] for r in runs)
+    assert best < BUDGET_SECONDS, (
+        f"cold import took {best:.2f}s (budget {BUDGET_SECONDS}s); "
+        "run scripts/profile_imports.py to see what was added"
+    )
@@ -0,0 +1,92 @@
+"""Layout-aware statement parsing: tables by column, not by number magnitude."""
+
+import hashlib
+from decimal import Decimal
+
+import pytest
+
+from backend.parsers import get_default_registry
+from backend.parsers.layout import BROKERAGE_POSITIONS, DocumentLayout, extract_layout
+from tests.fixtures.statement_samples import ETRADE_TEXT, NW_MUTUAL_VA_TEXT, ROBINHOOD_TEXT
+
+
+def _by_key(parsed):
+    return {(p.ticker or p.security_name): p for p in parsed.positions}
+
+
+def test_robinhood_columns_assigned_by_position():
+    parsed = get_default_registry().detect_and_parse(ROBINHOOD_TEXT)
+    positions = _by_key(parsed)
+    assert positions["GOOGL"].quantity == Decimal("5.2")
+    assert positions["GOOGL"].market_value == Decimal("789.30")
+    assert positions["AAPL"].quantity == Decimal("10.5")
+    assert parsed.metadata["table_rows"] == 3
+
+
+def test_nw_va_labelled_fields_and_allocations():
+    parsed = get_default_registry().detect_and_parse(NW_MUTUAL_VA_TEXT)
+    positions = _by_key(parsed)
+    assert positions["Index 500 (BlackRock)"].market_value == Decimal("4627.18")
+    assert positions["Select Bond (Allspring)"].market_value == Decimal("5468.49")
+    assert len(parsed.positions) == 3  # the "Total Contract Value" row is not a holding
+    assert all(a.target_pct is not None and a.actual_pct is not None for a in parsed.allocations)
+
+
+def test_unknown_custodian_uses_generic_table_before_llm(monkeypatch):
+    registry = get_default_registry()
+    monkeypatch.setattr(
+        registry._fallback_parser, "parse",
+        lambda text: pytest.fail("LLM fallback should not run for a recognisable table"),
+    )
+    text = """
+    Acme Clearing Corp — Quarterly Statement
+    Symbol    Description            Quantity      Market Value
+    VTI       Vanguard Total Market   12.000        $3,120.44
+    BND       Vanguard Total Bond     40.500        $2,950.10
+    Total                                           $6,070.54
+    """
+    parsed = registry.detect_and_parse(text)
+    assert parsed.metadata["parser"] == "layout_table"
+    assert _by_key(parsed)["BND"].quantity == Decimal("40.500")
+    assert parsed.total_value == Decimal("6070.54")
+
+
+def test_pdf_layout_matches_text_layout():
+    fitz = pytest.importorskip("fitz")
+    doc = fitz.open()
+    page = doc.new_page()
+    for i, line in enumerate(ETRADE_TEXT.strip("\n").split("\n")):
+        page.insert_text((36, 40 + 11 * i), line, fontname="cour", fontsize=9)
+    pdf = doc.tobytes()
+    doc.close()
+
+    layout = extract_layout(pdf)
+    assert extract_layout(pdf) is layout  # cached by content hash
+    from_pdf = get_default_registry().detect_and_parse_layout(layout)
+    from_text = get_default_registry().detect_and_parse(ETRADE_TEXT)
+    assert _by_key(from_pdf)["META"].market_value == _by_key(from_text)["META"].market_value
+    assert _by_key(from_pdf)["META"].quantity == Decimal("2.5")
+    assert BROKERAGE_POSITIONS.extract(DocumentLayout.from_text("no table here")) == []
+
+
+@pytest.mark.asyncio
+async def test_pdf_layout_from_path_streams_and_shares_the_cache(tmp_path, monkeypatch):
+    fitz = pytest.importorskip("fitz")
+    from backend.parsers import layout as layout_module
+    from backend.services.pdf_service import PDFService
+
+    doc = fitz.open()
+    doc.new_page().insert_text((36, 40), "VTI  Vanguard Total Market  12.000  $3,120.44", fontname="cour")
+    pdf = doc.tobytes()
+    doc.close()
+    path = tmp_path / "statement.pdf"
+    path.write_bytes(pdf)
+
+    from_path = extract_layout(str(path))
+    assert extract_layout(pdf) is from_path  # same content hash, streamed from disk
+
+    monkeypatch.setattr(layout_module, "_layout_cache", type(layout_module._layout_cache)())
+    digest = hashlib.sha256(pdf).hexdigest()
+    layout = await PDFService.extract_layout_from_path(str(path), "statement.pdf", digest)
+    assert list(layout_module._layout_cache) == [digest]
+    assert layout.pages[0].rows[0].text.startswith("VTI")
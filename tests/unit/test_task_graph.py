@@ -0,0 +1,115 @@
+"""Unit tests for deadline-bounded dashboard sections."""
+
+import asyncio
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+
+from backend.services.latency import histogram, latency_stats
+from backend.services.task_graph import Section, run_sections
+
+
+def _sleeper(value, delay=0.05, log=None):
+    async def fn(**deps):
+        if log is not None:
+            log.append(dict(deps))
+        await asyncio.sleep(delay)
+        return value
+    return fn
+
+
+@pytest.mark.asyncio
+async def test_independent_sections_overlap_and_deps_wait():
+    log = []
+    sections = {
+        "a": Section(_sleeper(1)),
+        "b": Section(_sleeper(2)),
+        "c": Section(_sleeper(3)),
+        "d": Section(_sleeper(4, log=log), needs=("a", "b")),
+    }
+    t0 = time.perf_counter()
+    results = await run_sections(sections, metric="test.overlap")
+    elapsed = time.perf_counter() - t0
+
+    assert results.values == {"a": 1, "b": 2, "c": 3, "d": 4}
+    assert log == [{"a": 1, "b": 2}]
+    assert elapsed < 0.15  # two levels deep, not four sections in a row
+    assert not results.degraded
+    assert histogram("test.overlap.d").count == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_or_failing_section_degrades_to_placeholder():
+    async def boom():
+        raise RuntimeError("down")
+
+    sections = {
+        "fast": Section(_sleeper("ok", 0.0)),
+        "slow": Section(_sleeper("late", 1.0), placeholder=[], timeout=0.05),
+        "broken": Section(boom, placeholder=0),
+    }
+    t0 = time.perf_counter()
+    results = await run_sections(sections, metric="test.degrade")
+    assert time.perf_counter() - t0 < 0.5
+    assert results.values == {"fast": "ok", "slow": [], "broken": 0}
+    assert sorted(results.degraded) == ["broken", "slow"]
+
+    stats = latency_stats("test.degrade")
+    assert stats["test.degrade.slow"]["outcomes"] == {"timeout": 1}
+    assert stats["test.degrade.broken"]["outcomes"] == {"error": 1}
+    assert stats["test.degrade.total"]["outcomes"] == {"degraded": 1}
+
+
+@pytest.mark.asyncio
+async def test_required_section_failure_propagates_and_cycles_rejected():
+    sections = {"a": Section(_sleeper(1, 1.0), timeout=0.01, required=True)}
+    with pytest.raises(TimeoutError):
+        await run_sections(sections, metric="test.required")
+
+    cyclic = {"a": Section(_sleeper(1), needs=("b",)), "b": Section(_sleeper(2), needs=("a",))}
+    with pytest.raises(ValueError):
+        await run_sections(cyclic, metric="test.cycle")
+
+
+@pytest.mark.asyncio
+async def test_dashboard_sections_use_separate_sessions_and_await_once():
+    from backend.services.b2c_dashboard import B2CDashboardService
+
+    opened, active, peak, calls = [], [0], [0], []
+
+    class Session:
+        async def __aenter__(self):
+            opened.append(self)
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    def section(name, value):
+        async def fn(self, *args):
+            calls.append(name)
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(0.02)
+            active[0] -= 1
+            return value
+        return fn
+
+    user = SimpleNamespace(id=uuid4(), household_id=uuid4(), subscription_tier="free")
+    svc = B2CDashboardService(db=None, session_factory=Session)
+    with patch.object(B2CDashboardService, "_get_user_accounts", section("accounts", [])), \
+            patch.object(B2CDashboardService, "_calculate_allocation", section("allocation", [])), \
+            patch.object(B2CDashboardService, "_calculate_fee_summary", section("fee", None)), \
+            patch.object(B2CDashboardService, "_get_net_worth_history", section("history", [])), \
+            patch.object(B2CDashboardService, "_get_risk_profile", section("risk", None)), \
+            patch.object(B2CDashboardService, "_get_chat_remaining", section("chat", 7)):
+        response = await svc.get_dashboard(user)
+
+    assert response.total_aum == Decimal("0") and response.ai_chat_remaining == 7
+    assert response.alerts[0].type == "onboarding"
+    assert sorted(calls) == sorted(["accounts", "allocation", "fee", "history", "risk", "chat"])
+    assert len(opened) == len(calls) and peak[0] >= 4
@@ -0,0 +1,130 @@
+"""Tax-aware rebalance optimizer: lot choice, tax budget, wash sales, batch solving."""
+
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from backend.services.lot_engine import Lot, is_long_term
+from backend.services.model_portfolio.tax_aware import (
+    INLINE_BELOW,
+    PositionIn,
+    RebalanceProblem,
+    solve,
+    solve_many,
+)
+
+D = Decimal
+AS_OF = date(2026, 6, 1)
+
+
+def _problem(**kwargs):
+    """VTI 70% / BND 30% against a 50/50 model; VTI has a loss, an LT gain and an ST gain lot."""
+    lots = [
+        Lot("st-gain", "a", "VTI", D(200), D(60), date(2026, 3, 1)),
+        Lot("lt-gain", "a", "VTI", D(300), D(40), date(2020, 1, 1)),
+        Lot("loss", "a", "VTI", D(200), D(120), date(2025, 11, 1)),
+    ]
+    defaults = dict(
+        account_id="a",
+        positions={"VTI": PositionIn(D(70_000), D(100), D(700)), "BND": PositionIn(D(30_000), D(50), D(600), D(50))},
+        targets={"VTI": D(50), "BND": D(50)},
+        lots=lots,
+        as_of=AS_OF,
+    )
+    defaults.update(kwargs)
+    return RebalanceProblem(**defaults)
+
+
+def _sell(plan):
+    return next(t for t in plan.trades if t["action"] == "sell")
+
+
+def test_uncapped_rebalance_sells_loss_then_long_term_lots():
+    plan = solve(_problem())
+    sell = _sell(plan)
+    assert [lot["lot_id"] for lot in sell["lots"]] == ["loss"]  # 200 shares x $100 covers the 20% overweight
+    assert sell["value"] == 20_000 and sell["short_term_gain"] == -4_000
+    assert [t["action"] for t in plan.trades] == ["sell", "buy"]
+    assert plan.drift_after_pct == 0 and plan.estimated_tax < 0
+
+
+def test_tax_budget_leaves_drift_in_place():
+    # Cap the rebalance at $600 of tax once the loss lot is used up
+    plan = solve(_problem(positions={
+        "VTI": PositionIn(D(90_000), D(100), D(900)), "BND": PositionIn(D(10_000), D(50), D(200), D(50)),
+    }, lots=[Lot("loss", "a", "VTI", D(100), D(120), date(2025, 11, 1)),
+             Lot("lt-gain", "a", "VTI", D(800), D(40), date(2020, 1, 1))], tax_budget=D(600)))
+    sell = _sell(plan)
+    assert plan.budget_bound
+    assert [lot["lot_id"] for lot in sell["lots"]] == ["loss", "lt-gain"]
+    assert plan.estimated_tax <= D(600)
+    assert 0 < plan.drift_after_pct < plan.drift_before_pct
+
+
+def test_min_trade_and_tolerance_band():
+    plan = solve(_problem(tolerance_pct=D(25)))
+    assert plan.trades == []  # 20% drift is inside the band
+    plan = solve(_problem(tax_budget=D(0), lots=[Lot("gain", "a", "VTI", D(700), D(10), date(2020, 1, 1))]))
+    assert [t["action"] for t in plan.trades] == []
+    assert [s["action"] for s in plan.skipped] == []  # nothing affordable: no sell, no buy
+    plan = solve(_problem(tax_budget=D("1.5"), lots=[Lot("gain", "a", "VTI", D(700), D(10), date(2020, 1, 1))]))
+    assert plan.trades == [] and plan.skipped[0]["reason"].startswith("Under minimum trade")
+
+
+def test_wash_sale_windows_block_buys_and_neutralize_losses():
+    plan = solve(_problem(no_buy=frozenset({"BND"})))
+    assert [t["action"] for t in plan.trades] == ["sell"]
+    assert plan.skipped == [{"symbol": "BND", "action": "buy", "reason": "Open wash-sale window"}]
+
+    plan = solve(_problem(wash_risk=frozenset({"VTI"})))
+    sell = _sell(plan)
+    assert sell["wash_sale_risk"] and sell["estimated_tax"] >= 0
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_problems_meet_knapsack_optimality(seed):
+    """No unsold lot with room left is cheaper per dollar than a lot that was sold."""
+    rng = random.Random(seed)
+    symbols = [f"S{i}" for i in range(6)]
+    lots, positions = [], {}
+    for s in symbols:
+        price, qty = D(rng.randint(20, 200)), D(0)
+        for j in range(rng.randint(1, 6)):
+            q = D(rng.randint(10, 100))
+            basis = (price * D(rng.randint(30, 105)) / 100).quantize(D("0.01"))  # mostly gains
+            lots.append(Lot(f"{s}-{j}", "a", s, q, basis,
+                            date.fromordinal(date(2022, 1, 1).toordinal() + rng.randint(0, 1500))))
+            qty += q
+        positions[s] = PositionIn(qty * price, price, qty)
+    targets = {s: D(100) / len(symbols) for s in symbols}
+    p = RebalanceProblem("a", positions, targets, lots=lots, tax_budget=D(rng.randint(20, 300)), as_of=AS_OF)
+    plan = solve(p)
+    assert plan.estimated_tax <= p.tax_budget + D("0.01")
+
+    def per_dollar(lot, symbol):
+        price = positions[symbol].price
+        rate = D("0.20") if is_long_term(lot.acquired, AS_OF) else D("0.37")
+        return (price - lot.basis_per_share) / price * rate
+
+    by_id = {lot.id: lot for lot in lots}
+    sold = {lot["lot_id"]: D(str(lot["shares"])) for t in plan.trades if t["action"] == "sell" for lot in t["lots"]}
+    total = sum(pos.value for pos in positions.values())
+    costs_sold = [per_dollar(by_id[i], by_id[i].symbol) for i in sold]
+    assert plan.budget_bound and costs_sold
+    for lot in lots:
+        pos = positions[lot.symbol]
+        overweight = pos.value - total * targets[lot.symbol] / 100
+        sold_symbol = sum((q * pos.price for i, q in sold.items() if by_id[i].symbol == lot.symbol), D(0))
+        has_room = overweight - sold_symbol > D(100) and sold.get(lot.id, D(0)) < lot.quantity
+        if has_room:
+            assert per_dollar(lot, lot.symbol) >= max(costs_sold) - D("0.000001")
+
+
+def test_pool_batch_matches_inline():
+    problems = [_problem(account_id=f"a{i}", tax_budget=D(i * 50)) for i in range(INLINE_BELOW + 4)]
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        pooled = solve_many(problems, pool=pool, workers=2)
+    assert pooled == [solve(p) for p in problems]
@@ -0,0 +1,135 @@
+"""Unit tests for counter-based usage metering."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from backend.services import usage_tracker
+from backend.services.usage_tracker import UsageTracker
+
+
+class FakeRedis:
+    """Minimal in-memory subset of the redis.asyncio API used by the tracker."""
+
+    def __init__(self):
+        self.data = {}
+        self.sets = {}
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return False
+        self.data[key] = int(value)
+        return True
+
+    async def get(self, key):
+        return None if key not in self.data else str(self.data[key])
+
+    async def incr(self, key):
+        self.data[key] = self.data.get(key, 0) + 1
+        return self.data[key]
+
+    async def decr(self, key):
+        self.data[key] = self.data.get(key, 0) - 1
+        return self.data[key]
+
+    async def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(members)
+
+
+def _db(existing_count=None):
+    db = MagicMock()
+    result = MagicMock()
+    result.scalar.return_value = existing_count
+    db.execute = AsyncMock(return_value=result)
+    db.flush = AsyncMock()
+    return db
+
+
+@pytest.mark.asyncio
+async def test_redis_consume_is_bounded_and_seeded_from_db():
+    redis = FakeRedis()
+    db = _db(existing_count=8)
+    user = uuid4()
+    with patch.object(usage_tracker, "get_redis", AsyncMock(return_value=redis)):
+        tracker = UsageTracker(db)
+        assert await tracker.try_consume(user, "ai_chat_messages", 10) == (True, 9)
+        assert await tracker.try_consume(user, "ai_chat_messages", 10) == (True, 10)
+        assert await tracker.try_consume(user, "ai_chat_messages", 10) == (False, 10)
+        assert await tracker.get_monthly_count(user, "ai_chat_messages") == 10
+
+        await tracker.release(user, "ai_chat_messages")
+        assert await tracker.get_monthly_count(user, "ai_chat_messages") == 9
+
+    # Seeded once from usage_counters, never a COUNT(*) over usage_logs
+    assert db.execute.await_count == 1
+    assert len(redis.sets[usage_tracker.DIRTY_KEY]) == 1
+
+
+@pytest.mark.asyncio
+async def test_unlimited_and_zero_limits():
+    redis = FakeRedis()
+    with patch.object(usage_tracker, "get_redis", AsyncMock(return_value=redis)):
+        tracker = UsageTracker(_db(existing_count=0))
+        for _ in range(3):
+            allowed, _ = await tracker.try_consume(uuid4(), "ai_chat_messages", -1)
+            assert allowed
+        assert (await tracker.try_consume(uuid4(), "statement_upload", 0))[0] is False
+
+
+@pytest.mark.asyncio
+async def test_db_fallback_is_single_conditional_upsert():
+    db = _db(existing_count=4)
+    with patch.object(usage_tracker, "get_redis", AsyncMock(return_value=None)):
+        allowed, count = await UsageTracker(db).try_consume(uuid4(), "ai_chat_messages", 5)
+    assert (allowed, count) == (True, 4)
+    sql = str(db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (user_id, feature, period) DO UPDATE" in sql
+    assert "WHERE usage_counters.count <" in sql
+    assert "RETURNING usage_counters.count" in sql
+
+
+@pytest.mark.asyncio
+async def test_audit_events_are_batched_when_worker_runs():
+    db = _db()
+    user = uuid4()
+    with patch.object(usage_tracker, "_worker_running", True), patch.object(
+        usage_tracker, "_event_buffer", []
+    ) as buffer:
+        tracker = UsageTracker(db)
+        await tracker.log_event(user, "ai_chat_messages")
+        await tracker.log_event(user, "ai_chat_messages")
+        assert len(buffer) == 2
+        db.add.assert_not_called()
+
+        flush_db = MagicMock(execute=AsyncMock(), commit=AsyncMock())
+        assert await usage_tracker.flush_usage_events(flush_db) == 2
+        rows = flush_db.execute.await_args.args[1]
+        assert len(rows) == 2 and rows[0]["user_id"] == user
+        assert buffer == []
+
+
+@pytest.mark.asyncio
+async def test_chat_failure_gives_back_the_reserved_unit():
+    from types import SimpleNamespace
+
+    from backend.api.b2c import chat
+    from backend.api.b2c.middleware import require_usage_quota
+
+    redis = FakeRedis()
+    db = _db(existing_count=8)
+    user = SimpleNamespace(id=uuid4(), household_id=None, client_id=None, subscription_tier="free")
+    orchestrator = MagicMock()
+    orchestrator.return_value.process_query = AsyncMock(side_effect=RuntimeError("provider down"))
+    with patch.object(usage_tracker, "get_redis", AsyncMock(return_value=redis)), \
+            patch.object(chat, "AIOrchestrator", orchestrator):
+        reserved = await require_usage_quota("ai_chat_messages")(current_user=user, db=db)
+        assert await UsageTracker(db).get_monthly_count(user.id, "ai_chat_messages") == 9
+
+        with pytest.raises(RuntimeError, match="provider down"):
+            await chat.b2c_chat(chat.ChatRequest(message="hi"), current_user=reserved, db=db)
+        assert await UsageTracker(db).get_monthly_count(user.id, "ai_chat_messages") == 8
@@ -0,0 +1,105 @@
+"""Unit tests for the indexed wash-sale engine."""
+
+from datetime import date, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+from backend.models.tax_harvest import WashSaleStatus
+from backend.services.tax_harvest.wash_sale_engine import (
+    SecurityGroups,
+    WashSaleEngine,
+)
+
+TODAY = date(2026, 10, 18)
+
+
+def _engine(pairs=()):
+    engine = WashSaleEngine(db=None)
+    engine.as_of = TODAY
+    for a, b in pairs:
+        engine.index.groups.union(a, b)
+    return engine
+
+
+def _buy(engine, scope, symbol, on, txn_id=None):
+    engine.index.add_buy(
+        scope,
+        symbol,
+        on,
+        {"id": txn_id or str(uuid4()), "symbol": symbol, "date": on.isoformat(), "amount": -1000.0},
+    )
+
+
+def test_groups_merge_transitively():
+    groups = SecurityGroups([("QQQM", "QQQ"), ("QQQ", "ONEQ"), ("VTI", "ITOT")])
+    assert groups.key("qqqm") == groups.key("ONEQ") == "ONEQ"
+    assert groups.identical_to("QQQ") == ["ONEQ", "QQQM"]
+    assert groups.key("AAPL") == "AAPL"
+
+
+def test_sale_conflicts_span_client_accounts_and_identical_symbols():
+    engine = _engine([("SPY", "VOO")])
+    client = str(uuid4())
+    ira, taxable = uuid4(), uuid4()
+    engine._scope_of.update({ira: client, taxable: client})
+
+    _buy(engine, client, "VOO", TODAY - timedelta(days=10))
+    _buy(engine, client, "VOO", TODAY - timedelta(days=45))  # outside window
+
+    analysis = engine.analyze_sale(taxable, "SPY")
+    assert analysis["status"] == WashSaleStatus.IN_WINDOW
+    assert len(analysis["blocking_transactions"]) == 1
+    assert analysis["watch_symbols"] == ["SPY", "VOO"]
+
+    other = uuid4()  # different taxpayer
+    assert engine.analyze_sale(other, "SPY")["status"] == WashSaleStatus.CLEAR
+
+
+def test_buy_conflicts_respect_window_bounds():
+    engine = _engine()
+    account = uuid4()
+    sale = TODAY - timedelta(days=20)
+    engine.index.add_window(
+        str(account),
+        ["VTI"],
+        sale,
+        {
+            "id": "w1",
+            "symbol": "VTI",
+            "sale_date": sale.isoformat(),
+            "window_start": sale - timedelta(days=30),
+            "window_end": sale + timedelta(days=30),
+            "loss_amount": 500.0,
+        },
+    )
+    assert engine.buy_conflicts(account, "VTI")[0]["window_end"] == "2026-10-28"
+    assert engine.buy_conflicts(account, "VTI", on=TODAY + timedelta(days=11)) == []
+
+    trades = [
+        {"symbol": "VTI", "action": "buy", "value": 1000.0},
+        {"symbol": "BND", "action": "buy", "value": 1000.0},
+        {"symbol": "VTI", "action": "sell", "value": 1000.0},
+    ]
+    engine.check_trades(account, trades)
+    assert trades[0]["wash_sale_risk"] is True
+    assert "wash_sale_risk" not in trades[1] and "wash_sale_risk" not in trades[2]
+
+
+def test_first_violation_ignores_the_triggering_sale():
+    engine = _engine([("IVV", "VOO")])
+    account = uuid4()
+    sell_id = uuid4()
+    sale = TODAY - timedelta(days=5)
+    window = SimpleNamespace(
+        account_id=account,
+        symbol="IVV",
+        watch_symbols=["IVV"],
+        sell_transaction_id=sell_id,
+        window_start=sale - timedelta(days=30),
+        window_end=sale + timedelta(days=30),
+    )
+    _buy(engine, str(account), "IVV", sale, txn_id=str(sell_id))
+    assert engine.first_violation(window) is None
+
+    _buy(engine, str(account), "VOO", TODAY)
+    assert engine.first_violation(window)["symbol"] == "VOO"